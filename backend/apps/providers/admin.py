@@ -22,6 +22,7 @@ class ProviderAdmin(admin.ModelAdmin):
         "created_at",
         "updated_at",
         "last_sync_at",
+        "last_snapshot_at",
         "encrypted_credentials",
     )
 
@@ -37,7 +38,12 @@ class ProviderAdmin(admin.ModelAdmin):
         (
             "Sync Info",
             {
-                "fields": ("last_sync_at", "last_sync_status"),
+                "fields": (
+                    "sync_interval",
+                    "last_sync_at",
+                    "last_sync_status",
+                    "last_snapshot_at",
+                ),
             },
         ),
         (
@@ -6,3 +6,23 @@ class ProviderType(models.TextChoices):
 
     CONTABO = "contabo", "Contabo"
     DIGITALOCEAN = "digitalocean", "DigitalOcean"
+
+
+class InstanceStatus(models.TextChoices):
+    """Normalized VPS instance statuses."""
+
+    RUNNING = "running", "Running"
+    STOPPED = "stopped", "Stopped"
+    ERROR = "error", "Error"
+
+
+class SyncStatus(models.TextChoices):
+    """Provider ``last_sync_status`` values."""
+
+    SUCCESS = "success", "Success"
+    FAILED = "failed", "Failed"
+    PENDING = "pending", "Pending"
+    # Last sync failed fast: the account's circuit breaker is open
+    CIRCUIT_OPEN = "open", "Circuit open"
+    # Last sync failed while the circuit breaker was probing the provider
+    CIRCUIT_HALF_OPEN = "half_open", "Circuit half-open"
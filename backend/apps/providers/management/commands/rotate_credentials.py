@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from providers.models import Provider
+from providers.services.encryption import rotate_credentials
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-encrypt all provider credentials with the primary key of ENCRYPTION_KEYS. "
+        "Run after adding a new first key; older keys can be removed afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Check that every provider can be decrypted without saving anything",
+        )
+
+    def handle(self, *args, **options):
+        rotated = failed = 0
+
+        with transaction.atomic():
+            for provider in Provider.objects.only(
+                "id", "name", "encrypted_credentials"
+            ).iterator():
+                try:
+                    encrypted = rotate_credentials(provider.encrypted_credentials)
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(
+                        f"{provider.name} (#{provider.id}): cannot decrypt ({e!r})"
+                    )
+                    continue
+
+                if not options["dry_run"]:
+                    # update() keeps updated_at: the credentials did not change
+                    Provider.objects.filter(id=provider.id).update(
+                        encrypted_credentials=encrypted
+                    )
+                rotated += 1
+
+        action = "Can rotate" if options["dry_run"] else "Rotated"
+        self.stdout.write(f"{action} {rotated} providers, {failed} failed")
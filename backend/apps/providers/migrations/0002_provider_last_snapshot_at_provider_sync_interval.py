@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("providers", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="provider",
+            name="last_snapshot_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="When background sync last stored this provider's instances",
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="provider",
+            name="sync_interval",
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text="Seconds between background syncs (empty: VPS_SYNC_INTERVAL)",
+                null=True,
+            ),
+        ),
+    ]
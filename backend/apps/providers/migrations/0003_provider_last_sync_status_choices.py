@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("providers", "0002_provider_last_snapshot_at_provider_sync_interval"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="provider",
+            name="last_sync_status",
+            field=models.CharField(
+                blank=True,
+                choices=[
+                    ("success", "Success"),
+                    ("failed", "Failed"),
+                    ("pending", "Pending"),
+                    ("open", "Circuit open"),
+                    ("half_open", "Circuit half-open"),
+                ],
+                help_text="Last sync status, or the state of the provider's fetch circuit",
+                max_length=50,
+                null=True,
+            ),
+        ),
+    ]
@@ -1,8 +1,9 @@
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.db import models
 
-from .constants import ProviderType
-from .services.encryption import decrypt_credentials, encrypt_credentials
+from .constants import ProviderType, SyncStatus
+from .services.encryption import encrypt_credentials, get_cached_credentials
 
 
 class Provider(models.Model):
@@ -24,9 +25,20 @@ class Provider(models.Model):
     last_sync_at = models.DateTimeField(null=True, blank=True)
     last_sync_status = models.CharField(
         max_length=50,
+        choices=SyncStatus.choices,
         null=True,
         blank=True,
-        help_text="Last sync status: success, error",
+        help_text="Last sync status, or the state of the provider's fetch circuit",
+    )
+    sync_interval = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Seconds between background syncs (empty: VPS_SYNC_INTERVAL)",
+    )
+    last_snapshot_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="When background sync last stored this provider's instances",
     )
 
     class Meta:
@@ -40,10 +52,22 @@ class Provider(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_provider_type_display()})"
 
+    def get_sync_interval(self) -> int:
+        """Seconds between background syncs of this provider."""
+        return self.sync_interval or settings.VPS_SYNC_INTERVAL
+
     def set_credentials(self, credentials: dict) -> None:
         """Encrypt and store credentials."""
         self.encrypted_credentials = encrypt_credentials(credentials)
 
     def get_credentials(self) -> dict:
-        """Decrypt and retrieve credentials."""
-        return decrypt_credentials(self.encrypted_credentials)
+        """
+        Decrypt and retrieve credentials.
+
+        Cached briefly per process, keyed by the row's version and
+        ciphertext, so updated credentials are never served stale.
+        """
+        return get_cached_credentials(
+            (self.pk, self.updated_at, self.encrypted_credentials),
+            self.encrypted_credentials,
+        )
@@ -2,11 +2,14 @@ from rest_framework import serializers
 
 from .constants import ProviderType
 from .models import Provider
+from .services.transport import get_circuit_breaker
 
 
 class ProviderListSerializer(serializers.ModelSerializer):
     """Serializer for listing providers (excludes sensitive data)."""
 
+    circuit_state = serializers.SerializerMethodField()
+
     class Meta:
         model = Provider
         fields = [
@@ -16,8 +19,11 @@ class ProviderListSerializer(serializers.ModelSerializer):
             "is_active",
             "created_at",
             "updated_at",
+            "sync_interval",
             "last_sync_at",
             "last_sync_status",
+            "last_snapshot_at",
+            "circuit_state",
         ]
         read_only_fields = [
             "id",
@@ -25,8 +31,13 @@ class ProviderListSerializer(serializers.ModelSerializer):
             "updated_at",
             "last_sync_at",
             "last_sync_status",
+            "last_snapshot_at",
         ]
 
+    def get_circuit_state(self, obj) -> str:
+        """Live state of the account's transport circuit breaker."""
+        return get_circuit_breaker(obj.id).get_state()
+
 
 class ProviderCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating/updating providers with credentials."""
@@ -37,7 +48,14 @@ class ProviderCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Provider
-        fields = ["id", "name", "provider_type", "credentials", "is_active"]
+        fields = [
+            "id",
+            "name",
+            "provider_type",
+            "credentials",
+            "is_active",
+            "sync_interval",
+        ]
         read_only_fields = ["id"]
 
     def validate_credentials(self, value):
@@ -70,13 +88,20 @@ class ProviderCreateSerializer(serializers.ModelSerializer):
         return provider
 
     def update(self, instance, validated_data):
-        """Update provider, re-encrypting credentials if provided."""
-        if "credentials" in validated_data:
-            credentials = validated_data.pop("credentials")
+        """
+        Update provider, re-encrypting credentials if provided.
+
+        New credentials close the account's circuit breaker, so they are
+        tried right away instead of after the cool-down of the old ones.
+        """
+        credentials = validated_data.pop("credentials", None)
+        if credentials is not None:
             instance.set_credentials(credentials)
 
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
 
         instance.save()
+        if credentials is not None:
+            get_circuit_breaker(instance.id).reset()
         return instance
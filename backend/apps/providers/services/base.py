@@ -1,12 +1,31 @@
+import sys
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from datetime import datetime
-from typing import List
+from decimal import Decimal
+from typing import List, Tuple
 
+import httpx
+from django.conf import settings
 
-@dataclass
+from providers.constants import InstanceStatus
+
+from . import projection
+from .errors import ProviderError, ProviderUnavailable
+from .http import get_async_http_client, get_http_client
+from .transport import ProviderTransport, is_streamed
+
+
+@dataclass(slots=True)
 class VPSInstance:
-    """Normalized VPS instance data from any provider."""
+    """
+    Normalized VPS instance data from any provider.
+
+    ``status`` and ``provider_type`` are ``InstanceStatus``/``ProviderType``
+    members (plain strings otherwise) and ``region`` is interned, so large
+    fleets share those values. ``raw_data`` is only kept when
+    ``PROVIDER_KEEP_RAW_DATA`` is enabled.
+    """
 
     id: str
     name: str
@@ -21,13 +40,27 @@ class VPSInstance:
     provider_type: str
     provider_account_id: int
     plan: str | None = None
-    monthly_price: float | None = None
+    # A Decimal once a custom price is applied
+    monthly_price: float | Decimal | None = None
     currency: str = "USD"
-    raw_data: dict = None
+    raw_data: dict | None = None
 
 
 class BaseProviderClient(ABC):
-    """Abstract base class for provider API clients."""
+    """
+    Abstract base class for provider API clients.
+
+    API calls go through ``_request``, which applies the account's rate
+    limit, retries and circuit breaker (see ``ProviderTransport``) and
+    raises ``ProviderError`` subclasses.
+
+    Listing pages fetched through ``_fetch_page`` are requested
+    conditionally when the caller sets ``page_cache`` (a ``PageCache``).
+    """
+
+    PROVIDER_TYPE: str = ""
+    # Parts of a listing page read by ``_parse_page`` (see ``projection``)
+    PAGE_FIELDS: dict | None = None
 
     def __init__(self, credentials: dict, provider_id: int):
         """
@@ -39,6 +72,8 @@ class BaseProviderClient(ABC):
         """
         self.credentials = credentials
         self.provider_id = provider_id
+        self.transport = ProviderTransport(self.PROVIDER_TYPE, provider_id)
+        self.page_cache = None
 
     @abstractmethod
     def authenticate(self) -> bool:
@@ -55,8 +90,123 @@ class BaseProviderClient(ABC):
         """Fetch a single VPS instance by ID."""
         pass
 
+    @abstractmethod
+    def _parse_page(self, data: dict) -> Tuple[List[VPSInstance], int]:
+        """Normalize one listing page. Returns (instances, total pages)."""
+        pass
+
+    def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send an API request through the account's transport."""
+        return self.transport.request(get_http_client(), method, url, **kwargs)
+
+    def _fetch_page(
+        self, url: str, headers: dict, params: dict
+    ) -> Tuple[List[VPSInstance], int]:
+        """
+        Fetch and normalize one listing page. Returns (instances, total pages).
+
+        With a ``page_cache`` the request is conditional, and a page the
+        provider reports unchanged is served from the previous snapshot.
+        """
+        if self.page_cache is None:
+            response = self._request_page(url, headers, params)
+            return self._parse_page(self._get_json(response, self.PAGE_FIELDS))
+
+        key = self.page_cache.get_key(url, params)
+        response = self._request_page(
+            url, {**headers, **self.page_cache.get_headers(key)}, params
+        )
+        if response.status_code == 304:
+            page = self.page_cache.get_page(key)
+            if page is not None:
+                return page
+            response = self._request_page(url, headers, params)
+
+        instances, total_pages = self._parse_page(
+            self._get_json(response, self.PAGE_FIELDS)
+        )
+        self.page_cache.store(key, response, instances, total_pages)
+        return instances, total_pages
+
+    def _request_page(self, url: str, headers: dict, params: dict) -> httpx.Response:
+        """
+        Request a listing page. Large pages are left unread, to be decoded
+        by ``_get_json`` as they stream in.
+        """
+        return self._request(
+            "GET",
+            url,
+            headers=headers,
+            params=params,
+            stream_over=self._get_stream_threshold(),
+        )
+
     @staticmethod
-    def _normalize_status(provider_status: str) -> str:
+    def _get_stream_threshold() -> int | None:
+        """Size above which listing pages are stream-decoded (None: never)."""
+        if settings.PROVIDER_KEEP_RAW_DATA:
+            return None
+        return settings.PROVIDER_STREAM_PARSE_MIN_BYTES
+
+    @staticmethod
+    def _get_json(response: httpx.Response, fields: dict | None = None) -> dict:
+        """
+        Decode a JSON response body.
+
+        With ``fields`` only the parts of the body they select are kept
+        (see ``projection``), unless ``PROVIDER_KEEP_RAW_DATA`` asks for
+        whole responses. Bodies over ``PROVIDER_STREAM_PARSE_MIN_BYTES``
+        are decoded while they download (see ``_request_page``).
+        """
+        stream_over = BaseProviderClient._get_stream_threshold()
+        try:
+            if fields is None or stream_over is None:
+                return response.json()
+            if not is_streamed(response, stream_over):
+                return projection.loads(response.content, fields)
+            try:
+                decoder = projection.StreamDecoder(fields)
+                for chunk in response.iter_bytes():
+                    decoder.feed(chunk)
+                return decoder.close()
+            finally:
+                response.close()
+        except ValueError as e:
+            raise ProviderError(
+                f"Invalid JSON from {response.request.url}: {e}",
+                status_code=response.status_code,
+            )
+        except httpx.RequestError as e:
+            raise ProviderUnavailable(f"Reading {response.request.url} failed: {e}")
+
+    @staticmethod
+    async def _aget_json(response: httpx.Response, fields: dict | None = None) -> dict:
+        """Asyncio variant of ``_get_json``."""
+        stream_over = BaseProviderClient._get_stream_threshold()
+        if (
+            fields is None
+            or stream_over is None
+            or not is_streamed(response, stream_over)
+        ):
+            return BaseProviderClient._get_json(response, fields)
+        try:
+            try:
+                decoder = projection.StreamDecoder(fields)
+                async for chunk in response.aiter_bytes():
+                    decoder.feed(chunk)
+                return decoder.close()
+            finally:
+                await response.aclose()
+        except ValueError as e:
+            raise ProviderError(
+                f"Invalid JSON from {response.request.url}: {e}",
+                status_code=response.status_code,
+            )
+        except httpx.RequestError as e:
+            raise ProviderUnavailable(f"Reading {response.request.url} failed: {e}")
+
+    @staticmethod
+    def _normalize_status(provider_status: str) -> InstanceStatus:
         """
         Normalize provider-specific status to standard format.
 
@@ -65,8 +215,84 @@ class BaseProviderClient(ABC):
         status_lower = provider_status.lower()
 
         if status_lower in ["on", "active", "running"]:
-            return "running"
+            return InstanceStatus.RUNNING
         elif status_lower in ["off", "stopped", "paused"]:
-            return "stopped"
+            return InstanceStatus.STOPPED
         else:
-            return "error"
+            return InstanceStatus.ERROR
+
+    @staticmethod
+    def _normalize_region(region: str) -> str:
+        """Intern region names; a fleet has only a handful of them."""
+        return sys.intern(region or "")
+
+    @staticmethod
+    def _keep_raw_data(data: dict) -> dict | None:
+        """Return the raw API response only if raw data retention is enabled."""
+        return data if settings.PROVIDER_KEEP_RAW_DATA else None
+
+
+class AsyncBaseProviderClient(BaseProviderClient):
+    """
+    Abstract base class for asyncio provider API clients.
+
+    Same contract as ``BaseProviderClient`` but every API call is a
+    coroutine, so one event loop can wait on many providers at once.
+    """
+
+    async def _arequest(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send an API request through the account's transport."""
+        return await self.transport.arequest(
+            get_async_http_client(), method, url, **kwargs
+        )
+
+    async def _afetch_page(
+        self, url: str, headers: dict, params: dict
+    ) -> Tuple[List[VPSInstance], int]:
+        """Asyncio variant of ``_fetch_page``."""
+        if self.page_cache is None:
+            response = await self._arequest_page(url, headers, params)
+            return self._parse_page(await self._aget_json(response, self.PAGE_FIELDS))
+
+        key = self.page_cache.get_key(url, params)
+        response = await self._arequest_page(
+            url, {**headers, **self.page_cache.get_headers(key)}, params
+        )
+        if response.status_code == 304:
+            page = self.page_cache.get_page(key)
+            if page is not None:
+                return page
+            response = await self._arequest_page(url, headers, params)
+
+        instances, total_pages = self._parse_page(
+            await self._aget_json(response, self.PAGE_FIELDS)
+        )
+        self.page_cache.store(key, response, instances, total_pages)
+        return instances, total_pages
+
+    async def _arequest_page(
+        self, url: str, headers: dict, params: dict
+    ) -> httpx.Response:
+        """Asyncio variant of ``_request_page``."""
+        return await self._arequest(
+            "GET",
+            url,
+            headers=headers,
+            params=params,
+            stream_over=self._get_stream_threshold(),
+        )
+
+    @abstractmethod
+    async def authenticate(self) -> bool:
+        """Authenticate with provider API. Returns True if successful."""
+        pass
+
+    @abstractmethod
+    async def list_instances(self) -> List[VPSInstance]:
+        """Fetch all VPS instances from provider."""
+        pass
+
+    @abstractmethod
+    async def get_instance(self, instance_id: str) -> VPSInstance:
+        """Fetch a single VPS instance by ID."""
+        pass
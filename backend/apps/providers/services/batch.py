@@ -0,0 +1,169 @@
+"""
+Columnar container of normalized VPS instances.
+
+``InstanceBatch`` keeps one list per ``VPSInstance`` field instead of one
+object per instance. Cache codecs, the aggregator, filters and the
+serializer all work on batches, so large fleets are handled as a few
+lists rather than thousands of objects; ``VPSInstance`` objects are only
+built when a caller iterates the batch.
+"""
+
+import hashlib
+import sys
+from typing import Dict, Iterable, Iterator, List
+
+from providers.constants import InstanceStatus, ProviderType
+
+from .base import VPSInstance
+
+# Batch columns, in VPSInstance positional order (raw_data is not kept)
+FIELDS = [
+    "id",
+    "name",
+    "status",
+    "ipv4",
+    "ipv6",
+    "cpu_cores",
+    "ram_mb",
+    "disk_gb",
+    "region",
+    "created_at",
+    "provider_type",
+    "provider_account_id",
+    "plan",
+    "monthly_price",
+    "currency",
+]
+
+_STATUSES = {status.value: status for status in InstanceStatus}
+_PROVIDER_TYPES = {provider_type.value: provider_type for provider_type in ProviderType}
+
+
+class InstanceBatch:
+    """Instances of one or more providers, stored column by column."""
+
+    __slots__ = ("columns", "version", "fetched_at")
+
+    def __init__(
+        self,
+        columns: Dict[str, list] | None = None,
+        version: str | None = None,
+        fetched_at: float | None = None,
+    ):
+        """
+        Initialize batch.
+
+        Args:
+            columns: Field name -> list of values, all of the same length
+            version: Identifies the batch's content (e.g. the snapshot it
+                was loaded from); None when unknown. Batches with the same
+                version hold the same data.
+            fetched_at: Unix time the data was fetched from the provider
+        """
+        self.columns = columns or {name: [] for name in FIELDS}
+        self.version = version
+        self.fetched_at = fetched_at
+
+    @classmethod
+    def from_instances(cls, instances: Iterable[VPSInstance]) -> "InstanceBatch":
+        """Build a batch from ``VPSInstance`` objects."""
+        instances = list(instances)
+        return cls(
+            {
+                name: [getattr(instance, name) for instance in instances]
+                for name in FIELDS
+            }
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "InstanceBatch":
+        """
+        Build a batch from dicts keyed by field name.
+
+        Repeated strings (status, region, provider type) coming from JSON
+        or the database are replaced by shared values.
+        """
+        rows = list(rows)
+        columns = {name: [row[name] for row in rows] for name in FIELDS}
+        return cls(cls.intern_columns(columns))
+
+    @staticmethod
+    def intern_columns(columns: Dict[str, list]) -> Dict[str, list]:
+        """Share status, provider type and region values across rows."""
+        columns["status"] = [_STATUSES.get(value, value) for value in columns["status"]]
+        columns["provider_type"] = [
+            _PROVIDER_TYPES.get(value, value) for value in columns["provider_type"]
+        ]
+        columns["region"] = [sys.intern(value) for value in columns["region"]]
+        return columns
+
+    @classmethod
+    def concat(cls, batches: Iterable["InstanceBatch"]) -> "InstanceBatch":
+        """
+        Join several batches into one, in order.
+
+        The result is versioned only if all parts are, and counts as
+        fetched when its oldest part was.
+        """
+        batches = list(batches)
+        result = cls()
+        for batch in batches:
+            for name in FIELDS:
+                result.columns[name].extend(batch.columns[name])
+
+        result.version = cls.combine_versions([batch.version for batch in batches])
+        fetched = [batch.fetched_at for batch in batches]
+        if fetched and None not in fetched:
+            result.fetched_at = min(fetched)
+        return result
+
+    @staticmethod
+    def combine_versions(versions: List[str | None]) -> str | None:
+        """Version of the concatenation of batches with these versions."""
+        if None in versions:
+            return None
+        return hashlib.sha1("|".join(versions).encode()).hexdigest()
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    def __iter__(self) -> Iterator[VPSInstance]:
+        return (VPSInstance(*values) for values in zip(*self._ordered_columns()))
+
+    def __getitem__(self, index: int) -> VPSInstance:
+        return VPSInstance(*(column[index] for column in self._ordered_columns()))
+
+    def column(self, name: str) -> list:
+        """Values of one field."""
+        return self.columns[name]
+
+    def take(self, indexes: Iterable[int]) -> "InstanceBatch":
+        """New batch with the rows at ``indexes``, in that order."""
+        indexes = list(indexes)
+        return InstanceBatch(
+            {
+                name: [column[i] for i in indexes]
+                for name, column in self.columns.items()
+            }
+        )
+
+    def filter(self, **criteria) -> "InstanceBatch":
+        """New batch with the rows whose fields equal all given values."""
+        indexes = range(len(self))
+        for name, value in criteria.items():
+            column = self.columns[name]
+            indexes = [i for i in indexes if column[i] == value]
+        return self.take(indexes)
+
+    def rows(self) -> Iterator[dict]:
+        """Rows as dicts keyed by field name."""
+        names = list(self.columns)
+        return (dict(zip(names, values)) for values in zip(*self.columns.values()))
+
+    def to_instances(self) -> List[VPSInstance]:
+        """Materialize the batch as ``VPSInstance`` objects."""
+        return list(self)
+
+    def _ordered_columns(self) -> List[list]:
+        """Columns in VPSInstance positional order."""
+        return [self.columns[name] for name in FIELDS]
@@ -0,0 +1,102 @@
+"""
+Conditional requests for paginated provider listings.
+
+When a listing page came with an ``ETag`` or ``Last-Modified`` header, the
+next fetch asks for it with ``If-None-Match``/``If-Modified-Since``. On
+``304 Not Modified`` the page's instances are taken from the previous
+snapshot instead of being downloaded and normalized again. Providers that
+ignore the headers answer 200 as usual, so nothing changes for them.
+
+Validators are kept per page together with the IDs of the instances the
+page held; the caller persists ``PageCache.validators`` next to the
+snapshot built from the fetch.
+"""
+
+from typing import Dict, List, Tuple
+from urllib.parse import urlencode
+
+import httpx
+
+from .base import VPSInstance
+from .batch import InstanceBatch
+
+
+class PageCache:
+    """Page validators of one provider listing and the snapshot they describe."""
+
+    def __init__(
+        self,
+        validators: Dict[str, dict] | None = None,
+        previous: InstanceBatch | None = None,
+    ):
+        """
+        Initialize page cache.
+
+        Args:
+            validators: Page key -> validators saved by the previous fetch
+            previous: Snapshot built by that fetch; without it no
+                conditional request is sent
+        """
+        self.previous_validators = validators if previous is not None else {}
+        self.previous = previous
+        # Validators of the pages seen by this fetch, to save for the next
+        self.validators: Dict[str, dict] = {}
+        self.not_modified = 0
+        self._rows: Dict[str, int] | None = None
+
+    @staticmethod
+    def get_key(url: str, params: dict | None = None) -> str:
+        """Key of a page request."""
+        return f"{url}?{urlencode(sorted((params or {}).items()))}"
+
+    def get_headers(self, key: str) -> dict:
+        """Conditional request headers for a page (empty if unknown)."""
+        entry = self.previous_validators.get(key)
+        if not entry:
+            return {}
+        headers = {}
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def get_page(self, key: str) -> Tuple[List[VPSInstance], int] | None:
+        """
+        Instances and total page count of an unchanged page, from the
+        previous snapshot. None if the snapshot no longer has all of them.
+        """
+        entry = self.previous_validators.get(key)
+        if not entry:
+            return None
+        if self._rows is None:
+            self._rows = {
+                instance_id: row
+                for row, instance_id in enumerate(self.previous.column("id"))
+            }
+        rows = [self._rows.get(instance_id) for instance_id in entry["ids"]]
+        if None in rows:
+            return None
+
+        self.validators[key] = entry
+        self.not_modified += 1
+        return self.previous.take(rows).to_instances(), entry["total_pages"]
+
+    def store(
+        self,
+        key: str,
+        response: httpx.Response,
+        instances: List[VPSInstance],
+        total_pages: int | None,
+    ) -> None:
+        """Remember the validators of a freshly downloaded page, if it has any."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        self.validators[key] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "ids": [instance.id for instance in instances],
+            "total_pages": total_pages,
+        }
@@ -1,20 +1,58 @@
 import uuid
 from datetime import datetime
-from typing import List
+from typing import Awaitable, Callable, List, Tuple, TypeVar
 
-import httpx
+from asgiref.sync import sync_to_async
 
-from .base import BaseProviderClient, VPSInstance
+from providers.constants import ProviderType
+
+from .base import AsyncBaseProviderClient, BaseProviderClient, VPSInstance
+from .errors import ProviderAuthError, ProviderError
+from .pagination import afetch_all_pages, fetch_all_pages
+from .projection import KEEP
+from .token_cache import TokenCache
+
+T = TypeVar("T")
 
 
 class ContaboClient(BaseProviderClient):
     """Contabo API client using OAuth 2.0 password grant flow."""
 
+    PROVIDER_TYPE = ProviderType.CONTABO
     AUTH_URL = (
         "https://auth.contabo.com/auth/realms/contabo/protocol/openid-connect/token"
     )
     API_BASE_URL = "https://api.contabo.com"
 
+    # Instance keys read by _normalize_instance
+    INSTANCE_FIELDS = {
+        **{
+            key: KEEP
+            for key in [
+                "instanceId",
+                "displayName",
+                "status",
+                "cpuCores",
+                "ramMb",
+                "diskMb",
+                "createdDate",
+                "productName",
+                "productType",
+                "productId",
+                "imageId",
+                "priceMonthly",
+                "monthlyPrice",
+                "price",
+                "billingPrice",
+                "regionName",
+                "dataCenter",
+                "region",
+            ]
+        },
+        "ipConfig": {"v4": {"ip": KEEP}, "v6": {"ip": KEEP}},
+    }
+    PAGE_FIELDS = {"data": [INSTANCE_FIELDS], "pagination": KEEP}
+
     def __init__(self, credentials: dict, provider_id: int):
         """
         Initialize Contabo client.
@@ -27,89 +65,136 @@ class ContaboClient(BaseProviderClient):
         """
         super().__init__(credentials, provider_id)
         self.access_token = None
+        self.token_cache = TokenCache(provider_id, credentials)
 
     def authenticate(self) -> bool:
-        """Authenticate using OAuth 2.0 password grant flow."""
+        """
+        Authenticate using OAuth 2.0 password grant flow.
+
+        Tokens are shared across workers through ``TokenCache``, so the
+        password grant only runs when no cached token is usable.
+        """
+        self.access_token = self.token_cache.get_or_refresh(self._request_token)
+        return bool(self.access_token)
+
+    def _request_token(self) -> Tuple[str, int]:
+        """Run the password grant. Returns (access token, expires in seconds)."""
+        try:
+            response = self._request("POST", self.AUTH_URL, data=self._get_auth_data())
+            return self._parse_token(self._get_json(response))
+        except ProviderError as e:
+            error = self._to_auth_error(e)
+            if self._is_rejected_grant(e, error):
+                self.transport.breaker.record_failure(error)
+            raise error from e
+
+    def _retry_unauthorized(self, call: Callable[[], T]) -> T:
+        """Run an API call, re-authenticating once if the token was rejected."""
         try:
-            data = {
-                "client_id": self.credentials.get("client_id"),
-                "client_secret": self.credentials.get("client_secret"),
-                "username": self.credentials.get("api_user"),
-                "password": self.credentials.get("api_password"),
-                "grant_type": "password",
-            }
-
-            with httpx.Client() as client:
-                response = client.post(self.AUTH_URL, data=data, timeout=10)
-                response.raise_for_status()
-
-                self.access_token = response.json().get("access_token")
-                return bool(self.access_token)
-        except (httpx.HTTPError, ValueError) as e:
-            raise Exception(f"Contabo authentication failed: {str(e)}")
+            return call()
+        except ProviderAuthError as e:
+            if e.status_code != 401:
+                raise
+            self.token_cache.invalidate()
+            self.authenticate()
+            return call()
 
     def list_instances(self) -> List[VPSInstance]:
-        """Fetch all VPS instances from Contabo."""
+        """Fetch all VPS instances from Contabo, prefetching pages in parallel."""
         if not self.access_token:
             self.authenticate()
 
-        instances = []
-        page = 1
+        def fetch_page(page: int) -> Tuple[List[VPSInstance], int]:
+            return self._fetch_page(
+                f"{self.API_BASE_URL}/v1/compute/instances",
+                self._get_headers(),
+                {"page": page},
+            )
 
         try:
-            with httpx.Client() as client:
-                while True:
-                    url = f"{self.API_BASE_URL}/v1/compute/instances"
-                    headers = {
-                        "Authorization": f"Bearer {self.access_token}",
-                        "x-request-id": str(uuid.uuid4()),
-                    }
-                    params = {"page": page}
-
-                    response = client.get(url, headers=headers, params=params, timeout=10)
-                    response.raise_for_status()
-
-                    data = response.json()
-                    items = data.get("data", [])
-
-                    if not items:
-                        break
-
-                    for item in items:
-                        instance = self._normalize_instance(item)
-                        instances.append(instance)
-
-                    # Check if there are more pages
-                    pagination = data.get("pagination", {})
-                    if page >= pagination.get("pages", 1):
-                        break
-
-                    page += 1
-        except httpx.HTTPError as e:
-            raise Exception(f"Failed to fetch Contabo instances: {str(e)}")
-
-        return instances
+            return self._retry_unauthorized(lambda: fetch_all_pages(fetch_page))
+        except ProviderError as e:
+            raise e.with_context("Failed to fetch Contabo instances") from e
 
     def get_instance(self, instance_id: str) -> VPSInstance:
         """Fetch a single VPS instance by ID."""
         if not self.access_token:
             self.authenticate()
 
+        def fetch() -> VPSInstance:
+            response = self._request(
+                "GET",
+                f"{self.API_BASE_URL}/v1/compute/instances/{instance_id}",
+                headers=self._get_headers(),
+            )
+            return self._parse_instance(self._get_json(response, self.PAGE_FIELDS))
+
         try:
-            with httpx.Client() as client:
-                url = f"{self.API_BASE_URL}/v1/compute/instances/{instance_id}"
-                headers = {
-                    "Authorization": f"Bearer {self.access_token}",
-                    "x-request-id": str(uuid.uuid4()),
-                }
+            return self._retry_unauthorized(fetch)
+        except ProviderError as e:
+            raise e.with_context(f"Failed to fetch Contabo instance {instance_id}") from e
+
+    def _get_auth_data(self) -> dict:
+        """Get OAuth password grant form data."""
+        return {
+            "client_id": self.credentials.get("client_id"),
+            "client_secret": self.credentials.get("client_secret"),
+            "username": self.credentials.get("api_user"),
+            "password": self.credentials.get("api_password"),
+            "grant_type": "password",
+        }
+
+    @staticmethod
+    def _parse_token(data: dict) -> Tuple[str, int]:
+        """Extract the access token and its lifetime from a token response."""
+        return data.get("access_token"), int(data.get("expires_in", 300))
+
+    @staticmethod
+    def _to_auth_error(error: ProviderError) -> ProviderError:
+        """
+        Describe a failed password grant.
+
+        Rejected credentials become a ``ProviderAuthError``; throttling and
+        outages keep their type so they are retried or reported as such.
+        The token endpoint answers 400/401 for bad credentials.
+        """
+        if isinstance(error, ProviderAuthError) or error.status_code == 400:
+            return ProviderAuthError(
+                f"Contabo authentication failed: {error}", status_code=error.status_code
+            )
+        return error.with_context("Contabo authentication failed")
+
+    @staticmethod
+    def _is_rejected_grant(error: ProviderError, auth_error: ProviderError) -> bool:
+        """
+        Whether a failed password grant still has to be counted by the breaker.
 
-                response = client.get(url, headers=headers, timeout=10)
-                response.raise_for_status()
+        The transport counts 401/403 itself, but not the token endpoint's 400.
+        """
+        return isinstance(auth_error, ProviderAuthError) and not isinstance(
+            error, ProviderAuthError
+        )
 
-                item = response.json().get("data", {})
-                return self._normalize_instance(item)
-        except httpx.HTTPError as e:
-            raise Exception(f"Failed to fetch Contabo instance {instance_id}: {str(e)}")
+    def _get_headers(self) -> dict:
+        """Get authorization headers with a fresh request ID."""
+        return {
+            "Authorization": f"Bearer {self.access_token}",
+            "x-request-id": str(uuid.uuid4()),
+        }
+
+    def _parse_page(self, data: dict) -> Tuple[List[VPSInstance], int]:
+        """Normalize one instance listing page. Returns (instances, total pages)."""
+        instances = [self._normalize_instance(item) for item in data.get("data", [])]
+        pagination = data.get("pagination", {})
+        return instances, pagination.get("totalPages", pagination.get("pages", 1))
+
+    def _parse_instance(self, data: dict) -> VPSInstance:
+        """Normalize a single instance response."""
+        items = data.get("data", {})
+        # The single-instance endpoint wraps the instance in a list
+        if isinstance(items, list):
+            items = items[0] if items else {}
+        return self._normalize_instance(items)
 
     def _normalize_instance(self, data: dict) -> VPSInstance:
         """Normalize Contabo API response to VPSInstance."""
@@ -180,13 +265,80 @@ class ContaboClient(BaseProviderClient):
             cpu_cores=data.get("cpuCores", 0),
             ram_mb=data.get("ramMb", 0),
             disk_gb=disk_gb,
-            region=region,
+            region=self._normalize_region(region),
             created_at=created_at,
-            provider_type="contabo",
+            provider_type=ProviderType.CONTABO,
             provider_account_id=self.provider_id,
             plan=plan,
             monthly_price=price,
             currency="USD",
-            raw_data=data,
+            raw_data=self._keep_raw_data(data),
         )
 
+
+class AsyncContaboClient(AsyncBaseProviderClient, ContaboClient):
+    """Asyncio Contabo API client sharing the process-wide connection pool."""
+
+    async def authenticate(self) -> bool:
+        """Authenticate using OAuth 2.0 password grant flow, via ``TokenCache``."""
+        self.access_token = await self.token_cache.aget_or_refresh(self._arequest_token)
+        return bool(self.access_token)
+
+    async def _arequest_token(self) -> Tuple[str, int]:
+        """Run the password grant. Returns (access token, expires in seconds)."""
+        try:
+            response = await self._arequest("POST", self.AUTH_URL, data=self._get_auth_data())
+            return self._parse_token(self._get_json(response))
+        except ProviderError as e:
+            error = self._to_auth_error(e)
+            if self._is_rejected_grant(e, error):
+                await sync_to_async(
+                    self.transport.breaker.record_failure, thread_sensitive=False
+                )(error)
+            raise error from e
+
+    async def _aretry_unauthorized(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Run an API call, re-authenticating once if the token was rejected."""
+        try:
+            return await call()
+        except ProviderAuthError as e:
+            if e.status_code != 401:
+                raise
+            await sync_to_async(self.token_cache.invalidate)()
+            await self.authenticate()
+            return await call()
+
+    async def list_instances(self) -> List[VPSInstance]:
+        """Fetch all VPS instances from Contabo, prefetching pages in parallel."""
+        if not self.access_token:
+            await self.authenticate()
+
+        async def fetch_page(page: int) -> Tuple[List[VPSInstance], int]:
+            return await self._afetch_page(
+                f"{self.API_BASE_URL}/v1/compute/instances",
+                self._get_headers(),
+                {"page": page},
+            )
+
+        try:
+            return await self._aretry_unauthorized(lambda: afetch_all_pages(fetch_page))
+        except ProviderError as e:
+            raise e.with_context("Failed to fetch Contabo instances") from e
+
+    async def get_instance(self, instance_id: str) -> VPSInstance:
+        """Fetch a single VPS instance by ID."""
+        if not self.access_token:
+            await self.authenticate()
+
+        async def fetch() -> VPSInstance:
+            response = await self._arequest(
+                "GET",
+                f"{self.API_BASE_URL}/v1/compute/instances/{instance_id}",
+                headers=self._get_headers(),
+            )
+            return self._parse_instance(self._get_json(response, self.PAGE_FIELDS))
+
+        try:
+            return await self._aretry_unauthorized(fetch)
+        except ProviderError as e:
+            raise e.with_context(f"Failed to fetch Contabo instance {instance_id}") from e
@@ -1,15 +1,45 @@
+import math
 from datetime import datetime
-from typing import List
+from typing import List, Tuple
+from urllib.parse import parse_qs, urlparse
 
-import httpx
+from providers.constants import ProviderType
 
-from .base import BaseProviderClient, VPSInstance
+from .base import AsyncBaseProviderClient, BaseProviderClient, VPSInstance
+from .errors import ProviderAuthError, ProviderError
+from .pagination import afetch_all_pages, fetch_all_pages
+from .projection import KEEP
 
 
 class DigitalOceanClient(BaseProviderClient):
     """DigitalOcean API client using Bearer token authentication."""
 
+    PROVIDER_TYPE = ProviderType.DIGITALOCEAN
     API_BASE_URL = "https://api.digitalocean.com/v2"
+    PER_PAGE = 250  # Max per page
+
+    # Droplet keys read by _normalize_instance
+    INSTANCE_FIELDS = {
+        "id": KEEP,
+        "name": KEEP,
+        "status": KEEP,
+        "vcpus": KEEP,
+        "memory": KEEP,
+        "disk": KEEP,
+        "region": {"slug": KEEP},
+        "created_at": KEEP,
+        "size_slug": KEEP,
+        "size": {key: KEEP for key in ["price_monthly", "priceMonthly", "price", "slug", "name"]},
+        "networks": {
+            "v4": [{"type": KEEP, "ip_address": KEEP}],
+            "v6": [{"type": KEEP, "ip_address": KEEP}],
+        },
+    }
+    PAGE_FIELDS = {
+        "droplets": [INSTANCE_FIELDS],
+        "links": {"pages": KEEP},
+        "meta": {"total": KEEP},
+    }
 
     def __init__(self, credentials: dict, provider_id: int):
         """
@@ -23,72 +53,40 @@ class DigitalOceanClient(BaseProviderClient):
     def authenticate(self) -> bool:
         """Test authentication by making a simple API call."""
         try:
-            headers = self._get_headers()
-            with httpx.Client() as client:
-                response = client.get(
-                    f"{self.API_BASE_URL}/account",
-                    headers=headers,
-                    timeout=10,
-                )
-                response.raise_for_status()
-                return True
-        except httpx.HTTPError:
+            self._request("GET", f"{self.API_BASE_URL}/account", headers=self._get_headers())
+            return True
+        except ProviderAuthError:
             return False
 
     def list_instances(self) -> List[VPSInstance]:
-        """Fetch all droplets (VPS instances) from DigitalOcean."""
-        instances = []
-
-        try:
-            url = f"{self.API_BASE_URL}/droplets"
-            headers = self._get_headers()
-            params = {"per_page": 250}  # Max per page
-            page = 1
-
-            with httpx.Client() as client:
-                while True:
-                    params["page"] = page
-                    response = client.get(url, headers=headers, params=params, timeout=10)
-                    response.raise_for_status()
-
-                    data = response.json()
-                    droplets = data.get("droplets", [])
-
-                    if not droplets:
-                        break
-
-                    for droplet in droplets:
-                        instance = self._normalize_instance(droplet)
-                        instances.append(instance)
-
-                    # Check if there are more pages
-                    links = data.get("links", {})
-                    if "pages" not in links or "next" not in links.get("pages", {}):
-                        break
+        """Fetch all droplets (VPS instances), prefetching pages in parallel."""
+        url = f"{self.API_BASE_URL}/droplets"
+        headers = self._get_headers()
 
-                    page += 1
-        except httpx.HTTPError as e:
-            raise Exception(f"Failed to fetch DigitalOcean droplets: {str(e)}")
+        def fetch_page(page: int) -> Tuple[List[VPSInstance], int | None]:
+            return self._fetch_page(url, headers, self._get_page_params(page))
 
-        return instances
+        try:
+            return fetch_all_pages(fetch_page)
+        except ProviderError as e:
+            raise e.with_context("Failed to fetch DigitalOcean droplets") from e
 
     def get_instance(self, instance_id: str) -> VPSInstance:
         """Fetch a single droplet by ID."""
         try:
-            with httpx.Client() as client:
-                url = f"{self.API_BASE_URL}/droplets/{instance_id}"
-                headers = self._get_headers()
-
-                response = client.get(url, headers=headers, timeout=10)
-                response.raise_for_status()
-
-                droplet = response.json().get("droplet", {})
-                return self._normalize_instance(droplet)
-        except httpx.HTTPError as e:
-            raise Exception(
-                f"Failed to fetch DigitalOcean droplet {instance_id}: {str(e)}"
+            response = self._request(
+                "GET",
+                f"{self.API_BASE_URL}/droplets/{instance_id}",
+                headers=self._get_headers(),
             )
 
+            droplet = self._get_json(response, {"droplet": self.INSTANCE_FIELDS}).get("droplet", {})
+            return self._normalize_instance(droplet)
+        except ProviderError as e:
+            raise e.with_context(
+                f"Failed to fetch DigitalOcean droplet {instance_id}"
+            ) from e
+
     def _get_headers(self) -> dict:
         """Get authorization headers."""
         return {
@@ -96,6 +94,35 @@ class DigitalOceanClient(BaseProviderClient):
             "Content-Type": "application/json",
         }
 
+    def _get_page_params(self, page: int) -> dict:
+        """Get query parameters for one droplet listing page."""
+        return {"per_page": self.PER_PAGE, "page": page}
+
+    def _parse_page(self, data: dict) -> Tuple[List[VPSInstance], int | None]:
+        """Normalize one droplet listing page. Returns (instances, total pages)."""
+        instances = [self._normalize_instance(droplet) for droplet in data.get("droplets", [])]
+        return instances, self._get_page_count(data)
+
+    def _get_page_count(self, data: dict) -> int | None:
+        """
+        Work out the total page count from a listing page.
+
+        None if only a "next" link says more pages follow.
+        """
+        total = data.get("meta", {}).get("total")
+        if total is not None:
+            return max(1, math.ceil(total / self.PER_PAGE))
+
+        # Fall back to the page number of the "last" link
+        pages = data.get("links", {}).get("pages", {})
+        last = pages.get("last")
+        if last:
+            page = parse_qs(urlparse(last).query).get("page")
+            if page:
+                return int(page[0])
+
+        return None if "next" in pages else 1
+
     def _normalize_instance(self, data: dict) -> VPSInstance:
         """Normalize DigitalOcean API response to VPSInstance."""
         # Extract IPs from networks
@@ -163,13 +190,53 @@ class DigitalOceanClient(BaseProviderClient):
             cpu_cores=data.get("vcpus", 0),
             ram_mb=data.get("memory", 0),
             disk_gb=data.get("disk", 0),
-            region=data.get("region", {}).get("slug", ""),
+            region=self._normalize_region(data.get("region", {}).get("slug", "")),
             created_at=created_at,
-            provider_type="digitalocean",
+            provider_type=ProviderType.DIGITALOCEAN,
             provider_account_id=self.provider_id,
             plan=plan,
             monthly_price=price,
             currency="USD",
-            raw_data=data,
+            raw_data=self._keep_raw_data(data),
         )
 
+
+class AsyncDigitalOceanClient(AsyncBaseProviderClient, DigitalOceanClient):
+    """Asyncio DigitalOcean API client sharing the process-wide connection pool."""
+
+    async def authenticate(self) -> bool:
+        """Test authentication by making a simple API call."""
+        try:
+            await self._arequest("GET", f"{self.API_BASE_URL}/account", headers=self._get_headers())
+            return True
+        except ProviderAuthError:
+            return False
+
+    async def list_instances(self) -> List[VPSInstance]:
+        """Fetch all droplets (VPS instances), prefetching pages in parallel."""
+        url = f"{self.API_BASE_URL}/droplets"
+        headers = self._get_headers()
+
+        async def fetch_page(page: int) -> Tuple[List[VPSInstance], int | None]:
+            return await self._afetch_page(url, headers, self._get_page_params(page))
+
+        try:
+            return await afetch_all_pages(fetch_page)
+        except ProviderError as e:
+            raise e.with_context("Failed to fetch DigitalOcean droplets") from e
+
+    async def get_instance(self, instance_id: str) -> VPSInstance:
+        """Fetch a single droplet by ID."""
+        try:
+            response = await self._arequest(
+                "GET",
+                f"{self.API_BASE_URL}/droplets/{instance_id}",
+                headers=self._get_headers(),
+            )
+
+            droplet = self._get_json(response, {"droplet": self.INSTANCE_FIELDS}).get("droplet", {})
+            return self._normalize_instance(droplet)
+        except ProviderError as e:
+            raise e.with_context(
+                f"Failed to fetch DigitalOcean droplet {instance_id}"
+            ) from e
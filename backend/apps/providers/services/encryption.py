@@ -1,37 +1,123 @@
 import json
-from cryptography.fernet import Fernet
+import threading
+import time
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from cryptography.fernet import Fernet, MultiFernet
 from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+# Decrypted credentials by version: (expires at, credentials)
+_credentials_cache: Dict[tuple, Tuple[float, dict]] = {}
+_credentials_lock = threading.Lock()
+CREDENTIALS_CACHE_SIZE = 1024
+
+
+def get_encryption_keys() -> List[bytes]:
+    """
+    Get the configured encryption keys, primary first.
+
+    ``ENCRYPTION_KEYS`` lists several comma-separated keys for rotation:
+    data is encrypted with the first one and decrypted with any of them.
+    It defaults to ``ENCRYPTION_KEY``.
+    """
+    keys = getattr(settings, "ENCRYPTION_KEYS", None) or [settings.ENCRYPTION_KEY]
+    return [key.encode() if isinstance(key, str) else key for key in keys]
 
 
 def get_encryption_key() -> bytes:
-    """Get encryption key from settings."""
-    key = settings.ENCRYPTION_KEY
-    if isinstance(key, str):
-        key = key.encode()
+    """Get the primary encryption key from settings."""
+    return _get_cipher_and_key()[1]
+
+
+def get_cipher() -> MultiFernet:
+    """Cipher of the configured keys, built once per process and key set."""
+    return _get_cipher_and_key()[0]
+
+
+def _get_cipher_and_key() -> Tuple[MultiFernet, bytes]:
+    """Cipher and primary key of the configured keys."""
+    return _build_cipher(
+        tuple(get_encryption_keys()), bool(getattr(settings, "ENCRYPTION_KEYS", None))
+    )
+
 
+@lru_cache(maxsize=4)
+def _build_cipher(keys: Tuple[bytes, ...], strict: bool) -> Tuple[MultiFernet, bytes]:
+    """
+    Validate keys and build their cipher. Returns (cipher, primary key).
+
+    With ``strict`` (keys from ``ENCRYPTION_KEYS``) a key that does not
+    parse raises ``ImproperlyConfigured``: skipping it would silently keep
+    an old key primary. A single invalid ``ENCRYPTION_KEY`` is replaced by
+    a generated key, kept for the process lifetime.
+    """
+    fernets = []
     # Fernet keys are 44 bytes when base64 encoded
-    # If the key is not a valid Fernet key, generate one
-    try:
-        # Test if it's a valid Fernet key
-        Fernet(key)
-        return key
-    except Exception:
-        # If invalid, generate a new key
-        return Fernet.generate_key()
+    for position, key in enumerate(keys, 1):
+        try:
+            fernets.append(Fernet(key))
+        except (TypeError, ValueError) as e:
+            if strict:
+                raise ImproperlyConfigured(
+                    f"ENCRYPTION_KEYS entry {position} is not a valid Fernet key"
+                ) from e
+
+    if not fernets:
+        keys = (Fernet.generate_key(),)
+        fernets.append(Fernet(keys[0]))
+
+    return MultiFernet(fernets), keys[0]
 
 
 def encrypt_credentials(credentials: dict) -> str:
     """Encrypt credentials dictionary to string."""
-    key = get_encryption_key()
-    f = Fernet(key)
     json_str = json.dumps(credentials)
-    encrypted_bytes = f.encrypt(json_str.encode())
+    encrypted_bytes = get_cipher().encrypt(json_str.encode())
     return encrypted_bytes.decode()
 
 
 def decrypt_credentials(encrypted_str: str) -> dict:
     """Decrypt credentials string to dictionary."""
-    key = get_encryption_key()
-    f = Fernet(key)
-    decrypted_bytes = f.decrypt(encrypted_str.encode())
+    decrypted_bytes = get_cipher().decrypt(encrypted_str.encode())
     return json.loads(decrypted_bytes.decode())
+
+
+def rotate_credentials(encrypted_str: str) -> str:
+    """Re-encrypt credentials with the primary key."""
+    return get_cipher().rotate(encrypted_str.encode()).decode()
+
+
+def get_cached_credentials(version: tuple, encrypted_str: str) -> dict:
+    """
+    Decrypt credentials, reusing the result for the same ``version``.
+
+    Decrypted credentials are kept in process memory for
+    ``PROVIDER_CREDENTIALS_CACHE_TTL`` seconds, so concurrent refreshes of
+    a provider do not repeat the HMAC check and JSON parsing. Callers get
+    their own copy.
+    """
+    now = time.monotonic()
+    with _credentials_lock:
+        entry = _credentials_cache.get(version)
+        if entry is not None and entry[0] > now:
+            return dict(entry[1])
+
+    credentials = decrypt_credentials(encrypted_str)
+
+    with _credentials_lock:
+        if len(_credentials_cache) >= CREDENTIALS_CACHE_SIZE:
+            for key in [
+                key
+                for key, (expires_at, _) in _credentials_cache.items()
+                if expires_at <= now
+            ]:
+                del _credentials_cache[key]
+            if len(_credentials_cache) >= CREDENTIALS_CACHE_SIZE:
+                _credentials_cache.clear()
+        _credentials_cache[version] = (
+            now + settings.PROVIDER_CREDENTIALS_CACHE_TTL,
+            credentials,
+        )
+    return dict(credentials)
@@ -0,0 +1,102 @@
+"""
+Errors raised by provider API clients.
+
+HTTP failures are translated into these, so callers can tell rejected
+credentials from a throttled or unavailable provider without parsing
+messages.
+"""
+
+import copy
+
+
+class ProviderError(Exception):
+    """A provider API call failed."""
+
+    # Whether the same call may succeed if repeated later
+    retryable = False
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ):
+        """
+        Initialize provider error.
+
+        Args:
+            message: Description of the failure
+            status_code: HTTP status of the provider response, if any
+            retry_after: Seconds the provider asked to wait, if any
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    def with_context(self, context: str) -> "ProviderError":
+        """Same error with ``context`` prefixed to its message."""
+        error = copy.copy(self)
+        error.args = (f"{context}: {self}",)
+        return error
+
+
+class ProviderAuthError(ProviderError):
+    """Credentials were rejected (401/403) or no token could be obtained."""
+
+
+class ProviderNotFound(ProviderError):
+    """The requested resource does not exist (404)."""
+
+
+class ProviderRateLimited(ProviderError):
+    """The provider throttled the account (429), or its local budget is spent."""
+
+    retryable = True
+
+
+class ProviderUnavailable(ProviderError):
+    """The provider failed (5xx), timed out or could not be reached."""
+
+    retryable = True
+
+
+class ProviderCircuitOpen(ProviderUnavailable):
+    """Calls are skipped because the account failed repeatedly."""
+
+
+ERROR_TYPES = {
+    error_type.__name__: error_type
+    for error_type in [
+        ProviderError,
+        ProviderAuthError,
+        ProviderNotFound,
+        ProviderRateLimited,
+        ProviderUnavailable,
+        ProviderCircuitOpen,
+    ]
+}
+
+
+def dump_error(error: Exception) -> dict:
+    """
+    Describe an error as plain data, e.g. to hand it to another worker
+    through the cache. Errors other than ``ProviderError`` become one.
+    """
+    if not isinstance(error, ProviderError):
+        error = ProviderError(str(error))
+    return {
+        "type": type(error).__name__,
+        "message": str(error),
+        "status_code": error.status_code,
+        "retry_after": error.retry_after,
+    }
+
+
+def load_error(data: dict) -> ProviderError:
+    """Rebuild an error described by ``dump_error``."""
+    error_type = ERROR_TYPES.get(data["type"], ProviderError)
+    return error_type(
+        data["message"],
+        status_code=data["status_code"],
+        retry_after=data["retry_after"],
+    )
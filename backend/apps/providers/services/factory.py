@@ -1,6 +1,6 @@
-from .base import BaseProviderClient
-from .contabo import ContaboClient
-from .digitalocean import DigitalOceanClient
+from .base import AsyncBaseProviderClient, BaseProviderClient
+from .contabo import AsyncContaboClient, ContaboClient
+from .digitalocean import AsyncDigitalOceanClient, DigitalOceanClient
 
 
 class ProviderClientFactory:
@@ -11,6 +11,11 @@ class ProviderClientFactory:
         "digitalocean": DigitalOceanClient,
     }
 
+    ASYNC_CLIENTS = {
+        "contabo": AsyncContaboClient,
+        "digitalocean": AsyncDigitalOceanClient,
+    }
+
     @classmethod
     def create(
         cls,
@@ -32,12 +37,33 @@ class ProviderClientFactory:
         Raises:
             ValueError: If provider type is not supported
         """
-        client_class = cls.CLIENTS.get(provider_type.lower())
+        client_class = cls._get_client_class(cls.CLIENTS, provider_type)
+        return client_class(credentials, provider_id)
+
+    @classmethod
+    def create_async(
+        cls,
+        provider_type: str,
+        credentials: dict,
+        provider_id: int,
+    ) -> AsyncBaseProviderClient:
+        """
+        Create an asyncio provider client instance.
+
+        Same arguments and errors as ``create``.
+        """
+        client_class = cls._get_client_class(cls.ASYNC_CLIENTS, provider_type)
+        return client_class(credentials, provider_id)
+
+    @staticmethod
+    def _get_client_class(clients: dict, provider_type: str) -> type:
+        """Look up the client class for a provider type."""
+        client_class = clients.get(provider_type.lower())
 
         if not client_class:
             raise ValueError(
                 f"Unsupported provider type: {provider_type}. "
-                f"Supported: {', '.join(cls.CLIENTS.keys())}"
+                f"Supported: {', '.join(clients.keys())}"
             )
 
-        return client_class(credentials, provider_id)
+        return client_class
@@ -0,0 +1,70 @@
+"""
+Process-wide HTTP connection pools for provider API clients.
+
+Provider clients share one ``httpx.Client`` (and one ``httpx.AsyncClient``
+per event loop) instead of opening a new connection for every call, so
+TCP/TLS handshakes are paid once per host and kept alive between requests
+and provider accounts.
+"""
+
+import asyncio
+import threading
+import weakref
+
+import httpx
+from django.conf import settings
+
+_lock = threading.Lock()
+_sync_client: httpx.Client | None = None
+_async_clients: (
+    "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]"
+) = weakref.WeakKeyDictionary()
+
+
+def _client_options() -> dict:
+    """Build shared client options from settings."""
+    return {
+        "http2": settings.PROVIDER_HTTP2,
+        "timeout": settings.PROVIDER_HTTP_TIMEOUT,
+        "limits": httpx.Limits(
+            max_connections=settings.PROVIDER_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.PROVIDER_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.PROVIDER_HTTP_KEEPALIVE_EXPIRY,
+        ),
+    }
+
+
+def get_http_client() -> httpx.Client:
+    """Return the process-wide synchronous HTTP client."""
+    global _sync_client
+
+    if _sync_client is None or _sync_client.is_closed:
+        with _lock:
+            if _sync_client is None or _sync_client.is_closed:
+                _sync_client = httpx.Client(**_client_options())
+    return _sync_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared asynchronous HTTP client for the running event loop.
+
+    ``httpx.AsyncClient`` connections are bound to the loop that opened
+    them, so one client is kept per loop and dropped with it.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(**_client_options())
+        _async_clients[loop] = client
+    return client
+
+
+def close_http_clients() -> None:
+    """Close the synchronous client (e.g. after fork or in tests)."""
+    global _sync_client
+
+    with _lock:
+        if _sync_client is not None:
+            _sync_client.close()
+            _sync_client = None
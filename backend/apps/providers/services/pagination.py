@@ -0,0 +1,93 @@
+"""
+Parallel page prefetch for paginated provider listings.
+
+Page 1 is fetched first to learn the total page count, then the remaining
+pages are requested concurrently (bounded by ``PROVIDER_PAGE_CONCURRENCY``)
+and stitched back together in page order. While a provider does not tell
+the count, pages are followed one at a time instead.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, List, Tuple, TypeVar
+
+from django.conf import settings
+
+T = TypeVar("T")
+
+# A page fetcher returns the page's items and the total number of pages,
+# or None if it is unknown but more pages follow
+PageFetcher = Callable[[int], Tuple[List[T], int]]
+AsyncPageFetcher = Callable[[int], Awaitable[Tuple[List[T], int]]]
+
+
+def _get_concurrency(max_concurrency: int | None) -> int:
+    """Resolve the concurrency cap, defaulting to settings."""
+    if max_concurrency is None:
+        max_concurrency = settings.PROVIDER_PAGE_CONCURRENCY
+    return max(1, max_concurrency)
+
+
+def fetch_all_pages(
+    fetch_page: PageFetcher, max_concurrency: int | None = None
+) -> List[T]:
+    """
+    Fetch every page and return all items in page order.
+
+    Args:
+        fetch_page: Callable taking a 1-based page number
+        max_concurrency: Maximum pages in flight after the first one
+
+    Returns:
+        Items of all pages, in page order
+    """
+    items, total_pages = fetch_page(1)
+    items = list(items)
+    page = 1
+    while total_pages is None:
+        page += 1
+        page_items, total_pages = fetch_page(page)
+        items.extend(page_items)
+    if total_pages <= page:
+        return items
+
+    remaining = range(page + 1, total_pages + 1)
+    workers = min(_get_concurrency(max_concurrency), len(remaining))
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="provider-page"
+    ) as executor:
+        # map() preserves page order and re-raises the first failure
+        pages = list(executor.map(fetch_page, remaining))
+
+    for page_items, _ in pages:
+        items.extend(page_items)
+    return items
+
+
+async def afetch_all_pages(
+    fetch_page: AsyncPageFetcher, max_concurrency: int | None = None
+) -> List[T]:
+    """Asyncio variant of ``fetch_all_pages``."""
+    items, total_pages = await fetch_page(1)
+    items = list(items)
+    page = 1
+    while total_pages is None:
+        page += 1
+        page_items, total_pages = await fetch_page(page)
+        items.extend(page_items)
+    if total_pages <= page:
+        return items
+
+    semaphore = asyncio.Semaphore(_get_concurrency(max_concurrency))
+
+    async def fetch(page: int) -> Tuple[List[T], int]:
+        async with semaphore:
+            return await fetch_page(page)
+
+    pages = await asyncio.gather(
+        *(fetch(number) for number in range(page + 1, total_pages + 1))
+    )
+
+    for page_items, _ in pages:
+        items.extend(page_items)
+    return items
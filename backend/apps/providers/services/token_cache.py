@@ -0,0 +1,147 @@
+"""
+OAuth access token cache shared by all workers.
+
+Tokens are stored in the Django cache per provider account together with
+their expiry. A token is refreshed ``PROVIDER_TOKEN_REFRESH_MARGIN``
+seconds before it expires, and only one worker at a time performs the
+refresh: the others keep using the still-valid token, or wait briefly for
+the refreshing worker when there is no usable token at all.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+from typing import Awaitable, Callable, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+# A token fetcher returns (access_token, expires_in seconds)
+TokenFetcher = Callable[[], Tuple[str, int]]
+AsyncTokenFetcher = Callable[[], Awaitable[Tuple[str, int]]]
+
+
+class TokenCache:
+    """Cache of one provider account's OAuth access token."""
+
+    KEY_PREFIX = "provider_token"
+    LOCK_TIMEOUT = 30  # seconds a refresh may hold the lock
+    WAIT_TIMEOUT = 10  # seconds to wait for another worker's refresh
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, provider_id: int, credentials: dict):
+        """
+        Initialize token cache.
+
+        Args:
+            provider_id: Database ID of the provider account
+            credentials: Credentials the token is issued for; a cached
+                token is ignored once the credentials change
+        """
+        self.provider_id = provider_id
+        self.fingerprint = hashlib.sha256(
+            json.dumps(credentials, sort_keys=True).encode()
+        ).hexdigest()[:16]
+        self.key = f"{self.KEY_PREFIX}_{provider_id}"
+        self.lock_key = f"{self.key}_lock"
+
+    def get_or_refresh(self, fetch: TokenFetcher) -> str:
+        """Return a valid token, refreshing it through ``fetch`` when due."""
+        deadline = time.monotonic() + self.WAIT_TIMEOUT
+
+        while True:
+            entry = self._get_entry(cache.get(self.key))
+            if entry and not self._needs_refresh(entry):
+                return entry["access_token"]
+
+            lock_token = str(uuid.uuid4())
+            if cache.add(self.lock_key, lock_token, self.LOCK_TIMEOUT):
+                try:
+                    access_token, expires_in = fetch()
+                    self._store(access_token, expires_in)
+                    return access_token
+                finally:
+                    self._release(lock_token)
+
+            # Another worker is refreshing; the current token is still usable
+            if entry and not self._is_expired(entry):
+                return entry["access_token"]
+
+            if time.monotonic() >= deadline:
+                access_token, expires_in = fetch()
+                self._store(access_token, expires_in)
+                return access_token
+
+            time.sleep(self.POLL_INTERVAL)
+
+    async def aget_or_refresh(self, fetch: AsyncTokenFetcher) -> str:
+        """Asyncio variant of ``get_or_refresh``."""
+        deadline = time.monotonic() + self.WAIT_TIMEOUT
+
+        while True:
+            entry = self._get_entry(await cache.aget(self.key))
+            if entry and not self._needs_refresh(entry):
+                return entry["access_token"]
+
+            lock_token = str(uuid.uuid4())
+            if await cache.aadd(self.lock_key, lock_token, self.LOCK_TIMEOUT):
+                try:
+                    access_token, expires_in = await fetch()
+                    await sync_to_async(self._store)(access_token, expires_in)
+                    return access_token
+                finally:
+                    await sync_to_async(self._release)(lock_token)
+
+            if entry and not self._is_expired(entry):
+                return entry["access_token"]
+
+            if time.monotonic() >= deadline:
+                access_token, expires_in = await fetch()
+                await sync_to_async(self._store)(access_token, expires_in)
+                return access_token
+
+            await asyncio.sleep(self.POLL_INTERVAL)
+
+    def invalidate(self) -> None:
+        """Drop the cached token, e.g. after the provider rejected it."""
+        cache.delete(self.key)
+
+    def _get_entry(self, entry: dict | None) -> dict | None:
+        """Return the cached entry if it belongs to the current credentials."""
+        if not entry or entry.get("fingerprint") != self.fingerprint:
+            return None
+        return entry
+
+    @staticmethod
+    def _needs_refresh(entry: dict) -> bool:
+        """Check whether the token is inside the early-refresh window."""
+        return (
+            time.time() >= entry["expires_at"] - settings.PROVIDER_TOKEN_REFRESH_MARGIN
+        )
+
+    @staticmethod
+    def _is_expired(entry: dict) -> bool:
+        """Check whether the token can no longer be used."""
+        return time.time() >= entry["expires_at"]
+
+    def _store(self, access_token: str, expires_in: int) -> None:
+        """Cache a freshly issued token until it expires."""
+        if not access_token:
+            return
+        cache.set(
+            self.key,
+            {
+                "access_token": access_token,
+                "expires_at": time.time() + expires_in,
+                "fingerprint": self.fingerprint,
+            },
+            expires_in,
+        )
+
+    def _release(self, lock_token: str) -> None:
+        """Release the refresh lock if this worker still holds it."""
+        if cache.get(self.lock_key) == lock_token:
+            cache.delete(self.lock_key)
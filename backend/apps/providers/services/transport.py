@@ -0,0 +1,497 @@
+"""
+Rate-limited, retrying transport for provider API calls.
+
+Every request of a provider account goes through its ``ProviderTransport``:
+
+* a token bucket per provider type and account, kept in the Django cache
+  (Redis) so all workers share one request budget. A ``Retry-After``
+  header, or ``RateLimit-Remaining: 0`` with ``RateLimit-Reset``, pauses
+  the whole account until the provider's reset time;
+* retries of throttled (429) and failed (5xx, network) calls with jittered
+  exponential backoff. No single wait exceeds ``PROVIDER_RETRY_MAX_DELAY``,
+  so a fetch fails instead of outliving its fan-out slot;
+* a circuit breaker per account: after ``PROVIDER_CIRCUIT_THRESHOLD``
+  consecutive failures (outages or rejected credentials) calls fail fast with the last error for
+  ``PROVIDER_CIRCUIT_COOLDOWN`` seconds, then a single probe call decides
+  whether to close it again. Each failed probe doubles the cool-down, up
+  to ``PROVIDER_CIRCUIT_MAX_COOLDOWN``. ``get_circuit_breaker`` exposes the
+  state of an account's circuit.
+
+Failures are raised as ``ProviderError`` subclasses.
+"""
+
+import asyncio
+import email.utils
+import itertools
+import math
+import random
+import time
+import uuid
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .errors import (
+    ProviderAuthError,
+    ProviderCircuitOpen,
+    ProviderError,
+    ProviderNotFound,
+    ProviderRateLimited,
+    ProviderUnavailable,
+)
+
+# (requests per second, burst) of provider types missing from settings
+DEFAULT_RATE_LIMIT = (2.0, 10)
+
+# RateLimit-Reset values above this are epoch timestamps, below it seconds
+EPOCH_THRESHOLD = 10**9
+
+
+class TokenBucket:
+    """Request budget of one provider account, shared through the cache."""
+
+    LOCK_TIMEOUT = 1  # seconds a worker may hold the bucket
+    LOCK_WAIT = 0.5  # seconds to wait for it before going ahead unlocked
+    POLL_INTERVAL = 0.005
+
+    def __init__(self, key: str, rate: float, burst: int):
+        """
+        Initialize token bucket.
+
+        Args:
+            key: Cache key of the bucket state
+            rate: Tokens added per second
+            burst: Bucket capacity
+        """
+        self.key = key
+        self.lock_key = f"{key}_lock"
+        self.rate = rate
+        self.burst = burst
+
+    def reserve(self, max_wait: float) -> float:
+        """
+        Take a token. Returns the seconds to wait before using it.
+
+        Callers waiting for a refill reserve their token up front, so they
+        are served in order without polling. If the wait would exceed
+        ``max_wait``, nothing is taken and the wait is returned anyway.
+        """
+        lock_token = self._lock()
+        try:
+            now = time.time()
+            state = self._refill(cache.get(self.key), now)
+            wait = max(
+                state["paused_until"] - now, (1 - state["tokens"]) / self.rate, 0
+            )
+            if wait <= max_wait:
+                state["tokens"] -= 1
+                self._store(state, now)
+            return wait
+        finally:
+            self._unlock(lock_token)
+
+    def pause(self, until: float) -> None:
+        """Hold back every request of the account until ``until`` (epoch)."""
+        lock_token = self._lock()
+        try:
+            now = time.time()
+            state = self._refill(cache.get(self.key), now)
+            if until > state["paused_until"]:
+                state["paused_until"] = until
+                self._store(state, now)
+        finally:
+            self._unlock(lock_token)
+
+    def _refill(self, state: dict | None, now: float) -> dict:
+        """Bucket state with the tokens accrued since it was last stored."""
+        if state is None:
+            return {"tokens": float(self.burst), "updated_at": now, "paused_until": 0.0}
+        elapsed = max(now - state["updated_at"], 0)
+        # Negative tokens are reserved by waiting callers
+        state["tokens"] = min(float(self.burst), state["tokens"] + elapsed * self.rate)
+        state["updated_at"] = now
+        return state
+
+    def _store(self, state: dict, now: float) -> None:
+        """Save the state for as long as it differs from a full bucket."""
+        refill = (self.burst - state["tokens"]) / self.rate
+        cache.set(self.key, state, int(max(refill, state["paused_until"] - now)) + 1)
+
+    def _lock(self) -> str | None:
+        """Acquire the bucket lock; None if it stayed busy (go ahead anyway)."""
+        lock_token = str(uuid.uuid4())
+        deadline = time.monotonic() + self.LOCK_WAIT
+        while not cache.add(self.lock_key, lock_token, self.LOCK_TIMEOUT):
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(self.POLL_INTERVAL)
+        return lock_token
+
+    def _unlock(self, lock_token: str | None) -> None:
+        """Release the bucket lock if this worker still holds it."""
+        if lock_token and cache.get(self.lock_key) == lock_token:
+            cache.delete(self.lock_key)
+
+
+class CircuitBreaker:
+    """Fail fast for an account whose calls keep failing."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    STATE_TTL = 3600  # seconds failures are remembered
+
+    def __init__(self, key: str, threshold: int, cooldown: float, max_cooldown: float):
+        """
+        Initialize circuit breaker.
+
+        Args:
+            key: Cache key prefix of the breaker state
+            threshold: Consecutive failures that open the circuit
+            cooldown: Seconds the circuit stays open before a probe
+            max_cooldown: Upper bound of the cooldown after failed probes
+        """
+        self.failures_key = f"{key}_failures"
+        # Value: {"until": epoch, "opened": times opened in a row, "error": message}
+        self.open_key = f"{key}_opened"
+        self.probe_key = f"{key}_probe"
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        self._dirty = True
+
+    def get_state(self) -> str:
+        """Current state: closed, open or half_open."""
+        opened = cache.get(self.open_key)
+        if opened is None:
+            return self.CLOSED
+        return self.OPEN if time.time() < opened["until"] else self.HALF_OPEN
+
+    def before_call(self) -> None:
+        """
+        Raise ``ProviderCircuitOpen`` unless a call may go through.
+
+        While open, the last error is raised again. Once the cooldown has
+        passed, exactly one caller is let through as the probe; the others
+        keep failing fast until it reports back.
+        """
+        state = cache.get_many([self.failures_key, self.open_key])
+        self._dirty = bool(state)
+        opened = state.get(self.open_key)
+        if opened is None:
+            return
+
+        wait = opened["until"] - time.time()
+        if wait > 0:
+            raise ProviderCircuitOpen(
+                f"{opened['error']} (retrying in {math.ceil(wait)}s)", retry_after=wait
+            )
+        if not cache.add(self.probe_key, 1, self.cooldown):
+            raise ProviderCircuitOpen(
+                f"{opened['error']} (retrying now)", retry_after=self.cooldown
+            )
+
+    def record_success(self) -> None:
+        """Close the circuit and forget failures."""
+        if self._dirty:
+            self.reset()
+
+    def reset(self) -> None:
+        """Close the circuit, e.g. once the account's credentials changed."""
+        cache.delete_many([self.failures_key, self.open_key, self.probe_key])
+        self._dirty = False
+
+    def record_failure(self, error: Exception) -> None:
+        """Count a failure; open (or re-open) the circuit at the threshold."""
+        cache.add(self.failures_key, 0, self.STATE_TTL)
+        try:
+            failures = cache.incr(self.failures_key)
+        except ValueError:
+            # Expired between add() and incr()
+            failures = 1
+            cache.set(self.failures_key, failures, self.STATE_TTL)
+        self._dirty = True
+
+        if failures >= self.threshold:
+            previous = cache.get(self.open_key)
+            opened = previous["opened"] + 1 if previous else 1
+            cooldown = min(self.cooldown * 2 ** (opened - 1), self.max_cooldown)
+            cache.set(
+                self.open_key,
+                {
+                    "until": time.time() + cooldown,
+                    "opened": opened,
+                    "error": str(error),
+                },
+                # Remembered past the cooldown, so a failed probe backs off further
+                int(cooldown + self.STATE_TTL),
+            )
+            cache.delete(self.probe_key)
+
+
+def is_streamed(response: httpx.Response, stream_over: int) -> bool:
+    """Whether a successful response's body is over ``stream_over`` bytes."""
+    try:
+        length = int(response.headers.get("Content-Length", 0))
+    except ValueError:
+        return False
+    return response.status_code < 400 and length > stream_over
+
+
+def get_circuit_breaker(provider_id: int) -> CircuitBreaker:
+    """Circuit breaker of a provider account's calls."""
+    return CircuitBreaker(
+        f"provider_circuit_{provider_id}",
+        settings.PROVIDER_CIRCUIT_THRESHOLD,
+        settings.PROVIDER_CIRCUIT_COOLDOWN,
+        settings.PROVIDER_CIRCUIT_MAX_COOLDOWN,
+    )
+
+
+class ProviderTransport:
+    """Rate limiting, retries and circuit breaking for one provider account."""
+
+    def __init__(self, provider_type: str, provider_id: int):
+        """
+        Initialize provider transport.
+
+        Args:
+            provider_type: Type of provider; selects its rate limit
+            provider_id: Database ID of the provider account
+        """
+        rate, burst = settings.PROVIDER_RATE_LIMITS.get(
+            provider_type, DEFAULT_RATE_LIMIT
+        )
+        self.label = f"{provider_type} account {provider_id}"
+        self.bucket = TokenBucket(
+            f"provider_rate_{provider_type}_{provider_id}", rate, burst
+        )
+        self.breaker = get_circuit_breaker(provider_id)
+
+    def request(
+        self,
+        client: httpx.Client,
+        method: str,
+        url: str,
+        stream_over: int | None = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Send a request, waiting for the account's budget and retrying failures.
+
+        Returns a response with a status below 400. With ``stream_over``, a
+        response whose ``Content-Length`` exceeds that many bytes is
+        returned before its body is read; the caller streams and closes it.
+
+        Raises:
+            ProviderError: The call failed for good (or the circuit is open)
+        """
+        self.breaker.before_call()
+
+        for attempt in itertools.count():
+            time.sleep(self._reserve())
+            try:
+                response = self._send(client, method, url, stream_over, kwargs)
+            except httpx.RequestError as e:
+                error = ProviderUnavailable(f"{method} {url} failed: {e}")
+            else:
+                paused_until = self._get_paused_until(response)
+                if paused_until is not None:
+                    self.bucket.pause(paused_until)
+                if response.status_code < 400:
+                    self.breaker.record_success()
+                    return response
+                error = self._to_error(response, method, url, paused_until)
+
+            delay = self._get_retry_delay(error, attempt)
+            if delay is None:
+                self._record_error(error)
+                raise error
+            time.sleep(delay)
+
+    async def arequest(
+        self,
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        stream_over: int | None = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Asyncio variant of ``request``."""
+        await sync_to_async(self.breaker.before_call, thread_sensitive=False)()
+
+        for attempt in itertools.count():
+            await asyncio.sleep(
+                await sync_to_async(self._reserve, thread_sensitive=False)()
+            )
+            try:
+                response = await self._asend(client, method, url, stream_over, kwargs)
+            except httpx.RequestError as e:
+                error = ProviderUnavailable(f"{method} {url} failed: {e}")
+            else:
+                paused_until = self._get_paused_until(response)
+                if paused_until is not None:
+                    await sync_to_async(self.bucket.pause, thread_sensitive=False)(
+                        paused_until
+                    )
+                if response.status_code < 400:
+                    await sync_to_async(
+                        self.breaker.record_success, thread_sensitive=False
+                    )()
+                    return response
+                error = self._to_error(response, method, url, paused_until)
+
+            delay = self._get_retry_delay(error, attempt)
+            if delay is None:
+                await sync_to_async(self._record_error, thread_sensitive=False)(error)
+                raise error
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _send(
+        client: httpx.Client,
+        method: str,
+        url: str,
+        stream_over: int | None,
+        kwargs: dict,
+    ) -> httpx.Response:
+        """Send a request, reading the body unless it is left to stream."""
+        if stream_over is None:
+            return client.request(method, url, **kwargs)
+
+        response = client.send(client.build_request(method, url, **kwargs), stream=True)
+        if not is_streamed(response, stream_over):
+            try:
+                response.read()
+            finally:
+                response.close()
+        return response
+
+    @staticmethod
+    async def _asend(
+        client: httpx.AsyncClient,
+        method: str,
+        url: str,
+        stream_over: int | None,
+        kwargs: dict,
+    ) -> httpx.Response:
+        """Asyncio variant of ``_send``."""
+        if stream_over is None:
+            return await client.request(method, url, **kwargs)
+
+        response = await client.send(
+            client.build_request(method, url, **kwargs), stream=True
+        )
+        if not is_streamed(response, stream_over):
+            try:
+                await response.aread()
+            finally:
+                await response.aclose()
+        return response
+
+    def _reserve(self) -> float:
+        """Reserve a request from the account's budget. Returns the wait."""
+        wait = self.bucket.reserve(settings.PROVIDER_RETRY_MAX_DELAY)
+        if wait > settings.PROVIDER_RETRY_MAX_DELAY:
+            raise ProviderRateLimited(
+                f"Request budget of {self.label} is exhausted", retry_after=wait
+            )
+        return wait
+
+    @staticmethod
+    def _get_retry_delay(error: ProviderError, attempt: int) -> float | None:
+        """Seconds to wait before retrying, or None to give up."""
+        if not error.retryable or attempt >= settings.PROVIDER_RETRY_ATTEMPTS:
+            return None
+        if error.retry_after is not None:
+            # The bucket is paused until then, so the next reserve waits
+            return 0 if error.retry_after <= settings.PROVIDER_RETRY_MAX_DELAY else None
+        # Full jitter keeps workers that failed together from retrying together
+        ceiling = min(
+            settings.PROVIDER_RETRY_MAX_DELAY,
+            settings.PROVIDER_RETRY_BACKOFF * 2**attempt,
+        )
+        return random.uniform(0, ceiling)
+
+    def _record_error(self, error: ProviderError) -> None:
+        """Report a failed call to the circuit breaker."""
+        if isinstance(error, ProviderCircuitOpen):
+            return
+        if isinstance(error, (ProviderUnavailable, ProviderAuthError)):
+            # Neither an outage nor rejected credentials go away on retry
+            self.breaker.record_failure(error)
+        elif isinstance(error, ProviderNotFound):
+            # The provider answered, so the account is reachable
+            self.breaker.record_success()
+
+    @staticmethod
+    def _to_error(
+        response: httpx.Response, method: str, url: str, paused_until: float | None
+    ) -> ProviderError:
+        """Translate an error response into a ``ProviderError``."""
+        status_code = response.status_code
+        if status_code in (401, 403):
+            error_class = ProviderAuthError
+        elif status_code == 404:
+            error_class = ProviderNotFound
+        elif status_code == 429:
+            error_class = ProviderRateLimited
+        elif status_code >= 500:
+            error_class = ProviderUnavailable
+        else:
+            error_class = ProviderError
+
+        retry_after = (
+            max(paused_until - time.time(), 0) if paused_until is not None else None
+        )
+        return error_class(
+            f"{method} {url} returned {status_code} {response.reason_phrase}",
+            status_code=status_code,
+            retry_after=retry_after,
+        )
+
+    @classmethod
+    def _get_paused_until(cls, response: httpx.Response) -> float | None:
+        """
+        When the provider asked to hold back requests until (epoch), if it did.
+
+        ``Retry-After`` wins; otherwise an exhausted ``RateLimit-Remaining``
+        (or ``X-RateLimit-Remaining``) pauses until ``RateLimit-Reset``.
+        """
+        now = time.time()
+        retry_after = response.headers.get("Retry-After")
+        if retry_after is not None:
+            delay = cls._parse_retry_after(retry_after, now)
+            if delay is not None:
+                return now + delay
+
+        remaining = cls._get_header(response, "RateLimit-Remaining")
+        reset = cls._get_header(response, "RateLimit-Reset")
+        try:
+            if remaining is None or reset is None or float(remaining) > 0:
+                return None
+            reset = float(reset)
+        except ValueError:
+            return None
+        return reset if reset > EPOCH_THRESHOLD else now + reset
+
+    @staticmethod
+    def _get_header(response: httpx.Response, name: str) -> str | None:
+        """Read a rate limit header, with or without the ``X-`` prefix."""
+        value = response.headers.get(name)
+        return value if value is not None else response.headers.get(f"X-{name}")
+
+    @staticmethod
+    def _parse_retry_after(value: str, now: float) -> float | None:
+        """Seconds of a ``Retry-After`` header (delay or HTTP date)."""
+        try:
+            return max(float(value), 0)
+        except ValueError:
+            pass
+        try:
+            return max(email.utils.parsedate_to_datetime(value).timestamp() - now, 0)
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,171 @@
+"""
+Fake provider APIs for tests.
+
+``mock_provider_api`` routes the shared provider HTTP clients to a handler
+(such as ``FakeDigitalOcean`` or ``FakeContabo``), so clients, transport and aggregator run
+unchanged against canned responses.
+"""
+
+import contextlib
+import hashlib
+import json
+from typing import Callable, Dict, Iterator, List
+from unittest import mock
+
+import httpx
+
+# Tests use a private in-process cache instead of the configured Redis
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+def droplet(droplet_id: int, status: str = "active", price: float = 6) -> dict:
+    """A DigitalOcean droplet as the API returns it."""
+    return {
+        "id": droplet_id,
+        "name": f"droplet-{droplet_id}",
+        "status": status,
+        "vcpus": 1,
+        "memory": 1024,
+        "disk": 25,
+        "region": {"slug": "fra1", "name": "Frankfurt 1"},
+        "created_at": "2024-01-01T00:00:00Z",
+        "size_slug": "s-1vcpu-1gb",
+        "size": {"price_monthly": price, "slug": "s-1vcpu-1gb"},
+        "image": {"id": 1, "distribution": "Ubuntu"},
+        "networks": {"v4": [{"type": "public", "ip_address": f"10.0.0.{droplet_id}"}]},
+    }
+
+
+class FakeDigitalOcean:
+    """
+    In-memory DigitalOcean API: paginated droplet listings (with ETags),
+    single droplets and the account endpoint.
+
+    ``fail_with`` makes every call answer with that status code instead.
+    """
+
+    def __init__(self, count: int = 3):
+        self.droplets: Dict[int, dict] = {i: droplet(i) for i in range(1, count + 1)}
+        self.fail_with: int | None = None
+        self.requests: List[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if self.fail_with is not None:
+            return httpx.Response(self.fail_with, json={"message": "Server error"})
+
+        path = request.url.path
+        if path.endswith("/droplets"):
+            return self._list(request)
+        if "/droplets/" in path:
+            droplet_id = int(path.rsplit("/", 1)[1])
+            if droplet_id not in self.droplets:
+                return httpx.Response(
+                    404, json={"id": "not_found", "message": "Not found"}
+                )
+            return httpx.Response(200, json={"droplet": self.droplets[droplet_id]})
+        if path.endswith("/account"):
+            return httpx.Response(200, json={"account": {"status": "active"}})
+        return httpx.Response(404, json={"id": "not_found", "message": "Not found"})
+
+    @property
+    def listing_requests(self) -> List[httpx.Request]:
+        """Requests made for droplet listing pages."""
+        return [
+            request
+            for request in self.requests
+            if request.url.path.endswith("/droplets")
+        ]
+
+    def _list(self, request: httpx.Request) -> httpx.Response:
+        """One listing page, or 304 if the client's ETag still matches."""
+        page = int(request.url.params.get("page", 1))
+        per_page = int(request.url.params.get("per_page", 25))
+        droplets = list(self.droplets.values())[(page - 1) * per_page : page * per_page]
+        body = json.dumps(
+            {
+                "droplets": droplets,
+                "links": {},
+                "meta": {"total": len(self.droplets)},
+            }
+        ).encode()
+
+        etag = f'"{hashlib.sha1(body).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(
+            200,
+            content=body,
+            headers={"Content-Type": "application/json", "ETag": etag},
+        )
+
+
+class FakeContabo:
+    """
+    In-memory Contabo API: the OAuth token endpoint and one page of instances.
+
+    Issued tokens are numbered; ``revoke`` makes the API reject the current
+    ones, ``token_status`` makes the token endpoint answer with that status.
+    """
+
+    def __init__(self, count: int = 2):
+        self.instances = [
+            {
+                "instanceId": i,
+                "displayName": f"vmi-{i}",
+                "status": "running",
+                "cpuCores": 4,
+                "ramMb": 8192,
+            }
+            for i in range(1, count + 1)
+        ]
+        self.token_status = 200
+        self.issued: List[str] = []
+        self.valid: set = set()
+        self.requests: List[httpx.Request] = []
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        if request.url.path.endswith("/token"):
+            if self.token_status != 200:
+                return httpx.Response(
+                    self.token_status, json={"error": "invalid_grant"}
+                )
+            token = f"token-{len(self.issued) + 1}"
+            self.issued.append(token)
+            self.valid.add(token)
+            return httpx.Response(200, json={"access_token": token, "expires_in": 300})
+
+        if (
+            request.headers.get("Authorization", "").removeprefix("Bearer ")
+            not in self.valid
+        ):
+            return httpx.Response(401, json={"message": "Unauthorized"})
+        return httpx.Response(
+            200, json={"data": self.instances, "pagination": {"totalPages": 1}}
+        )
+
+    def revoke(self) -> None:
+        """Reject every token issued so far."""
+        self.valid.clear()
+
+
+@contextlib.contextmanager
+def mock_provider_api(
+    handler: Callable[[httpx.Request], httpx.Response],
+) -> Iterator[None]:
+    """Serve every provider API request (sync and async) from ``handler``."""
+    transport = httpx.MockTransport(handler)
+    client = httpx.Client(transport=transport)
+    with mock.patch(
+        "providers.services.base.get_http_client", return_value=client
+    ), mock.patch(
+        "providers.services.base.get_async_http_client",
+        side_effect=lambda: httpx.AsyncClient(transport=transport),
+    ):
+        try:
+            yield
+        finally:
+            client.close()
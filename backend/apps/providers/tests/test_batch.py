@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase
+
+from providers.constants import InstanceStatus, ProviderType
+from providers.services.base import VPSInstance
+from providers.services.batch import FIELDS, InstanceBatch
+
+
+def make_instance(instance_id: str, **fields) -> VPSInstance:
+    values = {
+        "id": instance_id,
+        "name": f"vps-{instance_id}",
+        "status": InstanceStatus.RUNNING,
+        "ipv4": f"10.0.0.{instance_id}",
+        "ipv6": None,
+        "cpu_cores": 1,
+        "ram_mb": 1024,
+        "disk_gb": 25,
+        "region": "fra1",
+        "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+        "provider_type": ProviderType.DIGITALOCEAN,
+        "provider_account_id": 1,
+        "monthly_price": 6.0,
+        **fields,
+    }
+    return VPSInstance(**values)
+
+
+class InstanceBatchTests(SimpleTestCase):
+    def setUp(self):
+        self.instances = [
+            make_instance("1"),
+            make_instance("2", status=InstanceStatus.STOPPED),
+            make_instance("3", region="nyc1", provider_account_id=2),
+        ]
+        self.batch = InstanceBatch.from_instances(self.instances)
+
+    def test_instances_round_trip(self):
+        self.assertEqual(len(self.batch), 3)
+        self.assertEqual(self.batch.to_instances(), self.instances)
+        self.assertEqual(self.batch[1], self.instances[1])
+
+    def test_rows_round_trip(self):
+        rows = list(self.batch.rows())
+
+        self.assertEqual(list(rows[0]), FIELDS)
+        self.assertEqual(InstanceBatch.from_rows(rows).to_instances(), self.instances)
+
+    def test_rows_from_json_share_enum_members_and_strings(self):
+        rows = [
+            {
+                **row,
+                "status": str(row["status"]),
+                "provider_type": "digitalocean",
+                "region": "".join(["fr", "a1"]),
+            }
+            for row in self.batch.rows()
+        ]
+        batch = InstanceBatch.from_rows(rows)
+
+        self.assertIs(batch.column("status")[0], InstanceStatus.RUNNING)
+        self.assertIs(batch.column("provider_type")[0], ProviderType.DIGITALOCEAN)
+        self.assertIs(batch.column("region")[0], batch.column("region")[1])
+
+    def test_unknown_statuses_are_kept(self):
+        batch = InstanceBatch.from_rows(
+            [{**next(self.batch.rows()), "status": "migrating"}]
+        )
+
+        self.assertEqual(batch.column("status"), ["migrating"])
+
+    def test_take_and_filter(self):
+        self.assertEqual(self.batch.take([2, 0]).column("id"), ["3", "1"])
+        self.assertEqual(
+            self.batch.filter(status=InstanceStatus.RUNNING).column("id"), ["1", "3"]
+        )
+        self.assertEqual(
+            self.batch.filter(status=InstanceStatus.RUNNING, region="fra1").column(
+                "id"
+            ),
+            ["1"],
+        )
+
+    def test_concat_keeps_order_versions_and_oldest_fetch_time(self):
+        first = self.batch.take([0, 1])
+        first.version, first.fetched_at = "a", 200.0
+        second = self.batch.take([2])
+        second.version, second.fetched_at = "b", 100.0
+
+        joined = InstanceBatch.concat([first, second])
+
+        self.assertEqual(joined.column("id"), ["1", "2", "3"])
+        self.assertEqual(joined.version, InstanceBatch.combine_versions(["a", "b"]))
+        self.assertNotEqual(joined.version, InstanceBatch.combine_versions(["b", "a"]))
+        self.assertEqual(joined.fetched_at, 100.0)
+
+    def test_concat_with_an_unversioned_part_is_unversioned(self):
+        first = self.batch.take([0])
+        first.version, first.fetched_at = "a", 100.0
+        second = self.batch.take([1])
+
+        joined = InstanceBatch.concat([first, second])
+
+        self.assertIsNone(joined.version)
+        self.assertIsNone(joined.fetched_at)
+
+    def test_empty_batch(self):
+        batch = InstanceBatch.concat([])
+
+        self.assertEqual(len(batch), 0)
+        self.assertEqual(batch.to_instances(), [])
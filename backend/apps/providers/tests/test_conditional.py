@@ -0,0 +1,73 @@
+import httpx
+from django.test import SimpleTestCase
+
+from providers.services.batch import InstanceBatch
+from providers.services.conditional import PageCache
+from providers.tests.test_batch import make_instance
+
+URL = "https://api.example.com/v1/servers"
+
+
+class PageCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.previous = InstanceBatch.from_instances(
+            [make_instance(str(i)) for i in range(1, 5)]
+        )
+        self.key = PageCache.get_key(URL, {"page": 2, "per_page": 2})
+        self.validators = {
+            self.key: {
+                "etag": '"abc"',
+                "last_modified": None,
+                "ids": ["3", "4"],
+                "total_pages": 2,
+            }
+        }
+
+    def test_page_keys_ignore_parameter_order(self):
+        self.assertEqual(PageCache.get_key(URL, {"per_page": 2, "page": 2}), self.key)
+
+    def test_known_pages_are_requested_conditionally(self):
+        pages = PageCache(self.validators, self.previous)
+
+        self.assertEqual(pages.get_headers(self.key), {"If-None-Match": '"abc"'})
+        self.assertEqual(pages.get_headers(PageCache.get_key(URL, {"page": 1})), {})
+
+    def test_nothing_is_conditional_without_the_previous_snapshot(self):
+        self.assertEqual(PageCache(self.validators).get_headers(self.key), {})
+
+    def test_unchanged_pages_come_from_the_previous_snapshot(self):
+        pages = PageCache(self.validators, self.previous)
+
+        instances, total_pages = pages.get_page(self.key)
+
+        self.assertEqual([instance.id for instance in instances], ["3", "4"])
+        self.assertEqual(total_pages, 2)
+        self.assertEqual(pages.not_modified, 1)
+        # Kept for the next fetch
+        self.assertEqual(pages.validators, self.validators)
+
+    def test_pages_the_snapshot_no_longer_covers_are_refetched(self):
+        pages = PageCache(self.validators, self.previous.take([0, 1, 2]))
+
+        self.assertIsNone(pages.get_page(self.key))
+        self.assertEqual(pages.not_modified, 0)
+
+    def test_only_pages_with_validators_are_stored(self):
+        pages = PageCache()
+        instances = [make_instance("1")]
+
+        pages.store("a", httpx.Response(200), instances, 1)
+        pages.store(
+            "b",
+            httpx.Response(
+                200, headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+            ),
+            instances,
+            1,
+        )
+
+        self.assertEqual(list(pages.validators), ["b"])
+        self.assertEqual(
+            PageCache(pages.validators, self.previous).get_headers("b"),
+            {"If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"},
+        )
@@ -0,0 +1,156 @@
+from io import StringIO
+from unittest import mock
+
+from cryptography.fernet import Fernet, InvalidToken
+from django.contrib.auth.models import User
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from providers.constants import ProviderType
+from providers.models import Provider
+from providers.services import encryption
+
+OLD_KEY = Fernet.generate_key().decode()
+NEW_KEY = Fernet.generate_key().decode()
+
+
+class EncryptionTestMixin:
+    def setUp(self):
+        super().setUp()
+        encryption._credentials_cache.clear()
+        self.addCleanup(encryption._credentials_cache.clear)
+
+
+@override_settings(ENCRYPTION_KEYS=[OLD_KEY])
+class KeyRotationTests(EncryptionTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.encrypted = encryption.encrypt_credentials({"token": "secret"})
+
+    def test_credentials_round_trip(self):
+        self.assertEqual(
+            encryption.decrypt_credentials(self.encrypted), {"token": "secret"}
+        )
+
+    @override_settings(ENCRYPTION_KEYS=[NEW_KEY, OLD_KEY])
+    def test_any_key_decrypts_and_the_first_encrypts(self):
+        self.assertEqual(
+            encryption.decrypt_credentials(self.encrypted), {"token": "secret"}
+        )
+        self.assertEqual(encryption.get_encryption_key(), NEW_KEY.encode())
+
+        rotated = encryption.rotate_credentials(self.encrypted)
+
+        with override_settings(ENCRYPTION_KEYS=[NEW_KEY]):
+            self.assertEqual(
+                encryption.decrypt_credentials(rotated), {"token": "secret"}
+            )
+            with self.assertRaises(InvalidToken):
+                encryption.decrypt_credentials(self.encrypted)
+
+    @override_settings(ENCRYPTION_KEYS=[NEW_KEY, "not-a-key"])
+    def test_invalid_keys_are_a_configuration_error(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "ENCRYPTION_KEYS entry 2"):
+            encryption.get_cipher()
+
+    @override_settings(ENCRYPTION_KEYS=[], ENCRYPTION_KEY="change-me")
+    def test_invalid_single_key_is_replaced_for_the_process(self):
+        encrypted = encryption.encrypt_credentials({"token": "secret"})
+
+        self.assertEqual(encryption.decrypt_credentials(encrypted), {"token": "secret"})
+        self.assertNotEqual(encryption.get_encryption_key(), b"change-me")
+
+
+@override_settings(ENCRYPTION_KEYS=[OLD_KEY], PROVIDER_CREDENTIALS_CACHE_TTL=60)
+class CachedCredentialsTests(EncryptionTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.encrypted = encryption.encrypt_credentials({"token": "secret"})
+        self.decrypt = self.enterContext(
+            mock.patch.object(
+                encryption, "decrypt_credentials", wraps=encryption.decrypt_credentials
+            )
+        )
+
+    def test_same_version_is_decrypted_once(self):
+        for _ in range(3):
+            credentials = encryption.get_cached_credentials((1, "v1"), self.encrypted)
+
+        self.assertEqual(credentials, {"token": "secret"})
+        self.assertEqual(self.decrypt.call_count, 1)
+
+    def test_callers_get_their_own_copy(self):
+        encryption.get_cached_credentials((1, "v1"), self.encrypted)[
+            "token"
+        ] = "changed"
+
+        self.assertEqual(
+            encryption.get_cached_credentials((1, "v1"), self.encrypted),
+            {"token": "secret"},
+        )
+
+    def test_new_versions_are_decrypted(self):
+        encryption.get_cached_credentials((1, "v1"), self.encrypted)
+        encryption.get_cached_credentials((1, "v2"), self.encrypted)
+
+        self.assertEqual(self.decrypt.call_count, 2)
+
+    @override_settings(PROVIDER_CREDENTIALS_CACHE_TTL=0)
+    def test_entries_expire(self):
+        encryption.get_cached_credentials((1, "v1"), self.encrypted)
+        encryption.get_cached_credentials((1, "v1"), self.encrypted)
+
+        self.assertEqual(self.decrypt.call_count, 2)
+
+
+@override_settings(ENCRYPTION_KEYS=[OLD_KEY])
+class ProviderCredentialsTests(EncryptionTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.provider = Provider(
+            user=User.objects.create(username="owner"),
+            name="DigitalOcean",
+            provider_type=ProviderType.DIGITALOCEAN,
+        )
+        self.provider.set_credentials({"token": "first"})
+        self.provider.save()
+
+    def test_updated_credentials_are_never_served_stale(self):
+        self.assertEqual(self.provider.get_credentials(), {"token": "first"})
+
+        self.provider.set_credentials({"token": "second"})
+        self.provider.save()
+
+        self.assertEqual(Provider.objects.get().get_credentials(), {"token": "second"})
+
+    def rotate(self, *args) -> str:
+        stdout, stderr = StringIO(), StringIO()
+        with override_settings(ENCRYPTION_KEYS=[NEW_KEY, OLD_KEY]):
+            call_command("rotate_credentials", *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue() + stderr.getvalue()
+
+    def test_rotate_command_re_encrypts_with_the_primary_key(self):
+        self.assertIn("Rotated 1 providers, 0 failed", self.rotate())
+
+        with override_settings(ENCRYPTION_KEYS=[NEW_KEY]):
+            encrypted = Provider.objects.get().encrypted_credentials
+            self.assertEqual(
+                encryption.decrypt_credentials(encrypted), {"token": "first"}
+            )
+
+    def test_dry_run_saves_nothing(self):
+        self.assertIn("Can rotate 1 providers", self.rotate("--dry-run"))
+
+        self.assertEqual(
+            Provider.objects.get().encrypted_credentials,
+            self.provider.encrypted_credentials,
+        )
+
+    def test_undecryptable_credentials_are_reported(self):
+        Provider.objects.update(encrypted_credentials="garbage")
+
+        output = self.rotate()
+
+        self.assertIn(f"DigitalOcean (#{self.provider.id}): cannot decrypt", output)
+        self.assertIn("Rotated 0 providers, 1 failed", output)
@@ -0,0 +1,97 @@
+import asyncio
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from providers.services import http
+from providers.services.contabo import AsyncContaboClient
+from providers.services.digitalocean import AsyncDigitalOceanClient, DigitalOceanClient
+from providers.services.errors import ProviderNotFound
+from providers.services.factory import ProviderClientFactory
+from providers.tests.mocks import LOCMEM_CACHES, FakeDigitalOcean, mock_provider_api
+
+
+# HTTP/2 clients need h2 (the httpx[http2] extra)
+@override_settings(
+    PROVIDER_HTTP2=False,
+    PROVIDER_HTTP_MAX_CONNECTIONS=7,
+    PROVIDER_HTTP_MAX_KEEPALIVE_CONNECTIONS=3,
+    PROVIDER_HTTP_KEEPALIVE_EXPIRY=12.0,
+)
+class SharedHTTPClientTests(SimpleTestCase):
+    def setUp(self):
+        http.close_http_clients()
+        self.addCleanup(http.close_http_clients)
+
+    def test_sync_client_is_shared(self):
+        client = http.get_http_client()
+
+        self.assertIs(http.get_http_client(), client)
+
+    def test_closed_client_is_replaced(self):
+        client = http.get_http_client()
+
+        http.close_http_clients()
+
+        self.assertTrue(client.is_closed)
+        self.assertIsNot(http.get_http_client(), client)
+
+    def test_pool_limits_come_from_settings(self):
+        options = http._client_options()
+
+        self.assertFalse(options["http2"])
+        self.assertEqual(options["limits"].max_connections, 7)
+        self.assertEqual(options["limits"].max_keepalive_connections, 3)
+        self.assertEqual(options["limits"].keepalive_expiry, 12.0)
+
+    def test_async_client_is_shared_within_an_event_loop(self):
+        async def get_clients():
+            return http.get_async_http_client(), http.get_async_http_client()
+
+        first, second = asyncio.run(get_clients())
+        other_loop, _ = asyncio.run(get_clients())
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other_loop)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PROVIDER_RETRY_ATTEMPTS=0)
+class AsyncProviderClientTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.api = FakeDigitalOcean()
+        self.enterContext(mock_provider_api(self.api))
+        self.credentials = {"token": "token"}
+
+    def test_async_client_matches_the_sync_client(self):
+        sync_instances = DigitalOceanClient(
+            self.credentials, provider_id=1
+        ).list_instances()
+        cache.clear()
+
+        instances = asyncio.run(
+            AsyncDigitalOceanClient(self.credentials, provider_id=1).list_instances()
+        )
+
+        self.assertEqual(instances, sync_instances)
+
+    def test_async_get_instance(self):
+        client = AsyncDigitalOceanClient(self.credentials, provider_id=1)
+
+        self.assertEqual(asyncio.run(client.get_instance("2")).id, "2")
+        with self.assertRaises(ProviderNotFound):
+            asyncio.run(client.get_instance("99"))
+
+    def test_factory_creates_async_clients(self):
+        for provider_type, client_class in [
+            ("digitalocean", AsyncDigitalOceanClient),
+            ("Contabo", AsyncContaboClient),
+        ]:
+            with self.subTest(provider_type=provider_type):
+                client = ProviderClientFactory.create_async(
+                    provider_type, self.credentials, 1
+                )
+                self.assertIsInstance(client, client_class)
+
+        with self.assertRaisesMessage(ValueError, "Unsupported provider type: linode"):
+            ProviderClientFactory.create_async("linode", self.credentials, 1)
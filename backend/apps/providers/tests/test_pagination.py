@@ -0,0 +1,154 @@
+import asyncio
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from providers.services.digitalocean import AsyncDigitalOceanClient, DigitalOceanClient
+from providers.services.pagination import afetch_all_pages, fetch_all_pages
+from providers.tests.mocks import LOCMEM_CACHES, FakeDigitalOcean, mock_provider_api
+
+
+def make_pages(page_count: int, per_page: int = 2, known_total: bool = True):
+    """Pages of consecutive numbers, reporting the page count or not."""
+
+    def page(number: int):
+        items = list(range((number - 1) * per_page, number * per_page))
+        if known_total:
+            return items, page_count
+        # Only a "next" link until the last page
+        return items, None if number < page_count else number
+
+    return page
+
+
+class FetchAllPagesTests(SimpleTestCase):
+    def test_returns_items_in_page_order(self):
+        self.assertEqual(
+            fetch_all_pages(make_pages(5), max_concurrency=3), list(range(10))
+        )
+
+    def test_single_page_is_fetched_once(self):
+        calls = []
+
+        def fetch_page(number):
+            calls.append(number)
+            return ["a"], 1
+
+        self.assertEqual(fetch_all_pages(fetch_page), ["a"])
+        self.assertEqual(calls, [1])
+
+    def test_prefetches_remaining_pages_concurrently(self):
+        # Pages 2-4 only return once all three are in flight
+        barrier = threading.Barrier(3, timeout=5)
+
+        def fetch_page(number):
+            if number > 1:
+                barrier.wait()
+            return [number], 4
+
+        self.assertEqual(fetch_all_pages(fetch_page, max_concurrency=3), [1, 2, 3, 4])
+
+    def test_follows_next_links_while_page_count_is_unknown(self):
+        calls = []
+
+        def fetch_page(number):
+            calls.append(number)
+            return make_pages(4, known_total=False)(number)
+
+        self.assertEqual(fetch_all_pages(fetch_page), list(range(8)))
+        self.assertEqual(calls, [1, 2, 3, 4])
+
+    def test_prefetches_after_page_count_becomes_known(self):
+        def fetch_page(number):
+            # Page 1 has only a "next" link, page 2 tells the count
+            return [number], None if number == 1 else 4
+
+        self.assertEqual(fetch_all_pages(fetch_page), [1, 2, 3, 4])
+
+    def test_page_failure_is_raised(self):
+        def fetch_page(number):
+            if number == 3:
+                raise ValueError("page 3")
+            return [number], 4
+
+        with self.assertRaisesMessage(ValueError, "page 3"):
+            fetch_all_pages(fetch_page)
+
+
+class AsyncFetchAllPagesTests(SimpleTestCase):
+    def run_pages(self, fetch_page, max_concurrency=None):
+        async def afetch_page(number):
+            await asyncio.sleep(0)
+            return fetch_page(number)
+
+        return asyncio.run(afetch_all_pages(afetch_page, max_concurrency))
+
+    def test_returns_items_in_page_order(self):
+        self.assertEqual(
+            self.run_pages(make_pages(5), max_concurrency=2), list(range(10))
+        )
+
+    def test_follows_next_links_while_page_count_is_unknown(self):
+        self.assertEqual(
+            self.run_pages(make_pages(3, known_total=False)), list(range(6))
+        )
+
+
+class DigitalOceanPageCountTests(SimpleTestCase):
+    def setUp(self):
+        self.client = DigitalOceanClient({"token": "token"}, provider_id=1)
+
+    def test_page_count_from_total(self):
+        self.assertEqual(self.client._get_page_count({"meta": {"total": 251}}), 2)
+
+    def test_page_count_from_last_link(self):
+        data = {
+            "links": {
+                "pages": {"next": "...", "last": "https://api/v2/droplets?page=7"}
+            }
+        }
+        self.assertEqual(self.client._get_page_count(data), 7)
+
+    def test_page_count_unknown_with_only_a_next_link(self):
+        data = {"links": {"pages": {"next": "https://api/v2/droplets?page=2"}}}
+        self.assertIsNone(self.client._get_page_count(data))
+
+    def test_single_page_without_links(self):
+        self.assertEqual(self.client._get_page_count({"links": {}}), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PROVIDER_CONDITIONAL_REQUESTS=False)
+@mock.patch.object(DigitalOceanClient, "PER_PAGE", 2)
+class DigitalOceanListingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.api = FakeDigitalOcean(count=5)
+
+    def test_lists_every_page_once(self):
+        with mock_provider_api(self.api):
+            instances = DigitalOceanClient(
+                {"token": "token"}, provider_id=1
+            ).list_instances()
+
+        self.assertEqual(
+            [instance.id for instance in instances], ["1", "2", "3", "4", "5"]
+        )
+        pages = sorted(
+            int(request.url.params["page"]) for request in self.api.listing_requests
+        )
+        self.assertEqual(pages, [1, 2, 3])
+
+    def test_async_client_lists_every_page(self):
+        async def list_instances():
+            return await AsyncDigitalOceanClient(
+                {"token": "token"}, provider_id=1
+            ).list_instances()
+
+        with mock_provider_api(self.api):
+            instances = asyncio.run(list_instances())
+
+        self.assertEqual(
+            [instance.id for instance in instances], ["1", "2", "3", "4", "5"]
+        )
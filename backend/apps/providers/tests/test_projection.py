@@ -0,0 +1,172 @@
+import asyncio
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from providers.services import projection
+from providers.services.digitalocean import AsyncDigitalOceanClient, DigitalOceanClient
+from providers.services.projection import KEEP
+from providers.tests.mocks import (
+    LOCMEM_CACHES,
+    FakeDigitalOcean,
+    droplet,
+    mock_provider_api,
+)
+
+
+def loads(document, fields):
+    return projection.loads(json.dumps(document).encode(), fields)
+
+
+def stream_loads(content: bytes, fields, chunk_size=7):
+    decoder = projection.StreamDecoder(fields)
+    for start in range(0, len(content), chunk_size):
+        decoder.feed(content[start : start + chunk_size])
+    return decoder.close()
+
+
+class ProjectionTests(SimpleTestCase):
+    def test_only_selected_keys_are_kept(self):
+        document = {
+            "id": 1,
+            "image": {"id": 2, "regions": ["fra1", {"deep": [1, 2]}]},
+            "size": {"slug": "s", "price": 6},
+        }
+
+        self.assertEqual(
+            loads(document, {"id": KEEP, "size": {"slug": KEEP}}),
+            {"id": 1, "size": {"slug": "s"}},
+        )
+
+    def test_arrays_are_projected_item_by_item(self):
+        document = {
+            "items": [{"id": 1, "extra": [1]}, {"id": 2, "extra": {}}],
+            "total": 2,
+        }
+
+        self.assertEqual(
+            loads(document, {"items": [{"id": KEEP}]}),
+            {"items": [{"id": 1}, {"id": 2}]},
+        )
+
+    def test_kept_values_are_whole(self):
+        document = {
+            "networks": {"v4": [{"ip_address": "10.0.0.1", "gateway": None}]},
+            "tags": ["a"],
+        }
+
+        self.assertEqual(loads(document, {"networks": KEEP, "tags": KEEP}), document)
+
+    def test_values_of_another_shape_are_kept_whole(self):
+        document = {"region": "fra1", "size": [1, 2], "links": None}
+
+        self.assertEqual(
+            loads(
+                document,
+                {
+                    "region": {"slug": KEEP},
+                    "size": {"slug": KEEP},
+                    "links": {"pages": KEEP},
+                },
+            ),
+            document,
+        )
+
+    def test_scalars_and_floats(self):
+        self.assertEqual(
+            loads(
+                {"price": 6.5, "count": 3, "ok": True}, {"price": KEEP, "count": KEEP}
+            ),
+            {"price": 6.5, "count": 3},
+        )
+        self.assertIsInstance(loads({"price": 6.5}, {"price": KEEP})["price"], float)
+        self.assertEqual(loads([1, 2], KEEP), [1, 2])
+
+    def test_matches_json_loads_for_a_page(self):
+        page = {"droplets": [droplet(1), droplet(2)], "links": {}, "meta": {"total": 2}}
+
+        projected = loads(page, DigitalOceanClient.PAGE_FIELDS)
+
+        self.assertEqual(projected["meta"], {"total": 2})
+        self.assertEqual(projected["droplets"][0]["networks"], droplet(1)["networks"])
+        self.assertEqual(
+            projected["droplets"][0]["size"],
+            {"price_monthly": 6, "slug": "s-1vcpu-1gb"},
+        )
+        self.assertNotIn("image", projected["droplets"][0])
+
+    def test_invalid_or_incomplete_json_is_a_value_error(self):
+        for content in [b"{", b'{"id": }', b""]:
+            with self.subTest(content=content), self.assertRaises(ValueError):
+                projection.loads(content, {"id": KEEP})
+
+
+class StreamDecoderTests(SimpleTestCase):
+    def test_matches_loads_whatever_the_chunk_size(self):
+        page = {"droplets": [droplet(1), droplet(2)], "links": {}, "meta": {"total": 2}}
+        content = json.dumps(page).encode()
+        fields = DigitalOceanClient.PAGE_FIELDS
+
+        for chunk_size in [1, 7, len(content)]:
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(
+                    stream_loads(content, fields, chunk_size), loads(page, fields)
+                )
+
+    def test_scalar_documents(self):
+        self.assertEqual(stream_loads(b"[1, 2.5]", KEEP), [1, 2.5])
+        self.assertIsInstance(
+            stream_loads(b'{"price": 6}', {"price": KEEP})["price"], int
+        )
+
+    def test_invalid_or_incomplete_json_is_a_value_error(self):
+        for content in [b"{", b'{"id": }', b""]:
+            with self.subTest(content=content), self.assertRaises(ValueError):
+                stream_loads(content, {"id": KEEP})
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PROVIDER_CONDITIONAL_REQUESTS=False)
+class ClientProjectionTests(SimpleTestCase):
+    def list_instances(self):
+        with mock_provider_api(FakeDigitalOcean()):
+            return DigitalOceanClient(
+                {"token": "token"}, provider_id=1
+            ).list_instances()
+
+    def test_instances_do_not_depend_on_trimming(self):
+        trimmed = self.list_instances()
+        with self.settings(PROVIDER_KEEP_RAW_DATA=True):
+            whole = self.list_instances()
+
+        for instance in whole:
+            instance.raw_data = None
+        self.assertEqual(trimmed, whole)
+
+    @override_settings(PROVIDER_KEEP_RAW_DATA=True)
+    def test_raw_data_keeps_the_whole_response(self):
+        self.assertEqual(self.list_instances()[0].raw_data, droplet(1))
+
+    @override_settings(PROVIDER_STREAM_PARSE_MIN_BYTES=0)
+    def test_large_pages_are_stream_decoded(self):
+        buffered = self.list_instances()
+
+        close = mock.Mock(wraps=projection.StreamDecoder.close)
+        with mock.patch.object(
+            projection.StreamDecoder, "close", lambda decoder: close(decoder)
+        ):
+            streamed = self.list_instances()
+            with mock_provider_api(FakeDigitalOcean()):
+                client = AsyncDigitalOceanClient({"token": "token"}, provider_id=1)
+                async_streamed = asyncio.run(client.list_instances())
+
+        self.assertEqual(close.call_count, 2)
+        self.assertEqual(streamed, buffered)
+        self.assertEqual(async_streamed, buffered)
+
+    @override_settings(PROVIDER_STREAM_PARSE_MIN_BYTES=10**9)
+    def test_pages_below_the_threshold_are_buffered(self):
+        with mock.patch.object(projection, "StreamDecoder") as decoder:
+            self.assertEqual(len(self.list_instances()), 3)
+
+        decoder.assert_not_called()
@@ -0,0 +1,176 @@
+import asyncio
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from providers.services.contabo import AsyncContaboClient, ContaboClient
+from providers.services.errors import ProviderAuthError, ProviderCircuitOpen
+from providers.services.token_cache import TokenCache
+from providers.tests.mocks import LOCMEM_CACHES, FakeContabo, mock_provider_api
+
+CREDENTIALS = {
+    "client_id": "id",
+    "client_secret": "secret",
+    "api_user": "user",
+    "api_password": "password",
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, PROVIDER_TOKEN_REFRESH_MARGIN=60)
+@mock.patch.object(TokenCache, "POLL_INTERVAL", 0.01)
+class TokenCacheTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.issued = []
+
+    def fetch(self, expires_in=300):
+        token = f"token-{len(self.issued) + 1}"
+        self.issued.append(token)
+        return token, expires_in
+
+    def test_workers_share_the_token(self):
+        self.assertEqual(
+            TokenCache(1, CREDENTIALS).get_or_refresh(self.fetch), "token-1"
+        )
+        self.assertEqual(
+            TokenCache(1, CREDENTIALS).get_or_refresh(self.fetch), "token-1"
+        )
+        self.assertEqual(
+            TokenCache(2, CREDENTIALS).get_or_refresh(self.fetch), "token-2"
+        )
+
+    def test_changed_credentials_get_a_new_token(self):
+        TokenCache(1, CREDENTIALS).get_or_refresh(self.fetch)
+
+        token = TokenCache(
+            1, {**CREDENTIALS, "api_password": "rotated"}
+        ).get_or_refresh(self.fetch)
+
+        self.assertEqual(token, "token-2")
+
+    def test_tokens_are_refreshed_before_they_expire(self):
+        TokenCache(1, CREDENTIALS).get_or_refresh(lambda: self.fetch(expires_in=30))
+
+        self.assertEqual(
+            TokenCache(1, CREDENTIALS).get_or_refresh(self.fetch), "token-2"
+        )
+
+    def test_valid_token_is_used_while_another_worker_refreshes(self):
+        tokens = TokenCache(1, CREDENTIALS)
+        tokens.get_or_refresh(lambda: self.fetch(expires_in=30))
+        cache.add(tokens.lock_key, "other worker")
+
+        self.assertEqual(tokens.get_or_refresh(self.fetch), "token-1")
+        self.assertEqual(len(self.issued), 1)
+
+    def test_without_a_token_waits_for_the_refreshing_worker(self):
+        other = TokenCache(1, CREDENTIALS)
+        cache.add(other.lock_key, "other worker")
+
+        def finish_refresh():
+            other._store("from-other-worker", 300)
+            cache.delete(other.lock_key)
+
+        threading.Timer(0.05, finish_refresh).start()
+
+        self.assertEqual(
+            TokenCache(1, CREDENTIALS).get_or_refresh(self.fetch), "from-other-worker"
+        )
+        self.assertEqual(self.issued, [])
+
+    @mock.patch.object(TokenCache, "WAIT_TIMEOUT", 0.05)
+    def test_stops_waiting_for_a_stuck_refresh(self):
+        cache.add(TokenCache(1, CREDENTIALS).lock_key, "stuck worker")
+
+        self.assertEqual(
+            TokenCache(1, CREDENTIALS).get_or_refresh(self.fetch), "token-1"
+        )
+
+    def test_failed_refresh_releases_the_lock(self):
+        def fail():
+            raise ProviderAuthError("Bad credentials")
+
+        tokens = TokenCache(1, CREDENTIALS)
+        with self.assertRaises(ProviderAuthError):
+            tokens.get_or_refresh(fail)
+
+        self.assertIsNone(cache.get(tokens.lock_key))
+
+    def test_invalidate(self):
+        tokens = TokenCache(1, CREDENTIALS)
+        tokens.get_or_refresh(self.fetch)
+
+        tokens.invalidate()
+
+        self.assertEqual(tokens.get_or_refresh(self.fetch), "token-2")
+
+    def test_async_workers_share_the_token(self):
+        async def fetch():
+            return self.fetch()
+
+        async def get_tokens():
+            first = await TokenCache(1, CREDENTIALS).aget_or_refresh(fetch)
+            return first, await TokenCache(1, CREDENTIALS).aget_or_refresh(fetch)
+
+        self.assertEqual(asyncio.run(get_tokens()), ("token-1", "token-1"))
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES, PROVIDER_CONDITIONAL_REQUESTS=False, PROVIDER_RETRY_ATTEMPTS=0
+)
+class ContaboAuthenticationTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.api = FakeContabo()
+        self.enterContext(mock_provider_api(self.api))
+
+    def list_instances(self):
+        return ContaboClient(CREDENTIALS, provider_id=1).list_instances()
+
+    def test_clients_share_one_password_grant(self):
+        self.list_instances()
+        instances = self.list_instances()
+
+        self.assertEqual([instance.id for instance in instances], ["1", "2"])
+        self.assertEqual(self.api.issued, ["token-1"])
+
+    def test_rejected_token_is_refreshed_once(self):
+        self.list_instances()
+        self.api.revoke()
+
+        self.assertEqual(len(self.list_instances()), 2)
+        self.assertEqual(self.api.issued, ["token-1", "token-2"])
+
+    def test_rejected_credentials_are_an_auth_error(self):
+        for status_code in [400, 401]:
+            with self.subTest(status_code=status_code):
+                self.api.token_status = status_code
+
+                with self.assertRaisesMessage(
+                    ProviderAuthError, "Contabo authentication failed"
+                ):
+                    self.list_instances()
+
+    @override_settings(PROVIDER_CIRCUIT_THRESHOLD=2)
+    def test_rejected_credentials_open_the_circuit(self):
+        self.api.token_status = 400
+        for _ in range(2):
+            with self.assertRaises(ProviderAuthError):
+                self.list_instances()
+        requests = len(self.api.requests)
+
+        with self.assertRaises(ProviderCircuitOpen):
+            self.list_instances()
+        self.assertEqual(len(self.api.requests), requests)
+
+    def test_async_client_shares_the_token(self):
+        self.list_instances()
+
+        instances = asyncio.run(
+            AsyncContaboClient(CREDENTIALS, provider_id=1).list_instances()
+        )
+
+        self.assertEqual(len(instances), 2)
+        self.assertEqual(self.api.issued, ["token-1"])
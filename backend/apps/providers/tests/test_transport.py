@@ -0,0 +1,317 @@
+import asyncio
+import email.utils
+import time
+from typing import List
+from unittest import mock
+
+import httpx
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from providers.services import transport
+from providers.services.errors import (
+    ProviderAuthError,
+    ProviderCircuitOpen,
+    ProviderError,
+    ProviderNotFound,
+    ProviderRateLimited,
+    ProviderUnavailable,
+)
+from providers.services.transport import CircuitBreaker, ProviderTransport, TokenBucket
+from providers.tests.mocks import LOCMEM_CACHES
+
+URL = "https://api.example.com/v1/servers"
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    PROVIDER_RATE_LIMITS={"example": (1000.0, 1000)},
+    PROVIDER_RETRY_ATTEMPTS=2,
+    PROVIDER_RETRY_BACKOFF=0.5,
+    PROVIDER_RETRY_MAX_DELAY=5,
+    PROVIDER_CIRCUIT_THRESHOLD=2,
+    PROVIDER_CIRCUIT_COOLDOWN=60,
+    PROVIDER_CIRCUIT_MAX_COOLDOWN=90,
+)
+class TransportTestCase(SimpleTestCase):
+    """
+    A provider answering with scripted responses (exceptions, or
+    callables producing the response).
+
+    Waits are recorded in ``self.sleeps`` instead of slept; jitter always
+    picks its ceiling.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.responses: List[httpx.Response | Exception] = []
+        self.requests: List[httpx.Request] = []
+        self.sleeps: List[float] = []
+        self.enterContext(
+            mock.patch.object(transport.time, "sleep", self.sleeps.append)
+        )
+        self.enterContext(
+            mock.patch.object(transport.random, "uniform", lambda low, high: high)
+        )
+        self.client = httpx.Client(transport=httpx.MockTransport(self.handle))
+        self.addCleanup(self.client.close)
+        self.transport = ProviderTransport("example", 1)
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        response = self.responses.pop(0) if self.responses else httpx.Response(200)
+        if callable(response):
+            response = response(request)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def call(self):
+        return self.transport.request(self.client, "GET", URL)
+
+    @property
+    def retry_waits(self) -> List[float]:
+        """Waits other than the (zero) rate limit waits."""
+        return [wait for wait in self.sleeps if wait]
+
+
+class RetryTests(TransportTestCase):
+    def test_failures_are_retried_with_exponential_backoff(self):
+        self.responses = [
+            httpx.Response(503),
+            httpx.ConnectError("refused"),
+            httpx.Response(200),
+        ]
+
+        self.assertEqual(self.call().status_code, 200)
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(self.retry_waits, [0.5, 1.0])
+
+    @override_settings(PROVIDER_RETRY_MAX_DELAY=0.75)
+    def test_backoff_is_capped(self):
+        self.responses = [httpx.Response(500), httpx.Response(500)]
+
+        self.call()
+
+        self.assertEqual(self.retry_waits, [0.5, 0.75])
+
+    def test_gives_up_after_the_configured_attempts(self):
+        self.responses = [httpx.Response(500)] * 3
+
+        with self.assertRaises(ProviderUnavailable) as raised:
+            self.call()
+
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(raised.exception.status_code, 500)
+
+    def test_client_errors_are_not_retried(self):
+        for status_code, error_class in [
+            (401, ProviderAuthError),
+            (403, ProviderAuthError),
+            (404, ProviderNotFound),
+        ]:
+            with self.subTest(status_code=status_code):
+                cache.clear()
+                self.requests.clear()
+                self.responses = [httpx.Response(status_code)]
+
+                with self.assertRaises(error_class):
+                    self.call()
+                self.assertEqual(len(self.requests), 1)
+
+    def test_retry_after_pauses_the_account(self):
+        self.responses = [httpx.Response(429, headers={"Retry-After": "2"})]
+
+        self.call()
+
+        self.assertEqual(len(self.requests), 2)
+        self.assertAlmostEqual(self.retry_waits[0], 2, places=1)
+
+    def test_retry_after_beyond_the_max_delay_fails_and_pauses_later_calls(self):
+        self.responses = [httpx.Response(429, headers={"Retry-After": "30"})]
+
+        with self.assertRaises(ProviderRateLimited) as raised:
+            self.call()
+        self.assertAlmostEqual(raised.exception.retry_after, 30, places=0)
+
+        with self.assertRaisesMessage(
+            ProviderRateLimited, "Request budget of example account 1 is exhausted"
+        ):
+            self.call()
+        self.assertEqual(len(self.requests), 1)
+
+    def test_async_requests_retry_too(self):
+        self.responses = [httpx.Response(502), httpx.Response(200)]
+
+        async def call():
+            with mock.patch.object(
+                transport.asyncio, "sleep", mock.AsyncMock()
+            ) as sleep:
+                async with httpx.AsyncClient(
+                    transport=httpx.MockTransport(self.handle)
+                ) as client:
+                    response = await self.transport.arequest(client, "GET", URL)
+                return response, [c.args[0] for c in sleep.call_args_list if c.args[0]]
+
+        response, waits = asyncio.run(call())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(waits, [0.5])
+
+
+class RateLimitHeaderTests(SimpleTestCase):
+    def paused_for(self, headers: dict) -> float | None:
+        paused_until = ProviderTransport._get_paused_until(
+            httpx.Response(200, headers=headers)
+        )
+        return None if paused_until is None else round(paused_until - time.time())
+
+    def test_retry_after_delay_or_date(self):
+        date = email.utils.formatdate(time.time() + 60, usegmt=True)
+
+        self.assertEqual(self.paused_for({"Retry-After": "10"}), 10)
+        self.assertAlmostEqual(self.paused_for({"Retry-After": date}), 60, delta=1)
+        self.assertIsNone(self.paused_for({"Retry-After": "soon"}))
+
+    def test_exhausted_rate_limit_pauses_until_reset(self):
+        self.assertEqual(
+            self.paused_for({"RateLimit-Remaining": "0", "RateLimit-Reset": "20"}), 20
+        )
+        self.assertEqual(
+            self.paused_for(
+                {
+                    "X-RateLimit-Remaining": "0",
+                    "X-RateLimit-Reset": str(time.time() + 30),
+                }
+            ),
+            30,
+        )
+        self.assertIsNone(
+            self.paused_for({"RateLimit-Remaining": "5", "RateLimit-Reset": "20"})
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TokenBucketTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.bucket = TokenBucket("bucket", rate=10, burst=2)
+
+    def test_burst_then_rate(self):
+        self.assertEqual([self.bucket.reserve(5), self.bucket.reserve(5)], [0, 0])
+        self.assertAlmostEqual(self.bucket.reserve(5), 0.1, places=2)
+        # Reserved up front: the next caller waits behind it
+        self.assertAlmostEqual(self.bucket.reserve(5), 0.2, places=2)
+
+    def test_waits_beyond_max_wait_take_nothing(self):
+        self.bucket.reserve(5)
+        self.bucket.reserve(5)
+
+        self.assertGreater(self.bucket.reserve(0.01), 0.01)
+        self.assertAlmostEqual(self.bucket.reserve(5), 0.1, places=2)
+
+    def test_pause(self):
+        self.bucket.pause(time.time() + 3)
+
+        self.assertAlmostEqual(self.bucket.reserve(5), 3, places=1)
+
+
+class CircuitBreakerTests(TransportTestCase):
+    def open_circuit(self):
+        self.responses = [httpx.Response(500)] * 6
+        for _ in range(2):
+            with self.assertRaises(ProviderUnavailable):
+                self.call()
+        self.responses.clear()
+        self.requests.clear()
+
+    def end_cooldown(self):
+        breaker = self.transport.breaker
+        opened = cache.get(breaker.open_key)
+        cache.set(breaker.open_key, {**opened, "until": time.time() - 1})
+
+    def test_consecutive_failures_open_the_circuit(self):
+        self.open_circuit()
+
+        with self.assertRaisesMessage(
+            ProviderCircuitOpen, "returned 500 Internal Server Error (retrying in 60s)"
+        ):
+            self.call()
+        self.assertEqual(self.requests, [])
+        self.assertEqual(self.transport.breaker.get_state(), CircuitBreaker.OPEN)
+
+    def test_answers_from_the_provider_reset_the_failure_count(self):
+        for response in [httpx.Response(500), httpx.Response(404), httpx.Response(500)]:
+            self.responses = [response] * 3
+            with self.assertRaises(ProviderError):
+                self.call()
+
+        self.assertEqual(self.transport.breaker.get_state(), CircuitBreaker.CLOSED)
+
+    def test_rejected_credentials_open_the_circuit(self):
+        self.responses = [httpx.Response(401)] * 2
+        for _ in range(2):
+            with self.assertRaises(ProviderAuthError):
+                self.call()
+        self.requests.clear()
+
+        with self.assertRaisesMessage(ProviderCircuitOpen, "returned 401 Unauthorized"):
+            self.call()
+        self.assertEqual(self.requests, [])
+
+    def test_reset_closes_the_circuit(self):
+        self.open_circuit()
+
+        self.transport.breaker.reset()
+
+        self.assertEqual(self.call().status_code, 200)
+
+    def test_other_client_errors_do_not_count(self):
+        self.responses = [httpx.Response(400)] * 2
+
+        for _ in range(2):
+            with self.assertRaises(ProviderError):
+                self.call()
+
+        self.assertEqual(self.transport.breaker.get_state(), CircuitBreaker.CLOSED)
+
+    def test_throttling_does_not_count(self):
+        self.responses = [httpx.Response(429, headers={"Retry-After": "0"})] * 6
+
+        for _ in range(2):
+            with self.assertRaises(ProviderRateLimited):
+                self.call()
+
+        self.assertEqual(self.transport.breaker.get_state(), CircuitBreaker.CLOSED)
+
+    def test_one_probe_after_the_cooldown_closes_it(self):
+        self.open_circuit()
+        self.end_cooldown()
+        self.assertEqual(self.transport.breaker.get_state(), CircuitBreaker.HALF_OPEN)
+
+        def probe(request):
+            # While the probe is in flight, other callers keep failing fast
+            with self.assertRaisesMessage(ProviderCircuitOpen, "(retrying now)"):
+                ProviderTransport("example", 1).request(self.client, "GET", URL)
+            return httpx.Response(200)
+
+        self.responses = [probe]
+
+        self.assertEqual(self.call().status_code, 200)
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(self.transport.breaker.get_state(), CircuitBreaker.CLOSED)
+
+    @override_settings(PROVIDER_CIRCUIT_MAX_COOLDOWN=150)
+    def test_failed_probes_double_the_cooldown_up_to_the_maximum(self):
+        self.transport = ProviderTransport("example", 1)
+        self.open_circuit()
+        cooldowns = []
+        for _ in range(3):
+            self.end_cooldown()
+            self.responses = [httpx.Response(500)] * 3
+            with self.assertRaises(ProviderUnavailable):
+                self.call()
+            opened = cache.get(self.transport.breaker.open_key)
+            cooldowns.append(round(opened["until"] - time.time()))
+
+        self.assertEqual(cooldowns, [120, 150, 150])
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from vps.models import InstanceCustomPrice
+from vps.models import InstanceCustomPrice, InstanceSample, ProviderSample, SyncedInstance
 
 
 @admin.register(InstanceCustomPrice)
@@ -31,3 +31,49 @@ class InstanceCustomPriceAdmin(admin.ModelAdmin):
         """Optimize queryset with select_related."""
         qs = super().get_queryset(request)
         return qs.select_related("provider")
+
+
+@admin.register(SyncedInstance)
+class SyncedInstanceAdmin(admin.ModelAdmin):
+    """Read-only view of instances persisted by background sync."""
+
+    list_display = ["name", "provider", "instance_id", "status", "ipv4", "region", "synced_at"]
+    list_filter = ["provider", "status", "provider_type"]
+    search_fields = ["name", "instance_id", "ipv4"]
+    readonly_fields = [field.name for field in SyncedInstance._meta.fields]
+
+    def has_add_permission(self, request):
+        """Rows are written by the sync only."""
+        return False
+
+    def get_queryset(self, request):
+        """Optimize queryset with select_related."""
+        qs = super().get_queryset(request)
+        return qs.select_related("provider")
+
+
+@admin.register(ProviderSample)
+class ProviderSampleAdmin(admin.ModelAdmin):
+    """Read-only view of recorded and rolled-up provider history."""
+
+    list_display = ["provider", "resolution", "bucket", "samples", "instances", "running", "monthly_cost"]
+    list_filter = ["provider", "resolution"]
+    readonly_fields = [field.name for field in ProviderSample._meta.fields]
+
+    def has_add_permission(self, request):
+        """Rows are written by the sync only."""
+        return False
+
+
+@admin.register(InstanceSample)
+class InstanceSampleAdmin(admin.ModelAdmin):
+    """Read-only view of instance status and price changes."""
+
+    list_display = ["instance_id", "provider", "sampled_at", "status", "monthly_price"]
+    list_filter = ["provider", "status"]
+    search_fields = ["instance_id"]
+    readonly_fields = [field.name for field in InstanceSample._meta.fields]
+
+    def has_add_permission(self, request):
+        """Rows are written by the sync only."""
+        return False
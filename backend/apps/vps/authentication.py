@@ -0,0 +1,21 @@
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+class QueryParamJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication reading the access token from ``?token=``.
+
+    For clients that cannot set request headers, such as the browser's
+    ``EventSource``. Only enable it on endpoints that need it: tokens in
+    URLs end up in access logs.
+    """
+
+    query_param = "token"
+
+    def authenticate(self, request):
+        raw_token = request.query_params.get(self.query_param)
+        if not raw_token:
+            return None
+
+        validated_token = self.get_validated_token(raw_token.encode())
+        return self.get_user(validated_token), validated_token
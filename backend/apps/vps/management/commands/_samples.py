@@ -0,0 +1,149 @@
+"""Synthetic fleets, provider pages and timing helpers shared by the benchmark commands."""
+
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+import orjson
+
+from providers.constants import InstanceStatus, ProviderType
+from providers.services.base import VPSInstance
+from providers.services.batch import InstanceBatch
+
+REGIONS = ["fra1", "nyc3", "sgp1", "EU", "US-central", "Asia (Singapore)"]
+PLANS = ["s-1vcpu-1gb", "s-2vcpu-4gb", "VPS S SSD", "VPS M NVMe", None]
+
+
+def build_sample_batch(count: int) -> InstanceBatch:
+    """Realistic-looking instances with repeated statuses, regions and plans."""
+    rng = random.Random(0)
+    epoch = datetime(2022, 1, 1, tzinfo=timezone.utc)
+    return InstanceBatch.from_instances(
+        VPSInstance(
+            id=str(100_000_000 + i),
+            name=f"web-{i:05d}",
+            status=rng.choice(list(InstanceStatus)),
+            ipv4=f"10.{i // 65536 % 256}.{i // 256 % 256}.{i % 256}",
+            ipv6=f"2a02:c207::{i:x}" if i % 3 else None,
+            cpu_cores=rng.choice([1, 2, 4, 8]),
+            ram_mb=rng.choice([1024, 2048, 4096, 8192]),
+            disk_gb=rng.choice([25, 50, 100, 200]),
+            region=rng.choice(REGIONS),
+            created_at=epoch + timedelta(seconds=rng.randrange(100_000_000)),
+            provider_type=rng.choice(list(ProviderType)),
+            provider_account_id=rng.randrange(1, 20),
+            plan=rng.choice(PLANS),
+            monthly_price=rng.choice([4.5, 6.0, 12.0, 24.0, None]),
+            currency="USD",
+        )
+        for i in range(count)
+    )
+
+
+def best_of(repeat: int, func) -> float:
+    """Fastest of ``repeat`` runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def build_droplet_page(count: int) -> bytes:
+    """A DigitalOcean droplet listing body with the nested objects clients drop."""
+    regions = ["ams3", "fra1", "lon1", "nyc1", "nyc3", "sfo3", "sgp1", "tor1"]
+    droplets = [
+        {
+            "id": 300_000_000 + i,
+            "name": f"web-{i:05d}",
+            "memory": 1024,
+            "vcpus": 1,
+            "disk": 25,
+            "locked": False,
+            "status": "active",
+            "kernel": None,
+            "created_at": "2024-07-21T18:37:44Z",
+            "features": ["backups", "private_networking", "ipv6", "monitoring"],
+            "backup_ids": [53893572, 53893573],
+            "next_backup_window": {
+                "start": "2024-07-30T00:00:00Z",
+                "end": "2024-07-30T23:00:00Z",
+            },
+            "snapshot_ids": [],
+            "image": {
+                "id": 63663980,
+                "name": "24.04 (LTS) x64",
+                "distribution": "Ubuntu",
+                "slug": "ubuntu-24-04-x64",
+                "public": True,
+                "regions": regions,
+                "created_at": "2024-05-15T05:47:50Z",
+                "min_disk_size": 20,
+                "size_gigabytes": 2.36,
+                "description": "Ubuntu 24.04 LTS x64",
+                "tags": [],
+                "status": "available",
+            },
+            "volume_ids": [],
+            "size": {
+                "slug": "s-1vcpu-1gb",
+                "memory": 1024,
+                "vcpus": 1,
+                "disk": 25,
+                "transfer": 1.0,
+                "price_monthly": 6.0,
+                "price_hourly": 0.00893,
+                "regions": regions,
+                "available": True,
+                "description": "Basic",
+            },
+            "size_slug": "s-1vcpu-1gb",
+            "networks": {
+                "v4": [
+                    {
+                        "ip_address": f"10.110.{i // 256 % 256}.{i % 256}",
+                        "netmask": "255.255.0.0",
+                        "type": "private",
+                    },
+                    {
+                        "ip_address": f"164.90.{i // 256 % 256}.{i % 256}",
+                        "netmask": "255.255.240.0",
+                        "type": "public",
+                    },
+                ],
+                "v6": [
+                    {
+                        "ip_address": f"2a03:b0c0:3:d0::{i:x}",
+                        "netmask": 64,
+                        "type": "public",
+                    }
+                ],
+            },
+            "region": {
+                "name": "Frankfurt 1",
+                "slug": regions[i % len(regions)],
+                "features": [
+                    "backups",
+                    "ipv6",
+                    "metadata",
+                    "install_agent",
+                    "storage",
+                    "image_transfer",
+                ],
+                "available": True,
+                "sizes": [
+                    "s-1vcpu-1gb",
+                    "s-1vcpu-2gb",
+                    "s-2vcpu-2gb",
+                    "s-2vcpu-4gb",
+                    "s-4vcpu-8gb",
+                    "c-2",
+                ],
+            },
+            "tags": ["web", "env:prod"],
+            "vpc_uuid": "760e09ef-dc84-11e8-981e-3cfdfeaae000",
+        }
+        for i in range(count)
+    ]
+    return orjson.dumps({"droplets": droplets, "links": {}, "meta": {"total": count}})
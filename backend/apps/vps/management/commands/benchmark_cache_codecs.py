@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from vps.services import codecs
+
+from ._samples import best_of, build_sample_batch
+
+
+class Command(BaseCommand):
+    help = "Compare cache codecs on a synthetic instance list (size and encode/decode time)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--instances", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--tags",
+            nargs="+",
+            default=[
+                "json",
+                "json+zlib",
+                "columnar",
+                "columnar+zlib",
+                "msgpack",
+                "msgpack+zlib",
+            ],
+            help="Codec tags to compare (codec[+compression])",
+        )
+
+    def handle(self, *args, **options):
+        batch = build_sample_batch(options["instances"])
+        repeat = options["repeat"]
+
+        self.stdout.write(f"{len(batch)} instances, best of {repeat}")
+        self.stdout.write(
+            f"{'codec':<16}{'bytes':>12}{'encode ms':>12}{'decode ms':>12}"
+        )
+
+        for tag in options["tags"]:
+            if tag.startswith("msgpack") and codecs.msgpack is None:
+                self.stdout.write(f"{tag:<16}  skipped (msgpack is not installed)")
+                continue
+
+            _, data = codecs.encode(batch, tag)
+            assert (
+                codecs.decode(tag, data).columns == batch.columns
+            ), f"{tag} does not round-trip"
+
+            encode_ms = best_of(repeat, lambda: codecs.encode(batch, tag))
+            decode_ms = best_of(repeat, lambda: codecs.decode(tag, data))
+            self.stdout.write(
+                f"{tag:<16}{len(data):>12}{encode_ms:>12.1f}{decode_ms:>12.1f}"
+            )
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from vps.renderers import ORJSONRenderer
+from vps.serializers import VPSInstanceSerializer, instance_row_encoder
+
+from ._samples import best_of, build_sample_batch
+
+
+class Command(BaseCommand):
+    help = "Compare VPSInstanceSerializer + JSONRenderer with the row encoder + ORJSONRenderer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--instances", type=int, default=10_000)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        batch = build_sample_batch(options["instances"])
+        repeat = options["repeat"]
+
+        def serializer_path():
+            data = VPSInstanceSerializer(batch.rows(), many=True).data
+            return JSONRenderer().render({"results": data, "count": len(data)})
+
+        def encoder_path():
+            data = instance_row_encoder.encode(batch)
+            return ORJSONRenderer().render({"results": data, "count": len(batch)})
+
+        if serializer_path() != encoder_path():
+            raise AssertionError(
+                "Row encoder output differs from VPSInstanceSerializer"
+            )
+
+        self.stdout.write(f"{len(batch)} instances, best of {repeat}, identical output")
+        baseline = None
+        for label, func in [
+            ("serializer + JSONRenderer", serializer_path),
+            ("row encoder + ORJSONRenderer", encoder_path),
+        ]:
+            elapsed = best_of(repeat, func)
+            baseline = baseline or elapsed
+            self.stdout.write(
+                f"{label:<30}{elapsed:>10.1f} ms{baseline / elapsed:>8.1f}x"
+            )
@@ -0,0 +1,57 @@
+import tracemalloc
+
+from django.core.management.base import BaseCommand
+
+from providers.services import projection
+from providers.services.digitalocean import DigitalOceanClient
+
+from ._samples import best_of, build_droplet_page
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare buffering a provider listing page and decoding it with orjson against "
+        "stream-decoding it with ijson as it downloads (time and peak memory)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--droplets", type=int, nargs="+", default=[200, 5_000])
+        parser.add_argument("--chunk-size", type=int, default=64 * 1024)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        fields = DigitalOceanClient.PAGE_FIELDS
+        repeat = options["repeat"]
+        chunk_size = options["chunk_size"]
+
+        self.stdout.write(f"best of {repeat}, {chunk_size // 1024} KB chunks")
+        self.stdout.write(
+            f"{'droplets':>9}{'body KB':>10}  {'decoder':<10}{'ms':>10}{'peak KB':>10}"
+        )
+
+        for count in options["droplets"]:
+            body = build_droplet_page(count)
+            # The page as it arrives from the network
+            chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)]
+
+            def buffered():
+                return projection.loads(b"".join(chunks), fields)
+
+            def streamed():
+                decoder = projection.StreamDecoder(fields)
+                for chunk in chunks:
+                    decoder.feed(chunk)
+                return decoder.close()
+
+            if buffered() != streamed():
+                raise AssertionError("Streamed decoding differs from orjson")
+
+            for label, func in [("orjson", buffered), ("streamed", streamed)]:
+                elapsed = best_of(repeat, func)
+                tracemalloc.start()
+                func()
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+                self.stdout.write(
+                    f"{count:>9}{len(body) // 1024:>10}  {label:<10}{elapsed:>10.1f}{peak // 1024:>10}"
+                )
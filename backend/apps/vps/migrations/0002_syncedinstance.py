@@ -0,0 +1,83 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("providers", "0002_provider_last_snapshot_at_provider_sync_interval"),
+        ("vps", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SyncedInstance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "instance_id",
+                    models.CharField(
+                        help_text="Instance ID from the provider", max_length=255
+                    ),
+                ),
+                ("name", models.CharField(blank=True, max_length=255)),
+                ("status", models.CharField(max_length=20)),
+                ("ipv4", models.CharField(blank=True, max_length=45)),
+                ("ipv6", models.CharField(blank=True, max_length=45, null=True)),
+                ("cpu_cores", models.PositiveIntegerField(default=0)),
+                ("ram_mb", models.PositiveIntegerField(default=0)),
+                ("disk_gb", models.PositiveIntegerField(default=0)),
+                ("region", models.CharField(blank=True, max_length=100)),
+                (
+                    "instance_created_at",
+                    models.DateTimeField(
+                        help_text="Creation time reported by the provider"
+                    ),
+                ),
+                (
+                    "provider_type",
+                    models.CharField(
+                        choices=[
+                            ("contabo", "Contabo"),
+                            ("digitalocean", "DigitalOcean"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("plan", models.CharField(blank=True, max_length=255, null=True)),
+                ("monthly_price", models.FloatField(blank=True, null=True)),
+                ("currency", models.CharField(default="USD", max_length=3)),
+                ("synced_at", models.DateTimeField()),
+                (
+                    "provider",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="synced_instances",
+                        to="providers.provider",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Synced Instance",
+                "verbose_name_plural": "Synced Instances",
+                "ordering": ["provider_id", "id"],
+                "indexes": [
+                    models.Index(
+                        fields=["provider", "status"],
+                        name="vps_syncedi_provide_320399_idx",
+                    )
+                ],
+                "unique_together": {("provider", "instance_id")},
+            },
+        ),
+    ]
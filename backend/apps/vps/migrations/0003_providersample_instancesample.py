@@ -0,0 +1,115 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("providers", "0002_provider_last_snapshot_at_provider_sync_interval"),
+        ("vps", "0002_syncedinstance"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InstanceSample",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("instance_id", models.CharField(max_length=255)),
+                ("sampled_at", models.DateTimeField()),
+                ("status", models.CharField(max_length=20)),
+                (
+                    "monthly_price",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=10, null=True
+                    ),
+                ),
+                (
+                    "provider",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="instance_samples",
+                        to="providers.provider",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Instance Sample",
+                "verbose_name_plural": "Instance Samples",
+                "indexes": [
+                    models.Index(
+                        fields=["provider", "instance_id", "sampled_at"],
+                        name="vps_instanc_provide_53dd6f_idx",
+                    ),
+                    models.Index(
+                        fields=["sampled_at"], name="vps_instanc_sampled_7c787c_idx"
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="ProviderSample",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "resolution",
+                    models.CharField(
+                        choices=[("raw", "Raw"), ("hour", "Hourly"), ("day", "Daily")],
+                        max_length=4,
+                    ),
+                ),
+                (
+                    "bucket",
+                    models.DateTimeField(
+                        help_text="Sample time, or start of the rolled-up period"
+                    ),
+                ),
+                ("samples", models.PositiveIntegerField(default=1)),
+                ("instances", models.PositiveIntegerField(default=0)),
+                ("running", models.PositiveIntegerField(default=0)),
+                ("stopped", models.PositiveIntegerField(default=0)),
+                ("errored", models.PositiveIntegerField(default=0)),
+                (
+                    "monthly_cost",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=16),
+                ),
+                ("currency", models.CharField(default="USD", max_length=3)),
+                (
+                    "provider",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="samples",
+                        to="providers.provider",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Provider Sample",
+                "verbose_name_plural": "Provider Samples",
+                "indexes": [
+                    models.Index(
+                        fields=["resolution", "bucket"],
+                        name="vps_provide_resolut_88e305_idx",
+                    )
+                ],
+                "unique_together": {("provider", "resolution", "bucket")},
+            },
+        ),
+    ]
@@ -1,6 +1,10 @@
+from datetime import datetime
+
 from django.db import models
 
+from providers.constants import ProviderType
 from providers.models import Provider
+from providers.services.base import VPSInstance
 
 
 class InstanceCustomPrice(models.Model):
@@ -34,3 +38,165 @@ class InstanceCustomPrice(models.Model):
 
     def __str__(self):
         return f"{self.provider.name} - {self.instance_id}: ${self.monthly_price}"
+
+
+class SyncedInstance(models.Model):
+    """Normalized VPS instance persisted by the background provider sync."""
+
+    provider = models.ForeignKey(
+        Provider, on_delete=models.CASCADE, related_name="synced_instances"
+    )
+    instance_id = models.CharField(
+        max_length=255, help_text="Instance ID from the provider"
+    )
+    name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20)
+    ipv4 = models.CharField(max_length=45, blank=True)
+    ipv6 = models.CharField(max_length=45, blank=True, null=True)
+    cpu_cores = models.PositiveIntegerField(default=0)
+    ram_mb = models.PositiveIntegerField(default=0)
+    disk_gb = models.PositiveIntegerField(default=0)
+    region = models.CharField(max_length=100, blank=True)
+    instance_created_at = models.DateTimeField(
+        help_text="Creation time reported by the provider"
+    )
+    provider_type = models.CharField(max_length=20, choices=ProviderType.choices)
+    plan = models.CharField(max_length=255, blank=True, null=True)
+    monthly_price = models.FloatField(blank=True, null=True)
+    currency = models.CharField(max_length=3, default="USD")
+    synced_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("provider", "instance_id")
+        indexes = [
+            models.Index(fields=["provider", "status"]),
+        ]
+        ordering = ["provider_id", "id"]
+        verbose_name = "Synced Instance"
+        verbose_name_plural = "Synced Instances"
+
+    def __str__(self):
+        return f"{self.provider.name} - {self.name} ({self.instance_id})"
+
+    @classmethod
+    def from_vps_instance(
+        cls, provider: Provider, instance: VPSInstance, synced_at: datetime
+    ) -> "SyncedInstance":
+        """Build an unsaved row from a normalized instance."""
+        return cls(
+            provider=provider,
+            instance_id=instance.id,
+            name=instance.name,
+            status=instance.status,
+            ipv4=instance.ipv4 or "",
+            ipv6=instance.ipv6,
+            cpu_cores=instance.cpu_cores or 0,
+            ram_mb=instance.ram_mb or 0,
+            disk_gb=int(instance.disk_gb or 0),
+            region=instance.region,
+            instance_created_at=instance.created_at,
+            provider_type=instance.provider_type,
+            plan=instance.plan,
+            monthly_price=instance.monthly_price,
+            currency=instance.currency,
+            synced_at=synced_at,
+        )
+
+    def to_vps_instance(self) -> VPSInstance:
+        """Convert the row back to a normalized instance."""
+        return VPSInstance(
+            id=self.instance_id,
+            name=self.name,
+            status=self.status,
+            ipv4=self.ipv4,
+            ipv6=self.ipv6,
+            cpu_cores=self.cpu_cores,
+            ram_mb=self.ram_mb,
+            disk_gb=self.disk_gb,
+            region=self.region,
+            created_at=self.instance_created_at,
+            provider_type=self.provider_type,
+            provider_account_id=self.provider_id,
+            plan=self.plan,
+            monthly_price=self.monthly_price,
+            currency=self.currency,
+        )
+
+
+class SampleResolution(models.TextChoices):
+    """Granularity of a provider history sample."""
+
+    RAW = "raw", "Raw"
+    HOUR = "hour", "Hourly"
+    DAY = "day", "Daily"
+
+
+class ProviderSample(models.Model):
+    """
+    Fleet size and cost of one provider over a time bucket.
+
+    Raw samples are written on every sync (``samples`` = 1) and rolled up
+    into hourly and daily buckets. Counts and cost are sums over the
+    bucket's raw samples, so averages are exact at any resolution:
+    divide by ``samples``.
+    """
+
+    provider = models.ForeignKey(
+        Provider, on_delete=models.CASCADE, related_name="samples"
+    )
+    resolution = models.CharField(max_length=4, choices=SampleResolution.choices)
+    bucket = models.DateTimeField(
+        help_text="Sample time, or start of the rolled-up period"
+    )
+    samples = models.PositiveIntegerField(default=1)
+    instances = models.PositiveIntegerField(default=0)
+    running = models.PositiveIntegerField(default=0)
+    stopped = models.PositiveIntegerField(default=0)
+    errored = models.PositiveIntegerField(default=0)
+    monthly_cost = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    currency = models.CharField(max_length=3, default="USD")
+
+    class Meta:
+        unique_together = ("provider", "resolution", "bucket")
+        indexes = [
+            models.Index(fields=["resolution", "bucket"]),
+        ]
+        verbose_name = "Provider Sample"
+        verbose_name_plural = "Provider Samples"
+
+    def __str__(self):
+        return f"{self.provider.name} @ {self.bucket} ({self.resolution})"
+
+
+class InstanceSample(models.Model):
+    """
+    Status and price of an instance from ``sampled_at`` on.
+
+    Append-only and run-length encoded: a row is written when a sync sees
+    an instance for the first time or with another status or price, and
+    holds until the instance's next row. Disappeared instances get a row
+    with status ``deleted``.
+    """
+
+    DELETED = "deleted"
+
+    provider = models.ForeignKey(
+        Provider, on_delete=models.CASCADE, related_name="instance_samples"
+    )
+    instance_id = models.CharField(max_length=255)
+    sampled_at = models.DateTimeField()
+    status = models.CharField(max_length=20)
+    monthly_price = models.DecimalField(
+        max_digits=10, decimal_places=2, blank=True, null=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["provider", "instance_id", "sampled_at"]),
+            models.Index(fields=["sampled_at"]),
+        ]
+        verbose_name = "Instance Sample"
+        verbose_name_plural = "Instance Samples"
+
+    def __str__(self):
+        return f"{self.provider.name} - {self.instance_id} @ {self.sampled_at}: {self.status}"
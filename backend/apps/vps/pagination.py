@@ -0,0 +1,208 @@
+"""
+Pagination of the aggregated instance list.
+
+``VPSViewSet`` is not a generic view over a queryset, so DRF's paginators
+do not apply. ``InstancePagination`` pages an ordered ``InstanceBatch``
+instead, with the same query parameters and response links:
+
+* ``?limit=`` / ``?cursor=``: keyset pagination. A cursor stores the
+  ordering values of the page boundary, not a position, so it stays valid
+  when the snapshot is refreshed between pages: instances that appear or
+  disappear do not shift the following pages.
+* ``?offset=&limit=``: ``LimitOffsetPagination`` compatibility.
+
+Requests without any of these parameters are not paginated.
+"""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from bisect import bisect_left, bisect_right
+from decimal import Decimal
+
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from providers.services.batch import InstanceBatch
+from vps.services.query import InstanceQuery
+
+
+class InstancePagination:
+    """Cursor and limit/offset pagination over an ordered instance batch."""
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    offset_query_param = "offset"
+    max_limit = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, request, query: InstanceQuery):
+        """
+        Initialize pagination.
+
+        Args:
+            request: DRF request, for parameters and page links
+            query: Query of the listing. Instances must be filtered and
+                ordered with ``self.query``, its totally ordered variant,
+                before ``paginate``
+        """
+        self.request = request
+        self.query = query.with_total_ordering()
+        self.limit = self._get_limit()
+        # Decoded up front so an invalid cursor fails before any work
+        cursor = request.query_params.get(self.cursor_query_param)
+        self.cursor = self._decode_cursor(cursor) if cursor else None
+        self.count = 0
+        self.next = None
+        self.previous = None
+
+    @classmethod
+    def from_request(cls, request, query: InstanceQuery) -> "InstancePagination | None":
+        """Paginator for the request, or None if it asked for no page."""
+        params = request.query_params
+        if not any(
+            param in params
+            for param in (
+                cls.cursor_query_param,
+                cls.limit_query_param,
+                cls.offset_query_param,
+            )
+        ):
+            return None
+        return cls(request, query)
+
+    def paginate(self, instances: InstanceBatch) -> InstanceBatch:
+        """
+        Return one page of ``instances`` (already ordered by ``self.query``)
+        and set ``count``, ``next`` and ``previous``.
+        """
+        self.count = len(instances)
+        params = self.request.query_params
+
+        if self.offset_query_param in params and self.cursor_query_param not in params:
+            return self._paginate_offset(instances, self._get_offset())
+        return self._paginate_cursor(instances)
+
+    def get_links(self) -> dict:
+        """Response fields describing the neighbouring pages."""
+        return {"next": self.next, "previous": self.previous}
+
+    def _paginate_offset(self, instances: InstanceBatch, offset: int) -> InstanceBatch:
+        """Classic limit/offset page."""
+        end = offset + self.limit
+        url = self.request.build_absolute_uri()
+
+        if end < self.count:
+            self.next = replace_query_param(
+                replace_query_param(url, self.limit_query_param, self.limit),
+                self.offset_query_param,
+                end,
+            )
+        if offset > 0:
+            previous = replace_query_param(url, self.limit_query_param, self.limit)
+            if offset - self.limit <= 0:
+                self.previous = remove_query_param(previous, self.offset_query_param)
+            else:
+                self.previous = replace_query_param(
+                    previous, self.offset_query_param, offset - self.limit
+                )
+
+        return instances.take(range(offset, min(end, self.count)))
+
+    def _paginate_cursor(self, instances: InstanceBatch) -> InstanceBatch:
+        """Keyset page after (or, for previous links, before) the cursor."""
+        if self.cursor:
+            values, reverse = self.cursor
+            target = self.query.get_position_key(values)
+            position = (bisect_left if reverse else bisect_right)(
+                range(self.count),
+                target,
+                key=lambda row: self.query.get_position_key(
+                    self.query.get_ordering_values(instances, row)
+                ),
+            )
+        else:
+            position, reverse = 0, False
+
+        if reverse:
+            start, end = max(position - self.limit, 0), position
+        else:
+            start, end = position, min(position + self.limit, self.count)
+
+        if end < self.count and end > start:
+            self.next = self._get_cursor_link(instances, end - 1, reverse=False)
+        if start > 0:
+            self.previous = self._get_cursor_link(instances, start, reverse=True)
+
+        return instances.take(range(start, end))
+
+    def _get_cursor_link(
+        self, instances: InstanceBatch, row: int, reverse: bool
+    ) -> str:
+        """URL of the page after (or before) ``row``."""
+        values = [
+            (
+                value.isoformat()
+                if hasattr(value, "isoformat")
+                else str(value) if isinstance(value, Decimal) else value
+            )
+            for value in self.query.get_ordering_values(instances, row)
+        ]
+        payload = json.dumps(
+            {"v": values, "r": reverse, "o": self._get_ordering_spec()}
+        )
+        cursor = urlsafe_b64encode(payload.encode()).decode()
+
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        url = replace_query_param(url, self.limit_query_param, self.limit)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def _decode_cursor(self, cursor: str) -> tuple:
+        """Ordering values and direction stored in a cursor."""
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor.encode()))
+            values, reverse = payload["v"], bool(payload["r"])
+            if payload["o"] != self._get_ordering_spec() or len(values) != len(
+                self.query.ordering
+            ):
+                raise ValueError("Cursor belongs to another ordering")
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        fields = [name for name, _ in self.query.ordering]
+        if "created_at" in fields:
+            index = fields.index("created_at")
+            if values[index] is not None:
+                try:
+                    values[index] = parse_datetime(values[index])
+                except (TypeError, ValueError):
+                    values[index] = None
+                if values[index] is None:
+                    raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def _get_ordering_spec(self) -> str:
+        """The ordering a cursor was issued for."""
+        return ",".join(
+            f"-{name}" if descending else name
+            for name, descending in self.query.ordering
+        )
+
+    def _get_limit(self) -> int:
+        """Page size, as LimitOffsetPagination parses it."""
+        try:
+            limit = int(self.request.query_params[self.limit_query_param])
+            if limit > 0:
+                return min(limit, self.max_limit)
+        except (KeyError, ValueError):
+            pass
+        return api_settings.PAGE_SIZE
+
+    def _get_offset(self) -> int:
+        """Page offset, as LimitOffsetPagination parses it."""
+        try:
+            return max(int(self.request.query_params[self.offset_query_param]), 0)
+        except (KeyError, ValueError):
+            return 0
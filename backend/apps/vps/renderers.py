@@ -0,0 +1,56 @@
+import orjson
+from rest_framework.utils import encoders
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.settings import api_settings
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` producing the same bytes through orjson.
+
+    Falls back to the standard renderer for indented output (browsable
+    API, ``; indent=`` media types) and when ``UNICODE_JSON`` is disabled.
+    """
+
+    encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is not None or not api_settings.UNICODE_JSON or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        ret = orjson.dumps(data, default=self.encoder.default)
+
+        # Same JavaScript-safe escaping as JSONRenderer
+        return ret.replace("\u2028".encode(), b"\\u2028").replace(
+            "\u2029".encode(), b"\\u2029"
+        )
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    Newline-delimited JSON: one compact JSON document per line.
+
+    Streamed listings write their lines with ``render_lines``; regular
+    responses (e.g. errors) are rendered as a single line.
+    """
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+    encoder = encoders.JSONEncoder()
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return self.render_lines([data])
+
+    def render_lines(self, items) -> bytes:
+        """Encode documents as NDJSON lines."""
+        return b"".join(
+            orjson.dumps(item, default=self.encoder.default) + b"\n" for item in items
+        )
@@ -1,56 +1,482 @@
-import json
-from typing import List
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Tuple
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.cache import cache
 
 from providers.models import Provider
 from providers.services.base import VPSInstance
+from providers.services.batch import InstanceBatch
+from providers.services.conditional import PageCache
+from providers.services.errors import ProviderNotFound
 from providers.services.factory import ProviderClientFactory
+from vps.services import background, billing, codecs, events, metrics
+from vps.services.changes import ChangeLog
+from vps.services.fanout import FanoutResult, ProviderFanout
 from vps.services.price_loader import PriceLoader
+from vps.services.single_flight import COALESCED_METRIC, LEADER_METRIC, SingleFlight
+from vps.services.sync import ProviderSyncService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AggregationResult:
+    """Instances gathered from a user's providers plus per-provider errors."""
+
+    instances: InstanceBatch = field(default_factory=InstanceBatch)
+    errors: List[dict] = field(default_factory=list)
+    # Provider ID -> version of the snapshot served, before custom prices
+    versions: Dict[int, str | None] = field(default_factory=dict)
+
+
+@dataclass
+class ChangeSet:
+    """
+    Instances changed since a client's version, or all of them on reset.
+
+    On ``reset`` the client replaces its list with ``added``.
+    """
+
+    version: str
+    reset: bool = False
+    added: InstanceBatch = field(default_factory=InstanceBatch)
+    modified: InstanceBatch = field(default_factory=InstanceBatch)
+    removed: List[dict] = field(default_factory=list)
+    errors: List[dict] = field(default_factory=list)
+
+
+@dataclass
+class BillingResult:
+    """Billing aggregates of a user's providers plus per-provider errors."""
+
+    summary: dict = field(default_factory=lambda: billing.merge([]))
+    errors: List[dict] = field(default_factory=list)
+    fetched_at: float | None = None
 
 
 class VPSAggregator:
     """Service for aggregating VPS instances from multiple providers."""
 
-    CACHE_TTL = 300  # 5 minutes
     CACHE_KEY_PREFIX = "vps_instances"
+    VERSION_KEY_SUFFIX = "version"
+    GENERATION_KEY_PREFIX = "vps_generation"
+    REFRESH_LOCK_PREFIX = "vps_refresh"
+    BACKGROUND_METRIC = "fetch_background"
+    NOT_MODIFIED_METRIC = "fetch_pages_not_modified"
 
     @classmethod
     def get_all_instances(cls, user: User) -> List[VPSInstance]:
         """Get all VPS instances from all active providers for a user."""
-        instances = []
+        return cls.collect_all_instances(user).instances.to_instances()
+
+    @classmethod
+    def collect_all_instances(cls, user: User) -> AggregationResult:
+        """
+        Fetch instances from all active providers concurrently.
 
-        active_providers = Provider.objects.filter(user=user, is_active=True)
-        provider_ids = list(active_providers.values_list("id", flat=True))
+        Providers are queried in parallel, so latency is bounded by the
+        slowest provider (or the request deadline) instead of their sum.
+        Providers that fail or time out are reported in ``errors`` and the
+        remaining providers are still returned, together with the failed
+        providers' last known good instances (their errors are marked
+        ``stale``).
+        """
+        active_providers = list(Provider.objects.filter(user=user, is_active=True))
+        if not active_providers:
+            return AggregationResult()
 
         # Preload all custom prices (avoids N+1 queries)
-        price_loader = PriceLoader(provider_ids)
+        price_loader = PriceLoader([provider.id for provider in active_providers])
+
+        # Providers kept up to date by background sync are read from the DB
+        stored = cls._load_stored_instances(active_providers)
+        live_providers = [p for p in active_providers if p not in stored]
+
+        fanout = cls._get_fanout()
+        outcome = fanout.run(
+            live_providers,
+            lambda provider: cls._get_provider_instances(provider, price_loader),
+        )
+        cls._record_fetches(outcome)
+        outcome.results.update(stored)
+
+        return cls._merge_outcome(active_providers, outcome, price_loader)
+
+    @classmethod
+    async def acollect_all_instances(cls, user: User) -> AggregationResult:
+        """
+        Asyncio variant of ``collect_all_instances``.
+
+        Provider APIs are awaited on the running event loop through the
+        shared async HTTP client, so an ASGI worker can serve many
+        dashboards without a thread per request.
+        """
+        active_providers = [
+            provider
+            async for provider in Provider.objects.filter(user=user, is_active=True)
+        ]
+        if not active_providers:
+            return AggregationResult()
+
+        price_loader = await sync_to_async(PriceLoader)(
+            [provider.id for provider in active_providers]
+        )
+
+        stored = await sync_to_async(cls._load_stored_instances)(active_providers)
+        live_providers = [p for p in active_providers if p not in stored]
+
+        fanout = cls._get_fanout()
+        outcome = await fanout.arun(
+            live_providers,
+            lambda provider: cls._aget_provider_instances(provider, price_loader),
+        )
+        await sync_to_async(cls._record_fetches)(outcome)
+        outcome.results.update(stored)
+
+        return await sync_to_async(cls._merge_outcome)(
+            active_providers, outcome, price_loader
+        )
+
+    @classmethod
+    def iter_instances(
+        cls, user: User
+    ) -> Iterator[Tuple[InstanceBatch | None, dict | None]]:
+        """
+        Yield ``(instances, error)`` per active provider as each completes.
+
+        Stored snapshots come first, then live providers in completion
+        order, so the first batch is available after the fastest provider
+        instead of the slowest. Custom prices are applied; ``error`` is
+        formatted like ``AggregationResult.errors``. A failed provider's
+        last known good instances come with its (stale) error.
+        """
+        active_providers = list(Provider.objects.filter(user=user, is_active=True))
+        if not active_providers:
+            return
+
+        price_loader = PriceLoader([provider.id for provider in active_providers])
+
+        stored = cls._load_stored_instances(active_providers)
+        for instances in stored.values():
+            yield price_loader.apply_prices(instances), None
+
+        live_providers = [p for p in active_providers if p not in stored]
+        for provider, instances, error in cls._get_fanout().iter_completed(
+            live_providers,
+            lambda provider: cls._get_provider_instances(provider, price_loader),
+        ):
+            ProviderSyncService.record_fetch(provider, failed=error is not None)
+            if error is not None:
+                logger.warning(
+                    "Error fetching instances from %s: %s", provider.name, error
+                )
+                instances = cls._load_last_good([provider]).get(provider)
+                yield (
+                    (
+                        price_loader.apply_prices(instances)
+                        if instances is not None
+                        else None
+                    ),
+                    cls._format_error(provider, error, instances),
+                )
+            else:
+                yield price_loader.apply_prices(instances), None
+
+    @staticmethod
+    def _record_fetches(outcome: FanoutResult) -> None:
+        """Record the providers' live fetches as their ``last_sync_status``."""
+        for provider in outcome.results:
+            ProviderSyncService.record_fetch(provider, failed=False)
+        for provider in outcome.errors:
+            ProviderSyncService.record_fetch(provider, failed=True)
+
+    @classmethod
+    def _merge_outcome(
+        cls,
+        active_providers: List[Provider],
+        outcome: FanoutResult,
+        price_loader: PriceLoader,
+    ) -> AggregationResult:
+        """
+        Combine per-provider fan-out results into one aggregation result.
 
+        Failed providers are served from their last known good instances,
+        if any.
+        """
+        result = AggregationResult()
+        batches = []
+        last_good = cls._load_last_good(list(outcome.errors))
+
+        # Keep provider order stable regardless of completion order
         for provider in active_providers:
-            try:
-                provider_instances = cls._get_provider_instances(provider)
-                # Apply custom prices to instances
-                provider_instances = price_loader.apply_prices(provider_instances)
-                instances.extend(provider_instances)
-            except Exception as e:
-                # Log error but continue with other providers
-                import traceback
-
-                print(f"Error fetching instances from {provider.name}: {str(e)}")
-                traceback.print_exc()
+            if provider in outcome.errors:
+                error = outcome.errors[provider]
+                logger.warning(
+                    "Error fetching instances from %s: %s", provider.name, error
+                )
+                instances = last_good.get(provider)
+                result.errors.append(cls._format_error(provider, error, instances))
+                if instances is None:
+                    continue
+            else:
+                instances = outcome.results[provider]
 
-        return instances
+            result.versions[provider.id] = instances.version
+            # Apply custom prices to instances
+            batches.append(price_loader.apply_prices(instances))
+
+        result.instances = InstanceBatch.concat(batches)
+        return result
+
+    @classmethod
+    def get_snapshot(
+        cls, user: User, provider_id: int = None
+    ) -> Tuple[str, float] | None:
+        """
+        Version and fetch time of the instances a request would be served,
+        without loading or decoding any instance.
+
+        Matches ``collect_all_instances(user).instances`` (or
+        ``get_provider_instances(provider_id, user)``) as long as it succeeds
+        without errors. Returns None when some provider has no snapshot yet,
+        in which case only a full fetch can tell.
+        """
+        providers = Provider.objects.filter(user=user)
+        if provider_id:
+            providers = providers.filter(id=provider_id)
+        else:
+            providers = providers.filter(is_active=True)
+        providers = list(providers)
+        if not providers:
+            return None
+
+        price_loader = PriceLoader([provider.id for provider in providers])
+        snapshots = cls._get_snapshot_versions(providers, price_loader)
+        if len(snapshots) < len(providers):
+            return None
+
+        versions = [price_loader.get_version(snapshots[p][0], p.id) for p in providers]
+        fetched_at = min(snapshots[p][1] for p in providers)
+
+        if provider_id:
+            return versions[0], fetched_at
+        # Same version InstanceBatch.concat gives the merged batch
+        return InstanceBatch.combine_versions(versions), fetched_at
 
     @classmethod
-    def get_provider_instances(cls, provider_id: int, user: User) -> List[VPSInstance]:
+    def _get_snapshot_versions(
+        cls, providers: List[Provider], price_loader: PriceLoader
+    ) -> Dict[Provider, Tuple[str, float]]:
+        """
+        (version, fetched_at) of the snapshots a user's providers would be
+        served from, before custom prices. Providers without one (or with only
+        a last known good one) are left out; stale cached ones are scheduled
+        for a background refresh (publishing events priced by ``price_loader``).
+        """
+        snapshots = {}
+        stored = []
+        cached = []
+        for provider in providers:
+            if settings.VPS_READ_FROM_STORE and ProviderSyncService.is_servable(
+                provider
+            ):
+                stored.append(provider)
+            else:
+                cached.append(provider)
+
+        if stored:
+            versions = ProviderSyncService.get_versions(stored)
+            for provider in stored:
+                snapshots[provider] = (
+                    versions[provider.id],
+                    provider.last_snapshot_at.timestamp(),
+                )
+
+        if cached:
+            # All of one user's providers share a generation
+            generation = cls._get_generation(cached[0].user_id)
+            keys = {
+                provider: cls._get_version_key(provider, generation)
+                for provider in cached
+            }
+            entries = cache.get_many(list(keys.values()))
+            now = time.time()
+            for provider in cached:
+                entry = entries.get(keys[provider])
+                if entry is None or now >= entry["stale_until"]:
+                    continue
+                if now >= entry["fresh_until"]:
+                    cls._schedule_refresh(provider, price_loader)
+                snapshots[provider] = (entry["version"], entry["fetched_at"])
+        return snapshots
+
+    @classmethod
+    def collect_billing(cls, user: User) -> BillingResult:
+        """
+        Billing aggregates of all active providers, with custom prices.
+
+        Each provider's summary is cached under the version of its
+        price-adjusted snapshot, so only providers whose snapshot or
+        custom prices changed are loaded and summarized again.
+        """
+        active_providers = list(Provider.objects.filter(user=user, is_active=True))
+        if not active_providers:
+            return BillingResult()
+
+        price_loader = PriceLoader([provider.id for provider in active_providers])
+        snapshots = cls._get_snapshot_versions(active_providers, price_loader)
+        keys = {
+            provider: billing.get_cache_key(
+                provider.id, price_loader.get_version(version, provider.id)
+            )
+            for provider, (version, _) in snapshots.items()
+        }
+        cached = cache.get_many(list(keys.values()))
+        summaries = {
+            provider: cached[key] for provider, key in keys.items() if key in cached
+        }
+
+        result = BillingResult()
+        missing = [p for p in active_providers if p not in summaries]
+        if missing:
+            stored = cls._load_stored_instances(missing)
+            outcome = cls._get_fanout().run(
+                [p for p in missing if p not in stored],
+                lambda provider: cls._get_provider_instances(provider, price_loader),
+            )
+            cls._record_fetches(outcome)
+            outcome.results.update(stored)
+            last_good = cls._load_last_good(list(outcome.errors))
+
+            for provider in missing:
+                if provider in outcome.errors:
+                    logger.warning(
+                        "Error fetching instances from %s: %s",
+                        provider.name,
+                        outcome.errors[provider],
+                    )
+                    instances = last_good.get(provider)
+                    result.errors.append(
+                        cls._format_error(provider, outcome.errors[provider], instances)
+                    )
+                    if instances is None:
+                        continue
+                else:
+                    instances = outcome.results[provider]
+
+                instances = price_loader.apply_prices(instances)
+                summary = {
+                    **billing.summarize(instances),
+                    "fetched_at": instances.fetched_at,
+                }
+                if instances.version is not None:
+                    cache.set(
+                        billing.get_cache_key(provider.id, instances.version),
+                        summary,
+                        settings.VPS_CACHE_STALE_TTL,
+                    )
+                summaries[provider] = summary
+
+        ordered = [summaries[p] for p in active_providers if p in summaries]
+        result.summary = billing.merge(
+            ordered, {provider.id: provider.name for provider in active_providers}
+        )
+        fetched = [summary["fetched_at"] for summary in ordered]
+        if fetched and None not in fetched:
+            result.fetched_at = min(fetched)
+        return result
+
+    @classmethod
+    def collect_changes(cls, user: User, since: str | None = None) -> ChangeSet:
+        """
+        Instances added, modified and removed since version ``since``.
+
+        Changes are read from the providers' change logs, so no snapshot is
+        loaded. Without ``since``, or when the logs no longer cover it (or
+        custom prices or the set of providers changed), all instances are
+        returned with ``reset`` set. The returned version is the one to
+        pass next time.
+        """
+        active_providers = list(Provider.objects.filter(user=user, is_active=True))
+        provider_ids = [provider.id for provider in active_providers]
+        price_loader = PriceLoader(provider_ids)
+
+        # Schedules refreshes of stale snapshots, like a listing would
+        snapshot = cls.get_snapshot(user)
+        positions = ChangeLog.get_positions(provider_ids)
+        version = ChangeLog.encode_version(positions, price_loader.fingerprint)
+
+        previous = ChangeLog.decode_version(since) if since else None
+        changes = None
+        if (
+            snapshot is not None
+            and previous is not None
+            and previous[1] == price_loader.fingerprint
+            and set(previous[0]) == set(provider_ids)
+        ):
+            changes = {
+                provider_id: ChangeLog.get_changes(
+                    provider_id, previous[0][provider_id], positions[provider_id]
+                )
+                for provider_id in provider_ids
+            }
+            if None in changes.values():
+                changes = None
+
+        if changes is None:
+            result = cls.collect_all_instances(user)
+            # Position the client at the snapshots actually returned, so a
+            # fetch during the call is neither missed nor sent again
+            positions.update(ChangeLog.find_positions(result.versions))
+            return ChangeSet(
+                version=ChangeLog.encode_version(positions, price_loader.fingerprint),
+                reset=True,
+                added=result.instances,
+                errors=result.errors,
+            )
+
+        change_set = ChangeSet(version=version)
+        added, modified = [], []
+        for provider_id in provider_ids:
+            provider_changes = changes[provider_id]
+            added.append(
+                price_loader.apply_prices(
+                    InstanceBatch.from_rows(provider_changes.added)
+                )
+            )
+            modified.append(
+                price_loader.apply_prices(
+                    InstanceBatch.from_rows(provider_changes.modified)
+                )
+            )
+            change_set.removed.extend(
+                {"provider_account_id": provider_id, "id": instance_id}
+                for instance_id in provider_changes.removed
+            )
+        change_set.added = InstanceBatch.concat(added)
+        change_set.modified = InstanceBatch.concat(modified)
+        return change_set
+
+    @classmethod
+    def get_provider_instances(cls, provider_id: int, user: User) -> InstanceBatch:
         """Get VPS instances from a specific provider."""
         try:
             provider = Provider.objects.get(id=provider_id, user=user)
-            instances = cls._get_provider_instances(provider)
-
-            # Apply custom prices for this provider (single query, no N+1)
+            # Custom prices of this provider (single query, no N+1)
             price_loader = PriceLoader([provider_id])
+            stored = cls._load_stored_instances([provider])
+            if provider in stored:
+                instances = stored[provider]
+            else:
+                instances = cls._get_provider_instances(provider, price_loader)
+
             instances = price_loader.apply_prices(instances)
 
             return instances
@@ -58,101 +484,517 @@ class VPSAggregator:
             raise ValueError(f"Provider {provider_id} not found or not owned by user")
 
     @classmethod
-    def _get_provider_instances(cls, provider: Provider) -> List[VPSInstance]:
-        """Fetch instances from provider with caching."""
-        cache_key = cls._get_cache_key(provider.id)
+    def refresh_instance(
+        cls, provider_id: int, instance_id: str, user: User
+    ) -> InstanceBatch:
+        """
+        Refetch one instance through ``get_instance`` and patch it into the
+        provider's snapshots.
+
+        The cached snapshot (and the stored one, if the provider is synced)
+        gets the new row and a new version, without relisting the provider;
+        change logs and live events see the change like any other. An
+        instance the provider no longer has is removed from them and
+        ``ProviderNotFound`` is raised. A full refresh of the provider in
+        flight may predate the change, so the patch waits for it to finish.
+
+        Returns the instance (one row, custom price applied).
+        """
+        try:
+            provider = Provider.objects.get(id=provider_id, user=user)
+        except Provider.DoesNotExist:
+            raise ValueError(f"Provider {provider_id} not found or not owned by user")
+
+        client = ProviderClientFactory.create(
+            provider.provider_type,
+            provider.get_credentials(),
+            provider.id,
+        )
+        try:
+            instance = client.get_instance(instance_id)
+            error = None
+        except ProviderNotFound as e:
+            instance, error = None, e
+
+        price_loader = PriceLoader([provider.id])
+        flight = cls._get_single_flight(provider.id)
+        # Past the wait the lock is abandoned (it expires just as long)
+        locked = flight.wait_acquire()
+        try:
+            cls._patch_cached_instances(provider, instance_id, instance, price_loader)
+            ProviderSyncService.patch(provider, instance_id, instance)
+        finally:
+            if locked:
+                flight.release()
+
+        if error is not None:
+            raise error
+
+        instances = InstanceBatch.from_instances([instance])
+        instances.fetched_at = time.time()
+        return price_loader.apply_prices(instances)
+
+    @classmethod
+    def _patch_cached_instances(
+        cls,
+        provider: Provider,
+        instance_id: str,
+        instance: VPSInstance | None,
+        price_loader: PriceLoader,
+    ) -> None:
+        """Replace, add or (``instance`` None) remove one row of the cached snapshot."""
+        entry = cache.get(cls._get_cache_key(provider))
+        if entry is None or time.time() >= entry["stale_until"]:
+            return
+
+        instances = cls._decode_entry(provider, entry)
+        ids = instances.column("id")
+        row = ids.index(instance_id) if instance_id in ids else None
+        if instance is None:
+            if row is None:
+                return
+            instances = instances.take(i for i in range(len(instances)) if i != row)
+        else:
+            for name, column in instances.columns.items():
+                value = getattr(instance, name)
+                if row is None:
+                    column.append(value)
+                else:
+                    column[row] = value
+
+        times = {
+            name: entry[name] for name in ["fetched_at", "fresh_until", "stale_until"]
+        }
+        cls._cache_instances(
+            provider, instances, times, entry.get("pages"), price_loader
+        )
+
+    @staticmethod
+    def _load_stored_instances(
+        providers: List[Provider],
+    ) -> Dict[Provider, InstanceBatch]:
+        """Load instances of providers with a recent background-synced snapshot."""
+        if not settings.VPS_READ_FROM_STORE:
+            return {}
+
+        servable = [p for p in providers if ProviderSyncService.is_servable(p)]
+        if not servable:
+            return {}
+
+        loaded = ProviderSyncService.load(servable)
+        return {provider: loaded[provider.id] for provider in servable}
+
+    @classmethod
+    def refresh_provider(cls, provider: Provider) -> InstanceBatch:
+        """
+        Fetch a provider from its API now and update the cache.
+
+        Coalesced with any fetch of the same provider already in flight.
+        """
+        started_at = time.time()
+        return cls._get_single_flight(provider.id).run(
+            lambda: cls._refresh_provider(provider),
+            lambda: cls._read_cached_instances(provider, newer_than=started_at),
+        )
+
+    @classmethod
+    def _get_provider_instances(
+        cls, provider: Provider, price_loader: PriceLoader | None = None
+    ) -> InstanceBatch:
+        """
+        Fetch instances from provider with stale-while-revalidate caching.
 
+        ``price_loader`` (the caller's) prices the live events of a refetch.
+        """
         # Try to get from cache
-        cached_data = cache.get(cache_key)
-        if cached_data:
-            return cls._deserialize_instances(cached_data)
+        instances = cls._get_cached_instances(provider, price_loader)
+        if instances is not None:
+            return instances
+
+        # On a miss only one request fetches; concurrent ones wait for it
+        return cls._get_single_flight(provider.id).run(
+            lambda: cls._refresh_provider(provider, price_loader),
+            lambda: cls._read_cached_instances(provider),
+        )
 
-        # Fetch from API
+    @classmethod
+    def _refresh_provider(
+        cls, provider: Provider, price_loader: PriceLoader | None = None
+    ) -> InstanceBatch:
+        """
+        Fetch instances from the provider API and cache them.
+
+        Fails fast with the last error while the provider's circuit is
+        open (see ``ProviderTransport``). Listing pages are requested
+        conditionally against the cached snapshot (see ``PageCache``).
+        """
         credentials = provider.get_credentials()
         client = ProviderClientFactory.create(
             provider.provider_type,
             credentials,
             provider.id,
         )
+        client.page_cache = cls._get_page_cache(provider)
 
-        instances = client.list_instances()
+        instances = InstanceBatch.from_instances(client.list_instances())
 
         # Cache the results
-        cache.set(cache_key, cls._serialize_instances(instances), cls.CACHE_TTL)
+        cls._cache_instances(
+            provider,
+            instances,
+            pages=cls._get_page_validators(client),
+            price_loader=price_loader,
+        )
 
         return instances
 
     @classmethod
-    def clear_cache(cls, provider_id: int = None) -> None:
-        """Clear cache for specific provider or all providers."""
-        if provider_id:
-            cache_key = cls._get_cache_key(provider_id)
-            cache.delete(cache_key)
-        else:
-            # Clear all VPS cache keys
-            # Note: This requires redis backend for key pattern matching
-            pattern = f"{cls.CACHE_KEY_PREFIX}_*"
-            # For now, we'll just note that full pattern clearing needs Redis
-            # In production, use cache.delete_pattern() or similar
+    async def _aget_provider_instances(
+        cls, provider: Provider, price_loader: PriceLoader | None = None
+    ) -> InstanceBatch:
+        """Asyncio variant of ``_get_provider_instances``."""
+        instances = await sync_to_async(
+            cls._get_cached_instances, thread_sensitive=False
+        )(provider, price_loader)
+        if instances is not None:
+            return instances
+
+        return await cls._get_single_flight(provider.id).arun(
+            lambda: cls._arefresh_provider(provider, price_loader),
+            lambda: cls._read_cached_instances(provider),
+        )
+
+    @classmethod
+    async def _arefresh_provider(
+        cls, provider: Provider, price_loader: PriceLoader | None = None
+    ) -> InstanceBatch:
+        """Asyncio variant of ``_refresh_provider``."""
+        credentials = provider.get_credentials()
+        client = ProviderClientFactory.create_async(
+            provider.provider_type,
+            credentials,
+            provider.id,
+        )
+        client.page_cache = await sync_to_async(
+            cls._get_page_cache, thread_sensitive=False
+        )(provider)
+
+        instances = InstanceBatch.from_instances(await client.list_instances())
+
+        await sync_to_async(cls._cache_instances, thread_sensitive=False)(
+            provider,
+            instances,
+            pages=cls._get_page_validators(client),
+            price_loader=price_loader,
+        )
+
+        return instances
+
+    @classmethod
+    def _get_cached_instances(
+        cls, provider: Provider, price_loader: PriceLoader | None = None
+    ) -> InstanceBatch | None:
+        """
+        Read a provider's instances from cache. Returns None on a miss.
+
+        Entries are fresh for ``VPS_CACHE_FRESH_TTL`` seconds. After that
+        they are still served until ``VPS_CACHE_STALE_TTL`` while a single
+        background refresh replaces them, so requests never wait on the
+        provider API for data that is merely stale. Older entries are only
+        kept as last known good data.
+        """
+        entry = cache.get(cls._get_cache_key(provider))
+        if entry is None or time.time() >= entry["stale_until"]:
+            return None
+
+        if time.time() >= entry["fresh_until"]:
+            cls._schedule_refresh(provider, price_loader)
+
+        return cls._decode_entry(provider, entry)
+
+    @classmethod
+    def _get_page_cache(cls, provider: Provider) -> PageCache | None:
+        """
+        Page validators saved with the provider's cached snapshot, however
+        old, for conditional listing requests. None if disabled.
+        """
+        if not settings.PROVIDER_CONDITIONAL_REQUESTS:
+            return None
+        entry = cache.get(cls._get_cache_key(provider))
+        if entry is None or not entry.get("pages"):
+            return PageCache()
+        return PageCache(entry["pages"], cls._decode_entry(provider, entry))
+
+    @classmethod
+    def _get_page_validators(cls, client) -> dict | None:
+        """Page validators collected by a client's fetch, to cache."""
+        if client.page_cache is None:
+            return None
+        if client.page_cache.not_modified:
+            metrics.increment(cls.NOT_MODIFIED_METRIC, client.page_cache.not_modified)
+        return client.page_cache.validators
 
     @staticmethod
-    def _get_cache_key(provider_id: int) -> str:
-        """Generate cache key for provider."""
-        return f"{VPSAggregator.CACHE_KEY_PREFIX}_{provider_id}"
+    def _decode_entry(provider: Provider, entry: dict) -> InstanceBatch:
+        """Decode a cache entry, versioned by its content."""
+        instances = codecs.decode(entry.get("codec", "json"), entry["data"])
+        instances.version = (
+            entry.get("version") or f"cache:{provider.id}:{entry['fetched_at']}"
+        )
+        instances.fetched_at = entry["fetched_at"]
+        return instances
+
+    @classmethod
+    def _read_cached_instances(
+        cls, provider: Provider, newer_than: float = 0, last_good: bool = False
+    ) -> InstanceBatch | None:
+        """
+        Read a provider's cached instances without triggering a refresh.
+
+        With ``last_good``, entries past ``VPS_CACHE_STALE_TTL`` are returned too.
+        """
+        entry = cache.get(cls._get_cache_key(provider))
+        if entry is None or entry["fetched_at"] < newer_than:
+            return None
+        if not last_good and time.time() >= entry["stale_until"]:
+            return None
+        return cls._decode_entry(provider, entry)
+
+    @classmethod
+    def _load_last_good(
+        cls, providers: List[Provider]
+    ) -> Dict[Provider, InstanceBatch]:
+        """
+        Last known good instances of failing providers.
+
+        Read from the cache (kept for ``VPS_CACHE_LAST_GOOD_TTL``), or else
+        from the provider's stored snapshot, however old.
+        """
+        last_good = {}
+        for provider in providers:
+            instances = cls._read_cached_instances(provider, last_good=True)
+            if instances is not None:
+                last_good[provider] = instances
+
+        stored = [
+            p
+            for p in providers
+            if p not in last_good and p.last_snapshot_at is not None
+        ]
+        if stored:
+            loaded = ProviderSyncService.load(stored)
+            last_good.update((provider, loaded[provider.id]) for provider in stored)
+        return last_good
+
+    @classmethod
+    def _cache_instances(
+        cls,
+        provider: Provider,
+        instances: InstanceBatch,
+        times: dict | None = None,
+        pages: dict | None = None,
+        price_loader: PriceLoader | None = None,
+    ) -> None:
+        """
+        Store a provider's freshly fetched instances in cache.
+
+        The snapshot is versioned by a hash of its encoded content, so a
+        refetch returning the same instances keeps its version. The version
+        is also stored under a small key of its own, which ``get_snapshot``
+        reads without fetching the instances. Entries outlive
+        ``VPS_CACHE_STALE_TTL`` (up to ``VPS_CACHE_LAST_GOOD_TTL``) only to be
+        served while the provider fails.
+
+        ``times`` (``fetched_at``, ``fresh_until``, ``stale_until``) keeps
+        those of a patched snapshot instead of starting new ones. ``pages``
+        are the upstream page validators the snapshot was built from.
+        ``price_loader`` prices the live events of the changes, if it holds
+        the provider's custom prices (they are loaded otherwise).
+        """
+        now = time.time()
+        codec, data = codecs.encode(instances)
+        digest = hashlib.sha1(data).hexdigest()[:16]
+        instances.version = f"cache:{provider.id}:{codec}:{digest}"
+
+        times = times or {
+            "fetched_at": now,
+            "fresh_until": now + settings.VPS_CACHE_FRESH_TTL,
+            "stale_until": now + settings.VPS_CACHE_STALE_TTL,
+        }
+        instances.fetched_at = times["fetched_at"]
+        snapshot = {"version": instances.version, **times}
+        expires_at = max(
+            times["stale_until"], times["fetched_at"] + settings.VPS_CACHE_LAST_GOOD_TTL
+        )
+        generation = cls._get_generation(provider.user_id)
+        cache.set_many(
+            {
+                cls._get_cache_key(provider, generation): {
+                    **snapshot,
+                    "data": data,
+                    "codec": codec,
+                    "pages": pages or {},
+                },
+                cls._get_version_key(provider, generation): snapshot,
+            },
+            max(int(expires_at - now), 1),
+        )
+        changes = ChangeLog.record(provider.id, instances)
+        if changes:
+            events.publish_changes(provider, changes, price_loader)
+
+    @classmethod
+    def _schedule_refresh(
+        cls, provider: Provider, price_loader: PriceLoader | None = None
+    ) -> None:
+        """
+        Refresh a stale provider in the background, at most once at a time.
+
+        The refresh leads the provider's single-flight, so requests that
+        miss the cache meanwhile wait for its result or error.
+        """
+        flight = cls._get_single_flight(provider.id)
+        if not flight.acquire():
+            return
+
+        metrics.increment(cls.BACKGROUND_METRIC)
+        background.submit(
+            flight.lead, lambda: cls._refresh_provider(provider, price_loader)
+        )
+
+    @classmethod
+    def _get_single_flight(cls, provider_id: int) -> SingleFlight:
+        """Single-flight guarding upstream fetches of one provider."""
+        return SingleFlight(
+            f"{cls.REFRESH_LOCK_PREFIX}_{provider_id}",
+            settings.VPS_PROVIDER_TIMEOUT,
+        )
+
+    @classmethod
+    def get_fetch_metrics(cls) -> dict:
+        """
+        Counters of leader, coalesced and background provider fetches, and
+        of listing pages the providers reported unchanged.
+        """
+        return metrics.get_counters(
+            [
+                LEADER_METRIC,
+                COALESCED_METRIC,
+                cls.BACKGROUND_METRIC,
+                cls.NOT_MODIFIED_METRIC,
+            ]
+        )
 
     @staticmethod
-    def _serialize_instances(instances: List[VPSInstance]) -> str:
-        """Serialize VPSInstance objects to JSON for caching."""
-        data = []
-        for instance in instances:
-            data.append(
-                {
-                    "id": instance.id,
-                    "name": instance.name,
-                    "status": instance.status,
-                    "ipv4": instance.ipv4,
-                    "ipv6": instance.ipv6,
-                    "cpu_cores": instance.cpu_cores,
-                    "ram_mb": instance.ram_mb,
-                    "disk_gb": instance.disk_gb,
-                    "region": instance.region,
-                    "created_at": instance.created_at.isoformat(),
-                    "provider_type": instance.provider_type,
-                    "provider_account_id": instance.provider_account_id,
-                    "plan": instance.plan,
-                    "monthly_price": instance.monthly_price,
-                    "currency": instance.currency,
-                }
-            )
-        return json.dumps(data)
+    def _get_fanout() -> ProviderFanout:
+        """Build the provider fan-out from settings."""
+        return ProviderFanout(
+            max_workers=settings.VPS_FANOUT_MAX_WORKERS,
+            provider_timeout=settings.VPS_PROVIDER_TIMEOUT,
+            total_timeout=settings.VPS_REQUEST_TIMEOUT,
+        )
 
     @staticmethod
-    def _deserialize_instances(json_str: str) -> List[VPSInstance]:
-        """Deserialize JSON to VPSInstance objects."""
-        from datetime import datetime
-
-        data = json.loads(json_str)
-        instances = []
-
-        for item in data:
-            created_at = datetime.fromisoformat(item["created_at"])
-            instance = VPSInstance(
-                id=item["id"],
-                name=item["name"],
-                status=item["status"],
-                ipv4=item["ipv4"],
-                ipv6=item["ipv6"],
-                cpu_cores=item["cpu_cores"],
-                ram_mb=item["ram_mb"],
-                disk_gb=item["disk_gb"],
-                region=item["region"],
-                created_at=created_at,
-                provider_type=item["provider_type"],
-                provider_account_id=item["provider_account_id"],
-                plan=item.get("plan"),
-                monthly_price=item.get("monthly_price"),
-                currency=item.get("currency", "USD"),
-            )
-            instances.append(instance)
+    def _format_error(
+        provider: Provider, error: Exception, last_good: InstanceBatch | None = None
+    ) -> dict:
+        """
+        Describe a failed provider for the API response.
 
-        return instances
+        When its ``last_good`` instances are served instead, the error is
+        marked ``stale`` with the time they were fetched.
+        """
+        formatted = {
+            "provider_id": provider.id,
+            "provider_name": provider.name,
+            "provider_type": provider.provider_type,
+            "error": str(error),
+        }
+        if last_good is not None:
+            formatted["stale"] = True
+            if last_good.fetched_at is not None:
+                formatted["fetched_at"] = (
+                    datetime.fromtimestamp(last_good.fetched_at, timezone.utc)
+                    .replace(tzinfo=None)
+                    .isoformat()
+                )
+        return formatted
+
+    @classmethod
+    def clear_cache(
+        cls, user: User, provider_id: int = None, warm: bool = False
+    ) -> int:
+        """
+        Invalidate cached instances of a user's providers.
+
+        Without ``provider_id`` every provider of the user is invalidated at
+        once by bumping the user's cache generation: all existing keys stop
+        being read and simply expire, so no key scan is needed. Stored
+        snapshots are marked as not servable as well, so the next request
+        goes to the provider APIs instead of the database.
+
+        Args:
+            user: Owner of the providers
+            provider_id: Only invalidate this provider
+            warm: Refetch the invalidated active providers in the background
+                so the next request is not a cold miss
+
+        Returns:
+            Number of providers being warmed
+        """
+        providers = Provider.objects.filter(user=user)
+        if provider_id:
+            providers = providers.filter(id=provider_id)
+            for provider in providers:
+                cache.delete_many(
+                    [cls._get_cache_key(provider), cls._get_version_key(provider)]
+                )
+        else:
+            cls._bump_generation(user.id)
+
+        providers.update(last_snapshot_at=None)
+
+        if not warm:
+            return 0
+
+        active_providers = list(providers.filter(is_active=True))
+        for provider in active_providers:
+            background.submit(cls._warm_provider, provider)
+        return len(active_providers)
+
+    @classmethod
+    def _warm_provider(cls, provider: Provider) -> None:
+        """Refetch an invalidated provider, restoring its stored snapshot too."""
+        if settings.VPS_READ_FROM_STORE:
+            ProviderSyncService.sync(provider)
+        else:
+            cls.refresh_provider(provider)
+
+    @classmethod
+    def _get_generation(cls, user_id: int) -> int:
+        """Current cache generation of a user's provider keys."""
+        key = f"{cls.GENERATION_KEY_PREFIX}_{user_id}"
+        generation = cache.get(key)
+        if generation is None:
+            # Seed from the clock so a lost counter never revives old keys
+            cache.add(key, time.time_ns() // 1_000_000, None)
+            generation = cache.get(key)
+        return generation
+
+    @classmethod
+    def _bump_generation(cls, user_id: int) -> None:
+        """Move a user's provider keys to a new, empty generation."""
+        cls._get_generation(user_id)
+        cache.incr(f"{cls.GENERATION_KEY_PREFIX}_{user_id}")
+
+    @classmethod
+    def _get_cache_key(cls, provider: Provider, generation: int = None) -> str:
+        """Generate cache key for provider in its owner's current generation."""
+        if generation is None:
+            generation = cls._get_generation(provider.user_id)
+        return f"{cls.CACHE_KEY_PREFIX}_{provider.user_id}_{generation}_{provider.id}"
+
+    @classmethod
+    def _get_version_key(cls, provider: Provider, generation: int = None) -> str:
+        """Cache key of the version of a provider's cached snapshot."""
+        return f"{cls._get_cache_key(provider, generation)}_{cls.VERSION_KEY_SUFFIX}"
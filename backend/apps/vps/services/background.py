@@ -0,0 +1,50 @@
+"""
+Small in-process executor for background cache refreshes.
+
+Work submitted here runs after the request that triggered it has been
+answered. Each job closes its database connection when done so worker
+threads never leak connections.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable
+
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Return the process-wide background executor."""
+    global _executor
+
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.VPS_BACKGROUND_WORKERS,
+                    thread_name_prefix="vps-background",
+                )
+    return _executor
+
+
+def submit(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Future:
+    """Run ``func`` in the background, logging (not raising) its errors."""
+
+    def run() -> Any:
+        try:
+            return func(*args, **kwargs)
+        except Exception:
+            logger.exception(
+                "Background job %s failed", getattr(func, "__qualname__", func)
+            )
+        finally:
+            close_old_connections()
+
+    return _get_executor().submit(run)
@@ -0,0 +1,133 @@
+"""
+Billing aggregates over instance snapshots.
+
+``summarize`` reduces one provider's price-adjusted batch to per-group
+totals; ``merge`` combines the summaries of several providers into the
+``/vps/billing`` response. Summaries are small and only depend on the
+snapshot and custom prices they were computed from, so they are cached
+per provider under the batch version: when one provider's snapshot or
+prices change, only that summary is recomputed.
+
+Sums are exact ``Decimal`` arithmetic and never mix currencies: every
+group is split by currency.
+"""
+
+import hashlib
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+from providers.services.batch import InstanceBatch
+
+CACHE_KEY_PREFIX = "vps_billing"
+
+# Response section -> instance field it groups by
+DIMENSIONS = {
+    "by_provider": "provider_type",
+    "by_provider_account": "provider_account_id",
+    "by_region": "region",
+    "by_plan": "plan",
+}
+
+CENT = Decimal("0.01")
+
+
+def get_cache_key(provider_id: int, version: str) -> str:
+    """Cache key of a provider's summary for one batch version."""
+    digest = hashlib.sha1(version.encode()).hexdigest()[:16]
+    return f"{CACHE_KEY_PREFIX}_{provider_id}_{digest}"
+
+
+def summarize(instances: InstanceBatch) -> dict:
+    """
+    Per-group totals of a batch.
+
+    Only priced instances (non-zero ``monthly_price``) count towards
+    totals, as on the billing page. Returns ``{"instances": n, "groups":
+    {section: {(value, currency): [total, count]}}}``, with a ``totals``
+    section keyed by ``(None, currency)``.
+    """
+    groups: Dict[str, Dict[Tuple, list]] = {
+        name: {} for name in ["totals", *DIMENSIONS]
+    }
+    columns = {field: instances.column(field) for field in DIMENSIONS.values()}
+
+    for row, (price, currency) in enumerate(
+        zip(instances.column("monthly_price"), instances.column("currency"))
+    ):
+        if not price:
+            continue
+        price = price if isinstance(price, Decimal) else Decimal(str(price))
+        currency = str(currency)
+        _add(groups["totals"], (None, currency), price)
+        for name, field in DIMENSIONS.items():
+            value = columns[field][row]
+            _add(
+                groups[name],
+                (str(value) if value is not None else None, currency),
+                price,
+            )
+
+    return {"instances": len(instances), "groups": groups}
+
+
+def merge(
+    summaries: Iterable[dict], account_names: Dict[int, str] | None = None
+) -> dict:
+    """
+    Combine provider summaries into the billing response.
+
+    Amounts are decimal strings; groups are sorted by descending total.
+    """
+    account_names = account_names or {}
+    groups: Dict[str, Dict[Tuple, list]] = {
+        name: {} for name in ["totals", *DIMENSIONS]
+    }
+    instance_count = 0
+    for summary in summaries:
+        instance_count += summary["instances"]
+        for name, entries in summary["groups"].items():
+            for key, (total, count) in entries.items():
+                _add(groups[name], key, total, count)
+
+    result = {
+        "instance_count": instance_count,
+        "totals": [
+            _format_group({"currency": currency}, total, count)
+            for (_, currency), (total, count) in _sorted(groups["totals"])
+        ],
+    }
+    for name, field in DIMENSIONS.items():
+        rows = []
+        for (value, currency), (total, count) in _sorted(groups[name]):
+            row = {field: value, "currency": currency}
+            if field == "provider_account_id":
+                row[field] = int(value)
+                row["provider_name"] = account_names.get(int(value))
+            rows.append(_format_group(row, total, count))
+        result[name] = rows
+    return result
+
+
+def _add(groups: Dict[Tuple, list], key: Tuple, total: Decimal, count: int = 1) -> None:
+    """Accumulate into a group."""
+    entry = groups.get(key)
+    if entry is None:
+        groups[key] = [total, count]
+    else:
+        entry[0] += total
+        entry[1] += count
+
+
+def _sorted(groups: Dict[Tuple, list]) -> List[Tuple[Tuple, list]]:
+    """Groups by descending total, then key."""
+    return sorted(groups.items(), key=lambda item: (-item[1][0], str(item[0])))
+
+
+def _format_group(row: dict, total: Decimal, count: int) -> dict:
+    """Response entry of a group."""
+    return {
+        **row,
+        "total": str(total),
+        "count": count,
+        "average": str((total / count).quantize(CENT)),
+    }
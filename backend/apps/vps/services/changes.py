@@ -0,0 +1,242 @@
+"""
+Per-provider change logs of cached instance snapshots.
+
+Every time a provider's snapshot is cached, ``ChangeLog.record`` diffs it
+against the previous one (by a digest of each instance row) and appends
+the added, modified and removed instances to a bounded log kept in the
+Django cache. Polling clients then ask for the changes since the
+sequence numbers they last saw instead of downloading the whole fleet.
+
+A log starts a new epoch whenever its state is lost (eviction, expiry),
+so sequence numbers issued before can never be mistaken for new ones.
+"""
+
+import hashlib
+import json
+import time
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from providers.services.batch import FIELDS, InstanceBatch
+
+ID = FIELDS.index("id")
+STATUS = FIELDS.index("status")
+MONTHLY_PRICE = FIELDS.index("monthly_price")
+
+
+@dataclass
+class ProviderChanges:
+    """Net changes of one provider between two sequence numbers."""
+
+    added: List[dict] = field(default_factory=list)
+    modified: List[dict] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    # Status and provider price of modified instances before the change
+    previous: Dict[str, Tuple[str, object]] = field(default_factory=dict)
+
+
+class ChangeLog:
+    """Bounded log of snapshot changes of one provider."""
+
+    KEY_PREFIX = "vps_changes"
+
+    @classmethod
+    def record(
+        cls, provider_id: int, instances: InstanceBatch
+    ) -> ProviderChanges | None:
+        """
+        Diff a new snapshot against the previous one and log the changes.
+
+        Callers are serialized per provider by the refresh single-flight.
+        Returns the changes, or None if there was nothing to diff against.
+        """
+        key = cls._get_key(provider_id)
+        state = cache.get(key)
+        if (
+            state is not None
+            and instances.version
+            and state["version"] == instances.version
+        ):
+            # Same content as the previous snapshot
+            cache.touch(key, settings.VPS_CHANGE_LOG_TTL)
+            return ProviderChanges()
+
+        digests = cls._get_digests(instances)
+        if state is None:
+            # First snapshot of this epoch: nothing to diff against
+            state = {"epoch": time.time_ns(), "seq": 0, "entries": [], "versions": []}
+            cls._set_version(state, instances.version, digests)
+            cache.set(key, state, settings.VPS_CHANGE_LOG_TTL)
+            return None
+
+        previous = state["digests"]
+        added, modified = [], []
+        for row, instance_id in enumerate(instances.column("id")):
+            if instance_id not in previous:
+                added.append(row)
+            elif previous[instance_id][0] != digests[instance_id][0]:
+                modified.append(row)
+        changes = ProviderChanges(
+            added=list(instances.take(added).rows()),
+            modified=list(instances.take(modified).rows()),
+            removed=[
+                instance_id for instance_id in previous if instance_id not in digests
+            ],
+        )
+
+        if added or modified or changes.removed:
+            state["seq"] += 1
+            state["entries"].append(
+                (state["seq"], changes.added, changes.modified, changes.removed)
+            )
+            del state["entries"][: -settings.VPS_CHANGE_LOG_SIZE]
+        cls._set_version(state, instances.version, digests)
+        cache.set(key, state, settings.VPS_CHANGE_LOG_TTL)
+
+        changes.previous = {
+            row["id"]: previous[row["id"]][1:] for row in changes.modified
+        }
+        return changes
+
+    @staticmethod
+    def _set_version(state: dict, version: str | None, digests: dict) -> None:
+        """Make ``version`` the log's current snapshot, at its current seq."""
+        state.update(version=version, digests=digests)
+        # Snapshot version -> seq it was recorded at, for find_positions
+        state.setdefault("versions", []).append((version, state["seq"]))
+        del state["versions"][: -(settings.VPS_CHANGE_LOG_SIZE + 1)]
+
+    @staticmethod
+    def encode_version(
+        positions: Dict[int, Tuple[int, int] | None], fingerprint: str
+    ) -> str:
+        """Opaque version token of the given log positions and prices."""
+        payload = {
+            "p": {str(pid): position for pid, position in positions.items()},
+            "f": fingerprint,
+        }
+        return urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode()
+        ).decode()
+
+    @staticmethod
+    def decode_version(
+        version: str,
+    ) -> Tuple[Dict[int, Tuple[int, int] | None], str] | None:
+        """Positions and price fingerprint of a token (None if invalid)."""
+        try:
+            payload = json.loads(urlsafe_b64decode(version.encode()))
+            positions = {
+                int(pid): tuple(position) if position else None
+                for pid, position in payload["p"].items()
+            }
+            return positions, payload["f"]
+        except (TypeError, ValueError, KeyError, AttributeError):
+            return None
+
+    @classmethod
+    def get_positions(
+        cls, provider_ids: List[int]
+    ) -> Dict[int, Tuple[int, int] | None]:
+        """Current (epoch, seq) of several providers' logs (None if absent)."""
+        keys = {provider_id: cls._get_key(provider_id) for provider_id in provider_ids}
+        states = cache.get_many(list(keys.values()))
+        return {
+            provider_id: (
+                (states[key]["epoch"], states[key]["seq"]) if key in states else None
+            )
+            for provider_id, key in keys.items()
+        }
+
+    @classmethod
+    def find_positions(
+        cls, versions: Dict[int, str | None]
+    ) -> Dict[int, Tuple[int, int]]:
+        """
+        Positions at which providers' logs recorded the given snapshot
+        versions. Providers whose log does not know theirs are left out.
+        """
+        keys = {provider_id: cls._get_key(provider_id) for provider_id in versions}
+        states = cache.get_many(list(keys.values()))
+        positions = {}
+        for provider_id, key in keys.items():
+            state = states.get(key)
+            if state is None or versions[provider_id] is None:
+                continue
+            for version, seq in reversed(state.get("versions", [])):
+                if version == versions[provider_id]:
+                    positions[provider_id] = (state["epoch"], seq)
+                    break
+        return positions
+
+    @classmethod
+    def get_changes(
+        cls, provider_id: int, since: Tuple[int, int], until: Tuple[int, int]
+    ) -> ProviderChanges | None:
+        """
+        Net changes of a provider from position ``since`` to ``until``.
+
+        Returns None when the log no longer covers that range (other epoch,
+        or entries already dropped), in which case the client has to reload.
+        """
+        if since is None or until is None:
+            return None
+        epoch, since_seq = since
+        if until[0] != epoch or since_seq > until[1]:
+            return None
+        if since_seq == until[1]:
+            return ProviderChanges()
+
+        state = cache.get(cls._get_key(provider_id))
+        if state is None or state["epoch"] != epoch:
+            return None
+        entries = [
+            entry for entry in state["entries"] if since_seq < entry[0] <= until[1]
+        ]
+        if not entries or entries[0][0] != since_seq + 1:
+            return None
+
+        # Instance ID -> (kind, row), relative to what the client has
+        changed: Dict[str, Tuple[str, dict]] = {}
+        removed = set()
+        for _, added_rows, modified_rows, removed_ids in entries:
+            for row in added_rows:
+                if row["id"] in removed:
+                    removed.discard(row["id"])
+                    changed[row["id"]] = ("modified", row)
+                else:
+                    changed[row["id"]] = ("added", row)
+            for row in modified_rows:
+                kind = changed.get(row["id"], ("modified",))[0]
+                changed[row["id"]] = (kind, row)
+            for instance_id in removed_ids:
+                kind = changed.pop(instance_id, ("modified",))[0]
+                if kind != "added":
+                    removed.add(instance_id)
+
+        changes = ProviderChanges(removed=sorted(removed))
+        for kind, row in changed.values():
+            getattr(changes, kind).append(row)
+        return changes
+
+    @staticmethod
+    def _get_digests(instances: InstanceBatch) -> Dict[str, Tuple[str, str, object]]:
+        """Instance ID -> (short digest of its row, status, provider price)."""
+        columns = [instances.column(name) for name in FIELDS]
+        return {
+            row[ID]: (
+                hashlib.blake2b(repr(row).encode(), digest_size=8).hexdigest(),
+                str(row[STATUS]),
+                row[MONTHLY_PRICE],
+            )
+            for row in zip(*columns)
+        }
+
+    @classmethod
+    def _get_key(cls, provider_id: int) -> str:
+        """Generate cache key for a provider's change log."""
+        return f"{cls.KEY_PREFIX}_{provider_id}"
@@ -0,0 +1,159 @@
+"""
+Cache codecs for provider instance lists.
+
+A codec turns an ``InstanceBatch`` into bytes and back. Cached
+payloads are stored together with the tag of the codec that wrote them
+(e.g. ``columnar+zlib``), so ``VPS_CACHE_CODEC`` and
+``VPS_CACHE_COMPRESSION`` can be changed without breaking entries that
+are already cached.
+
+* ``json``: one JSON object per instance (the original format)
+* ``columnar``: one JSON array per field, which maps directly onto the
+  batch's columns
+* ``msgpack``: the columnar layout packed with msgpack (optional
+  dependency, ``pip install msgpack``)
+"""
+
+import json
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, List, Tuple
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from providers.services.batch import FIELDS, InstanceBatch
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+CREATED_AT = FIELDS.index("created_at")
+
+# Compression name -> (compress, decompress)
+COMPRESSIONS: Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]] = {
+    "zlib": (lambda data: zlib.compress(data, 1), zlib.decompress),
+}
+
+
+class InstanceCodec(ABC):
+    """Abstract base class of instance batch codecs."""
+
+    name: str = None
+
+    @abstractmethod
+    def encode(self, batch: InstanceBatch) -> bytes:
+        """Serialize a batch to bytes."""
+        pass
+
+    @abstractmethod
+    def decode(self, data: bytes) -> InstanceBatch:
+        """Deserialize a batch from bytes."""
+        pass
+
+
+class JSONCodec(InstanceCodec):
+    """One JSON object per instance."""
+
+    name = "json"
+
+    def encode(self, batch: InstanceBatch) -> bytes:
+        data = []
+        for row in batch.rows():
+            row["created_at"] = row["created_at"].isoformat()
+            data.append(row)
+        return json.dumps(data).encode()
+
+    def decode(self, data: bytes) -> InstanceBatch:
+        rows = json.loads(data)
+        for row in rows:
+            row["created_at"] = datetime.fromisoformat(row["created_at"])
+        return InstanceBatch.from_rows(rows)
+
+
+class ColumnarCodec(InstanceCodec):
+    """One array per field, serialized as JSON."""
+
+    name = "columnar"
+
+    def encode(self, batch: InstanceBatch) -> bytes:
+        columns = [batch.column(name) for name in FIELDS]
+        columns[CREATED_AT] = [value.isoformat() for value in columns[CREATED_AT]]
+        return self.dumps(columns)
+
+    def decode(self, data: bytes) -> InstanceBatch:
+        columns = dict(zip(FIELDS, self.loads(data)))
+        columns["created_at"] = list(map(datetime.fromisoformat, columns["created_at"]))
+        return InstanceBatch(InstanceBatch.intern_columns(columns))
+
+    def dumps(self, columns: List[list]) -> bytes:
+        return json.dumps(columns, separators=(",", ":")).encode()
+
+    def loads(self, data: bytes) -> List[list]:
+        return json.loads(data)
+
+
+class MsgpackCodec(ColumnarCodec):
+    """The columnar layout packed with msgpack."""
+
+    name = "msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImproperlyConfigured(
+                "The msgpack cache codec requires the msgpack package"
+            )
+
+    def dumps(self, columns: List[list]) -> bytes:
+        return msgpack.packb(columns, use_bin_type=True)
+
+    def loads(self, data: bytes) -> List[list]:
+        return msgpack.unpackb(data, raw=False)
+
+
+CODECS = {codec.name: codec for codec in (JSONCodec, ColumnarCodec, MsgpackCodec)}
+
+
+def get_tag(codec: str = None, compression: str = None) -> str:
+    """Build the tag of a codec/compression pair, defaulting to settings."""
+    codec = codec or settings.VPS_CACHE_CODEC
+    if compression is None:
+        compression = settings.VPS_CACHE_COMPRESSION
+    if compression and compression != "none":
+        return f"{codec}+{compression}"
+    return codec
+
+
+def encode(batch: InstanceBatch, tag: str = None) -> Tuple[str, bytes]:
+    """Serialize a batch with the configured codec. Returns (tag, payload)."""
+    tag = tag or get_tag()
+    codec, compress, _ = _resolve(tag)
+    data = codec.encode(batch)
+    if compress:
+        data = compress(data)
+    return tag, data
+
+
+def decode(tag: str, data: bytes) -> InstanceBatch:
+    """Deserialize a payload written by ``encode`` with the given tag."""
+    codec, _, decompress = _resolve(tag)
+    if decompress:
+        data = decompress(data)
+    return codec.decode(data)
+
+
+def _resolve(tag: str):
+    """Split a tag into its codec and compression functions."""
+    name, _, compression = tag.partition("+")
+    if name not in CODECS:
+        raise ImproperlyConfigured(f"Unknown cache codec: {name}")
+
+    compress = decompress = None
+    if compression:
+        if compression not in COMPRESSIONS:
+            raise ImproperlyConfigured(f"Unknown cache compression: {compression}")
+        compress, decompress = COMPRESSIONS[compression]
+
+    return CODECS[name](), compress, decompress
@@ -0,0 +1,153 @@
+"""
+Live instance events over Redis pub/sub.
+
+When a provider snapshot is cached, the status and price changes it
+contains are published on the owner's channel. Any ASGI worker can then
+relay them to that user's open dashboards (``VPSEventStreamView``), so
+subscribers share the aggregator's upstream polls instead of each
+refetching the full list.
+
+Events are off unless ``VPS_EVENTS_ENABLED`` is set, and need
+``VPS_EVENTS_REDIS_URL``.
+"""
+
+import json
+import logging
+from typing import AsyncIterator, Iterator, List
+
+import redis
+import redis.asyncio
+from django.conf import settings
+
+from providers.models import Provider
+from providers.services.batch import InstanceBatch
+from vps.services.changes import ProviderChanges
+from vps.services.price_loader import PriceLoader
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "vps_events"
+
+_client: redis.Redis | None = None
+
+
+def is_enabled() -> bool:
+    """Whether live events are published and served."""
+    return settings.VPS_EVENTS_ENABLED and bool(settings.VPS_EVENTS_REDIS_URL)
+
+
+def get_channel(user_id: int) -> str:
+    """Pub/sub channel of a user's instance events."""
+    return f"{CHANNEL_PREFIX}_{user_id}"
+
+
+def build_events(
+    provider: Provider,
+    changes: ProviderChanges,
+    price_loader: PriceLoader | None = None,
+) -> List[dict]:
+    """
+    Events for instances added, removed, or whose status or price changed.
+
+    Prices are reported after custom price overrides, from ``price_loader``
+    if given (it must hold the provider's prices) or loaded otherwise.
+    """
+    rows = changes.added + [
+        row
+        for row in changes.modified
+        if (str(row["status"]), row["monthly_price"]) != changes.previous[row["id"]]
+    ]
+    if not rows and not changes.removed:
+        return []
+
+    price_loader = price_loader or PriceLoader([provider.id])
+    batch = price_loader.apply_prices(InstanceBatch.from_rows(rows))
+    added = {row["id"] for row in changes.added}
+    events = [
+        {
+            "change": "added" if instance_id in added else "modified",
+            "provider_account_id": provider.id,
+            "id": instance_id,
+            "name": name,
+            "status": str(status),
+            "monthly_price": float(price) if price is not None else None,
+            "currency": currency,
+        }
+        for instance_id, name, status, price, currency in zip(
+            batch.column("id"),
+            batch.column("name"),
+            batch.column("status"),
+            batch.column("monthly_price"),
+            batch.column("currency"),
+        )
+    ]
+    events.extend(
+        {"change": "removed", "provider_account_id": provider.id, "id": instance_id}
+        for instance_id in changes.removed
+    )
+    return events
+
+
+def publish_changes(
+    provider: Provider,
+    changes: ProviderChanges,
+    price_loader: PriceLoader | None = None,
+) -> None:
+    """Publish a provider's instance events to its owner's subscribers."""
+    if not is_enabled():
+        return
+
+    events = build_events(provider, changes, price_loader)
+    if not events:
+        return
+
+    try:
+        _get_client().publish(get_channel(provider.user_id), json.dumps(events))
+    except redis.RedisError as e:
+        # Subscribers catch up on their next full fetch
+        logger.warning("Could not publish instance events of %s: %s", provider.name, e)
+
+
+def subscribe(user_id: int, timeout: float) -> Iterator[List[dict] | None]:
+    """
+    Yield batches of a user's instance events as they are published.
+
+    Yields None whenever ``timeout`` seconds pass without events, so the
+    caller can send keep-alives.
+    """
+    client = redis.Redis.from_url(settings.VPS_EVENTS_REDIS_URL)
+    pubsub = client.pubsub()
+    try:
+        pubsub.subscribe(get_channel(user_id))
+        while True:
+            message = pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=timeout
+            )
+            yield json.loads(message["data"]) if message else None
+    finally:
+        pubsub.close()
+        client.close()
+
+
+async def asubscribe(user_id: int, timeout: float) -> AsyncIterator[List[dict] | None]:
+    """Asyncio variant of ``subscribe``."""
+    client = redis.asyncio.from_url(settings.VPS_EVENTS_REDIS_URL)
+    pubsub = client.pubsub()
+    try:
+        await pubsub.subscribe(get_channel(user_id))
+        while True:
+            message = await pubsub.get_message(
+                ignore_subscribe_messages=True, timeout=timeout
+            )
+            yield json.loads(message["data"]) if message else None
+    finally:
+        await pubsub.aclose()
+        await client.aclose()
+
+
+def _get_client() -> redis.Redis:
+    """Shared Redis client used for publishing."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.VPS_EVENTS_REDIS_URL)
+    return _client
@@ -0,0 +1,186 @@
+"""
+Concurrent fan-out over provider accounts.
+
+Runs one fetch per provider on a bounded thread pool (or as asyncio tasks
+under ASGI) so a request costs roughly the slowest provider instead of the
+sum of all of them. Every provider has its own deadline and the whole
+fan-out has a global deadline; providers that fail or miss their deadline
+are reported as errors while the others still return results. Worker
+threads close their database connections when their call is done.
+"""
+
+import asyncio
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, Tuple
+
+from django.db import connections
+
+
+class ProviderTimeout(Exception):
+    """Raised in place of a result when a provider misses its deadline."""
+
+
+@dataclass
+class FanoutResult:
+    """Results and errors of a fan-out, keyed by provider."""
+
+    results: Dict[Any, Any] = field(default_factory=dict)
+    errors: Dict[Any, Exception] = field(default_factory=dict)
+
+
+class ProviderFanout:
+    """Run a callable for many providers concurrently with deadlines."""
+
+    def __init__(
+        self,
+        max_workers: int,
+        provider_timeout: float,
+        total_timeout: float,
+    ):
+        """
+        Initialize fan-out.
+
+        Args:
+            max_workers: Upper bound on concurrently running fetches
+            provider_timeout: Seconds a single provider may take once started
+            total_timeout: Seconds the whole fan-out may take
+        """
+        self.max_workers = max(1, max_workers)
+        self.provider_timeout = provider_timeout
+        self.total_timeout = total_timeout
+
+    def run(self, items: Iterable[Any], func: Callable[[Any], Any]) -> FanoutResult:
+        """Call ``func(item)`` for every item and collect results and errors."""
+        result = FanoutResult()
+        for item, value, error in self.iter_completed(items, func):
+            if error is not None:
+                result.errors[item] = error
+            else:
+                result.results[item] = value
+        return result
+
+    def iter_completed(
+        self, items: Iterable[Any], func: Callable[[Any], Any]
+    ) -> Iterator[Tuple[Any, Any, Exception | None]]:
+        """
+        Yield ``(item, result, error)`` in completion order.
+
+        Items that miss their own deadline or the global deadline are
+        yielded last with a ``ProviderTimeout`` error. Their worker threads
+        are abandoned rather than joined, so a hung provider API never
+        holds the request open.
+        """
+        items = list(items)
+        if not items:
+            return
+
+        started_at: Dict[int, float] = {}
+
+        def call(index: int, item: Any) -> Any:
+            started_at[index] = time.monotonic()
+            try:
+                return func(item)
+            finally:
+                # The pool is discarded after the fan-out, so a connection
+                # its threads opened could never be reused
+                connections.close_all()
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(items)),
+            thread_name_prefix="provider-fanout",
+        )
+        futures = {
+            executor.submit(call, index, item): (index, item)
+            for index, item in enumerate(items)
+        }
+        pending = set(futures)
+        global_deadline = time.monotonic() + self.total_timeout
+
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= global_deadline:
+                    break
+
+                # Expire running providers that exceeded their own deadline
+                expired = {
+                    future
+                    for future in pending
+                    if futures[future][0] in started_at
+                    and not future.done()
+                    and now - started_at[futures[future][0]] >= self.provider_timeout
+                }
+                for future in expired:
+                    pending.discard(future)
+                    item = futures[future][1]
+                    yield item, None, ProviderTimeout(
+                        f"Provider did not respond within {self.provider_timeout:g}s"
+                    )
+
+                timeout = global_deadline - now
+                running = [
+                    started_at[futures[f][0]]
+                    for f in pending
+                    if futures[f][0] in started_at
+                ]
+                if running:
+                    timeout = min(timeout, min(running) + self.provider_timeout - now)
+
+                done, _ = wait(
+                    pending, timeout=max(timeout, 0), return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    pending.discard(future)
+                    item = futures[future][1]
+                    try:
+                        yield item, future.result(), None
+                    except Exception as e:
+                        yield item, None, e
+
+            for future in pending:
+                item = futures[future][1]
+                yield item, None, ProviderTimeout(
+                    f"Request deadline of {self.total_timeout:g}s exceeded"
+                )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    async def arun(
+        self, items: Iterable[Any], func: Callable[[Any], Awaitable[Any]]
+    ) -> FanoutResult:
+        """Await ``func(item)`` for every item on the running event loop."""
+        items = list(items)
+        result = FanoutResult()
+        if not items:
+            return result
+
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def call(item: Any) -> Any:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(func(item), self.provider_timeout)
+                except asyncio.TimeoutError:
+                    raise ProviderTimeout(
+                        f"Provider did not respond within {self.provider_timeout:g}s"
+                    )
+
+        tasks = {asyncio.ensure_future(call(item)): item for item in items}
+        done, pending = await asyncio.wait(tasks, timeout=self.total_timeout)
+
+        for task in pending:
+            task.cancel()
+            result.errors[tasks[task]] = ProviderTimeout(
+                f"Request deadline of {self.total_timeout:g}s exceeded"
+            )
+
+        for task in done:
+            item = tasks[task]
+            try:
+                result.results[item] = task.result()
+            except Exception as e:
+                result.errors[item] = e
+
+        return result
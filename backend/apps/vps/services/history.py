@@ -0,0 +1,359 @@
+"""
+Historical fleet size, cost and instance state.
+
+Every sync appends:
+
+* one raw ``ProviderSample`` per provider (instance counts by status and
+  total monthly cost, after custom prices),
+* ``InstanceSample`` rows for instances whose status or price changed
+  since the previous sync (run-length encoding: unchanged instances cost
+  nothing, so a year of 5-minute syncs of a stable fleet stays small).
+
+``rollup`` folds raw samples into hourly and hourly into daily buckets;
+``prune`` applies the ``VPS_HISTORY_*_RETENTION_DAYS`` policies, keeping
+each instance's current state. Range queries use the finest resolution
+still retained for the whole range and downsample to at most
+``VPS_HISTORY_MAX_POINTS`` points.
+"""
+
+import math
+from collections import Counter
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from typing import Dict, List
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q, Sum
+from django.db.models.functions import TruncDay, TruncHour
+from django.utils import timezone
+
+from providers.constants import InstanceStatus
+from providers.models import Provider
+from providers.services.batch import InstanceBatch
+from vps.models import InstanceSample, ProviderSample, SampleResolution
+from vps.services.price_loader import PriceLoader
+
+CENT = Decimal("0.01")
+
+# (source resolution, target resolution, truncation of bucket times)
+ROLLUPS = [
+    (SampleResolution.RAW, SampleResolution.HOUR, TruncHour),
+    (SampleResolution.HOUR, SampleResolution.DAY, TruncDay),
+]
+
+PERIOD_SECONDS = {
+    SampleResolution.HOUR: 3600,
+    SampleResolution.DAY: 86400,
+}
+
+SUMMED_FIELDS = [
+    "samples",
+    "instances",
+    "running",
+    "stopped",
+    "errored",
+    "monthly_cost",
+]
+
+
+class HistoryService:
+    """Record, roll up, prune and query provider history."""
+
+    @classmethod
+    def record(
+        cls, provider: Provider, instances: InstanceBatch, sampled_at: datetime
+    ) -> int:
+        """
+        Append a sync's samples. Returns the number of instance rows written.
+
+        ``instances`` is left untouched; custom prices are applied to a copy.
+        """
+        batch = PriceLoader([provider.id]).apply_prices(
+            instances.take(range(len(instances)))
+        )
+        prices = [cls._to_cents(price) for price in batch.column("monthly_price")]
+        statuses = [str(status) for status in batch.column("status")]
+        counts = Counter(statuses)
+
+        sample = ProviderSample(
+            provider=provider,
+            resolution=SampleResolution.RAW,
+            bucket=sampled_at,
+            instances=len(batch),
+            running=counts[InstanceStatus.RUNNING],
+            stopped=counts[InstanceStatus.STOPPED],
+            errored=counts[InstanceStatus.ERROR],
+            monthly_cost=sum((price for price in prices if price), Decimal(0)),
+            currency=batch.column("currency")[0] if len(batch) else "USD",
+        )
+
+        previous = cls._get_instance_states(provider)
+        rows = [
+            InstanceSample(
+                provider=provider,
+                instance_id=instance_id,
+                sampled_at=sampled_at,
+                status=status,
+                monthly_price=price,
+            )
+            for instance_id, status, price in zip(batch.column("id"), statuses, prices)
+            if previous.get(instance_id) != (status, price)
+        ]
+        current = set(batch.column("id"))
+        rows.extend(
+            InstanceSample(
+                provider=provider,
+                instance_id=instance_id,
+                sampled_at=sampled_at,
+                status=InstanceSample.DELETED,
+            )
+            for instance_id, (status, _) in previous.items()
+            if instance_id not in current and status != InstanceSample.DELETED
+        )
+
+        with transaction.atomic():
+            sample.save()
+            InstanceSample.objects.bulk_create(rows)
+        return len(rows)
+
+    @staticmethod
+    def _get_instance_states(provider: Provider) -> Dict[str, tuple]:
+        """Instance ID -> (status, price) of its latest sample."""
+        samples = InstanceSample.objects.filter(provider=provider)
+        latest = (
+            samples.values("instance_id")
+            .annotate(latest_id=Max("id"))
+            .values("latest_id")
+        )
+        return {
+            instance_id: (status, price)
+            for instance_id, status, price in samples.filter(id__in=latest).values_list(
+                "instance_id", "status", "monthly_price"
+            )
+        }
+
+    @classmethod
+    def rollup(cls, now: datetime = None) -> int:
+        """
+        Fold finer samples into complete hourly and daily buckets.
+
+        Each provider resumes from its latest rolled-up bucket (which is
+        recomputed), so running it late or twice is harmless, and a
+        provider whose samples lag behind the others' is not skipped.
+        Returns the number of buckets written.
+        """
+        now = now or timezone.now()
+        written = 0
+        for source, target, trunc in ROLLUPS:
+            until = cls._truncate(now, target)
+            samples = ProviderSample.objects.filter(resolution=source, bucket__lt=until)
+            last_buckets = dict(
+                ProviderSample.objects.filter(resolution=target)
+                .values("provider_id")
+                .annotate(last_bucket=Max("bucket"))
+                .values_list("provider_id", "last_bucket")
+            )
+            if last_buckets:
+                resumed = ~Q(provider_id__in=list(last_buckets))
+                for provider_id, last_bucket in last_buckets.items():
+                    resumed |= Q(provider_id=provider_id, bucket__gte=last_bucket)
+                samples = samples.filter(resumed)
+
+            buckets = (
+                samples.annotate(period=trunc("bucket", tzinfo=dt_timezone.utc))
+                .values("provider_id", "period")
+                .annotate(
+                    **{f"sum_{name}": Sum(name) for name in SUMMED_FIELDS},
+                    bucket_currency=Max("currency"),
+                )
+            )
+            rows = [
+                ProviderSample(
+                    provider_id=bucket["provider_id"],
+                    resolution=target,
+                    bucket=bucket["period"],
+                    currency=bucket["bucket_currency"],
+                    **{name: bucket[f"sum_{name}"] for name in SUMMED_FIELDS},
+                )
+                for bucket in buckets
+            ]
+            ProviderSample.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["provider", "resolution", "bucket"],
+                update_fields=SUMMED_FIELDS + ["currency"],
+            )
+            written += len(rows)
+        return written
+
+    @staticmethod
+    def prune(now: datetime = None) -> int:
+        """
+        Delete samples past their retention. Returns the number deleted.
+
+        The latest sample of each instance still present is kept whatever
+        its age: it holds the instance's current state, which ``record``
+        compares against and instance history starts from.
+        """
+        now = now or timezone.now()
+        retention = {
+            SampleResolution.RAW: settings.VPS_HISTORY_RAW_RETENTION_DAYS,
+            SampleResolution.HOUR: settings.VPS_HISTORY_HOURLY_RETENTION_DAYS,
+            SampleResolution.DAY: settings.VPS_HISTORY_DAILY_RETENTION_DAYS,
+        }
+        deleted = 0
+        for resolution, days in retention.items():
+            deleted += ProviderSample.objects.filter(
+                resolution=resolution, bucket__lt=now - timedelta(days=days)
+            ).delete()[0]
+        # Samples are appended in time order: the latest has the highest ID
+        latest = (
+            InstanceSample.objects.values("provider_id", "instance_id")
+            .annotate(latest_id=Max("id"))
+            .values("latest_id")
+        )
+        deleted += (
+            InstanceSample.objects.filter(
+                sampled_at__lt=now
+                - timedelta(days=settings.VPS_HISTORY_INSTANCE_RETENTION_DAYS)
+            )
+            .exclude(Q(id__in=latest) & ~Q(status=InstanceSample.DELETED))
+            .delete()[0]
+        )
+        return deleted
+
+    @classmethod
+    def get_series(
+        cls,
+        providers: List[Provider],
+        start: datetime,
+        end: datetime,
+        resolution: str = None,
+    ) -> dict:
+        """
+        Fleet size and cost of ``providers`` between ``start`` and ``end``.
+
+        Without ``resolution``, the finest one retained for the whole range
+        is used.
+        Samples are then grouped into at most ``VPS_HISTORY_MAX_POINTS``
+        equal steps: each provider is averaged within a step, and providers
+        are summed. Costs are per currency.
+        """
+        resolution = resolution or cls._choose_resolution(start, end)
+        period = PERIOD_SECONDS.get(resolution, settings.VPS_SYNC_INTERVAL)
+        span = max((end - start).total_seconds(), 1)
+        step = max(period, math.ceil(span / settings.VPS_HISTORY_MAX_POINTS))
+
+        # Step index -> provider ID -> sums
+        steps: Dict[int, Dict[int, dict]] = {}
+        samples = ProviderSample.objects.filter(
+            provider__in=providers,
+            resolution=resolution,
+            bucket__gte=start,
+            bucket__lt=end,
+        ).values_list("provider_id", "bucket", "currency", *SUMMED_FIELDS)
+        for provider_id, bucket, currency, *values in samples.iterator():
+            index = int((bucket - start).total_seconds() // step)
+            sums = steps.setdefault(index, {}).setdefault(
+                provider_id, {"currency": currency}
+            )
+            for name, value in zip(SUMMED_FIELDS, values):
+                sums[name] = sums.get(name, 0) + value
+
+        points = []
+        for index in sorted(steps):
+            point = {
+                "t": start + timedelta(seconds=index * step),
+                "instances": 0.0,
+                "running": 0.0,
+                "stopped": 0.0,
+                "errored": 0.0,
+                "monthly_cost": {},
+            }
+            for sums in steps[index].values():
+                samples_count = sums["samples"]
+                for name in ["instances", "running", "stopped", "errored"]:
+                    point[name] += sums[name] / samples_count
+                cost = point["monthly_cost"].get(sums["currency"], Decimal(0))
+                point["monthly_cost"][sums["currency"]] = (
+                    cost + sums["monthly_cost"] / samples_count
+                )
+            for name in ["instances", "running", "stopped", "errored"]:
+                point[name] = round(point[name], 2)
+            point["monthly_cost"] = {
+                currency: str(cost.quantize(CENT))
+                for currency, cost in point["monthly_cost"].items()
+            }
+            points.append(point)
+
+        return {
+            "resolution": resolution,
+            "step": step,
+            "start": start,
+            "end": end,
+            "points": points,
+        }
+
+    @staticmethod
+    def get_instance_history(
+        provider: Provider, instance_id: str, start: datetime, end: datetime
+    ) -> List[dict]:
+        """State changes of one instance in a range, starting with its state at ``start``."""
+        samples = InstanceSample.objects.filter(
+            provider=provider, instance_id=instance_id
+        )
+        initial = samples.filter(sampled_at__lt=start).order_by("-sampled_at", "-id")[
+            :1
+        ]
+        changes = samples.filter(sampled_at__gte=start, sampled_at__lt=end).order_by(
+            "sampled_at", "id"
+        )
+        return [
+            {
+                "sampled_at": sample.sampled_at,
+                "status": sample.status,
+                "monthly_price": sample.monthly_price,
+            }
+            for sample in [*initial, *changes]
+        ]
+
+    @staticmethod
+    def _choose_resolution(start: datetime, end: datetime) -> str:
+        """Finest resolution whose retention covers ``start`` and that fits the point budget."""
+        now = timezone.now()
+        span = (end - start).total_seconds()
+        candidates = [
+            (
+                SampleResolution.RAW,
+                settings.VPS_SYNC_INTERVAL,
+                settings.VPS_HISTORY_RAW_RETENTION_DAYS,
+            ),
+            (SampleResolution.HOUR, 3600, settings.VPS_HISTORY_HOURLY_RETENTION_DAYS),
+        ]
+        for resolution, period, days in candidates:
+            if (
+                start >= now - timedelta(days=days)
+                and span / period <= settings.VPS_HISTORY_MAX_POINTS
+            ):
+                return resolution
+        return SampleResolution.DAY
+
+    @staticmethod
+    def _truncate(value: datetime, resolution: str) -> datetime:
+        """Start of the UTC hour or day containing ``value``."""
+        value = value.astimezone(dt_timezone.utc).replace(
+            minute=0, second=0, microsecond=0
+        )
+        if resolution == SampleResolution.DAY:
+            value = value.replace(hour=0)
+        return value
+
+    @staticmethod
+    def _to_cents(price) -> Decimal | None:
+        """Price as stored in samples."""
+        if price is None:
+            return None
+        if not isinstance(price, Decimal):
+            price = Decimal(str(price))
+        return price.quantize(CENT)
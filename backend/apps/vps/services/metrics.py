@@ -0,0 +1,35 @@
+"""
+Process-independent counters stored in the Django cache.
+
+Counters are shared by all workers, never expire and are meant for
+operational visibility (e.g. how many provider fetches were coalesced).
+"""
+
+from typing import Dict, Iterable
+
+from django.core.cache import cache
+
+KEY_PREFIX = "vps_metrics"
+
+
+def _get_key(name: str) -> str:
+    """Generate cache key for a counter."""
+    return f"{KEY_PREFIX}_{name}"
+
+
+def increment(name: str, delta: int = 1) -> None:
+    """Atomically add ``delta`` to a counter, creating it if needed."""
+    key = _get_key(name)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        # Counter does not exist yet; add() keeps a concurrent creator's value
+        cache.add(key, 0, None)
+        cache.incr(key, delta)
+
+
+def get_counters(names: Iterable[str]) -> Dict[str, int]:
+    """Read several counters at once. Missing counters read as 0."""
+    names = list(names)
+    values = cache.get_many([_get_key(name) for name in names])
+    return {name: values.get(_get_key(name), 0) for name in names}
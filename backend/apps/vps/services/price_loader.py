@@ -3,11 +3,14 @@ Service for loading and applying custom instance prices.
 Optimized to avoid N+1 queries by preloading all prices.
 """
 
+import hashlib
 from decimal import Decimal
-from typing import Dict, Optional, List
+from functools import cached_property
+from typing import Dict, Optional, List, Tuple
 
 from vps.models import InstanceCustomPrice
 from providers.services.base import VPSInstance
+from providers.services.batch import InstanceBatch
 
 
 class PriceLoader:
@@ -16,8 +19,9 @@ class PriceLoader:
     def __init__(self, provider_ids: List[int]):
         """Initialize with provider IDs to preload prices."""
         self.provider_ids = provider_ids
-        self._prices_by_instance_id: Dict[str, Decimal] = {}
-        self._prices_by_instance_ip: Dict[str, Decimal] = {}
+        # provider_id -> (prices by instance ID, prices by instance IP)
+        self._prices: Dict[int, Tuple[Dict[str, Decimal], Dict[str, Decimal]]] = {}
+        self._fingerprints: Dict[int, str] = {}
         self._load_prices()
 
     def _load_prices(self):
@@ -25,40 +29,91 @@ class PriceLoader:
         custom_prices = InstanceCustomPrice.objects.filter(
             provider_id__in=self.provider_ids,
             is_active=True
-        ).values("instance_id", "instance_ip", "monthly_price")
+        ).values("provider_id", "instance_id", "instance_ip", "monthly_price")
 
         for price_record in custom_prices:
             instance_id = price_record.get("instance_id")
             instance_ip = price_record.get("instance_ip")
             monthly_price = Decimal(str(price_record.get("monthly_price", 0)))
+            by_id, by_ip = self._prices.setdefault(price_record["provider_id"], ({}, {}))
 
             if instance_id:
-                self._prices_by_instance_id[instance_id] = monthly_price
+                by_id[instance_id] = monthly_price
 
             if instance_ip:
-                self._prices_by_instance_ip[instance_ip] = monthly_price
+                by_ip[instance_ip] = monthly_price
+
+    def get_version(self, version: str | None, provider_id: int) -> str | None:
+        """
+        Version of a provider's snapshot once its prices are applied to it.
+
+        Only the provider's own prices count, so changing a price of one
+        provider leaves the versions of the others as they were.
+        """
+        if version is None or provider_id not in self._prices:
+            return version
+        return f"{version}:{self._get_fingerprint(provider_id)}"
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Short hash of all loaded prices; changes whenever a price does."""
+        fingerprints = [
+            f"{provider_id}={self._get_fingerprint(provider_id)}"
+            for provider_id in sorted(self._prices)
+        ]
+        return hashlib.sha1(repr(fingerprints).encode()).hexdigest()[:12]
+
+    def _get_fingerprint(self, provider_id: int) -> str:
+        """Short hash of one provider's prices."""
+        if provider_id not in self._fingerprints:
+            by_id, by_ip = self._prices[provider_id]
+            prices = sorted(by_id.items()) + sorted(by_ip.items())
+            self._fingerprints[provider_id] = hashlib.sha1(repr(prices).encode()).hexdigest()[:12]
+        return self._fingerprints[provider_id]
 
     def get_price(self, instance: VPSInstance) -> Optional[Decimal]:
         """
         Get custom price for an instance.
         Tries to match by instance ID first, then by IP.
         """
+        if instance.provider_account_id not in self._prices:
+            return None
+        by_id, by_ip = self._prices[instance.provider_account_id]
+
         # Try to match by instance ID (more reliable)
-        if instance.id in self._prices_by_instance_id:
-            return self._prices_by_instance_id[instance.id]
+        if instance.id in by_id:
+            return by_id[instance.id]
 
         # Try to match by IP address
-        if instance.ipv4 and instance.ipv4 in self._prices_by_instance_ip:
-            return self._prices_by_instance_ip[instance.ipv4]
+        if instance.ipv4 and instance.ipv4 in by_ip:
+            return by_ip[instance.ipv4]
 
         # No custom price found
         return None
 
-    def apply_prices(self, instances: List[VPSInstance]) -> List[VPSInstance]:
-        """Apply custom prices to instances."""
-        for instance in instances:
-            custom_price = self.get_price(instance)
+    def apply_prices(self, instances: InstanceBatch) -> InstanceBatch:
+        """
+        Apply custom prices to a batch of one provider's instances (in
+        place). Custom prices are set as ``Decimal``; serializers convert
+        them like other prices.
+        """
+        if not len(instances):
+            return instances
+        provider_id = instances.column("provider_account_id")[0]
+        if provider_id not in self._prices:
+            return instances
+        by_id, by_ip = self._prices[provider_id]
+
+        instances.version = self.get_version(instances.version, provider_id)
+
+        prices = instances.column("monthly_price")
+        for index, (instance_id, ipv4) in enumerate(
+            zip(instances.column("id"), instances.column("ipv4"))
+        ):
+            custom_price = by_id.get(instance_id)
+            if custom_price is None and ipv4:
+                custom_price = by_ip.get(ipv4)
             if custom_price is not None:
-                instance.monthly_price = float(custom_price)
+                prices[index] = custom_price
 
         return instances
@@ -0,0 +1,417 @@
+"""
+Indexed filtering, search and ordering over an ``InstanceBatch``.
+
+``InstanceIndex`` holds, per field and built on first use:
+
+* hash indexes (value -> row positions) for exact-match filters,
+* sorted indexes (values in order + their rows) for range filters,
+* dense ranks for ordering,
+* lowercased sorted keys for prefix search on name and IP addresses.
+
+Indexes only depend on a batch's content, so they are kept in a small
+in-process LRU keyed by ``InstanceBatch.version`` and reused for as long
+as the same snapshot is served.
+"""
+
+import math
+import threading
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from datetime import datetime, time
+from decimal import Decimal
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+
+from providers.services.batch import InstanceBatch
+
+# Fields filterable by exact (multi-)value, with the parser of query values
+EXACT_FIELDS = {
+    "provider_type": str,
+    "status": str,
+    "region": str,
+    "plan": str,
+    "currency": str,
+    "provider_account_id": int,
+    "cpu_cores": int,
+    "ram_mb": int,
+    "disk_gb": int,
+}
+RANGE_FIELDS = ["cpu_cores", "ram_mb", "disk_gb", "monthly_price", "created_at"]
+RANGE_OPERATORS = ["gte", "gt", "lte", "lt"]
+SEARCH_FIELDS = ["name", "ipv4", "ipv6"]
+ORDERING_FIELDS = [
+    "name",
+    "status",
+    "ipv4",
+    "region",
+    "plan",
+    "provider_type",
+    "cpu_cores",
+    "ram_mb",
+    "disk_gb",
+    "monthly_price",
+    "created_at",
+]
+
+
+def _datetime_key(value: datetime) -> datetime:
+    """Comparable created_at; naive values are taken in the default time zone."""
+    if timezone.is_naive(value):
+        return timezone.make_aware(value)
+    return value
+
+
+def _text_key(value) -> str:
+    """Case-insensitive key of text fields."""
+    return str(value).lower()
+
+
+def _price_key(value) -> Decimal:
+    """
+    Comparable monthly_price: provider prices are floats and custom prices
+    Decimals, which do not compare exactly with each other.
+    """
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+# How values of each field are compared when sorting
+SORT_KEYS = {
+    "created_at": _datetime_key,
+    "name": _text_key,
+    "ipv4": _text_key,
+    "ipv6": _text_key,
+    "region": _text_key,
+    "plan": _text_key,
+    "status": str,
+    "provider_type": str,
+    "monthly_price": _price_key,
+}
+
+# Appended to the ordering when a total order is needed (pagination)
+TIEBREAKER = [("provider_account_id", False), ("id", False)]
+
+
+class _Descending:
+    """Sort key wrapper inverting comparisons, for descending fields."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __lt__(self, other: "_Descending") -> bool:
+        return other.value < self.value
+
+    def __eq__(self, other: "_Descending") -> bool:
+        return self.value == other.value
+
+
+class InstanceIndex:
+    """Lazily built indexes over one batch's columns."""
+
+    def __init__(self, batch: InstanceBatch):
+        self.batch = batch
+        self._hash: Dict[str, Dict[object, List[int]]] = {}
+        self._sorted: Dict[str, Tuple[list, List[int]]] = {}
+        self._ranks: Dict[str, List[int | None]] = {}
+        self._prefix: Dict[str, Tuple[List[str], List[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.batch)
+
+    def equal(self, name: str, values: Iterable) -> set:
+        """Rows whose field equals any of ``values``."""
+        index = self._hash.get(name)
+        if index is None:
+            index = {}
+            for row, value in enumerate(self.batch.column(name)):
+                index.setdefault(value, []).append(row)
+            self._hash[name] = index
+
+        rows = set()
+        for value in values:
+            rows.update(index.get(value, ()))
+        return rows
+
+    def range(self, name: str, operator: str, bound) -> set:
+        """Rows whose field satisfies ``<operator> bound`` (None never matches)."""
+        keys, rows = self._get_sorted(name)
+        bound = SORT_KEYS.get(name, lambda value: value)(bound)
+
+        if operator == "gte":
+            return set(rows[bisect_left(keys, bound) :])
+        if operator == "gt":
+            return set(rows[bisect_right(keys, bound) :])
+        if operator == "lte":
+            return set(rows[: bisect_right(keys, bound)])
+        return set(rows[: bisect_left(keys, bound)])
+
+    def prefix(self, name: str, prefix: str) -> set:
+        """Rows whose field starts with ``prefix``, ignoring case."""
+        index = self._prefix.get(name)
+        if index is None:
+            pairs = sorted(
+                (_text_key(value), row)
+                for row, value in enumerate(self.batch.column(name))
+                if value
+            )
+            index = ([key for key, _ in pairs], [row for _, row in pairs])
+            self._prefix[name] = index
+
+        keys, rows = index
+        prefix = prefix.lower()
+        start = bisect_left(keys, prefix)
+        # Every key starting with the prefix sorts before prefix + U+10FFFF
+        end = bisect_left(keys, prefix + "\U0010ffff", start)
+        return set(rows[start:end])
+
+    def ranks(self, name: str) -> List[int | None]:
+        """Dense rank of every row's value (None for missing values)."""
+        ranks = self._ranks.get(name)
+        if ranks is None:
+            keys, rows = self._get_sorted(name)
+            ranks = [None] * len(self.batch)
+            rank = -1
+            previous = object()
+            for key, row in zip(keys, rows):
+                if key != previous:
+                    rank += 1
+                    previous = key
+                ranks[row] = rank
+            self._ranks[name] = ranks
+        return ranks
+
+    def _get_sorted(self, name: str) -> Tuple[list, List[int]]:
+        """Non-null values of a field in order, with their rows."""
+        index = self._sorted.get(name)
+        if index is None:
+            key = SORT_KEYS.get(name, lambda value: value)
+            pairs = sorted(
+                (
+                    (key(value), row)
+                    for row, value in enumerate(self.batch.column(name))
+                    if value is not None
+                ),
+                key=lambda pair: pair[0],
+            )
+            index = ([value for value, _ in pairs], [row for _, row in pairs])
+            self._sorted[name] = index
+        return index
+
+
+class InstanceQuery:
+    """Filters, search and ordering parsed from request query parameters."""
+
+    def __init__(
+        self,
+        exact: Dict[str, List] | None = None,
+        ranges: List[Tuple[str, str, object]] | None = None,
+        search: str | None = None,
+        ordering: List[Tuple[str, bool]] | None = None,
+    ):
+        """
+        Initialize query.
+
+        Args:
+            exact: Field -> accepted values
+            ranges: (field, operator, bound) triples
+            search: Prefix matched against name, IPv4 and IPv6
+            ordering: (field, descending) pairs
+        """
+        self.exact = exact or {}
+        self.ranges = ranges or []
+        self.search = search
+        self.ordering = ordering or []
+
+    @classmethod
+    def from_params(cls, params) -> "InstanceQuery":
+        """
+        Parse query parameters.
+
+        * ``status=running,stopped`` or repeated ``status=`` for any of
+          several values (also provider_type, region, plan, ...)
+        * ``ram_mb__gte=2048``, ``created_at__lt=2024-01-01`` for ranges
+        * ``search=web`` for a name/IP prefix
+        * ``ordering=-ram_mb,name``
+
+        Raises:
+            ValidationError: On values that cannot be parsed
+        """
+        errors = {}
+
+        exact = {}
+        for name, parse in EXACT_FIELDS.items():
+            values = [
+                value.strip()
+                for raw in params.getlist(name)
+                for value in raw.split(",")
+                if value.strip()
+            ]
+            if values:
+                try:
+                    exact[name] = [parse(value) for value in values]
+                except ValueError:
+                    errors[name] = f"Invalid value: {', '.join(values)}"
+
+        ranges = []
+        for name in RANGE_FIELDS:
+            for operator in RANGE_OPERATORS:
+                param = f"{name}__{operator}"
+                value = params.get(param)
+                if not value:
+                    continue
+                try:
+                    ranges.append((name, operator, cls._parse_bound(name, value)))
+                except ValueError:
+                    errors[param] = f"Invalid value: {value}"
+
+        ordering = []
+        for value in params.get("ordering", "").split(","):
+            value = value.strip()
+            if not value:
+                continue
+            name = value.lstrip("-")
+            if name not in ORDERING_FIELDS:
+                errors["ordering"] = f"Cannot order by {name}"
+                continue
+            ordering.append((name, value.startswith("-")))
+
+        if errors:
+            raise ValidationError(errors)
+
+        return cls(
+            exact=exact,
+            ranges=ranges,
+            search=params.get("search", "").strip() or None,
+            ordering=ordering,
+        )
+
+    @staticmethod
+    def _parse_bound(name: str, value: str):
+        """Parse a range bound for a field."""
+        if name == "monthly_price":
+            price = float(value)
+            if not math.isfinite(price):
+                raise ValueError(value)
+            return price
+        if name == "created_at":
+            parsed = parse_datetime(value)
+            if parsed is None:
+                parsed_date = parse_date(value)
+                if parsed_date is None:
+                    raise ValueError(value)
+                parsed = datetime.combine(parsed_date, time.min)
+            return parsed
+        return int(value)
+
+    def __bool__(self) -> bool:
+        return bool(self.exact or self.ranges or self.search or self.ordering)
+
+    def with_total_ordering(self) -> "InstanceQuery":
+        """
+        Copy of the query ordered by provider and instance ID after the
+        requested fields, so no two instances compare equal.
+        """
+        ordered = {name for name, _ in self.ordering}
+        ordering = self.ordering + [
+            item for item in TIEBREAKER if item[0] not in ordered
+        ]
+        return InstanceQuery(self.exact, self.ranges, self.search, ordering)
+
+    def get_ordering_values(self, batch: InstanceBatch, row: int) -> list:
+        """Values of a row's ordering fields."""
+        return [batch.column(name)[row] for name, _ in self.ordering]
+
+    def get_position_key(self, values: Sequence) -> tuple:
+        """
+        Comparable key of a position in the ordering, given the values of
+        the ordering fields. Consistent with the order ``apply`` produces.
+        """
+        key = []
+        for (name, descending), value in zip(self.ordering, values):
+            if value is None:
+                key.append((1,))
+                continue
+            value = SORT_KEYS.get(name, lambda value: value)(value)
+            key.append((0, _Descending(value) if descending else value))
+        return tuple(key)
+
+    def apply(self, batch: InstanceBatch) -> InstanceBatch:
+        """Return the matching instances of ``batch``, ordered if requested."""
+        if not self:
+            return batch
+
+        index = get_index(batch)
+        rows = None
+
+        for name, values in self.exact.items():
+            rows = self._intersect(rows, index.equal(name, values))
+
+        for name, operator, bound in self.ranges:
+            rows = self._intersect(rows, index.range(name, operator, bound))
+
+        if self.search:
+            matches = set()
+            for name in SEARCH_FIELDS:
+                matches |= index.prefix(name, self.search)
+            rows = self._intersect(rows, matches)
+
+        rows = list(range(len(batch))) if rows is None else sorted(rows)
+
+        if self.ordering:
+            rows.sort(key=self._get_sort_key(index))
+
+        return batch.take(rows)
+
+    def _get_sort_key(self, index: InstanceIndex):
+        """Row -> tuple of ranks; missing values sort last either way."""
+        missing = len(index) + 1
+        columns = []
+        for name, descending in self.ordering:
+            ranks = index.ranks(name)
+            if descending:
+                columns.append([missing if rank is None else -rank for rank in ranks])
+            else:
+                columns.append([missing if rank is None else rank for rank in ranks])
+
+        if len(columns) == 1:
+            return columns[0].__getitem__
+        return lambda row: tuple(column[row] for column in columns)
+
+    @staticmethod
+    def _intersect(rows: set | None, matches: set) -> set:
+        """Narrow the current row set (None means all rows)."""
+        return matches if rows is None else rows & matches
+
+
+_lock = threading.Lock()
+_indexes: "OrderedDict[str, InstanceIndex]" = OrderedDict()
+
+
+def get_index(batch: InstanceBatch) -> InstanceIndex:
+    """
+    Index of a batch, shared by all requests serving the same snapshot.
+
+    Batches without a version (filtered or ad-hoc ones) get a fresh index.
+    """
+    if batch.version is None:
+        return InstanceIndex(batch)
+
+    with _lock:
+        index = _indexes.get(batch.version)
+        if index is not None:
+            _indexes.move_to_end(batch.version)
+            return index
+
+    index = InstanceIndex(batch)
+    with _lock:
+        _indexes[batch.version] = index
+        while len(_indexes) > settings.VPS_QUERY_INDEX_CACHE_SIZE:
+            _indexes.popitem(last=False)
+    return index
@@ -0,0 +1,186 @@
+"""
+Distributed single-flight execution on top of the Django cache.
+
+When many requests (in any worker) need the same expensive result at the
+same time, only the first one, the leader, computes it. The others,
+followers, wait for the leader to publish its result (or its error)
+instead of repeating the work. A published error is re-raised in the
+followers as the same ``ProviderError`` subclass.
+"""
+
+import asyncio
+import time
+import uuid
+from typing import Awaitable, Callable, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+
+from providers.services.errors import ProviderUnavailable, dump_error, load_error
+from vps.services import metrics
+
+T = TypeVar("T")
+
+LEADER_METRIC = "fetch_leader"
+COALESCED_METRIC = "fetch_coalesced"
+
+
+class SingleFlightTimeout(ProviderUnavailable):
+    """Raised when a follower gives up waiting for the leader."""
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for one key into a single execution."""
+
+    POLL_INTERVAL = 0.1
+    ERROR_TTL = 5  # seconds followers may see the leader's failure
+
+    def __init__(self, key: str, timeout: float):
+        """
+        Initialize single-flight.
+
+        Args:
+            key: Cache key of the lock; also namespaces the error key
+            timeout: Seconds the leader may hold the lock and followers wait
+        """
+        self.lock_key = key
+        self.error_key = f"{key}_error"
+        self.timeout = timeout
+        self._token = None
+
+    def acquire(self) -> bool:
+        """Try to become the leader without waiting."""
+        token = str(uuid.uuid4())
+        if cache.add(self.lock_key, token, self.timeout):
+            self._token = token
+            return True
+        return False
+
+    def wait_acquire(self) -> bool:
+        """
+        Acquire the lock, waiting up to ``timeout`` for the current holder.
+
+        Returns False if it is still held by then.
+        """
+        deadline = time.monotonic() + self.timeout
+        while not self.acquire():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(self.POLL_INTERVAL)
+        return True
+
+    def release(self) -> None:
+        """Release the lock if this instance still holds it."""
+        if self._token and cache.get(self.lock_key) == self._token:
+            cache.delete(self.lock_key)
+        self._token = None
+
+    def lead(self, func: Callable[[], T]) -> T:
+        """
+        Run ``func`` as the leader, once ``acquire`` succeeded.
+
+        Its failure is published to the followers, and the lock is
+        released either way.
+        """
+        cache.delete(self.error_key)
+        try:
+            return func()
+        except Exception as e:
+            cache.set(self.error_key, dump_error(e), self.ERROR_TTL)
+            raise
+        finally:
+            self.release()
+
+    async def alead(self, func: Callable[[], Awaitable[T]]) -> T:
+        """Asyncio variant of ``lead``."""
+        await cache.adelete(self.error_key)
+        try:
+            return await func()
+        except Exception as e:
+            await cache.aset(self.error_key, dump_error(e), self.ERROR_TTL)
+            raise
+        finally:
+            await sync_to_async(self.release, thread_sensitive=False)()
+
+    def run(self, func: Callable[[], T], get_result: Callable[[], T | None]) -> T:
+        """
+        Run ``func`` as leader, or wait for the leader's result.
+
+        Args:
+            func: Computes and publishes the result (leader only)
+            get_result: Reads the published result, None if not there yet
+        """
+        if self.acquire():
+            # The previous leader may have published since the caller's miss
+            result = get_result()
+            if result is None:
+                metrics.increment(LEADER_METRIC)
+                return self.lead(func)
+            self.release()
+            metrics.increment(COALESCED_METRIC)
+            return result
+
+        metrics.increment(COALESCED_METRIC)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            time.sleep(self.POLL_INTERVAL)
+            # Past the leader's release its outcome is published, so a
+            # follower that gets the lock checks for it before leading
+            acquired = self.acquire()
+
+            result = get_result()
+            if result is not None:
+                self.release()
+                return result
+
+            error = cache.get(self.error_key)
+            if error is not None:
+                self.release()
+                raise load_error(error)
+
+            if acquired:
+                # The leader's lock expired without an outcome
+                return self.lead(func)
+            if time.monotonic() >= deadline:
+                raise SingleFlightTimeout(f"Timed out waiting for {self.lock_key}")
+
+    async def arun(
+        self,
+        func: Callable[[], Awaitable[T]],
+        get_result: Callable[[], T | None],
+    ) -> T:
+        """Asyncio variant of ``run``; ``get_result`` stays synchronous."""
+        release = sync_to_async(self.release, thread_sensitive=False)
+        if await sync_to_async(self.acquire, thread_sensitive=False)():
+            result = await sync_to_async(get_result, thread_sensitive=False)()
+            if result is None:
+                await sync_to_async(metrics.increment, thread_sensitive=False)(
+                    LEADER_METRIC
+                )
+                return await self.alead(func)
+            await release()
+            await sync_to_async(metrics.increment, thread_sensitive=False)(
+                COALESCED_METRIC
+            )
+            return result
+
+        await sync_to_async(metrics.increment, thread_sensitive=False)(COALESCED_METRIC)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            await asyncio.sleep(self.POLL_INTERVAL)
+            acquired = await sync_to_async(self.acquire, thread_sensitive=False)()
+
+            result = await sync_to_async(get_result, thread_sensitive=False)()
+            if result is not None:
+                await release()
+                return result
+
+            error = await cache.aget(self.error_key)
+            if error is not None:
+                await release()
+                raise load_error(error)
+
+            if acquired:
+                return await self.alead(func)
+            if time.monotonic() >= deadline:
+                raise SingleFlightTimeout(f"Timed out waiting for {self.lock_key}")
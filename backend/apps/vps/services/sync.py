@@ -0,0 +1,268 @@
+"""
+Background provider sync.
+
+Fetches a provider's instances (through the aggregator, which also warms
+the cache), persists them as ``SyncedInstance`` rows and records the
+outcome on the provider. ``VPSAggregator`` then serves synced providers
+from the database instead of calling provider APIs during requests.
+"""
+
+import logging
+from datetime import timedelta
+from typing import Dict, List
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from providers.constants import SyncStatus
+from providers.models import Provider
+from providers.services.base import VPSInstance
+from providers.services.batch import FIELDS, InstanceBatch
+from providers.services.transport import CircuitBreaker, get_circuit_breaker
+from vps.models import SyncedInstance
+
+logger = logging.getLogger(__name__)
+
+# Statuses of a provider whose last fetch failed
+FAILED_STATUSES = {
+    SyncStatus.FAILED,
+    SyncStatus.CIRCUIT_OPEN,
+    SyncStatus.CIRCUIT_HALF_OPEN,
+}
+
+# Stored snapshots older than this many sync intervals are not served
+STORE_MAX_AGE_INTERVALS = 3
+
+# Counts single-instance patches of a stored snapshot, which bump its version
+REVISION_KEY_PREFIX = "vps_store_revision"
+
+SYNCED_FIELDS = [
+    "name",
+    "status",
+    "ipv4",
+    "ipv6",
+    "cpu_cores",
+    "ram_mb",
+    "disk_gb",
+    "region",
+    "instance_created_at",
+    "provider_type",
+    "plan",
+    "monthly_price",
+    "currency",
+    "synced_at",
+]
+
+# SyncedInstance columns matching the batch FIELDS, in order
+BATCH_COLUMNS = [
+    "instance_id",
+    "name",
+    "status",
+    "ipv4",
+    "ipv6",
+    "cpu_cores",
+    "ram_mb",
+    "disk_gb",
+    "region",
+    "instance_created_at",
+    "provider_type",
+    "provider_id",
+    "plan",
+    "monthly_price",
+    "currency",
+]
+
+
+class ProviderSyncService:
+    """Persist provider instances to the local instance store."""
+
+    @classmethod
+    def sync(cls, provider: Provider) -> int:
+        """
+        Sync one provider. Returns the number of stored instances.
+
+        The provider's ``last_sync_at``/``last_sync_status`` are updated
+        whether the sync succeeds or fails; failures are re-raised. A failed
+        sync of a provider whose circuit is open (or half-open) records that
+        state as its status.
+        """
+        from vps.services.aggregator import VPSAggregator
+
+        now = timezone.now()
+        try:
+            instances = VPSAggregator.refresh_provider(provider)
+            cls.store(provider, instances, now)
+            cls.record_history(provider, instances, now)
+        except Exception:
+            provider.last_sync_at = now
+            provider.last_sync_status = cls.get_failure_status(provider)
+            provider.save(update_fields=["last_sync_at", "last_sync_status"])
+            raise
+
+        provider.last_sync_at = now
+        provider.last_sync_status = SyncStatus.SUCCESS
+        provider.last_snapshot_at = now
+        provider.save(
+            update_fields=["last_sync_at", "last_sync_status", "last_snapshot_at"]
+        )
+        return len(instances)
+
+    @staticmethod
+    def get_failure_status(provider: Provider) -> str:
+        """Status of a failed fetch: the circuit state if it is not closed."""
+        state = get_circuit_breaker(provider.id).get_state()
+        return state if state != CircuitBreaker.CLOSED else SyncStatus.FAILED
+
+    @classmethod
+    def record_fetch(cls, provider: Provider, failed: bool) -> None:
+        """
+        Record a fetch made outside of a sync (during a request).
+
+        A failure records the circuit state like a failed sync, and a
+        success clears a failed status. Only changes are written, and
+        ``last_sync_at`` is left to syncs so their schedule is unaffected.
+        """
+        if failed:
+            status = cls.get_failure_status(provider)
+        elif provider.last_sync_status in FAILED_STATUSES:
+            status = SyncStatus.SUCCESS
+        else:
+            return
+
+        if status != provider.last_sync_status:
+            provider.last_sync_status = status
+            provider.save(update_fields=["last_sync_status"])
+
+    @staticmethod
+    def store(provider: Provider, instances: InstanceBatch, synced_at) -> None:
+        """Replace a provider's stored instances with a fresh snapshot."""
+        rows = [
+            SyncedInstance.from_vps_instance(provider, instance, synced_at)
+            for instance in instances
+        ]
+
+        with transaction.atomic():
+            SyncedInstance.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["provider", "instance_id"],
+                update_fields=SYNCED_FIELDS,
+            )
+            # Instances that disappeared upstream
+            SyncedInstance.objects.filter(provider=provider).exclude(
+                instance_id__in=[row.instance_id for row in rows]
+            ).delete()
+
+    @classmethod
+    def patch(
+        cls, provider: Provider, instance_id: str, instance: VPSInstance | None
+    ) -> bool:
+        """
+        Replace one instance of a provider's stored snapshot.
+
+        ``instance`` None deletes it. The snapshot gets a new version while
+        keeping its ``last_snapshot_at``. Returns False if the provider has
+        no stored snapshot.
+        """
+        if provider.last_snapshot_at is None:
+            return False
+
+        if instance is None:
+            SyncedInstance.objects.filter(
+                provider=provider, instance_id=instance_id
+            ).delete()
+        else:
+            SyncedInstance.objects.bulk_create(
+                [SyncedInstance.from_vps_instance(provider, instance, timezone.now())],
+                update_conflicts=True,
+                unique_fields=["provider", "instance_id"],
+                update_fields=SYNCED_FIELDS,
+            )
+
+        key = cls._get_revision_key(provider)
+        timeout = provider.get_sync_interval() * STORE_MAX_AGE_INTERVALS
+        cache.add(key, 0, timeout)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(key, 1, timeout)
+        return True
+
+    @classmethod
+    def get_versions(cls, providers: List[Provider]) -> Dict[int, str]:
+        """Versions of stored snapshots (providers must have ``last_snapshot_at``)."""
+        keys = {provider.id: cls._get_revision_key(provider) for provider in providers}
+        revisions = cache.get_many(list(keys.values()))
+        versions = {}
+        for provider in providers:
+            version = f"store:{provider.id}:{provider.last_snapshot_at.timestamp()}"
+            revision = revisions.get(keys[provider.id])
+            versions[provider.id] = f"{version}:{revision}" if revision else version
+        return versions
+
+    @staticmethod
+    def _get_revision_key(provider: Provider) -> str:
+        """Cache key of the patch count of a provider's current stored snapshot."""
+        return f"{REVISION_KEY_PREFIX}_{provider.id}_{provider.last_snapshot_at.timestamp()}"
+
+    @staticmethod
+    def record_history(provider: Provider, instances: InstanceBatch, synced_at) -> None:
+        """Append the sync to the provider's history; failures only log."""
+        from vps.services.history import HistoryService
+
+        try:
+            HistoryService.record(provider, instances, synced_at)
+        except Exception as e:
+            logger.warning("Could not record history of %s: %s", provider.name, e)
+
+    @staticmethod
+    def get_due_providers() -> List[Provider]:
+        """Active providers whose sync interval has elapsed."""
+        now = timezone.now()
+        return [
+            provider
+            for provider in Provider.objects.filter(is_active=True)
+            if provider.last_sync_at is None
+            or provider.last_sync_at + timedelta(seconds=provider.get_sync_interval())
+            <= now
+        ]
+
+    @staticmethod
+    def is_servable(provider: Provider) -> bool:
+        """Check whether a provider's stored snapshot is recent enough to serve."""
+        if provider.last_snapshot_at is None:
+            return False
+        max_age = timedelta(
+            seconds=provider.get_sync_interval() * STORE_MAX_AGE_INTERVALS
+        )
+        return timezone.now() - provider.last_snapshot_at <= max_age
+
+    @classmethod
+    def load(cls, providers: List[Provider]) -> Dict[int, InstanceBatch]:
+        """Load stored instances of several providers in one query."""
+        rows = {provider.id: [] for provider in providers}
+        values = SyncedInstance.objects.filter(provider_id__in=list(rows)).values_list(
+            *BATCH_COLUMNS
+        )
+        provider_index = BATCH_COLUMNS.index("provider_id")
+        for row in values:
+            rows[row[provider_index]].append(row)
+
+        versions = cls.get_versions(
+            [p for p in providers if p.last_snapshot_at is not None]
+        )
+        instances = {}
+        for provider in providers:
+            provider_rows = rows[provider.id]
+            if provider_rows:
+                columns = dict(zip(FIELDS, map(list, zip(*provider_rows))))
+                batch = InstanceBatch(InstanceBatch.intern_columns(columns))
+            else:
+                batch = InstanceBatch()
+            if provider.last_snapshot_at is not None:
+                batch.fetched_at = provider.last_snapshot_at.timestamp()
+                batch.version = versions[provider.id]
+            instances[provider.id] = batch
+        return instances
@@ -0,0 +1,39 @@
+import logging
+
+from celery import shared_task
+
+from providers.models import Provider
+from vps.services.history import HistoryService
+from vps.services.sync import ProviderSyncService
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def sync_provider(provider_id: int) -> None:
+    """Fetch one provider and persist its instances."""
+    try:
+        provider = Provider.objects.get(id=provider_id, is_active=True)
+    except Provider.DoesNotExist:
+        return
+
+    try:
+        count = ProviderSyncService.sync(provider)
+        logger.info("Synced %s instances from %s", count, provider.name)
+    except Exception as e:
+        logger.warning("Sync of %s failed: %s", provider.name, e)
+
+
+@shared_task(ignore_result=True)
+def sync_due_providers() -> None:
+    """Queue a sync for every active provider whose interval has elapsed."""
+    for provider in ProviderSyncService.get_due_providers():
+        sync_provider.delay(provider.id)
+
+
+@shared_task(ignore_result=True)
+def maintain_history() -> None:
+    """Roll up provider samples and apply history retention."""
+    rolled_up = HistoryService.rollup()
+    deleted = HistoryService.prune()
+    logger.info("Rolled up %s history buckets, pruned %s samples", rolled_up, deleted)
@@ -0,0 +1,62 @@
+from typing import Any, Callable, List, Tuple
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from providers.constants import ProviderType
+from providers.models import Provider
+from providers.tests.mocks import LOCMEM_CACHES, FakeDigitalOcean, mock_provider_api
+
+
+@override_settings(
+    CACHES=LOCMEM_CACHES,
+    VPS_EVENTS_REDIS_URL="",
+    VPS_READ_FROM_STORE=False,
+    PROVIDER_RETRY_ATTEMPTS=0,
+)
+class ProviderAPITestCase(TestCase):
+    """
+    A user with one DigitalOcean account, served by ``FakeDigitalOcean``.
+
+    Background jobs are queued instead of run; ``run_background_jobs``
+    runs them.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(username="owner")
+        self.provider = self.create_provider("DigitalOcean")
+        self.api = FakeDigitalOcean()
+        self.enterContext(mock_provider_api(self.api))
+
+        self.background_jobs: List[Tuple[Callable, tuple, dict]] = []
+        self.enterContext(
+            mock.patch(
+                "vps.services.background.submit",
+                side_effect=lambda func, *args, **kwargs: self.background_jobs.append(
+                    (func, args, kwargs)
+                ),
+            )
+        )
+
+    def create_provider(self, name: str, user: User = None) -> Provider:
+        """Create an active DigitalOcean account."""
+        provider = Provider(
+            user=user or self.user, name=name, provider_type=ProviderType.DIGITALOCEAN
+        )
+        provider.set_credentials({"token": "token"})
+        provider.save()
+        return provider
+
+    def run_background_jobs(self) -> List[Any]:
+        """Run the queued background jobs; returns their results or errors."""
+        results = []
+        while self.background_jobs:
+            func, args, kwargs = self.background_jobs.pop(0)
+            try:
+                results.append(func(*args, **kwargs))
+            except Exception as e:
+                results.append(e)
+        return results
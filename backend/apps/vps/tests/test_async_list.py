@@ -0,0 +1,71 @@
+from asgiref.sync import sync_to_async
+from rest_framework.test import APIClient
+
+from vps.tests.base import ProviderAPITestCase
+
+
+class AsyncListViewTests(ProviderAPITestCase):
+    def sync_get(self, *args, **kwargs):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        return sync_to_async(client.get)(*args, **kwargs)
+
+    async def test_matches_the_viewset_list(self):
+        await self.async_client.aforce_login(self.user)
+        expected = await self.sync_get(
+            "/api/v1/vps", {"status": "running", "format": "json"}
+        )
+
+        response = await self.async_client.get("/api/v1/vps", {"status": "running"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], expected["Content-Type"])
+        self.assertEqual(response.json()["count"], expected.json()["count"])
+        self.assertEqual(response.json()["results"], expected.json()["results"])
+        self.assertEqual(len(self.api.listing_requests), 1)
+
+    async def test_unchanged_list_is_not_modified(self):
+        await self.async_client.aforce_login(self.user)
+        first = await self.async_client.get("/api/v1/vps")
+
+        response = await self.async_client.get(
+            "/api/v1/vps", headers={"If-None-Match": first["ETag"]}
+        )
+
+        self.assertEqual(response.status_code, 304)
+
+    async def test_streamed_listings_stay_streamed(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get("/api/v1/vps", {"format": "ndjson"})
+
+        self.assertTrue(response.is_async)
+        lines = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(b"".join(lines).splitlines()), 3)
+
+    async def test_other_formats_are_served_by_the_viewset(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get(
+            "/api/v1/vps", headers={"Accept": "text/html"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/html; charset=utf-8")
+
+    async def test_invalid_filters_are_rejected_like_the_viewset(self):
+        await self.async_client.aforce_login(self.user)
+
+        response = await self.async_client.get("/api/v1/vps", {"ordering": "password"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["type"], "validation_error")
+
+    async def test_requires_authentication(self):
+        expected = await sync_to_async(APIClient().get)("/api/v1/vps")
+
+        response = await self.async_client.get("/api/v1/vps")
+
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(self.api.requests, [])
@@ -0,0 +1,170 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase
+from rest_framework.test import APIClient
+
+from providers.constants import ProviderType
+from providers.services.batch import InstanceBatch
+from providers.tests.test_batch import make_instance
+from vps.models import InstanceCustomPrice
+from vps.services import billing
+from vps.tests.base import ProviderAPITestCase
+
+
+class SummaryTests(SimpleTestCase):
+    def test_sums_are_exact(self):
+        summary = billing.summarize(
+            InstanceBatch.from_instances(
+                [make_instance(str(i), monthly_price=0.1) for i in range(3)]
+            )
+        )
+
+        self.assertEqual(
+            summary["groups"]["totals"], {(None, "USD"): [Decimal("0.3"), 3]}
+        )
+
+    def test_unpriced_instances_are_counted_but_not_totalled(self):
+        summary = billing.summarize(
+            InstanceBatch.from_instances(
+                [
+                    make_instance("1", monthly_price=None),
+                    make_instance("2", monthly_price=0.0),
+                    make_instance("3"),
+                ]
+            )
+        )
+
+        self.assertEqual(summary["instances"], 3)
+        self.assertEqual(
+            summary["groups"]["totals"], {(None, "USD"): [Decimal("6.0"), 1]}
+        )
+
+    def test_merged_groups_never_mix_currencies(self):
+        summaries = [
+            billing.summarize(
+                InstanceBatch.from_instances(
+                    [
+                        make_instance("1", monthly_price=5.0, region="nyc1"),
+                        make_instance("2", monthly_price=20.0, currency="EUR"),
+                    ]
+                )
+            ),
+            billing.summarize(
+                InstanceBatch.from_instances(
+                    [make_instance("3", monthly_price=10.0, provider_account_id=2)]
+                )
+            ),
+        ]
+
+        result = billing.merge(summaries, {1: "Main", 2: "Side"})
+
+        self.assertEqual(result["instance_count"], 3)
+        self.assertEqual(
+            result["totals"],
+            [
+                {"currency": "EUR", "total": "20.0", "count": 1, "average": "20.00"},
+                {"currency": "USD", "total": "15.0", "count": 2, "average": "7.50"},
+            ],
+        )
+        accounts = [
+            (
+                row["provider_account_id"],
+                row["provider_name"],
+                row["currency"],
+                row["total"],
+            )
+            for row in result["by_provider_account"]
+        ]
+        self.assertEqual(
+            accounts,
+            [
+                (1, "Main", "EUR", "20.0"),
+                (2, "Side", "USD", "10.0"),
+                (1, "Main", "USD", "5.0"),
+            ],
+        )
+        self.assertEqual(
+            [(row["region"], row["currency"]) for row in result["by_region"]],
+            [("fra1", "EUR"), ("fra1", "USD"), ("nyc1", "USD")],
+        )
+        self.assertEqual(
+            result["by_provider"][0]["provider_type"], ProviderType.DIGITALOCEAN
+        )
+
+    def test_averages_are_rounded_to_cents(self):
+        summary = billing.summarize(
+            InstanceBatch.from_instances(
+                [
+                    make_instance("1", monthly_price=1.0),
+                    make_instance("2", monthly_price=1.0),
+                    make_instance("3", monthly_price=0.01),
+                ]
+            )
+        )
+
+        self.assertEqual(billing.merge([summary])["totals"][0]["average"], "0.67")
+
+
+class BillingEndpointTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_billing(self):
+        response = self.client.get("/api/v1/vps/billing")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_totals_of_the_fleet(self):
+        result = self.get_billing()
+
+        self.assertEqual(result["instance_count"], 3)
+        self.assertEqual(
+            result["totals"],
+            [{"currency": "USD", "total": "18.0", "count": 3, "average": "6.00"}],
+        )
+        self.assertEqual(
+            result["by_provider_account"][0]["provider_name"], "DigitalOcean"
+        )
+        self.assertEqual(result["errors"], [])
+
+    def test_custom_prices_apply(self):
+        InstanceCustomPrice.objects.create(
+            provider=self.provider, instance_id="1", monthly_price="0.10"
+        )
+        InstanceCustomPrice.objects.create(
+            provider=self.provider, instance_id="2", monthly_price="0.20"
+        )
+
+        self.assertEqual(self.get_billing()["totals"][0]["total"], "6.30")
+
+    def test_summaries_are_reused_until_prices_change(self):
+        with mock.patch.object(
+            billing, "summarize", wraps=billing.summarize
+        ) as summarize:
+            self.get_billing()
+            self.get_billing()
+            self.assertEqual(summarize.call_count, 1)
+
+            InstanceCustomPrice.objects.create(
+                provider=self.provider, instance_id="1", monthly_price=1
+            )
+            self.assertEqual(self.get_billing()["totals"][0]["total"], "13.00")
+            self.assertEqual(summarize.call_count, 2)
+
+    def test_prices_of_other_providers_keep_summaries(self):
+        other = self.create_provider("Other")
+        self.get_billing()
+
+        with mock.patch.object(
+            billing, "summarize", wraps=billing.summarize
+        ) as summarize:
+            InstanceCustomPrice.objects.create(
+                provider=other, instance_id="1", monthly_price=1
+            )
+            result = self.get_billing()
+
+        self.assertEqual(summarize.call_count, 1)
+        self.assertEqual(result["totals"][0]["total"], "31.00")
@@ -0,0 +1,105 @@
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from providers.models import Provider
+from vps.services.aggregator import VPSAggregator
+from vps.tests.base import ProviderAPITestCase
+
+
+class ClearCacheTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_provider = self.create_provider("Second account")
+        self.other_user = User.objects.create(username="other")
+        self.foreign_provider = self.create_provider(
+            "Other user's account", user=self.other_user
+        )
+        for user in [self.user, self.other_user]:
+            VPSAggregator.collect_all_instances(user)
+        self.api.requests.clear()
+
+    def listed_providers(self):
+        """Number of provider listings made since the last check."""
+        count = len(self.api.listing_requests)
+        self.api.requests.clear()
+        return count
+
+    def test_clearing_all_providers_refetches_each_of_them(self):
+        VPSAggregator.clear_cache(self.user)
+
+        VPSAggregator.collect_all_instances(self.user)
+        self.assertEqual(self.listed_providers(), 2)
+        VPSAggregator.collect_all_instances(self.user)
+        self.assertEqual(self.listed_providers(), 0)
+
+    def test_other_users_keep_their_cache(self):
+        VPSAggregator.clear_cache(self.user)
+
+        VPSAggregator.collect_all_instances(self.other_user)
+        self.assertEqual(self.listed_providers(), 0)
+
+    def test_clearing_one_provider_refetches_only_it(self):
+        VPSAggregator.clear_cache(self.user, provider_id=self.other_provider.id)
+
+        VPSAggregator.collect_all_instances(self.user)
+        self.assertEqual(self.listed_providers(), 1)
+
+    def test_stored_snapshots_stop_being_served(self):
+        Provider.objects.update(last_snapshot_at=timezone.now())
+
+        VPSAggregator.clear_cache(self.user)
+
+        self.assertFalse(
+            Provider.objects.filter(
+                user=self.user, last_snapshot_at__isnull=False
+            ).exists()
+        )
+        self.assertIsNotNone(
+            Provider.objects.get(id=self.foreign_provider.id).last_snapshot_at
+        )
+
+    def test_warming_refetches_active_providers_in_background(self):
+        self.other_provider.is_active = False
+        self.other_provider.save()
+
+        warming = VPSAggregator.clear_cache(self.user, warm=True)
+
+        self.assertEqual(warming, 1)
+        self.assertEqual(self.listed_providers(), 0)
+        self.run_background_jobs()
+        self.assertEqual(self.listed_providers(), 1)
+        VPSAggregator.collect_all_instances(self.user)
+        self.assertEqual(self.listed_providers(), 0)
+
+
+class RefreshEndpointTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_refresh_clears_the_cache(self):
+        VPSAggregator.collect_all_instances(self.user)
+
+        response = self.client.post(
+            "/api/v1/vps/refresh", {"warm": "true"}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["warming"], 1)
+        self.assertEqual(len(self.background_jobs), 1)
+
+    def test_refresh_of_one_provider(self):
+        response = self.client.post(
+            "/api/v1/vps/refresh", {"provider_id": str(self.provider.id)}, format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["warming"], 0)
+
+    def test_invalid_provider_id_is_rejected(self):
+        response = self.client.post("/api/v1/vps/refresh?provider_id=abc")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][0]["attr"], "provider_id")
@@ -0,0 +1,164 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIClient
+
+from providers.constants import InstanceStatus
+from providers.services.batch import InstanceBatch
+from providers.tests.mocks import LOCMEM_CACHES, droplet
+from providers.tests.test_batch import make_instance
+from vps.models import InstanceCustomPrice
+from vps.services.aggregator import VPSAggregator
+from vps.services.changes import ChangeLog
+from vps.tests.base import ProviderAPITestCase
+
+
+def snapshot(version: str, *instances) -> InstanceBatch:
+    batch = InstanceBatch.from_instances(instances)
+    batch.version = version
+    return batch
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ChangeLogTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        ChangeLog.record(1, snapshot("v1", make_instance("1"), make_instance("2")))
+        self.start = ChangeLog.get_positions([1])[1]
+
+    def record(self, version, *instances):
+        ChangeLog.record(1, snapshot(version, *instances))
+        return ChangeLog.get_positions([1])[1]
+
+    def test_first_snapshot_has_nothing_to_diff(self):
+        self.assertIsNone(ChangeLog.record(2, snapshot("v1", make_instance("1"))))
+        self.assertEqual(ChangeLog.get_positions([2])[2][1], 0)
+
+    def test_record_diffs_against_the_previous_snapshot(self):
+        changes = ChangeLog.record(
+            1,
+            snapshot(
+                "v2",
+                make_instance("1", status=InstanceStatus.STOPPED, monthly_price=12.0),
+                make_instance("3"),
+            ),
+        )
+
+        self.assertEqual([row["id"] for row in changes.added], ["3"])
+        self.assertEqual(
+            [row["status"] for row in changes.modified], [InstanceStatus.STOPPED]
+        )
+        self.assertEqual(changes.removed, ["2"])
+        self.assertEqual(changes.previous, {"1": ("running", 6.0)})
+
+    def test_unchanged_snapshots_do_not_advance_the_log(self):
+        self.assertEqual(self.record("v1", make_instance("1")), self.start)
+        self.assertEqual(
+            self.record("v2", make_instance("1"), make_instance("2")), self.start
+        )
+
+    def test_changes_are_netted_across_entries(self):
+        self.record("v2", make_instance("1"), make_instance("2"), make_instance("3"))
+        self.record("v3", make_instance("1"), make_instance("3", name="renamed"))
+        until = self.record(
+            "v4", make_instance("1", name="renamed"), make_instance("2")
+        )
+
+        changes = ChangeLog.get_changes(1, self.start, until)
+
+        # 3 came and went, 2 went and came back, 1 was modified
+        self.assertEqual(changes.added, [])
+        self.assertEqual(sorted(row["id"] for row in changes.modified), ["1", "2"])
+        self.assertEqual(changes.removed, [])
+
+    def test_same_position_has_no_changes(self):
+        self.assertEqual(ChangeLog.get_changes(1, self.start, self.start).modified, [])
+
+    @override_settings(VPS_CHANGE_LOG_SIZE=1)
+    def test_positions_the_log_no_longer_covers_need_a_reload(self):
+        self.record("v2", make_instance("1"))
+        until = self.record("v3", make_instance("1", name="renamed"))
+
+        self.assertIsNone(ChangeLog.get_changes(1, self.start, until))
+
+    def test_positions_of_a_lost_log_need_a_reload(self):
+        cache.clear()
+        until = self.record("v2", make_instance("1"))
+
+        self.assertNotEqual(until[0], self.start[0])
+        self.assertIsNone(ChangeLog.get_changes(1, self.start, until))
+
+    def test_versions_round_trip(self):
+        version = ChangeLog.encode_version({1: self.start, 2: None}, "prices")
+
+        self.assertEqual(
+            ChangeLog.decode_version(version), ({1: self.start, 2: None}, "prices")
+        )
+        self.assertIsNone(ChangeLog.decode_version("garbage"))
+
+    def test_find_positions_of_snapshot_versions(self):
+        until = self.record("v2", make_instance("1"))
+
+        self.assertEqual(ChangeLog.find_positions({1: "v1", 2: "v1"}), {1: self.start})
+        self.assertEqual(ChangeLog.find_positions({1: "v2"}), {1: until})
+
+
+class ChangesEndpointTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.initial = self.get_changes()
+
+    def get_changes(self, since=None):
+        response = self.client.get(
+            "/api/v1/vps/changes", {"since": since} if since else {}
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def refetch(self):
+        VPSAggregator.clear_cache(self.user)
+        VPSAggregator.collect_all_instances(self.user)
+
+    def test_without_since_everything_is_added(self):
+        self.assertTrue(self.initial["reset"])
+        self.assertEqual(len(self.initial["added"]), 3)
+
+    def test_changes_since_a_version(self):
+        self.api.droplets[1]["status"] = "off"
+        del self.api.droplets[2]
+        self.api.droplets[4] = droplet(4)
+        self.refetch()
+
+        changes = self.get_changes(self.initial["version"])
+
+        self.assertFalse(changes["reset"])
+        self.assertEqual([row["id"] for row in changes["added"]], ["4"])
+        self.assertEqual([row["status"] for row in changes["modified"]], ["stopped"])
+        self.assertEqual(
+            changes["removed"], [{"provider_account_id": self.provider.id, "id": "2"}]
+        )
+        self.assertEqual(self.get_changes(changes["version"])["added"], [])
+
+    def test_no_changes(self):
+        self.refetch()
+
+        changes = self.get_changes(self.initial["version"])
+
+        self.assertFalse(changes["reset"])
+        self.assertEqual(
+            (changes["added"], changes["modified"], changes["removed"]), ([], [], [])
+        )
+
+    def test_custom_price_changes_reset(self):
+        InstanceCustomPrice.objects.create(
+            provider=self.provider, instance_id="1", monthly_price=10
+        )
+
+        changes = self.get_changes(self.initial["version"])
+
+        self.assertTrue(changes["reset"])
+        self.assertEqual(len(changes["added"]), 3)
+
+    def test_invalid_version_resets(self):
+        self.assertTrue(self.get_changes("garbage")["reset"])
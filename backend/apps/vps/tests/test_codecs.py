@@ -0,0 +1,115 @@
+from datetime import datetime, timezone
+from unittest import mock
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, override_settings
+
+from providers.constants import InstanceStatus, ProviderType
+from providers.services.base import VPSInstance
+from providers.services.batch import InstanceBatch
+from vps.services import codecs
+
+
+def make_batch() -> InstanceBatch:
+    return InstanceBatch.from_instances(
+        [
+            VPSInstance(
+                id="101",
+                name="web-1",
+                status=InstanceStatus.RUNNING,
+                ipv4="10.0.0.1",
+                ipv6="2001:db8::1",
+                cpu_cores=2,
+                ram_mb=4096,
+                disk_gb=80,
+                region="fra1",
+                created_at=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+                provider_type=ProviderType.DIGITALOCEAN,
+                provider_account_id=7,
+                plan="s-2vcpu-4gb",
+                monthly_price=24.0,
+            ),
+            VPSInstance(
+                id="102",
+                name="db-1 ☃",
+                status=InstanceStatus.STOPPED,
+                ipv4="",
+                ipv6=None,
+                cpu_cores=4,
+                ram_mb=8192,
+                disk_gb=160,
+                region="fra1",
+                created_at=datetime(2024, 2, 3, 4, 5, 6, tzinfo=timezone.utc),
+                provider_type=ProviderType.DIGITALOCEAN,
+                provider_account_id=7,
+                plan=None,
+                monthly_price=None,
+                currency="EUR",
+            ),
+        ]
+    )
+
+
+class CodecRoundTripTests(SimpleTestCase):
+    # msgpack is an optional dependency
+    TAGS = [
+        f"{codec}{compression}"
+        for codec in ["json", "columnar"] + (["msgpack"] if codecs.msgpack else [])
+        for compression in ["", "+zlib"]
+    ]
+
+    def test_every_codec_round_trips(self):
+        batch = make_batch()
+        for tag in self.TAGS:
+            with self.subTest(tag=tag):
+                written_tag, data = codecs.encode(batch, tag)
+                decoded = codecs.decode(written_tag, data)
+
+                self.assertEqual(written_tag, tag)
+                self.assertEqual(list(decoded.rows()), list(batch.rows()))
+
+    def test_decoded_values_are_shared_members(self):
+        _, data = codecs.encode(make_batch(), "columnar")
+        decoded = codecs.decode("columnar", data)
+
+        self.assertIs(decoded.column("status")[0], InstanceStatus.RUNNING)
+        self.assertIs(decoded.column("provider_type")[1], ProviderType.DIGITALOCEAN)
+
+    def test_empty_batch_round_trips(self):
+        for tag in self.TAGS:
+            with self.subTest(tag=tag):
+                self.assertEqual(
+                    len(codecs.decode(*codecs.encode(InstanceBatch(), tag))), 0
+                )
+
+    def test_compression_shrinks_the_payload(self):
+        batch = InstanceBatch.concat([make_batch()] * 50)
+
+        self.assertLess(
+            len(codecs.encode(batch, "columnar+zlib")[1]),
+            len(codecs.encode(batch, "columnar")[1]),
+        )
+
+
+class CodecSettingsTests(SimpleTestCase):
+    @override_settings(VPS_CACHE_CODEC="json", VPS_CACHE_COMPRESSION="none")
+    def test_tag_defaults_to_settings(self):
+        self.assertEqual(codecs.get_tag(), "json")
+        self.assertEqual(codecs.encode(make_batch())[0], "json")
+
+    @override_settings(VPS_CACHE_CODEC="columnar", VPS_CACHE_COMPRESSION="zlib")
+    def test_entries_written_with_another_codec_still_decode(self):
+        tag, data = codecs.encode(make_batch(), "json")
+
+        self.assertEqual(len(codecs.decode(tag, data)), 2)
+
+    def test_unknown_codec_or_compression_is_rejected(self):
+        for tag in ["yaml", "columnar+lz4"]:
+            with self.subTest(tag=tag), self.assertRaises(ImproperlyConfigured):
+                codecs.encode(make_batch(), tag)
+
+    def test_msgpack_codec_requires_msgpack(self):
+        with mock.patch.object(codecs, "msgpack", None), self.assertRaises(
+            ImproperlyConfigured
+        ):
+            codecs.encode(make_batch(), "msgpack")
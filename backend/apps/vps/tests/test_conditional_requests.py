@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.test import override_settings
+
+from providers.services.digitalocean import DigitalOceanClient
+from vps.services.aggregator import VPSAggregator
+from vps.tests.base import ProviderAPITestCase
+
+
+@override_settings(VPS_CACHE_FRESH_TTL=0, VPS_CACHE_STALE_TTL=0)
+@mock.patch.object(DigitalOceanClient, "PER_PAGE", 2)
+class ConditionalListingTests(ProviderAPITestCase):
+    def refetch(self):
+        """Refetch the (expired) snapshot; returns the listing responses' status codes."""
+        self.api.requests.clear()
+        statuses = []
+        handle = self.api._list
+
+        def record_list(request):
+            response = handle(request)
+            statuses.append(response.status_code)
+            return response
+
+        with mock.patch.object(self.api, "_list", record_list):
+            self.result = VPSAggregator.collect_all_instances(self.user)
+        return statuses
+
+    def statuses(self) -> dict:
+        return dict(
+            zip(
+                self.result.instances.column("id"),
+                self.result.instances.column("status"),
+            )
+        )
+
+    def test_unchanged_pages_are_not_downloaded_again(self):
+        self.refetch()
+
+        self.assertEqual(self.refetch(), [304, 304])
+        self.assertTrue(
+            all(
+                "If-None-Match" in request.headers
+                for request in self.api.listing_requests
+            )
+        )
+        self.assertEqual(
+            self.statuses(), {"1": "running", "2": "running", "3": "running"}
+        )
+        self.assertEqual(
+            VPSAggregator.get_fetch_metrics()[VPSAggregator.NOT_MODIFIED_METRIC], 2
+        )
+
+    def test_only_changed_pages_are_downloaded(self):
+        self.refetch()
+        self.api.droplets[3]["status"] = "off"
+
+        self.assertEqual(self.refetch(), [304, 200])
+        self.assertEqual(
+            self.statuses(), {"1": "running", "2": "running", "3": "stopped"}
+        )
+
+    def test_validators_follow_the_latest_fetch(self):
+        self.refetch()
+        self.api.droplets[3]["status"] = "off"
+        self.refetch()
+
+        self.assertEqual(self.refetch(), [304, 304])
+        self.assertEqual(self.statuses()["3"], "stopped")
+
+    @override_settings(PROVIDER_CONDITIONAL_REQUESTS=False)
+    def test_can_be_disabled(self):
+        self.refetch()
+
+        self.assertEqual(self.refetch(), [200, 200])
+        self.assertFalse(
+            any(
+                "If-None-Match" in request.headers
+                for request in self.api.listing_requests
+            )
+        )
@@ -0,0 +1,87 @@
+from rest_framework.test import APIClient
+
+from vps.models import InstanceCustomPrice
+from vps.services.aggregator import VPSAggregator
+from vps.tests.base import ProviderAPITestCase
+
+
+class ListETagTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url="/api/v1/vps", params=None, etag=None):
+        headers = {"If-None-Match": etag} if etag else {}
+        return self.client.get(url, params, headers=headers)
+
+    def test_matching_etag_is_not_modified_without_fetching(self):
+        etag = self.get()["ETag"]
+        requests = len(self.api.requests)
+
+        response = self.get(etag=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(len(self.api.requests), requests)
+
+    def test_weak_and_wildcard_validators_match(self):
+        etag = self.get()["ETag"]
+
+        for header in [f"W/{etag}", f'"other", {etag}', "*"]:
+            with self.subTest(header=header):
+                self.assertEqual(self.get(etag=header).status_code, 304)
+
+    def test_stale_etag_gets_the_listing(self):
+        etag = self.get()["ETag"]
+        VPSAggregator.clear_cache(self.user)
+
+        response = self.get(etag=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.get(etag=response["ETag"]).status_code, 304)
+
+    def test_etag_depends_on_the_query_and_format(self):
+        etags = {
+            self.get()["ETag"],
+            self.get(params={"status": "running"})["ETag"],
+            self.get(params={"limit": 2})["ETag"],
+        }
+
+        self.assertEqual(len(etags), 3)
+        self.assertEqual(
+            self.get(params={"limit": 2}, etag=self.get()["ETag"]).status_code, 200
+        )
+
+    def test_custom_price_changes_the_etag(self):
+        etag = self.get()["ETag"]
+        InstanceCustomPrice.objects.create(
+            provider=self.provider, instance_id="1", monthly_price=10
+        )
+
+        response = self.get(etag=etag)
+
+        self.assertEqual(response.status_code, 200)
+        prices = {
+            item["id"]: item["monthly_price"] for item in response.json()["results"]
+        }
+        self.assertEqual(prices["1"], 10)
+
+    def test_listings_with_errors_are_not_tagged(self):
+        self.api.fail_with = 500
+
+        response = self.get()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["errors"])
+        self.assertFalse(response.has_header("ETag"))
+
+    def test_by_provider_listing(self):
+        url = "/api/v1/vps/by-provider"
+        params = {"provider_id": self.provider.id}
+        etag = self.get(url, params)["ETag"]
+
+        self.assertEqual(self.get(url, params, etag=etag).status_code, 304)
+        self.assertNotEqual(self.get()["ETag"], etag)
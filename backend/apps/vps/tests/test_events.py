@@ -0,0 +1,185 @@
+import json
+from unittest import mock
+
+import redis
+import redis.asyncio
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from providers.constants import InstanceStatus
+from providers.services.batch import InstanceBatch
+from providers.tests.test_batch import make_instance
+from vps.models import InstanceCustomPrice
+from vps.services import events
+from vps.services.aggregator import VPSAggregator
+from vps.services.changes import ProviderChanges
+from vps.services.price_loader import PriceLoader
+from vps.tests.base import ProviderAPITestCase
+
+
+def rows(*instances) -> list:
+    return list(InstanceBatch.from_instances(instances).rows())
+
+
+class BuildEventsTests(ProviderAPITestCase):
+    def test_added_modified_and_removed_instances(self):
+        changes = ProviderChanges(
+            added=rows(make_instance("4")),
+            modified=rows(make_instance("1", status=InstanceStatus.STOPPED)),
+            removed=["2"],
+            previous={"1": ("running", 6.0)},
+        )
+
+        built = events.build_events(self.provider, changes)
+
+        self.assertEqual(
+            [(event["change"], event["id"]) for event in built],
+            [("added", "4"), ("modified", "1"), ("removed", "2")],
+        )
+        self.assertEqual(built[1]["status"], "stopped")
+        self.assertEqual(
+            built[2],
+            {"change": "removed", "provider_account_id": self.provider.id, "id": "2"},
+        )
+
+    def test_modifications_other_than_status_or_price_are_not_events(self):
+        changes = ProviderChanges(
+            modified=rows(make_instance("1", name="renamed")),
+            previous={"1": ("running", 6.0)},
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(events.build_events(self.provider, changes), [])
+
+    def test_prices_are_reported_after_custom_prices(self):
+        InstanceCustomPrice.objects.create(
+            provider=self.provider, instance_id="1", monthly_price="9.50"
+        )
+        changes = ProviderChanges(
+            modified=rows(
+                make_instance(
+                    "1", monthly_price=7.0, provider_account_id=self.provider.id
+                )
+            ),
+            previous={"1": ("running", 6.0)},
+        )
+
+        built = events.build_events(self.provider, changes)
+
+        self.assertEqual(built[0]["monthly_price"], 9.5)
+
+    def test_given_price_loader_is_used(self):
+        price_loader = PriceLoader([self.provider.id])
+        changes = ProviderChanges(added=rows(make_instance("4")))
+
+        with self.assertNumQueries(0):
+            events.build_events(self.provider, changes, price_loader)
+
+
+class PublishChangesTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = mock.Mock()
+        self.enterContext(
+            mock.patch.object(events, "_get_client", return_value=self.client)
+        )
+        self.changes = ProviderChanges(removed=["2"])
+
+    @override_settings(VPS_EVENTS_ENABLED=True)
+    def test_disabled_without_redis(self):
+        events.publish_changes(self.provider, self.changes)
+
+        self.client.publish.assert_not_called()
+
+    @override_settings(VPS_EVENTS_REDIS_URL="redis://events")
+    def test_off_by_default(self):
+        events.publish_changes(self.provider, self.changes)
+
+        self.client.publish.assert_not_called()
+
+    @override_settings(VPS_EVENTS_ENABLED=True, VPS_EVENTS_REDIS_URL="redis://events")
+    def test_events_are_published_on_the_owners_channel(self):
+        events.publish_changes(self.provider, self.changes)
+
+        channel, payload = self.client.publish.call_args.args
+        self.assertEqual(channel, events.get_channel(self.user.id))
+        self.assertEqual(json.loads(payload)[0]["id"], "2")
+
+    @override_settings(VPS_EVENTS_ENABLED=True, VPS_EVENTS_REDIS_URL="redis://events")
+    def test_redis_errors_are_logged(self):
+        self.client.publish.side_effect = redis.ConnectionError("down")
+
+        with self.assertLogs("vps.services.events", "WARNING"):
+            events.publish_changes(self.provider, self.changes)
+
+    @override_settings(VPS_EVENTS_ENABLED=True, VPS_EVENTS_REDIS_URL="redis://events")
+    def test_refetched_snapshots_publish_their_changes(self):
+        VPSAggregator.collect_all_instances(self.user)
+        self.client.publish.assert_not_called()
+        self.api.droplets[1]["status"] = "off"
+        VPSAggregator.clear_cache(self.user)
+
+        VPSAggregator.collect_all_instances(self.user)
+
+        published = json.loads(self.client.publish.call_args.args[1])
+        self.assertEqual(
+            [(event["change"], event["id"], event["status"]) for event in published],
+            [("modified", "1", "stopped")],
+        )
+
+
+@override_settings(VPS_EVENTS_ENABLED=True, VPS_EVENTS_REDIS_URL="redis://events")
+class EventStreamTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.pubsub = mock.Mock()
+        self.pubsub.get_message.side_effect = [
+            None,
+            {"data": json.dumps([{"change": "removed", "id": "2"}])},
+        ]
+        redis_client = mock.Mock()
+        redis_client.pubsub.return_value = self.pubsub
+        self.enterContext(
+            mock.patch.object(redis.Redis, "from_url", return_value=redis_client)
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_streams_through_wsgi(self):
+        response = self.client.get("/api/v1/vps/events")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertFalse(response.is_async)
+        stream = response.streaming_content
+        self.assertEqual(next(stream), b"retry: 5000\n\n")
+        self.assertEqual(next(stream), b": keep-alive\n\n")
+        self.assertEqual(
+            next(stream),
+            b'event: instances\ndata: [{"change": "removed", "id": "2"}]\n\n',
+        )
+        response.close()
+        self.pubsub.subscribe.assert_called_once_with(events.get_channel(self.user.id))
+        self.pubsub.close.assert_called_once()
+
+    async def test_streams_through_asgi(self):
+        pubsub = mock.AsyncMock()
+        pubsub.get_message.return_value = None
+        redis_client = mock.AsyncMock()
+        redis_client.pubsub = mock.Mock(return_value=pubsub)
+        await self.async_client.aforce_login(self.user)
+
+        with mock.patch.object(redis.asyncio, "from_url", return_value=redis_client):
+            response = await self.async_client.get("/api/v1/vps/events")
+            self.assertTrue(response.is_async)
+            stream = aiter(response.streaming_content)
+            self.assertEqual(await anext(stream), b"retry: 5000\n\n")
+            self.assertEqual(await anext(stream), b": keep-alive\n\n")
+            await stream.aclose()
+
+    @override_settings(VPS_EVENTS_ENABLED=False)
+    def test_off_by_default(self):
+        self.assertEqual(self.client.get("/api/v1/vps/events").status_code, 503)
+
+    def test_requires_authentication(self):
+        self.assertEqual(APIClient().get("/api/v1/vps/events").status_code, 401)
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from vps.services import fanout
+from vps.services.fanout import ProviderFanout, ProviderTimeout
+
+
+class FanoutTests(SimpleTestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        self.addCleanup(self.join_abandoned_workers)
+
+    def join_abandoned_workers(self):
+        """Let hung fetches finish, so they do not run into the next test."""
+        self.release.set()
+        for thread in threading.enumerate():
+            if thread.name.startswith("provider-fanout"):
+                thread.join(5)
+
+    def fetch(self, item):
+        """Sleep ``item`` seconds ("hang" until released, or raise an exception item)."""
+        if isinstance(item, Exception):
+            raise item
+        if item == "hang":
+            self.release.wait(5)
+            return item
+        time.sleep(item)
+        return item
+
+    def test_results_and_errors_are_collected(self):
+        error = ValueError("boom")
+
+        result = ProviderFanout(4, 1, 2).run([0, error, 0.01], self.fetch)
+
+        self.assertEqual(result.results, {0: 0, 0.01: 0.01})
+        self.assertEqual(result.errors, {error: error})
+
+    def test_providers_are_fetched_concurrently(self):
+        started = time.monotonic()
+
+        ProviderFanout(4, 1, 2).run([0.2, 0.2, 0.2], self.fetch)
+
+        self.assertLess(time.monotonic() - started, 0.45)
+
+    def test_concurrency_is_bounded(self):
+        running, peak = [0], [0]
+        lock = threading.Lock()
+
+        def fetch(item):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.02)
+            with lock:
+                running[0] -= 1
+
+        ProviderFanout(2, 1, 2).run(range(6), fetch)
+
+        self.assertEqual(peak[0], 2)
+
+    def test_results_are_yielded_in_completion_order(self):
+        completed = [
+            item
+            for item, _, _ in ProviderFanout(4, 1, 2).iter_completed(
+                [0.2, 0, 0.1], self.fetch
+            )
+        ]
+
+        self.assertEqual(completed, [0, 0.1, 0.2])
+
+    def test_slow_providers_time_out_without_holding_the_others(self):
+        started = time.monotonic()
+
+        result = ProviderFanout(4, 0.1, 2).run(["hang", 0], self.fetch)
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(result.results, {0: 0})
+        self.assertIsInstance(result.errors["hang"], ProviderTimeout)
+        self.assertIn("within 0.1s", str(result.errors["hang"]))
+
+    def test_global_deadline(self):
+        # Queued behind the hung provider: never started, so only the global deadline applies
+        result = ProviderFanout(1, 5, 0.1).run(["hang", 0], self.fetch)
+
+        self.assertEqual(set(result.errors), {"hang", 0})
+        self.assertIn("deadline of 0.1s", str(result.errors[0]))
+
+    def test_worker_threads_close_their_database_connections(self):
+        with mock.patch.object(fanout.connections, "close_all") as close_all:
+            ProviderFanout(4, 1, 2).run([0, ValueError("boom")], self.fetch)
+
+        self.assertEqual(close_all.call_count, 2)
+
+    def test_nothing_to_fetch(self):
+        result = ProviderFanout(4, 1, 2).run([], self.fetch)
+
+        self.assertEqual((result.results, result.errors), ({}, {}))
+
+
+class AsyncFanoutTests(SimpleTestCase):
+    async def fetch(self, item):
+        if isinstance(item, Exception):
+            raise item
+        await asyncio.sleep(item)
+        return item
+
+    def test_results_errors_and_timeouts(self):
+        error = ValueError("boom")
+
+        result = asyncio.run(ProviderFanout(4, 0.1, 2).arun([0, error, 10], self.fetch))
+
+        self.assertEqual(result.results, {0: 0})
+        self.assertIs(result.errors[error], error)
+        self.assertIsInstance(result.errors[10], ProviderTimeout)
+
+    def test_global_deadline(self):
+        started = time.monotonic()
+
+        result = asyncio.run(ProviderFanout(1, 5, 0.1).arun([10, 0], self.fetch))
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertIn("deadline of 0.1s", str(result.errors[0]))
@@ -0,0 +1,361 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from providers.constants import InstanceStatus
+from providers.services.batch import InstanceBatch
+from providers.tests.test_batch import make_instance
+from vps.models import (
+    InstanceCustomPrice,
+    InstanceSample,
+    ProviderSample,
+    SampleResolution,
+)
+from vps.services.history import HistoryService
+from vps.tests.base import ProviderAPITestCase
+
+START = datetime(2024, 5, 1, 10, 0, tzinfo=timezone.utc)
+
+
+class HistoryTestCase(ProviderAPITestCase):
+    def add_sample(self, bucket, instances, running, cost, provider=None, **fields):
+        return ProviderSample.objects.create(
+            provider=provider or self.provider,
+            resolution=SampleResolution.RAW,
+            bucket=bucket,
+            instances=instances,
+            running=running,
+            monthly_cost=Decimal(cost),
+            **fields,
+        )
+
+    def buckets(self, resolution):
+        return list(
+            ProviderSample.objects.filter(resolution=resolution)
+            .order_by("bucket")
+            .values_list("bucket", "samples", "instances", "monthly_cost")
+        )
+
+
+class RecordTests(HistoryTestCase):
+    def record(self, *instances, at=START):
+        return HistoryService.record(
+            self.provider, InstanceBatch.from_instances(instances), at
+        )
+
+    def test_sample_counts_and_cost_after_custom_prices(self):
+        InstanceCustomPrice.objects.create(
+            provider=self.provider, instance_id="2", monthly_price="0.10"
+        )
+        instances = InstanceBatch.from_instances(
+            [
+                make_instance("1", provider_account_id=self.provider.id),
+                make_instance(
+                    "2",
+                    status=InstanceStatus.STOPPED,
+                    provider_account_id=self.provider.id,
+                ),
+            ]
+        )
+
+        HistoryService.record(self.provider, instances, START)
+
+        sample = ProviderSample.objects.get()
+        self.assertEqual(
+            (sample.instances, sample.running, sample.stopped, sample.monthly_cost),
+            (2, 1, 1, Decimal("6.10")),
+        )
+        self.assertEqual(instances.column("monthly_price"), [6.0, 6.0])
+
+    def test_instance_states_are_per_provider(self):
+        other = self.create_provider("Other")
+        HistoryService.record(
+            other, InstanceBatch.from_instances([make_instance("1")]), START
+        )
+
+        self.assertEqual(self.record(make_instance("1")), 1)
+
+    def test_instance_samples_only_record_changes(self):
+        self.assertEqual(self.record(make_instance("1"), make_instance("2")), 2)
+        self.assertEqual(
+            self.record(
+                make_instance("1"), make_instance("2"), at=START + timedelta(minutes=5)
+            ),
+            0,
+        )
+
+        written = self.record(
+            make_instance("1", status=InstanceStatus.STOPPED),
+            at=START + timedelta(minutes=10),
+        )
+
+        self.assertEqual(written, 2)
+        changes = InstanceSample.objects.filter(
+            sampled_at=START + timedelta(minutes=10)
+        )
+        self.assertEqual(
+            dict(changes.values_list("instance_id", "status")),
+            {"1": "stopped", "2": InstanceSample.DELETED},
+        )
+        self.assertEqual(
+            self.record(
+                make_instance("1", status=InstanceStatus.STOPPED),
+                at=START + timedelta(minutes=15),
+            ),
+            0,
+        )
+
+
+class RollupTests(HistoryTestCase):
+    def test_raw_samples_fold_into_complete_hours(self):
+        self.add_sample(START + timedelta(minutes=5), 2, 2, "12.00")
+        self.add_sample(START + timedelta(minutes=35), 4, 3, "24.00")
+        self.add_sample(START + timedelta(hours=1, minutes=10), 4, 4, "24.00")
+        self.add_sample(START + timedelta(hours=2, minutes=5), 5, 5, "30.00")
+
+        HistoryService.rollup(now=START + timedelta(hours=2, minutes=30))
+
+        self.assertEqual(
+            self.buckets(SampleResolution.HOUR),
+            [
+                (START, 2, 6, Decimal("36.00")),
+                (START + timedelta(hours=1), 1, 4, Decimal("24.00")),
+            ],
+        )
+
+    def test_rerunning_recomputes_the_latest_bucket(self):
+        self.add_sample(START + timedelta(minutes=5), 2, 2, "12.00")
+        HistoryService.rollup(now=START + timedelta(hours=1, minutes=1))
+        # Written late, after the first rollup
+        self.add_sample(START + timedelta(minutes=50), 4, 4, "24.00")
+
+        HistoryService.rollup(now=START + timedelta(hours=1, minutes=6))
+        HistoryService.rollup(now=START + timedelta(hours=1, minutes=6))
+
+        self.assertEqual(
+            self.buckets(SampleResolution.HOUR), [(START, 2, 6, Decimal("36.00"))]
+        )
+
+    def test_providers_resume_from_their_own_buckets(self):
+        self.add_sample(START + timedelta(hours=2, minutes=5), 2, 2, "12.00")
+        HistoryService.rollup(now=START + timedelta(hours=3))
+        # A provider added later, with older samples
+        other = self.create_provider("Other")
+        self.add_sample(START + timedelta(minutes=5), 1, 1, "6.00", provider=other)
+
+        HistoryService.rollup(now=START + timedelta(hours=3, minutes=5))
+
+        self.assertEqual(
+            list(
+                ProviderSample.objects.filter(resolution=SampleResolution.HOUR)
+                .order_by("bucket")
+                .values_list("provider_id", "bucket")
+            ),
+            [(other.id, START), (self.provider.id, START + timedelta(hours=2))],
+        )
+
+    def test_hours_fold_into_complete_days(self):
+        self.add_sample(START, 2, 2, "12.00")
+        self.add_sample(START + timedelta(hours=5), 4, 4, "24.00")
+
+        HistoryService.rollup(now=START + timedelta(hours=6))
+        self.assertEqual(self.buckets(SampleResolution.DAY), [])
+
+        HistoryService.rollup(now=START + timedelta(days=1))
+        day = START.replace(hour=0)
+        self.assertEqual(
+            self.buckets(SampleResolution.DAY), [(day, 2, 6, Decimal("36.00"))]
+        )
+
+
+class PruneTests(HistoryTestCase):
+    @override_settings(
+        VPS_HISTORY_RAW_RETENTION_DAYS=1, VPS_HISTORY_INSTANCE_RETENTION_DAYS=2
+    )
+    def test_samples_past_retention_are_deleted(self):
+        self.add_sample(START - timedelta(days=2), 1, 1, "6.00")
+        kept = self.add_sample(START - timedelta(hours=12), 1, 1, "6.00")
+        ProviderSample.objects.create(
+            provider=self.provider,
+            resolution=SampleResolution.HOUR,
+            bucket=START - timedelta(days=2),
+        )
+        for days in [3, 1]:
+            InstanceSample.objects.create(
+                provider=self.provider,
+                instance_id="1",
+                sampled_at=START - timedelta(days=days),
+                status="running",
+            )
+
+        self.assertEqual(HistoryService.prune(now=START), 2)
+
+        self.assertEqual(
+            ProviderSample.objects.filter(resolution=SampleResolution.RAW).get(), kept
+        )
+        self.assertEqual(
+            ProviderSample.objects.filter(resolution=SampleResolution.HOUR).count(), 1
+        )
+        self.assertEqual(InstanceSample.objects.count(), 1)
+
+    @override_settings(VPS_HISTORY_INSTANCE_RETENTION_DAYS=2)
+    def test_current_instance_states_are_kept(self):
+        instances = [
+            make_instance("1", provider_account_id=self.provider.id),
+            make_instance("2"),
+        ]
+        HistoryService.record(
+            self.provider,
+            InstanceBatch.from_instances(instances),
+            START - timedelta(days=5),
+        )
+        HistoryService.record(
+            self.provider,
+            InstanceBatch.from_instances(instances[:1]),
+            START - timedelta(days=4),
+        )
+
+        self.assertEqual(HistoryService.prune(now=START), 2)
+
+        self.assertEqual(
+            list(InstanceSample.objects.values_list("instance_id", "status")),
+            [("1", "running")],
+        )
+        self.assertEqual(
+            HistoryService.record(
+                self.provider, InstanceBatch.from_instances(instances[:1]), START
+            ),
+            0,
+        )
+        history = HistoryService.get_instance_history(
+            self.provider, "1", START - timedelta(days=1), START
+        )
+        self.assertEqual([sample["status"] for sample in history], ["running"])
+
+
+class SeriesTests(HistoryTestCase):
+    def test_providers_are_averaged_per_step_and_summed(self):
+        other = self.create_provider("Second account")
+        self.add_sample(START, 2, 2, "10.00")
+        self.add_sample(START + timedelta(minutes=5), 4, 3, "20.00")
+        self.add_sample(START, 1, 0, "5.00", provider=other, currency="EUR")
+
+        series = HistoryService.get_series(
+            [self.provider, other],
+            START,
+            START + timedelta(minutes=10),
+            SampleResolution.RAW,
+        )
+
+        self.assertEqual(series["step"], 300)
+        self.assertEqual(
+            [
+                (point["instances"], point["running"], point["monthly_cost"])
+                for point in series["points"]
+            ],
+            [(3.0, 2.0, {"USD": "10.00", "EUR": "5.00"}), (4.0, 3.0, {"USD": "20.00"})],
+        )
+
+    @override_settings(VPS_HISTORY_MAX_POINTS=2)
+    def test_points_are_downsampled(self):
+        for minutes, instances in [(0, 1), (5, 2), (10, 3), (15, 4)]:
+            self.add_sample(
+                START + timedelta(minutes=minutes), instances, instances, "0"
+            )
+
+        series = HistoryService.get_series(
+            [self.provider], START, START + timedelta(minutes=20), SampleResolution.RAW
+        )
+
+        self.assertEqual([point["instances"] for point in series["points"]], [1.5, 3.5])
+
+    def test_resolution_follows_range_and_retention(self):
+        with override_settings(VPS_HISTORY_RAW_RETENTION_DAYS=7):
+            now = datetime.now(timezone.utc)
+            self.assertEqual(
+                HistoryService._choose_resolution(now - timedelta(days=1), now), "raw"
+            )
+            self.assertEqual(
+                HistoryService._choose_resolution(now - timedelta(days=14), now), "hour"
+            )
+            self.assertEqual(
+                HistoryService._choose_resolution(now - timedelta(days=365), now), "day"
+            )
+
+
+class HistoryEndpointTests(HistoryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_series(self):
+        self.add_sample(START, 2, 2, "12.00")
+
+        response = self.client.get(
+            "/api/v1/vps/history",
+            {
+                "start": START.isoformat(),
+                "end": (START + timedelta(hours=1)).isoformat(),
+                "resolution": "raw",
+            },
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["points"][0]["monthly_cost"], {"USD": "12.00"})
+
+    def test_other_users_providers_are_excluded(self):
+        foreign = self.create_provider(
+            "Foreign", user=User.objects.create(username="other")
+        )
+        self.add_sample(START, 2, 2, "12.00", provider=foreign)
+
+        response = self.client.get(
+            "/api/v1/vps/history",
+            {
+                "start": START.isoformat(),
+                "end": (START + timedelta(hours=1)).isoformat(),
+            },
+        )
+
+        self.assertEqual(response.json()["points"], [])
+
+    def test_instance_history(self):
+        for minutes, status in [(0, "running"), (30, "stopped")]:
+            InstanceSample.objects.create(
+                provider=self.provider,
+                instance_id="1",
+                sampled_at=START + timedelta(minutes=minutes),
+                status=status,
+            )
+
+        response = self.client.get(
+            "/api/v1/vps/history",
+            {
+                "provider_id": self.provider.id,
+                "instance_id": "1",
+                "start": (START + timedelta(minutes=10)).isoformat(),
+                "end": (START + timedelta(hours=1)).isoformat(),
+            },
+        )
+
+        self.assertEqual(
+            [change["status"] for change in response.json()["changes"]],
+            ["running", "stopped"],
+        )
+
+    def test_invalid_parameters_are_rejected(self):
+        for params, attr in [
+            ({"start": "2024-05-02T00:00:00Z", "end": "2024-05-01T00:00:00Z"}, "start"),
+            ({"start": "yesterday"}, "start"),
+            ({"resolution": "minute"}, "resolution"),
+            ({"instance_id": "1"}, "provider_id"),
+        ]:
+            with self.subTest(params=params):
+                response = self.client.get("/api/v1/vps/history", params)
+
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.json()["errors"][0]["attr"], attr)
@@ -0,0 +1,141 @@
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from providers.constants import SyncStatus
+from providers.services.transport import CircuitBreaker, get_circuit_breaker
+from vps.services.aggregator import VPSAggregator
+from vps.services.sync import ProviderSyncService
+from vps.tests.base import ProviderAPITestCase
+
+
+@override_settings(
+    VPS_CACHE_FRESH_TTL=0, VPS_CACHE_STALE_TTL=0, PROVIDER_CIRCUIT_THRESHOLD=1
+)
+class FailingProviderTests(ProviderAPITestCase):
+    def test_last_good_instances_are_served_with_a_stale_error(self):
+        fetched = VPSAggregator.collect_all_instances(self.user).instances
+        self.api.fail_with = 500
+
+        result = VPSAggregator.collect_all_instances(self.user)
+
+        self.assertEqual(result.instances.column("id"), ["1", "2", "3"])
+        self.assertEqual(len(result.errors), 1)
+        self.assertTrue(result.errors[0]["stale"])
+        self.assertEqual(result.errors[0]["provider_id"], self.provider.id)
+        self.assertIn("fetched_at", result.errors[0])
+        self.assertEqual(result.instances.fetched_at, fetched.fetched_at)
+
+    def test_open_circuit_fails_fast_with_the_last_error(self):
+        VPSAggregator.collect_all_instances(self.user)
+        self.api.fail_with = 500
+        VPSAggregator.collect_all_instances(self.user)
+        requests = len(self.api.requests)
+
+        result = VPSAggregator.collect_all_instances(self.user)
+
+        self.assertEqual(len(self.api.requests), requests)
+        self.assertIn(
+            "500 Internal Server Error (retrying in", result.errors[0]["error"]
+        )
+        self.assertEqual(len(result.instances), 3)
+
+    def test_without_last_good_instances_only_the_error_is_reported(self):
+        self.api.fail_with = 500
+
+        result = VPSAggregator.collect_all_instances(self.user)
+
+        self.assertEqual(len(result.instances), 0)
+        self.assertNotIn("stale", result.errors[0])
+
+    def test_stored_snapshot_is_the_last_resort(self):
+        ProviderSyncService.sync(self.provider)
+        cache.clear()
+        self.provider.refresh_from_db()
+        self.api.fail_with = 500
+
+        result = VPSAggregator.collect_all_instances(self.user)
+
+        self.assertEqual(len(result.instances), 3)
+        self.assertTrue(result.errors[0]["stale"])
+
+    def test_rejected_credentials_fail_fast(self):
+        self.api.fail_with = 401
+        VPSAggregator.collect_all_instances(self.user)
+        requests = len(self.api.requests)
+
+        result = VPSAggregator.collect_all_instances(self.user)
+
+        self.assertEqual(len(self.api.requests), requests)
+        self.assertIn("401 Unauthorized (retrying in", result.errors[0]["error"])
+
+    def test_failed_fetches_record_the_circuit_state(self):
+        self.api.fail_with = 500
+        VPSAggregator.collect_all_instances(self.user)
+        self.provider.refresh_from_db()
+        self.assertEqual(self.provider.last_sync_status, SyncStatus.CIRCUIT_OPEN)
+
+        breaker = get_circuit_breaker(self.provider.id)
+        cache.set(breaker.open_key, {**cache.get(breaker.open_key), "until": 0})
+        self.api.fail_with = None
+        VPSAggregator.collect_all_instances(self.user)
+        self.provider.refresh_from_db()
+        self.assertEqual(self.provider.last_sync_status, SyncStatus.SUCCESS)
+        self.assertIsNone(self.provider.last_sync_at)
+
+    def test_recovery_closes_the_circuit(self):
+        self.api.fail_with = 500
+        VPSAggregator.collect_all_instances(self.user)
+        breaker = get_circuit_breaker(self.provider.id)
+        cache.set(breaker.open_key, {**cache.get(breaker.open_key), "until": 0})
+        self.api.fail_with = None
+
+        result = VPSAggregator.collect_all_instances(self.user)
+
+        self.assertEqual(result.errors, [])
+        self.assertEqual(breaker.get_state(), CircuitBreaker.CLOSED)
+
+
+@override_settings(PROVIDER_CIRCUIT_THRESHOLD=1)
+class CircuitStateFieldTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def circuit_state(self) -> str:
+        response = self.client.get("/api/v1/providers")
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"][0]["circuit_state"]
+
+    def test_providers_report_their_circuit(self):
+        self.assertEqual(self.circuit_state(), CircuitBreaker.CLOSED)
+
+        self.api.fail_with = 500
+        VPSAggregator.collect_all_instances(self.user)
+
+        self.assertEqual(self.circuit_state(), CircuitBreaker.OPEN)
+
+    def test_new_credentials_close_the_circuit(self):
+        self.api.fail_with = 401
+        VPSAggregator.collect_all_instances(self.user)
+        self.assertEqual(self.circuit_state(), CircuitBreaker.OPEN)
+
+        response = self.client.patch(
+            f"/api/v1/providers/{self.provider.id}",
+            {"provider_type": "digitalocean", "credentials": {"token": "rotated"}},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.circuit_state(), CircuitBreaker.CLOSED)
+
+    def test_other_updates_keep_the_circuit(self):
+        self.api.fail_with = 401
+        VPSAggregator.collect_all_instances(self.user)
+
+        self.client.patch(
+            f"/api/v1/providers/{self.provider.id}", {"name": "Renamed"}, format="json"
+        )
+
+        self.assertEqual(self.circuit_state(), CircuitBreaker.OPEN)
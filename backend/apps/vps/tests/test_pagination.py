@@ -0,0 +1,120 @@
+from urllib.parse import parse_qs, urlsplit
+
+from rest_framework.test import APIClient
+
+from providers.tests.mocks import droplet
+from vps.models import InstanceCustomPrice
+from vps.services.aggregator import VPSAggregator
+from vps.tests.base import ProviderAPITestCase
+
+
+class InstancePaginationTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.api.droplets = {i: droplet(i) for i in range(1, 8)}
+        self.api.droplets[5]["memory"] = 4096
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, url, params=None):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    @staticmethod
+    def ids(page) -> list:
+        return [item["id"] for item in page["results"]]
+
+    def test_unpaginated_requests_get_everything(self):
+        page = self.get("/api/v1/vps")
+
+        self.assertEqual(len(page["results"]), 7)
+        self.assertNotIn("next", page)
+
+    def test_cursor_pages_cover_the_ordering_once(self):
+        page = self.get("/api/v1/vps", {"limit": 3, "ordering": "-ram_mb"})
+        ids = self.ids(page)
+        while page["next"]:
+            page = self.get(page["next"])
+            ids += self.ids(page)
+
+        self.assertEqual(ids, ["5", "1", "2", "3", "4", "6", "7"])
+        self.assertEqual(page["count"], 7)
+
+    def test_previous_links_walk_back(self):
+        first = self.get("/api/v1/vps", {"limit": 3})
+        second = self.get(first["next"])
+        third = self.get(second["next"])
+
+        self.assertIsNone(first["previous"])
+        self.assertIsNone(third["next"])
+        self.assertEqual(self.ids(self.get(third["previous"])), self.ids(second))
+        self.assertEqual(self.ids(self.get(second["previous"])), self.ids(first))
+
+    def test_cursor_survives_instances_added_before_it(self):
+        first = self.get("/api/v1/vps", {"limit": 3, "ordering": "name"})
+        self.api.droplets[0] = droplet(0)
+        VPSAggregator.clear_cache(self.user)
+
+        second = self.get(first["next"])
+
+        self.assertEqual(self.ids(first), ["1", "2", "3"])
+        self.assertEqual(self.ids(second), ["4", "5", "6"])
+
+    def test_cursor_pages_over_custom_prices(self):
+        self.api.droplets[3] = droplet(3, price=6.1)
+        InstanceCustomPrice.objects.create(
+            provider=self.provider, instance_id="2", monthly_price="6.10"
+        )
+        InstanceCustomPrice.objects.create(
+            provider=self.provider, instance_id="6", monthly_price="4.10"
+        )
+
+        page = self.get("/api/v1/vps", {"limit": 2, "ordering": "-monthly_price"})
+        ids = self.ids(page)
+        while page["next"]:
+            page = self.get(page["next"])
+            ids += self.ids(page)
+
+        self.assertEqual(ids, ["2", "3", "1", "4", "5", "7", "6"])
+        page = self.get("/api/v1/vps", {"monthly_price__gte": "6.1"})
+        self.assertEqual(self.ids(page), ["2", "3"])
+
+    def test_filters_apply_before_paging(self):
+        page = self.get("/api/v1/vps", {"limit": 2, "ram_mb__lt": 2048})
+
+        self.assertEqual(page["count"], 6)
+        self.assertEqual(self.ids(self.get(page["next"])), ["3", "4"])
+
+    def test_limit_offset_pages(self):
+        page = self.get("/api/v1/vps", {"limit": 2, "offset": 2})
+
+        self.assertEqual(self.ids(page), ["3", "4"])
+        self.assertEqual(self.ids(self.get(page["next"])), ["5", "6"])
+        self.assertNotIn("offset=", page["previous"])
+        self.assertEqual(self.ids(self.get(page["previous"])), ["1", "2"])
+
+    def test_invalid_cursors_are_not_found(self):
+        page = self.get("/api/v1/vps", {"limit": 3, "ordering": "name"})
+        cursor = parse_qs(urlsplit(page["next"]).query)["cursor"][0]
+
+        self.assertEqual(
+            self.client.get(
+                "/api/v1/vps", {"cursor": cursor, "ordering": "name"}
+            ).status_code,
+            200,
+        )
+        for params in [
+            {"cursor": "garbage"},
+            # Issued for another ordering
+            {"cursor": cursor, "ordering": "-name"},
+        ]:
+            with self.subTest(params=params):
+                self.assertEqual(
+                    self.client.get("/api/v1/vps", params).status_code, 404
+                )
+
+    def test_streamed_listings_cannot_be_paginated(self):
+        response = self.client.get("/api/v1/vps", {"format": "ndjson", "limit": 3})
+
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from providers.services.batch import InstanceBatch
+from providers.tests.test_batch import make_instance
+from vps.models import InstanceCustomPrice
+from vps.services.price_loader import PriceLoader
+from vps.tests.base import ProviderAPITestCase
+
+
+class PriceLoaderTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.other = self.create_provider("Other")
+        InstanceCustomPrice.objects.create(
+            provider=self.provider, instance_id="1", monthly_price="4.10"
+        )
+        InstanceCustomPrice.objects.create(
+            provider=self.other,
+            instance_id="9",
+            instance_ip="10.0.0.2",
+            monthly_price="2.50",
+        )
+
+    def make_batch(self, provider_id: int) -> InstanceBatch:
+        batch = InstanceBatch.from_instances(
+            [
+                make_instance("1", provider_account_id=provider_id),
+                make_instance("2", ipv4="10.0.0.2", provider_account_id=provider_id),
+            ]
+        )
+        batch.version = "v1"
+        return batch
+
+    def test_custom_prices_stay_decimal(self):
+        batch = PriceLoader([self.provider.id]).apply_prices(
+            self.make_batch(self.provider.id)
+        )
+
+        self.assertEqual(batch.column("monthly_price"), [Decimal("4.10"), 6.0])
+        self.assertIsInstance(batch.column("monthly_price")[0], Decimal)
+
+    def test_prices_only_apply_to_their_provider(self):
+        price_loader = PriceLoader([self.provider.id, self.other.id])
+
+        self.assertEqual(
+            price_loader.apply_prices(self.make_batch(self.other.id)).column(
+                "monthly_price"
+            ),
+            [6.0, Decimal("2.50")],
+        )
+
+    def test_versions_only_depend_on_the_providers_prices(self):
+        before = PriceLoader([self.provider.id, self.other.id])
+        InstanceCustomPrice.objects.create(
+            provider=self.other, instance_id="8", monthly_price=1
+        )
+        after = PriceLoader([self.provider.id, self.other.id])
+
+        self.assertEqual(
+            before.get_version("v1", self.provider.id),
+            after.get_version("v1", self.provider.id),
+        )
+        self.assertNotEqual(
+            before.get_version("v1", self.other.id),
+            after.get_version("v1", self.other.id),
+        )
+        self.assertNotEqual(before.fingerprint, after.fingerprint)
+
+    def test_providers_without_prices_keep_their_version(self):
+        third = self.create_provider("Third")
+
+        self.assertEqual(PriceLoader([third.id]).get_version("v1", third.id), "v1")
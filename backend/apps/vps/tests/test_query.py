@@ -0,0 +1,148 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from django.http import QueryDict
+from django.test import SimpleTestCase
+from rest_framework.exceptions import ValidationError
+from rest_framework.test import APIClient
+
+from providers.constants import InstanceStatus
+from providers.services.batch import InstanceBatch
+from providers.tests.test_batch import make_instance
+from vps.services.query import InstanceQuery, get_index
+from vps.tests.base import ProviderAPITestCase
+
+
+def make_fleet() -> InstanceBatch:
+    return InstanceBatch.from_instances(
+        [
+            make_instance("1", name="web-1", ram_mb=2048, monthly_price=12.0),
+            make_instance(
+                "2", name="Web-2", status=InstanceStatus.STOPPED, ram_mb=1024
+            ),
+            make_instance(
+                "3", name="db-1", ram_mb=8192, region="nyc1", monthly_price=None
+            ),
+            make_instance(
+                "4",
+                name="cache",
+                ipv4="192.168.1.4",
+                ram_mb=2048,
+                created_at=datetime(2024, 6, 1, tzinfo=timezone.utc),
+            ),
+        ]
+    )
+
+
+class InstanceQueryTests(SimpleTestCase):
+    def query(self, params: str) -> list:
+        """IDs of the instances matching a query string, in order."""
+        return (
+            InstanceQuery.from_params(QueryDict(params))
+            .apply(make_fleet())
+            .column("id")
+        )
+
+    def test_no_parameters_return_everything(self):
+        self.assertEqual(self.query(""), ["1", "2", "3", "4"])
+
+    def test_exact_filters_accept_several_values(self):
+        self.assertEqual(self.query("status=stopped"), ["2"])
+        self.assertEqual(self.query("region=nyc1,fra1&ram_mb=2048"), ["1", "4"])
+        self.assertEqual(
+            self.query("region=nyc1&region=fra1&status=running"), ["1", "3", "4"]
+        )
+
+    def test_ranges(self):
+        self.assertEqual(self.query("ram_mb__gte=2048"), ["1", "3", "4"])
+        self.assertEqual(self.query("ram_mb__gt=2048"), ["3"])
+        self.assertEqual(self.query("ram_mb__lt=2048&ram_mb__gte=1024"), ["2"])
+        self.assertEqual(self.query("created_at__gte=2024-03-01"), ["4"])
+
+    def test_missing_values_never_match_ranges(self):
+        self.assertEqual(self.query("monthly_price__lte=100"), ["1", "2", "4"])
+
+    def test_custom_prices_compare_exactly_with_provider_prices(self):
+        fleet = make_fleet()
+        fleet.column("monthly_price")[1] = Decimal("12.00")
+        fleet.column("monthly_price")[3] = Decimal("4.10")
+
+        def query(params: str) -> list:
+            return (
+                InstanceQuery.from_params(QueryDict(params)).apply(fleet).column("id")
+            )
+
+        self.assertEqual(
+            query("monthly_price__gte=12&monthly_price__lte=12.0"), ["1", "2"]
+        )
+        self.assertEqual(query("monthly_price__lte=4.1"), ["4"])
+        self.assertEqual(query("ordering=monthly_price,-name"), ["4", "2", "1", "3"])
+
+    def test_search_is_a_case_insensitive_name_or_ip_prefix(self):
+        self.assertEqual(self.query("search=WEB"), ["1", "2"])
+        self.assertEqual(self.query("search=192.168."), ["4"])
+        self.assertEqual(self.query("search=eb"), [])
+
+    def test_ordering(self):
+        self.assertEqual(self.query("ordering=-ram_mb,name"), ["3", "4", "1", "2"])
+        self.assertEqual(self.query("ordering=name"), ["4", "3", "1", "2"])
+
+    def test_missing_values_sort_last_either_way(self):
+        self.assertEqual(self.query("ordering=monthly_price")[-1], "3")
+        self.assertEqual(self.query("ordering=-monthly_price")[-1], "3")
+
+    def test_invalid_parameters_are_rejected(self):
+        with self.assertRaises(ValidationError) as raised:
+            InstanceQuery.from_params(
+                QueryDict(
+                    "ram_mb=lots&created_at__gte=someday&monthly_price__lt=nan&ordering=raw_data"
+                )
+            )
+
+        self.assertEqual(
+            set(raised.exception.detail),
+            {"ram_mb", "created_at__gte", "monthly_price__lt", "ordering"},
+        )
+
+    def test_total_ordering_breaks_ties_by_instance(self):
+        query = InstanceQuery.from_params(
+            QueryDict("ordering=ram_mb")
+        ).with_total_ordering()
+
+        self.assertEqual(
+            query.ordering,
+            [("ram_mb", False), ("provider_account_id", False), ("id", False)],
+        )
+
+    def test_indexes_are_shared_by_versioned_batches_only(self):
+        batch = make_fleet()
+        self.assertIsNot(get_index(batch), get_index(batch))
+
+        same_snapshot = make_fleet()
+        batch.version = same_snapshot.version = "snapshot"
+        self.assertIs(get_index(batch), get_index(same_snapshot))
+
+
+class ListFilteringTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.api.droplets[2]["status"] = "off"
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_filters_apply_to_the_listing(self):
+        response = self.client.get(
+            "/api/v1/vps", {"status": "running", "ordering": "-name"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item["id"] for item in response.json()["results"]], ["3", "1"]
+        )
+        self.assertEqual(response.json()["count"], 2)
+
+    def test_invalid_filters_are_rejected(self):
+        response = self.client.get("/api/v1/vps", {"ordering": "password"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["errors"][0]["attr"], "ordering")
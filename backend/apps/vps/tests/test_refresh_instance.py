@@ -0,0 +1,100 @@
+from django.contrib.auth.models import User
+from rest_framework.test import APIClient
+
+from providers.tests.mocks import droplet
+from vps.models import InstanceCustomPrice, SyncedInstance
+from vps.services.aggregator import VPSAggregator
+from vps.services.sync import ProviderSyncService
+from vps.tests.base import ProviderAPITestCase
+
+
+class RefreshInstanceTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.listing = self.client.get("/api/v1/vps")
+        self.api.requests.clear()
+
+    def refresh(self, instance_id, provider_id=None):
+        return self.client.post(
+            f"/api/v1/vps/{provider_id or self.provider.id}/{instance_id}/refresh"
+        )
+
+    def listed_statuses(self) -> dict:
+        results = self.client.get("/api/v1/vps").json()["results"]
+        return {item["id"]: item["status"] for item in results}
+
+    def test_refreshed_instance_is_patched_into_the_cache(self):
+        self.api.droplets[1]["status"] = "off"
+
+        response = self.refresh("1")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["instance"]["status"], "stopped")
+        self.assertEqual(
+            self.listed_statuses(), {"1": "stopped", "2": "running", "3": "running"}
+        )
+        self.assertEqual(
+            [request.url.path for request in self.api.requests], ["/v2/droplets/1"]
+        )
+
+    def test_patched_snapshot_gets_a_new_version(self):
+        self.api.droplets[1]["status"] = "off"
+        self.refresh("1")
+
+        response = self.client.get(
+            "/api/v1/vps", headers={"If-None-Match": self.listing["ETag"]}
+        )
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_instances_are_added(self):
+        self.api.droplets[4] = droplet(4)
+
+        self.assertEqual(self.refresh("4").status_code, 200)
+        self.assertIn("4", self.listed_statuses())
+
+    def test_instances_the_provider_no_longer_has_are_removed(self):
+        del self.api.droplets[2]
+
+        response = self.refresh("2")
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(set(self.listed_statuses()), {"1", "3"})
+
+    def test_custom_price_applies(self):
+        InstanceCustomPrice.objects.create(
+            provider=self.provider, instance_id="1", monthly_price="9.50"
+        )
+
+        self.assertEqual(self.refresh("1").json()["instance"]["monthly_price"], 9.5)
+
+    def test_change_log_sees_the_patch(self):
+        version = VPSAggregator.collect_changes(self.user).version
+        self.api.droplets[1]["status"] = "off"
+        self.refresh("1")
+
+        changes = VPSAggregator.collect_changes(self.user, version)
+
+        self.assertFalse(changes.reset)
+        self.assertEqual(changes.modified.column("status"), ["stopped"])
+
+    def test_stored_snapshot_is_patched(self):
+        ProviderSyncService.sync(self.provider)
+        self.api.droplets[1]["status"] = "off"
+
+        self.refresh("1")
+
+        self.assertEqual(
+            SyncedInstance.objects.get(provider=self.provider, instance_id="1").status,
+            "stopped",
+        )
+
+    def test_other_users_providers_are_not_found(self):
+        foreign = self.create_provider(
+            "Foreign", user=User.objects.create(username="other")
+        )
+
+        self.assertEqual(self.refresh("1", provider_id=foreign.id).status_code, 404)
+        self.assertEqual(self.api.requests, [])
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone as django_timezone
+from rest_framework.renderers import JSONRenderer
+
+from providers.services.batch import InstanceBatch
+from vps.renderers import ORJSONRenderer
+from vps.serializers import VPSInstanceSerializer, instance_row_encoder
+from vps.tests.test_codecs import make_batch
+
+
+class InstanceRowEncoderTests(SimpleTestCase):
+    def assertMatchesSerializer(self, batch):
+        expected = VPSInstanceSerializer(batch.to_instances(), many=True).data
+        self.assertEqual(
+            instance_row_encoder.encode(batch), [dict(row) for row in expected]
+        )
+
+    def test_output_matches_the_serializer(self):
+        self.assertMatchesSerializer(make_batch())
+
+    def test_aware_datetimes_are_converted_to_the_current_time_zone(self):
+        batch = make_batch()
+        batch.columns["created_at"][0] = datetime(
+            2024, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=5))
+        )
+
+        with override_settings(TIME_ZONE="Asia/Tashkent"), django_timezone.override(
+            "Asia/Tashkent"
+        ):
+            self.assertMatchesSerializer(batch)
+        self.assertMatchesSerializer(batch)
+        self.assertEqual(
+            instance_row_encoder.encode(batch)[0]["created_at"], "2024-01-01 22:04:05"
+        )
+
+    def test_missing_and_string_datetimes(self):
+        batch = make_batch()
+        batch.columns["created_at"] = [None, "2024-02-03T04:05:06Z"]
+
+        self.assertMatchesSerializer(batch)
+
+    @override_settings(REST_FRAMEWORK={"DATETIME_FORMAT": "iso-8601"})
+    def test_iso_datetime_format(self):
+        self.assertMatchesSerializer(make_batch())
+        self.assertEqual(
+            instance_row_encoder.encode(make_batch())[0]["created_at"],
+            "2024-01-02T03:04:05Z",
+        )
+
+    def test_empty_batch(self):
+        self.assertEqual(instance_row_encoder.encode(InstanceBatch()), [])
+
+
+class ORJSONRendererTests(SimpleTestCase):
+    def test_output_matches_the_json_renderer(self):
+        data = {
+            "results": instance_row_encoder.encode(make_batch()),
+            "separators": "  ",
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indented_output_falls_back_to_the_json_renderer(self):
+        data = {"name": "web-1"}
+
+        self.assertEqual(
+            ORJSONRenderer().render(data, "application/json; indent=2"),
+            JSONRenderer().render(data, "application/json; indent=2"),
+        )
@@ -0,0 +1,187 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from providers.services.errors import (
+    ProviderAuthError,
+    ProviderRateLimited,
+    dump_error,
+    load_error,
+)
+from providers.tests.mocks import LOCMEM_CACHES
+from vps.services.aggregator import VPSAggregator
+from vps.services.single_flight import SingleFlight, SingleFlightTimeout
+from vps.tests.base import ProviderAPITestCase
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+@mock.patch.object(SingleFlight, "POLL_INTERVAL", 0.01)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.result = None
+        self.leader_started = threading.Event()
+        self.leader_may_finish = threading.Event()
+        self.waiting = set()
+
+    def lead(self, value):
+        """A leader's work: publishes ``value`` once allowed to finish."""
+        self.leader_started.set()
+        self.leader_may_finish.wait(5)
+        if isinstance(value, Exception):
+            raise value
+        self.result = value
+        return value
+
+    def get_result(self):
+        """What followers poll: the published result, if any."""
+        self.waiting.add(threading.get_ident())
+        return self.result
+
+    def run_concurrently(self, value, followers=3):
+        """Start a leader, then followers; returns all outcomes."""
+        with ThreadPoolExecutor(max_workers=followers + 1) as executor:
+            leader = executor.submit(self.run_flight, value)
+            self.leader_started.wait(5)
+            others = [
+                executor.submit(self.run_flight, "follower ran")
+                for _ in range(followers)
+            ]
+            while len(self.waiting) < followers:
+                time.sleep(0.01)
+            self.leader_may_finish.set()
+            return [
+                future.exception() or future.result() for future in [leader, *others]
+            ]
+
+    def run_flight(self, value):
+        return SingleFlight("flight", timeout=5).run(
+            lambda: self.lead(value), self.get_result
+        )
+
+    def test_followers_get_the_leaders_result(self):
+        self.assertEqual(self.run_concurrently("fetched"), ["fetched"] * 4)
+
+    def test_followers_reraise_the_leaders_error_type(self):
+        error = ProviderRateLimited(
+            "Too many requests", status_code=429, retry_after=30
+        )
+        outcomes = self.run_concurrently(error)
+
+        self.assertIs(outcomes[0], error)
+        for outcome in outcomes[1:]:
+            self.assertIsInstance(outcome, ProviderRateLimited)
+            self.assertEqual(str(outcome), "Too many requests")
+            self.assertEqual((outcome.status_code, outcome.retry_after), (429, 30))
+
+    def test_lock_is_released_after_the_leader_fails(self):
+        self.leader_may_finish.set()
+        with self.assertRaises(ValueError):
+            self.run_flight(ValueError("boom"))
+
+        self.assertTrue(SingleFlight("flight", timeout=5).acquire())
+
+    def test_follower_gives_up_after_timeout(self):
+        SingleFlight("flight", timeout=5).acquire()
+
+        with self.assertRaises(SingleFlightTimeout):
+            SingleFlight("flight", timeout=0.05).run(lambda: "leader", lambda: None)
+
+    def test_release_keeps_a_lock_taken_over_by_another_leader(self):
+        first = SingleFlight("flight", timeout=5)
+        first.acquire()
+        cache.delete("flight")  # expired
+        second = SingleFlight("flight", timeout=5)
+        second.acquire()
+
+        first.release()
+        self.assertFalse(SingleFlight("flight", timeout=5).acquire())
+
+    def test_caller_after_the_leader_released_takes_its_result(self):
+        self.result = "fetched"
+
+        outcome = SingleFlight("flight", timeout=5).run(
+            lambda: "fetched again", self.get_result
+        )
+
+        self.assertEqual(outcome, "fetched")
+        self.assertTrue(SingleFlight("flight", timeout=5).acquire())
+
+    def test_wait_acquire_waits_for_the_holder(self):
+        holder = SingleFlight("flight", timeout=5)
+        holder.acquire()
+        threading.Timer(0.05, holder.release).start()
+
+        self.assertTrue(SingleFlight("flight", timeout=5).wait_acquire())
+
+    def test_wait_acquire_gives_up_after_timeout(self):
+        SingleFlight("flight", timeout=5).acquire()
+
+        self.assertFalse(SingleFlight("flight", timeout=0.05).wait_acquire())
+
+    def test_async_followers_get_the_leaders_result(self):
+        calls = []
+
+        async def lead():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            self.result = "fetched"
+            return self.result
+
+        async def run_all():
+            return await asyncio.gather(
+                *(
+                    SingleFlight("flight", timeout=5).arun(lead, lambda: self.result)
+                    for _ in range(4)
+                )
+            )
+
+        self.assertEqual(asyncio.run(run_all()), ["fetched"] * 4)
+        self.assertEqual(calls, [1])
+
+
+class ErrorSerializationTests(SimpleTestCase):
+    def test_provider_errors_round_trip(self):
+        error = load_error(dump_error(ProviderAuthError("Bad token", status_code=401)))
+
+        self.assertIsInstance(error, ProviderAuthError)
+        self.assertEqual(
+            (str(error), error.status_code, error.retry_after), ("Bad token", 401, None)
+        )
+
+    def test_other_errors_become_provider_errors(self):
+        error = load_error(dump_error(KeyError("droplets")))
+
+        self.assertEqual(type(error).__name__, "ProviderError")
+        self.assertEqual(str(error), "'droplets'")
+
+
+@mock.patch.object(SingleFlight, "POLL_INTERVAL", 0.01)
+class ProviderFetchCoalescingTests(ProviderAPITestCase):
+    def test_concurrent_cache_misses_fetch_the_provider_once(self):
+        listing = threading.Event()
+        release = threading.Event()
+        list_page = self.api._list
+
+        def slow_list(request):
+            listing.set()
+            release.wait(5)
+            return list_page(request)
+
+        self.api._list = slow_list
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(VPSAggregator._get_provider_instances, self.provider)
+                for _ in range(4)
+            ]
+            listing.wait(5)
+            release.set()
+            results = [future.result() for future in futures]
+
+        self.assertEqual(len(self.api.listing_requests), 1)
+        self.assertEqual([len(result) for result in results], [3] * 4)
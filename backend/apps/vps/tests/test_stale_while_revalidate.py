@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.test import override_settings
+
+from providers.services.errors import ProviderUnavailable
+from vps.services.aggregator import VPSAggregator
+from vps.tests.base import ProviderAPITestCase
+
+
+def statuses(result):
+    return dict(zip(result.instances.column("id"), result.instances.column("status")))
+
+
+class FreshCacheTests(ProviderAPITestCase):
+    def test_fresh_snapshot_is_served_from_cache(self):
+        first = VPSAggregator.collect_all_instances(self.user)
+        second = VPSAggregator.collect_all_instances(self.user)
+
+        self.assertEqual(len(self.api.listing_requests), 1)
+        self.assertEqual(statuses(first), statuses(second))
+        self.assertEqual(first.versions, second.versions)
+        self.assertEqual(self.background_jobs, [])
+
+    async def test_async_collection_shares_the_cache(self):
+        first = await VPSAggregator.acollect_all_instances(self.user)
+        second = await VPSAggregator.acollect_all_instances(self.user)
+
+        self.assertEqual(len(self.api.listing_requests), 1)
+        self.assertEqual(statuses(first), statuses(second))
+
+
+@override_settings(VPS_CACHE_FRESH_TTL=0)
+class StaleCacheTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        VPSAggregator.collect_all_instances(self.user)
+        self.api.droplets[1]["status"] = "off"
+
+    def test_stale_snapshot_is_served_while_refreshing_in_background(self):
+        result = VPSAggregator.collect_all_instances(self.user)
+
+        self.assertEqual(statuses(result)["1"], "running")
+        self.assertEqual(len(self.api.listing_requests), 1)
+        self.assertEqual(len(self.background_jobs), 1)
+
+        self.run_background_jobs()
+        self.assertEqual(len(self.api.listing_requests), 2)
+        result = VPSAggregator.collect_all_instances(self.user)
+        self.assertEqual(statuses(result)["1"], "stopped")
+
+    def test_one_background_refresh_per_provider_at_a_time(self):
+        VPSAggregator.collect_all_instances(self.user)
+        VPSAggregator.collect_all_instances(self.user)
+
+        self.assertEqual(len(self.background_jobs), 1)
+
+    def test_failed_background_refresh_keeps_serving_stale_snapshot(self):
+        self.api.fail_with = 500
+        VPSAggregator.collect_all_instances(self.user)
+        [error] = self.run_background_jobs()
+
+        self.assertIsInstance(error, ProviderUnavailable)
+        result = VPSAggregator.collect_all_instances(self.user)
+        self.assertEqual(statuses(result)["1"], "running")
+        self.assertEqual(result.errors, [])
+
+    def test_failed_background_refresh_is_published_to_waiting_requests(self):
+        self.api.fail_with = 500
+        VPSAggregator.collect_all_instances(self.user)
+        self.run_background_jobs()
+
+        flight = VPSAggregator._get_single_flight(self.provider.id)
+        self.assertEqual(cache.get(flight.error_key)["type"], "ProviderUnavailable")
+        # The lock is released, so the next refresh can start
+        self.assertTrue(flight.acquire())
+
+
+@override_settings(VPS_CACHE_FRESH_TTL=0, VPS_CACHE_STALE_TTL=0)
+class ExpiredCacheTests(ProviderAPITestCase):
+    def test_expired_snapshot_is_refetched_before_answering(self):
+        VPSAggregator.collect_all_instances(self.user)
+        self.api.droplets[1]["status"] = "off"
+
+        result = VPSAggregator.collect_all_instances(self.user)
+
+        self.assertEqual(statuses(result)["1"], "stopped")
+        self.assertEqual(len(self.api.listing_requests), 2)
+        self.assertEqual(self.background_jobs, [])
@@ -0,0 +1,87 @@
+import json
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework.test import APIClient
+
+from vps.renderers import NDJSONRenderer
+from vps.services.aggregator import VPSAggregator
+from vps.tests.base import ProviderAPITestCase
+from vps.views import VPSViewSet
+
+
+class StreamedListTests(ProviderAPITestCase):
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def stream(self, params=None, **headers):
+        response = self.client.get(
+            "/api/v1/vps", {"format": "ndjson", **(params or {})}, **headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        return response
+
+    @staticmethod
+    def lines(response) -> list:
+        return [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+
+    def test_lines_are_the_listed_instances(self):
+        listed = self.client.get("/api/v1/vps").json()["results"]
+
+        self.assertEqual(self.lines(self.stream()), listed)
+
+    def test_accept_header_selects_the_stream(self):
+        response = self.client.get("/api/v1/vps", HTTP_ACCEPT="application/x-ndjson")
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(self.lines(response)), 3)
+
+    def test_filters_apply(self):
+        self.api.droplets[2]["status"] = "off"
+
+        lines = self.lines(self.stream({"status": "running", "ordering": "-name"}))
+
+        self.assertEqual([line["id"] for line in lines], ["3", "1"])
+
+    @mock.patch.object(VPSViewSet, "stream_chunk_size", 2)
+    def test_instances_are_written_in_chunks(self):
+        chunks = list(self.stream().streaming_content)
+
+        self.assertEqual([chunk.count(b"\n") for chunk in chunks], [2, 1])
+
+    def test_failed_providers_are_error_lines(self):
+        self.api.fail_with = 500
+
+        lines = self.lines(self.stream())
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(lines[0]["error"]["provider_id"], self.provider.id)
+
+    @override_settings(VPS_CACHE_FRESH_TTL=0, VPS_CACHE_STALE_TTL=0)
+    def test_failed_providers_are_followed_by_their_last_good_instances(self):
+        VPSAggregator.collect_all_instances(self.user)
+        self.api.fail_with = 500
+
+        lines = self.lines(self.stream())
+
+        self.assertIn("error", lines[0])
+        self.assertEqual([line["id"] for line in lines[1:]], ["1", "2", "3"])
+
+
+class NDJSONRendererTests(SimpleTestCase):
+    def test_documents_are_rendered_one_per_line(self):
+        renderer = NDJSONRenderer()
+
+        self.assertEqual(
+            renderer.render_lines([{"a": 1}, {"b": "☃"}]),
+            b'{"a":1}\n{"b":"\xe2\x98\x83"}\n',
+        )
+        self.assertEqual(renderer.render({"error": "boom"}), b'{"error":"boom"}\n')
+        self.assertEqual(renderer.render(None), b"")
@@ -0,0 +1,129 @@
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+
+from conf.celery import app
+from providers.constants import SyncStatus
+from vps.models import ProviderSample, SyncedInstance
+from vps.services.aggregator import VPSAggregator
+from vps.tasks import sync_due_providers, sync_provider
+from vps.tests.base import ProviderAPITestCase
+
+
+class SyncTaskTestCase(ProviderAPITestCase):
+    """Celery tasks run eagerly, in the test's thread and transaction."""
+
+    def setUp(self):
+        super().setUp()
+        # Settings are namespaced: CELERY_TASK_ALWAYS_EAGER
+        always_eager = app.conf.task_always_eager
+        app.conf.update(CELERY_TASK_ALWAYS_EAGER=True)
+        self.addCleanup(app.conf.update, CELERY_TASK_ALWAYS_EAGER=always_eager)
+
+    def stored_statuses(self, provider=None):
+        rows = SyncedInstance.objects.filter(provider=provider or self.provider)
+        return dict(rows.values_list("instance_id", "status"))
+
+
+class SyncProviderTaskTests(SyncTaskTestCase):
+    def test_sync_persists_the_snapshot(self):
+        sync_provider.delay(self.provider.id)
+
+        self.provider.refresh_from_db()
+        self.assertEqual(
+            self.stored_statuses(), {"1": "running", "2": "running", "3": "running"}
+        )
+        self.assertEqual(self.provider.last_sync_status, SyncStatus.SUCCESS)
+        self.assertIsNotNone(self.provider.last_snapshot_at)
+        self.assertEqual(self.provider.last_sync_at, self.provider.last_snapshot_at)
+
+    def test_resync_updates_and_removes_instances(self):
+        sync_provider.delay(self.provider.id)
+        self.api.droplets[1]["status"] = "off"
+        del self.api.droplets[3]
+
+        sync_provider.delay(self.provider.id)
+
+        self.assertEqual(self.stored_statuses(), {"1": "stopped", "2": "running"})
+
+    def test_sync_records_history(self):
+        sync_provider.delay(self.provider.id)
+
+        sample = ProviderSample.objects.get(provider=self.provider)
+        self.assertEqual(
+            (sample.instances, sample.running, sample.monthly_cost), (3, 3, 18)
+        )
+
+    def test_failed_sync_records_failure_and_keeps_the_snapshot(self):
+        sync_provider.delay(self.provider.id)
+        self.provider.refresh_from_db()
+        snapshot_at = self.provider.last_snapshot_at
+        self.api.fail_with = 500
+
+        sync_provider.delay(self.provider.id)
+
+        self.provider.refresh_from_db()
+        self.assertEqual(self.provider.last_sync_status, SyncStatus.FAILED)
+        self.assertGreater(self.provider.last_sync_at, snapshot_at)
+        self.assertEqual(self.provider.last_snapshot_at, snapshot_at)
+        self.assertEqual(len(self.stored_statuses()), 3)
+
+    @override_settings(PROVIDER_CIRCUIT_THRESHOLD=1)
+    def test_failed_sync_records_an_open_circuit(self):
+        self.api.fail_with = 500
+        sync_provider.delay(self.provider.id)
+        requests = len(self.api.requests)
+
+        sync_provider.delay(self.provider.id)
+
+        self.provider.refresh_from_db()
+        self.assertEqual(self.provider.last_sync_status, SyncStatus.CIRCUIT_OPEN)
+        # Failed fast, without calling the provider
+        self.assertEqual(len(self.api.requests), requests)
+
+    def test_inactive_provider_is_skipped(self):
+        self.provider.is_active = False
+        self.provider.save()
+
+        sync_provider.delay(self.provider.id)
+
+        self.assertEqual(self.api.requests, [])
+        self.assertFalse(SyncedInstance.objects.exists())
+
+
+class SyncDueProvidersTaskTests(SyncTaskTestCase):
+    def test_syncs_only_active_providers_whose_interval_elapsed(self):
+        recent = self.create_provider("Recently synced")
+        recent.last_sync_at = timezone.now() - timedelta(seconds=60)
+        recent.sync_interval = 300
+        recent.save()
+        overdue = self.create_provider("Overdue")
+        overdue.last_sync_at = timezone.now() - timedelta(seconds=600)
+        overdue.sync_interval = 300
+        overdue.save()
+        inactive = self.create_provider("Inactive")
+        inactive.is_active = False
+        inactive.save()
+
+        sync_due_providers.delay()
+
+        synced = SyncedInstance.objects.values_list("provider_id", flat=True).distinct()
+        self.assertEqual(set(synced), {self.provider.id, overdue.id})
+
+
+@override_settings(VPS_READ_FROM_STORE=True)
+class StoredSnapshotTests(SyncTaskTestCase):
+    def test_synced_provider_is_served_from_the_database(self):
+        sync_provider.delay(self.provider.id)
+        requests = len(self.api.requests)
+        SyncedInstance.objects.filter(instance_id="1").update(status="stopped")
+
+        result = VPSAggregator.collect_all_instances(self.user)
+
+        statuses = dict(
+            zip(result.instances.column("id"), result.instances.column("status"))
+        )
+        self.assertEqual(statuses, {"1": "stopped", "2": "running", "3": "running"})
+        self.assertTrue(result.versions[self.provider.id].startswith("store:"))
+        self.assertEqual(len(self.api.requests), requests)
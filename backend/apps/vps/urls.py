@@ -1,9 +1,14 @@
+from django.urls import path
 from rest_framework.routers import SimpleRouter
 
-from .views import VPSViewSet, InstanceCustomPriceViewSet
+from .views import VPSListView, VPSEventStreamView, VPSViewSet, InstanceCustomPriceViewSet
 
 router = SimpleRouter(trailing_slash=False)
 router.register(r"vps", VPSViewSet, basename="vps")
 router.register(r"instance-prices", InstanceCustomPriceViewSet, basename="instance-price")
 
-urlpatterns = router.urls
+urlpatterns = [
+    # Ahead of the router's vps-list route, which it serves asynchronously
+    path("vps", VPSListView.as_view()),
+    path("vps/events", VPSEventStreamView.as_view(), name="vps-events"),
+] + router.urls
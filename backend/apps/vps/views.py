@@ -1,35 +1,84 @@
-from datetime import datetime
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse, StreamingHttpResponse
+from django.utils import timezone as django_timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
+from django.views import View
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.request import Request
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.settings import api_settings
 
-from vps.models import InstanceCustomPrice
-from .serializers import VPSInstanceSerializer, InstanceCustomPriceSerializer
+from providers.models import Provider
+from providers.services.errors import ProviderNotFound
+from vps.models import InstanceCustomPrice, SampleResolution
+from .authentication import QueryParamJWTAuthentication
+from .pagination import InstancePagination
+from .renderers import NDJSONRenderer, ORJSONRenderer
+from .serializers import (
+    InstanceCustomPriceSerializer,
+    VPSInstanceSerializer,
+    instance_row_encoder,
+)
+from .services import events
 from .services.aggregator import VPSAggregator
+from .services.history import HistoryService
+from .services.query import InstanceQuery
 
 
 class VPSViewSet(viewsets.ViewSet):
     """ViewSet for aggregated VPS instances from all providers."""
 
     permission_classes = [IsAuthenticated]
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer, NDJSONRenderer]
+    # Precompiled encoder for instance rows; None uses VPSInstanceSerializer
+    instance_encoder = instance_row_encoder
+    # Instances encoded per chunk of a streamed listing
+    stream_chunk_size = 500
 
     def list(self, request):
-        """Get all VPS instances from all active providers."""
-        try:
-            instances = VPSAggregator.get_all_instances(request.user)
+        """
+        Get all VPS instances from all active providers.
 
-            # Apply filters if provided
-            instances = self._apply_filters(instances, request)
+        Supports the filters, ``search`` and ``ordering`` parameters of
+        ``InstanceQuery``, and ``cursor``/``limit``/``offset`` pagination.
 
-            serializer = VPSInstanceSerializer(instances, many=True)
-            return Response(
-                {
-                    "results": serializer.data,
-                    "count": len(serializer.data),
-                    "fetched_at": datetime.utcnow().isoformat(),
-                }
-            )
+        Responses carry an ETag derived from the served snapshots; a
+        matching ``If-None-Match`` gets ``304 Not Modified`` before any
+        instance is loaded.
+
+        ``?format=ndjson`` (or ``Accept: application/x-ndjson``) streams one
+        instance per line instead, provider by provider as each completes.
+        """
+        query = InstanceQuery.from_params(request.query_params)
+        paginator = InstancePagination.from_request(request, query)
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            if paginator is not None:
+                raise ValidationError({"format": "Streamed listings cannot be paginated"})
+            return self._stream_instances(request, query)
+
+        try:
+            snapshot = VPSAggregator.get_snapshot(request.user)
+            etag = self._get_etag(request, *snapshot) if snapshot else None
+            if self._is_not_modified(request, etag):
+                return self._not_modified(etag)
+
+            result = VPSAggregator.collect_all_instances(request.user)
+            response = Response(self._build_list_payload(result, query, paginator))
+            if not result.errors:
+                self._set_etag(request, response, result.instances)
+            return response
 
         except Exception as e:
             return Response(
@@ -47,23 +96,27 @@ class VPSViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        query = InstanceQuery.from_params(request.query_params)
+        paginator = InstancePagination.from_request(request, query)
         try:
+            snapshot = VPSAggregator.get_snapshot(request.user, int(provider_id))
+            etag = self._get_etag(request, *snapshot) if snapshot else None
+            if self._is_not_modified(request, etag):
+                return self._not_modified(etag)
+
             instances = VPSAggregator.get_provider_instances(
                 int(provider_id),
                 request.user,
             )
 
-            # Apply filters if provided
-            instances = self._apply_filters(instances, request)
-
-            serializer = VPSInstanceSerializer(instances, many=True)
-            return Response(
+            response = Response(
                 {
-                    "results": serializer.data,
-                    "count": len(serializer.data),
-                    "fetched_at": datetime.utcnow().isoformat(),
+                    **self._build_page(instances, query, paginator),
+                    "fetched_at": self._format_fetched_at(instances.fetched_at),
                 }
             )
+            self._set_etag(request, response, instances)
+            return response
 
         except ValueError as e:
             return Response(
@@ -76,35 +129,442 @@ class VPSViewSet(viewsets.ViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    @action(detail=False, methods=["get"], url_path="changes")
+    def changes(self, request):
+        """
+        Get the instances added, modified and removed since ``?since=``.
+
+        ``since`` is the ``version`` of a previous response. Without it, or
+        when it is too old to diff against, the response has ``reset`` set
+        and ``added`` holds every instance.
+        """
+        try:
+            change_set = VPSAggregator.collect_changes(
+                request.user, request.query_params.get("since")
+            )
+            return Response(
+                {
+                    "version": change_set.version,
+                    "reset": change_set.reset,
+                    "added": self._serialize_instances(change_set.added),
+                    "modified": self._serialize_instances(change_set.modified),
+                    "removed": change_set.removed,
+                    "errors": change_set.errors,
+                }
+            )
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["get"], url_path="billing")
+    def billing(self, request):
+        """
+        Get monthly cost totals, counts and averages of the user's instances.
+
+        Grouped by currency (``totals``), provider, provider account, region
+        and plan, after custom prices. Amounts are exact decimal strings.
+        """
+        try:
+            result = VPSAggregator.collect_billing(request.user)
+            return Response(
+                {
+                    **result.summary,
+                    "errors": result.errors,
+                    "fetched_at": self._format_fetched_at(result.fetched_at),
+                }
+            )
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(detail=False, methods=["get"], url_path="history")
+    def history(self, request):
+        """
+        Get fleet size and monthly cost over time.
+
+        ``start``/``end`` (ISO 8601, default: the last 7 days), optional
+        ``provider_id`` and ``resolution`` (raw, hour or day; chosen from
+        the range by default). With ``provider_id`` and ``instance_id``,
+        returns that instance's status and price changes instead.
+        """
+        params = request.query_params
+        end = self._parse_history_time(params, "end", django_timezone.now())
+        start = self._parse_history_time(params, "start", end - timedelta(days=7))
+        if start >= end:
+            raise ValidationError({"start": "Must be before end"})
+
+        resolution = params.get("resolution") or None
+        if resolution and resolution not in SampleResolution.values:
+            raise ValidationError({"resolution": f"Must be one of {', '.join(SampleResolution.values)}"})
+
+        provider_id = self._parse_provider_id(params.get("provider_id"))
+        providers = Provider.objects.filter(user=request.user)
+        if provider_id is not None:
+            providers = providers.filter(id=provider_id)
+
+        instance_id = params.get("instance_id")
+        if instance_id:
+            provider = providers.first() if provider_id is not None else None
+            if provider is None:
+                raise ValidationError({"provider_id": "Required with instance_id"})
+            return Response(
+                {
+                    "provider_id": provider.id,
+                    "instance_id": instance_id,
+                    "changes": HistoryService.get_instance_history(provider, instance_id, start, end),
+                }
+            )
+
+        return Response(HistoryService.get_series(list(providers), start, end, resolution))
+
+    @staticmethod
+    def _parse_history_time(params, name: str, default: datetime) -> datetime:
+        """Aware datetime from a query parameter."""
+        value = params.get(name)
+        if not value:
+            return default
+        try:
+            parsed = parse_datetime(value)
+        except ValueError:
+            parsed = None
+        if parsed is None:
+            raise ValidationError({name: f"Invalid datetime: {value}"})
+        if django_timezone.is_naive(parsed):
+            parsed = django_timezone.make_aware(parsed)
+        return parsed
+
     @action(detail=False, methods=["post"], url_path="refresh")
     def refresh(self, request):
-        """Refresh cache for all providers."""
+        """
+        Invalidate the cached instances of the user's providers.
+
+        Pass ``warm=true`` (body or query string) to refetch them in the
+        background right away, and ``provider_id`` to limit it to one provider.
+        """
+        warm = str(request.data.get("warm", request.query_params.get("warm", "")))
+        provider_id = self._parse_provider_id(
+            request.data.get("provider_id", request.query_params.get("provider_id"))
+        )
+        try:
+            warming = VPSAggregator.clear_cache(
+                request.user,
+                provider_id=provider_id,
+                warm=warm.lower() in ["true", "1", "t"],
+            )
+            return Response(
+                {"status": "success", "message": "Cache cleared", "warming": warming}
+            )
+        except Exception as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path=r"(?P<provider_id>\d+)/(?P<instance_id>[^/]+)/refresh",
+    )
+    def refresh_instance(self, request, provider_id=None, instance_id=None):
+        """
+        Refetch one instance from its provider and patch it into the cache.
+
+        Cheaper than ``refresh`` after e.g. a reboot or resize: one upstream
+        call instead of relisting the account. Instances the provider no
+        longer has are removed from the snapshot and answered with 404.
+        """
         try:
-            VPSAggregator.clear_cache()
-            return Response({"status": "success", "message": "Cache cleared"})
+            instances = VPSAggregator.refresh_instance(int(provider_id), instance_id, request.user)
+            return Response(
+                {
+                    "instance": self._serialize_instances(instances)[0],
+                    "fetched_at": self._format_fetched_at(instances.fetched_at),
+                }
+            )
+        except (ValueError, ProviderNotFound) as e:
+            return Response(
+                {"error": str(e)},
+                status=status.HTTP_404_NOT_FOUND,
+            )
         except Exception as e:
             return Response(
                 {"error": str(e)},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+    @action(detail=False, methods=["get"], url_path="metrics", permission_classes=[IsAdminUser])
+    def metrics(self, request):
+        """Provider fetch counters (leader vs coalesced vs background)."""
+        return Response(VPSAggregator.get_fetch_metrics())
+
+    @staticmethod
+    def _parse_provider_id(value) -> int | None:
+        """Provider ID from a request parameter (None if not given)."""
+        if value in (None, ""):
+            return None
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({"provider_id": f"Invalid provider ID: {value}"})
+
+    def _stream_instances(self, request, query: InstanceQuery) -> StreamingHttpResponse:
+        """
+        Stream instances as NDJSON while providers complete.
+
+        Filters and search apply as usual; ordering applies within each
+        provider's chunk of lines. Failed providers are reported as
+        ``{"error": {...}}`` lines, followed by their last known good
+        instances if there are any.
+        """
+        renderer = request.accepted_renderer
+
+        def lines():
+            for instances, error in VPSAggregator.iter_instances(request.user):
+                if error is not None:
+                    yield renderer.render_lines([{"error": error}])
+                if instances is None:
+                    continue
+
+                instances = query.apply(instances)
+                for start in range(0, len(instances), self.stream_chunk_size):
+                    chunk = instances.take(
+                        range(start, min(start + self.stream_chunk_size, len(instances)))
+                    )
+                    yield renderer.render_lines(self._serialize_instances(chunk))
+
+        return StreamingHttpResponse(lines(), content_type=renderer.media_type)
+
+    @classmethod
+    def _build_list_payload(
+        cls, result, query: InstanceQuery, paginator: InstancePagination | None = None
+    ) -> dict:
+        """Filter and serialize an aggregation result for the list response."""
+        return {
+            **cls._build_page(result.instances, query, paginator),
+            "errors": result.errors,
+            "fetched_at": cls._format_fetched_at(result.instances.fetched_at),
+        }
+
+    @classmethod
+    def _build_page(
+        cls, instances, query: InstanceQuery, paginator: InstancePagination | None
+    ) -> dict:
+        """Filter, order and (if requested) paginate instances."""
+        if paginator is None:
+            # Apply filters if provided
+            instances = query.apply(instances)
+            return {
+                "results": cls._serialize_instances(instances),
+                "count": len(instances),
+            }
+
+        page = paginator.paginate(paginator.query.apply(instances))
+        return {
+            "results": cls._serialize_instances(page),
+            "count": paginator.count,
+            **paginator.get_links(),
+        }
+
+    @staticmethod
+    def _format_fetched_at(fetched_at: float | None) -> str:
+        """UTC time the served data was fetched (now if unknown)."""
+        if fetched_at is None:
+            return datetime.utcnow().isoformat()
+        return datetime.fromtimestamp(fetched_at, timezone.utc).replace(tzinfo=None).isoformat()
+
+    @staticmethod
+    def _get_etag(request, version: str | None, fetched_at: float | None) -> str | None:
+        """
+        Strong ETag of a response: the snapshot version and fetch time,
+        plus everything of the request that shapes the body.
+        """
+        if version is None or fetched_at is None:
+            return None
+        renderer = getattr(request, "accepted_renderer", None)
+        digest = hashlib.sha1(
+            "|".join(
+                [
+                    version,
+                    repr(fetched_at),
+                    request.build_absolute_uri(),
+                    renderer.format if renderer else "json",
+                ]
+            ).encode()
+        ).hexdigest()
+        return f'"{digest}"'
+
+    @staticmethod
+    def _is_not_modified(request, etag: str | None) -> bool:
+        """Check ``If-None-Match`` against an ETag (weak comparison)."""
+        header = request.META.get("HTTP_IF_NONE_MATCH")
+        if not etag or not header:
+            return False
+        etags = parse_etags(header)
+        return etags == ["*"] or etag in [tag.removeprefix("W/") for tag in etags]
+
     @staticmethod
-    def _apply_filters(instances, request):
-        """Apply query parameter filters to instances."""
-        provider_type = request.query_params.get("provider_type")
-        status_filter = request.query_params.get("status")
-        region_filter = request.query_params.get("region")
+    def _not_modified(etag: str) -> Response:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    @classmethod
+    def _set_etag(cls, request, response, instances) -> None:
+        """Tag a response built from ``instances``, if they are versioned."""
+        etag = cls._get_etag(request, instances.version, instances.fetched_at)
+        if etag:
+            response["ETag"] = etag
 
-        if provider_type:
-            instances = [i for i in instances if i.provider_type == provider_type]
+    @classmethod
+    def _serialize_instances(cls, instances) -> list:
+        """Represent instances with the view's row encoder, or the serializer."""
+        if cls.instance_encoder is not None:
+            return cls.instance_encoder.encode(instances)
+        return VPSInstanceSerializer(instances.rows(), many=True).data
 
-        if status_filter:
-            instances = [i for i in instances if i.status == status_filter]
 
-        if region_filter:
-            instances = [i for i in instances if i.region == region_filter]
+class VPSListView(View):
+    """
+    ``GET /vps``, natively async for JSON listings.
 
-        return instances
+    Served through ``conf.asgi``, provider APIs are awaited on the event
+    loop instead of blocking a worker thread per request. Other formats
+    (NDJSON, the browsable API), and requests the viewset rejects, are
+    handed to ``VPSViewSet.list`` so responses match it exactly.
+    """
+
+    viewset_list = staticmethod(VPSViewSet.as_view({"get": "list"}))
+
+    async def get(self, request):
+        """Get all VPS instances from all active providers."""
+        drf_request = Request(
+            request,
+            authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+        )
+        try:
+            user = await sync_to_async(lambda: drf_request.user)()
+            renderer, _ = DefaultContentNegotiation().select_renderer(
+                drf_request, [renderer() for renderer in VPSViewSet.renderer_classes]
+            )
+            query = InstanceQuery.from_params(drf_request.query_params)
+            paginator = InstancePagination.from_request(drf_request, query)
+        except APIException:
+            return await self._get_from_viewset(request)
+        if not user.is_authenticated or not isinstance(renderer, ORJSONRenderer):
+            return await self._get_from_viewset(request)
+
+        try:
+            snapshot = await sync_to_async(VPSAggregator.get_snapshot)(user)
+            drf_request.accepted_renderer = renderer
+            etag = VPSViewSet._get_etag(drf_request, *snapshot) if snapshot else None
+            if VPSViewSet._is_not_modified(request, etag):
+                response = HttpResponseNotModified()
+                response["ETag"] = etag
+                return response
+
+            result = await VPSAggregator.acollect_all_instances(user)
+            payload = VPSViewSet._build_list_payload(result, query, paginator)
+            response = HttpResponse(renderer.render(payload), content_type=renderer.media_type)
+            response["Vary"] = "Accept"
+            if not result.errors:
+                VPSViewSet._set_etag(drf_request, response, result.instances)
+            return response
+        except Exception as e:
+            return JsonResponse(
+                {"error": str(e)},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    async def _get_from_viewset(self, request):
+        """
+        Answer through ``VPSViewSet.list``. Under ASGI, streamed bodies are
+        iterated off the event loop rather than read whole first.
+        """
+        response = await sync_to_async(self.viewset_list)(request)
+        if isinstance(request, ASGIRequest) and response.streaming and not response.is_async:
+            response.streaming_content = _iterate_async(response.streaming_content)
+        return response
+
+
+async def _iterate_async(iterator):
+    """Iterate a synchronous iterator without blocking the event loop."""
+    done = object()
+    while (item := await sync_to_async(next)(iterator, done)) is not done:
+        yield item
+
+
+class VPSEventStreamView(View):
+    """
+    Server-Sent Events feed of the user's instance changes.
+
+    Relays the events ``VPSAggregator`` publishes whenever it caches a
+    provider snapshot (instances added or removed, status or price
+    changes), one ``instances`` event per snapshot. The access token may
+    be passed as ``?token=`` since ``EventSource`` cannot set headers.
+
+    Off unless ``VPS_EVENTS_ENABLED`` is set. Meant for ``conf.asgi``,
+    where an open stream is a coroutine; under WSGI it works, but every
+    open dashboard holds a worker.
+    """
+
+    # Milliseconds browsers wait before reconnecting
+    retry = 5000
+
+    async def get(self, request):
+        """Stream instance events until the client disconnects."""
+        drf_request = Request(
+            request,
+            authenticators=[QueryParamJWTAuthentication()]
+            + [auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+        )
+        try:
+            user = await sync_to_async(lambda: drf_request.user)()
+        except APIException as e:
+            return JsonResponse({"error": str(e.detail)}, status=e.status_code)
+
+        if not user.is_authenticated:
+            return JsonResponse(
+                {"error": "Authentication credentials were not provided."},
+                status=status.HTTP_401_UNAUTHORIZED,
+            )
+
+        if not events.is_enabled():
+            return JsonResponse(
+                {"error": "Live events are not enabled"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+
+        # An endless async iterator would be read whole under WSGI
+        if isinstance(request, ASGIRequest):
+            stream = self._astream(user.id)
+        else:
+            stream = self._stream(user.id)
+        response = StreamingHttpResponse(stream, content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        # Keep reverse proxies from buffering the stream
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    def _stream(self, user_id: int):
+        """SSE messages, with comment lines as keep-alives."""
+        yield f"retry: {self.retry}\n\n"
+        for batch in events.subscribe(user_id, settings.VPS_EVENTS_KEEPALIVE):
+            yield self._format(batch)
+
+    async def _astream(self, user_id: int):
+        """Asyncio variant of ``_stream``."""
+        yield f"retry: {self.retry}\n\n"
+        async for batch in events.asubscribe(user_id, settings.VPS_EVENTS_KEEPALIVE):
+            yield self._format(batch)
+
+    @staticmethod
+    def _format(batch: list | None) -> str:
+        """SSE message of a batch of events (a keep-alive for None)."""
+        if batch is None:
+            return ": keep-alive\n\n"
+        return f"event: instances\ndata: {json.dumps(batch)}\n\n"
 
 
 class InstanceCustomPriceViewSet(viewsets.ModelViewSet):
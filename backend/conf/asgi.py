@@ -3,13 +3,18 @@ ASGI config for conf project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+This is the application deployed (``entrypoint.sh`` runs it on Gunicorn
+with Uvicorn workers): the ``/vps`` listing awaits provider APIs on the
+event loop, and each open ``/vps/events`` stream is a coroutine rather
+than a worker thread.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
 
 import os
 
-os.environ.setdefault("DJANGO_SETTINGS_MODULE", "conf.settings.dev")
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "conf.settings")
 
 from django.core.asgi import get_asgi_application
 
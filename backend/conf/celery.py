@@ -0,0 +1,18 @@
+"""
+Celery application for background jobs (provider sync, cache warm-up).
+
+Run a worker and the periodic scheduler with::
+
+    celery -A conf worker -l info
+    celery -A conf beat -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "conf.settings")
+
+app = Celery("conf")
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
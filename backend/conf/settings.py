@@ -77,6 +77,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "conf.wsgi.application"
+ASGI_APPLICATION = "conf.asgi.application"
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -232,11 +233,24 @@ CACHE_OTP_KEY_PREFIX = "otp"
 SILENCED_SYSTEM_CHECKS = ["auth.E003"]
 
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
-CELERY_RESULT_BACKEND = "redis://localhost:6379/0"
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/0")
 CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_RESULT_SERIALIZER = "json"
 CELERY_TASK_SERIALIZER = "json"
 CELERY_TIMEZONE = os.getenv("TIME_ZONE")
+# Run tasks inline (no broker needed), e.g. for tests or single-process setups
+CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_TASK_ALWAYS_EAGER", "False").lower() in ["true", "1", "t"]
+CELERY_TASK_EAGER_PROPAGATES = True
+CELERY_BEAT_SCHEDULE = {
+    "sync-due-providers": {
+        "task": "vps.tasks.sync_due_providers",
+        "schedule": float(os.getenv("VPS_SYNC_TICK", "60")),
+    },
+    "maintain-history": {
+        "task": "vps.tasks.maintain_history",
+        "schedule": 3600.0,
+    },
+}
 
 LOGIN_URL = "admin/"
 LOGIN_REDIRECT_URL = "/"
@@ -260,3 +274,88 @@ BACKEND_DOMAIN = os.getenv("BACKEND_DOMAIN", "v1")
 
 # Credential Encryption
 ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", "change-this-32-char-key-prod!")
+# Comma-separated keys for rotation: the first encrypts, all decrypt (empty:
+# ENCRYPTION_KEY only). After adding a new first key, run
+# `manage.py rotate_credentials`.
+ENCRYPTION_KEYS = [key.strip() for key in os.getenv("ENCRYPTION_KEYS", "").split(",") if key.strip()]
+
+# VPS aggregation
+VPS_FANOUT_MAX_WORKERS = int(os.getenv("VPS_FANOUT_MAX_WORKERS", "8"))
+VPS_PROVIDER_TIMEOUT = float(os.getenv("VPS_PROVIDER_TIMEOUT", "20"))
+VPS_REQUEST_TIMEOUT = float(os.getenv("VPS_REQUEST_TIMEOUT", "25"))
+# Cached provider snapshots are fresh for FRESH_TTL, then served stale
+# (while refreshing in the background) until STALE_TTL
+VPS_CACHE_FRESH_TTL = int(os.getenv("VPS_CACHE_FRESH_TTL", "300"))
+VPS_CACHE_STALE_TTL = int(os.getenv("VPS_CACHE_STALE_TTL", "3600"))
+# Snapshots are kept until LAST_GOOD_TTL to be served (marked stale) while
+# their provider fails
+VPS_CACHE_LAST_GOOD_TTL = int(os.getenv("VPS_CACHE_LAST_GOOD_TTL", "86400"))
+# Encoding of cached instance lists: json, columnar or msgpack (needs the
+# msgpack package); compression: zlib or none
+VPS_CACHE_CODEC = os.getenv("VPS_CACHE_CODEC", "columnar")
+VPS_CACHE_COMPRESSION = os.getenv("VPS_CACHE_COMPRESSION", "zlib")
+VPS_BACKGROUND_WORKERS = int(os.getenv("VPS_BACKGROUND_WORKERS", "4"))
+# Snapshots whose query indexes (filters, search, ordering) are kept per process
+VPS_QUERY_INDEX_CACHE_SIZE = int(os.getenv("VPS_QUERY_INDEX_CACHE_SIZE", "64"))
+# Snapshot changes kept per provider for /vps/changes, and for how long (seconds)
+VPS_CHANGE_LOG_SIZE = int(os.getenv("VPS_CHANGE_LOG_SIZE", "50"))
+VPS_CHANGE_LOG_TTL = int(os.getenv("VPS_CHANGE_LOG_TTL", "86400"))
+# Live instance events (/vps/events). Off by default: each open stream
+# holds a worker unless the app is served through conf.asgi
+VPS_EVENTS_ENABLED = os.getenv("VPS_EVENTS_ENABLED", "False").lower() in ["true", "1", "t"]
+# Redis for live instance events; empty disables them
+VPS_EVENTS_REDIS_URL = os.getenv("VPS_EVENTS_REDIS_URL", os.getenv("CACHE_BACKEND_URL", ""))
+VPS_EVENTS_KEEPALIVE = float(os.getenv("VPS_EVENTS_KEEPALIVE", "15"))
+# Background sync: default per-provider interval, and whether /vps reads
+# synced providers from the local instance store instead of provider APIs
+VPS_SYNC_INTERVAL = int(os.getenv("VPS_SYNC_INTERVAL", "300"))
+VPS_READ_FROM_STORE = os.getenv("VPS_READ_FROM_STORE", "True").lower() in ["true", "1", "t"]
+# History recorded on each sync: retention per resolution, and the most
+# points a range query returns
+VPS_HISTORY_RAW_RETENTION_DAYS = int(os.getenv("VPS_HISTORY_RAW_RETENTION_DAYS", "7"))
+VPS_HISTORY_HOURLY_RETENTION_DAYS = int(os.getenv("VPS_HISTORY_HOURLY_RETENTION_DAYS", "90"))
+VPS_HISTORY_DAILY_RETENTION_DAYS = int(os.getenv("VPS_HISTORY_DAILY_RETENTION_DAYS", "1825"))
+VPS_HISTORY_INSTANCE_RETENTION_DAYS = int(os.getenv("VPS_HISTORY_INSTANCE_RETENTION_DAYS", "365"))
+VPS_HISTORY_MAX_POINTS = int(os.getenv("VPS_HISTORY_MAX_POINTS", "500"))
+
+# Provider API HTTP connection pool
+PROVIDER_HTTP2 = os.getenv("PROVIDER_HTTP2", "True").lower() in ["true", "1", "t"]
+PROVIDER_HTTP_TIMEOUT = float(os.getenv("PROVIDER_HTTP_TIMEOUT", "10"))
+PROVIDER_HTTP_MAX_CONNECTIONS = int(os.getenv("PROVIDER_HTTP_MAX_CONNECTIONS", "100"))
+PROVIDER_HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("PROVIDER_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+PROVIDER_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("PROVIDER_HTTP_KEEPALIVE_EXPIRY", "30"))
+PROVIDER_PAGE_CONCURRENCY = int(os.getenv("PROVIDER_PAGE_CONCURRENCY", "4"))
+PROVIDER_TOKEN_REFRESH_MARGIN = int(os.getenv("PROVIDER_TOKEN_REFRESH_MARGIN", "60"))
+# Request budget of each provider account, shared by all workers, as
+# comma-separated type:requests per second:burst
+PROVIDER_RATE_LIMITS = {
+    provider_type.strip(): (float(rate), int(burst))
+    for provider_type, rate, burst in (
+        item.split(":")
+        for item in os.getenv("PROVIDER_RATE_LIMITS", "digitalocean:4:20,contabo:2:10").split(",")
+        if item.strip()
+    )
+}
+# Retries of throttled or failed provider calls: attempts after the first,
+# and base and maximum delay (seconds) of the jittered exponential backoff
+PROVIDER_RETRY_ATTEMPTS = int(os.getenv("PROVIDER_RETRY_ATTEMPTS", "2"))
+PROVIDER_RETRY_BACKOFF = float(os.getenv("PROVIDER_RETRY_BACKOFF", "0.5"))
+PROVIDER_RETRY_MAX_DELAY = float(os.getenv("PROVIDER_RETRY_MAX_DELAY", "5"))
+# Consecutive failed calls that open an account's circuit, and seconds
+# calls then fail fast with the last error before a probe is let through
+# (doubling each time a probe fails, up to MAX_COOLDOWN)
+PROVIDER_CIRCUIT_THRESHOLD = int(os.getenv("PROVIDER_CIRCUIT_THRESHOLD", "5"))
+PROVIDER_CIRCUIT_COOLDOWN = float(os.getenv("PROVIDER_CIRCUIT_COOLDOWN", "60"))
+PROVIDER_CIRCUIT_MAX_COOLDOWN = float(os.getenv("PROVIDER_CIRCUIT_MAX_COOLDOWN", "900"))
+# Send If-None-Match/If-Modified-Since for listing pages and reuse the
+# cached page when a provider answers 304 Not Modified
+PROVIDER_CONDITIONAL_REQUESTS = os.getenv("PROVIDER_CONDITIONAL_REQUESTS", "True").lower() in ["true", "1", "t"]
+# Seconds decrypted provider credentials are kept in process memory
+PROVIDER_CREDENTIALS_CACHE_TTL = int(os.getenv("PROVIDER_CREDENTIALS_CACHE_TTL", "60"))
+# Keep each instance's full provider API response in VPSInstance.raw_data
+# (debugging only; it multiplies per-instance memory). Otherwise responses
+# are trimmed to the fields the clients read while being decoded
+PROVIDER_KEEP_RAW_DATA = os.getenv("PROVIDER_KEEP_RAW_DATA", "False").lower() in ["true", "1", "t"]
+# Listing pages with a Content-Length above this many bytes are decoded
+# while they download instead of being buffered whole first
+PROVIDER_STREAM_PARSE_MIN_BYTES = int(os.getenv("PROVIDER_STREAM_PARSE_MIN_BYTES", str(4 * 1024 * 1024)))
@@ -12,6 +12,6 @@ echo "Running migrations..."
 python manage.py makemigrations
 python manage.py migrate
 
-# Start Gunicorn server
+# Start Gunicorn server, serving the ASGI app through Uvicorn workers
 echo "Starting Gunicorn..."
-exec gunicorn conf.wsgi:application --env DJANGO_SETTINGS_MODULE=conf.settings --bind 0.0.0.0:8000 --workers 4
+exec gunicorn conf.asgi:application -k uvicorn_worker.UvicornWorker --env DJANGO_SETTINGS_MODULE=conf.settings --bind 0.0.0.0:8000 --workers 4
@@ -1,5 +1,5 @@
 import { useState } from 'react';
-import { useVPS, useRefreshVPS } from '../../lib/hooks/useVPS';
+import { useVPS, useRefreshVPS, useVPSEvents } from '../../lib/hooks/useVPS';
 import { VPSFilters } from '../../types/vps';
 import { VPSTable } from './VPSTable';
 import { VPSFiltersComponent } from './VPSFilters';
@@ -11,6 +11,7 @@ export function VPSDashboard() {
   const instances = data?.instances ?? [];
   const fetchedAt = data?.fetchedAt;
   const { mutate: refresh, isPending: isRefreshing } = useRefreshVPS();
+  useVPSEvents();
 
   const stats = {
     total: instances.length,
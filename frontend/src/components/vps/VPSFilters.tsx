@@ -8,6 +8,17 @@ interface VPSFiltersProps {
 export function VPSFiltersComponent({ filters, onFiltersChange }: VPSFiltersProps) {
   return (
     <div className="card-premium p-6 flex gap-4 flex-wrap items-end">
+      <div>
+        <label className="block text-sm font-semibold text-slate-700 mb-2">Search</label>
+        <input
+          type="text"
+          placeholder="Name or IP prefix"
+          value={filters.search || ''}
+          onChange={(e) => onFiltersChange({ ...filters, search: e.target.value || undefined })}
+          className="input-premium"
+        />
+      </div>
+
       <div>
         <label className="block text-sm font-semibold text-slate-700 mb-2">Provider</label>
         <select
@@ -48,6 +59,27 @@ export function VPSFiltersComponent({ filters, onFiltersChange }: VPSFiltersProp
         />
       </div>
 
+      <div>
+        <label className="block text-sm font-semibold text-slate-700 mb-2">Min RAM</label>
+        <select
+          value={filters.ram_mb__gte ?? ''}
+          onChange={(e) =>
+            onFiltersChange({
+              ...filters,
+              ram_mb__gte: e.target.value ? Number(e.target.value) : undefined,
+            })
+          }
+          className="input-premium"
+        >
+          <option value="">Any</option>
+          <option value="1024">1 GB</option>
+          <option value="2048">2 GB</option>
+          <option value="4096">4 GB</option>
+          <option value="8192">8 GB</option>
+          <option value="16384">16 GB</option>
+        </select>
+      </div>
+
       <button
         onClick={() => onFiltersChange({})}
         className="btn-secondary"
@@ -3,7 +3,8 @@ import { VPSInstance } from '../../types/vps';
 import { formatDateHumanReadable, getRelativeTime } from '../../lib/utils';
 import { VPSStatusBadge } from './VPSStatusBadge';
 import { PriceModal } from './PriceModal';
-import { Calendar, ChevronUp, ChevronDown } from 'lucide-react';
+import { Calendar, ChevronUp, ChevronDown, RefreshCw } from 'lucide-react';
+import { useRefreshInstance } from '../../lib/hooks/useVPS';
 
 interface VPSTableProps {
   instances: VPSInstance[];
@@ -24,6 +25,7 @@ export function VPSTable({ instances, isLoading }: VPSTableProps) {
   const [sortColumn, setSortColumn] = useState<SortColumn>('created');
   const [sortDirection, setSortDirection] = useState<SortDirection>('desc');
   const [selectedInstance, setSelectedInstance] = useState<SelectedInstance | null>(null);
+  const { mutate: refreshInstance, isPending: isRefreshing, variables: refreshing } = useRefreshInstance();
 
   const handleSort = (column: SortColumn) => {
     if (sortColumn === column) {
@@ -134,7 +136,27 @@ export function VPSTable({ instances, isLoading }: VPSTableProps) {
                   {instance.name.length > 10 ? instance.name.substring(0, 10) + '...' : instance.name}
                 </td>
                 <td className="px-6 py-4 text-sm whitespace-nowrap">
-                  <VPSStatusBadge status={instance.status} />
+                  <div className="inline-flex items-center gap-2">
+                    <VPSStatusBadge status={instance.status} />
+                    <button
+                      type="button"
+                      title="Refresh this instance"
+                      className="text-slate-400 hover:text-blue-600 transition-colors disabled:opacity-50"
+                      disabled={isRefreshing}
+                      onClick={() => refreshInstance({ providerId: instance.provider_account_id, instanceId: instance.id })}
+                    >
+                      <RefreshCw
+                        size={14}
+                        className={
+                          isRefreshing &&
+                          refreshing?.providerId === instance.provider_account_id &&
+                          refreshing?.instanceId === instance.id
+                            ? 'animate-spin'
+                            : ''
+                        }
+                      />
+                    </button>
+                  </div>
                 </td>
                 <td className="px-6 py-4 text-sm text-slate-600 font-mono">
                   {instance.ipv4 || 'N/A'}
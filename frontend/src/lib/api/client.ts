@@ -10,7 +10,7 @@ const client = axios.create({
 });
 
 // Helper to get auth token from localStorage
-const getTokenFromStorage = () => {
+export const getTokenFromStorage = () => {
   try {
     const stored = localStorage.getItem('auth-store');
     if (stored) {
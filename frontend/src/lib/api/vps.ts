@@ -1,18 +1,26 @@
-import client from './client';
-import { VPSInstance, VPSFilters } from '../../types/vps';
+import client, { getTokenFromStorage } from './client';
+import { BillingSummary, VPSInstance, VPSFilters, VPSProviderError } from '../../types/vps';
 
 export interface VPSResponse {
   results: VPSInstance[];
   count: number;
+  // Only present on paginated requests (limit/offset/cursor)
+  next?: string | null;
+  previous?: string | null;
+  errors?: VPSProviderError[];
   fetched_at: string;
 }
 
+const appendFilters = (params: URLSearchParams, filters?: VPSFilters) => {
+  Object.entries(filters ?? {}).forEach(([key, value]) => {
+    if (value !== undefined && value !== '') params.append(key, String(value));
+  });
+};
+
 export const vpsApi = {
   getAll: async (filters?: VPSFilters): Promise<VPSResponse> => {
     const params = new URLSearchParams();
-    if (filters?.provider_type) params.append('provider_type', filters.provider_type);
-    if (filters?.status) params.append('status', filters.status);
-    if (filters?.region) params.append('region', filters.region);
+    appendFilters(params, filters);
 
     const queryString = params.toString();
     const url = queryString ? `vps?${queryString}` : 'vps';
@@ -23,8 +31,7 @@ export const vpsApi = {
 
   getByProvider: async (providerId: number, filters?: VPSFilters): Promise<VPSResponse> => {
     const params = new URLSearchParams({ provider_id: providerId.toString() });
-    if (filters?.status) params.append('status', filters.status);
-    if (filters?.region) params.append('region', filters.region);
+    appendFilters(params, filters);
 
     const response = await client.get<VPSResponse>(
       `vps/by-provider?${params.toString()}`
@@ -32,10 +39,31 @@ export const vpsApi = {
     return response.data;
   },
 
-  refresh: async () => {
-    const response = await client.post<{ status: string; message: string }>(
-      'vps/refresh'
+  getBilling: async (): Promise<BillingSummary> => {
+    const response = await client.get<BillingSummary>('vps/billing');
+    return response.data;
+  },
+
+  // EventSource cannot send headers, so the token goes in the query string
+  getEventsUrl: (): string => {
+    const params = new URLSearchParams({ token: getTokenFromStorage() ?? '' });
+    return `${client.defaults.baseURL}/vps/events?${params.toString()}`;
+  },
+
+  // Refetches one instance upstream; the server patches its cached snapshot
+  refreshInstance: async (providerId: number, instanceId: string) => {
+    const response = await client.post<{ instance: VPSInstance; fetched_at: string }>(
+      `vps/${providerId}/${encodeURIComponent(instanceId)}/refresh`
     );
     return response.data;
   },
+
+  refresh: async () => {
+    const response = await client.post<{
+      status: string;
+      message: string;
+      warming: number;
+    }>('vps/refresh', { warm: true });
+    return response.data;
+  },
 };
@@ -1,8 +1,13 @@
+import { useEffect } from 'react';
 import { useQuery, useMutation, useQueryClient } from '@tanstack/react-query';
 import { vpsApi } from '../api/vps';
-import { VPSFilters } from '../../types/vps';
+import { VPSFilters, VPSInstance, VPSInstanceEvent } from '../../types/vps';
 
 const VPS_QUERY_KEY = ['vps'];
+// Not under VPS_QUERY_KEY: the list updaters below expect { instances }
+const BILLING_QUERY_KEY = ['vps-billing'];
+// Live events are opt-in, like VPS_EVENTS_ENABLED on the backend
+const EVENTS_ENABLED = ['true', '1', 't'].includes(import.meta.env.VITE_VPS_EVENTS?.toLowerCase());
 
 export const useVPS = (filters?: VPSFilters) => {
   return useQuery({
@@ -34,6 +39,15 @@ export const useVPSByProvider = (providerId: number, filters?: VPSFilters) => {
   });
 };
 
+export const useBilling = () => {
+  return useQuery({
+    queryKey: BILLING_QUERY_KEY,
+    queryFn: () => vpsApi.getBilling(),
+    staleTime: 60000,
+    refetchInterval: 60000,
+  });
+};
+
 export const useRefreshVPS = () => {
   const queryClient = useQueryClient();
 
@@ -41,7 +55,82 @@ export const useRefreshVPS = () => {
     mutationFn: () => vpsApi.refresh(),
     onSuccess: async () => {
       // Invalidate and refetch immediately
-      await queryClient.invalidateQueries({ queryKey: VPS_QUERY_KEY });
+      await Promise.all([
+        queryClient.invalidateQueries({ queryKey: VPS_QUERY_KEY }),
+        queryClient.invalidateQueries({ queryKey: BILLING_QUERY_KEY }),
+      ]);
     },
   });
 };
+
+// Refreshes one instance and updates its row in cached VPS lists
+export const useRefreshInstance = () => {
+  const queryClient = useQueryClient();
+
+  return useMutation({
+    mutationFn: ({ providerId, instanceId }: { providerId: number; instanceId: string }) =>
+      vpsApi.refreshInstance(providerId, instanceId),
+    onSuccess: ({ instance }) => {
+      queryClient.setQueriesData<{ instances: VPSInstance[]; fetchedAt: string }>(
+        { queryKey: VPS_QUERY_KEY },
+        (data) =>
+          data && {
+            ...data,
+            instances: data.instances.map((cached) =>
+              cached.provider_account_id === instance.provider_account_id && cached.id === instance.id
+                ? instance
+                : cached
+            ),
+          }
+      );
+      queryClient.invalidateQueries({ queryKey: BILLING_QUERY_KEY });
+    },
+    // Gone upstream (404) or failed: reload the lists
+    onError: () => queryClient.invalidateQueries({ queryKey: VPS_QUERY_KEY }),
+  });
+};
+
+// Applies live status/price changes from /vps/events to cached VPS lists
+export const useVPSEvents = () => {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    if (!EVENTS_ENABLED) return;
+    const source = new EventSource(vpsApi.getEventsUrl());
+
+    source.addEventListener('instances', (event) => {
+      const changes: VPSInstanceEvent[] = JSON.parse((event as MessageEvent).data);
+      queryClient.invalidateQueries({ queryKey: BILLING_QUERY_KEY });
+
+      // Added or removed instances change counts and filters: refetch
+      if (changes.some((change) => change.change !== 'modified')) {
+        queryClient.invalidateQueries({ queryKey: VPS_QUERY_KEY });
+        return;
+      }
+
+      const byKey = new Map(
+        changes.map((change) => [`${change.provider_account_id}:${change.id}`, change])
+      );
+      queryClient.setQueriesData<{ instances: VPSInstance[]; fetchedAt: string }>(
+        { queryKey: VPS_QUERY_KEY },
+        (data) =>
+          data && {
+            ...data,
+            instances: data.instances.map((instance) => {
+              const change = byKey.get(`${instance.provider_account_id}:${instance.id}`);
+              if (!change) return instance;
+              return {
+                ...instance,
+                status: change.status ?? instance.status,
+                // null is a real change (price unknown); absent means unchanged
+                monthly_price:
+                  'monthly_price' in change ? change.monthly_price ?? null : instance.monthly_price,
+              };
+            }),
+          }
+      );
+    });
+
+    return () => source.close();
+  }, [queryClient]);
+};
@@ -1,4 +1,4 @@
-import { useVPS } from '../lib/hooks/useVPS';
+import { useBilling } from '../lib/hooks/useVPS';
 import { usePageTitle } from '../lib/hooks/usePageTitle';
 import { Layout } from '../components/layout/Layout';
 import { RefreshCw, AlertCircle, Clock, DollarSign, Server, TrendingUp } from 'lucide-react';
@@ -8,26 +8,25 @@ import { ProviderCostCard } from '../components/billing/ProviderCostCard';
 
 export function BillingPage() {
   usePageTitle('Billing');
-  const { data, isLoading, error } = useVPS();
-  const instances = data?.instances ?? [];
-  const fetchedAt = data?.fetchedAt;
+  const { data, isLoading, error } = useBilling();
+  const fetchedAt = data?.fetched_at;
   const { mutate: refresh, isPending: isRefreshing } = useRefreshVPS();
 
-  // Calculate billing data
-  const providerCosts = instances.reduce((acc, instance) => {
-    if (!instance.monthly_price) return acc;
-    const provider = instance.provider_type;
-    if (!acc[provider]) {
-      acc[provider] = { total: 0, count: 0, currency: instance.currency };
-    }
-    acc[provider].total += instance.monthly_price;
-    acc[provider].count += 1;
-    return acc;
-  }, {} as Record<string, { total: number; count: number; currency: string }>);
-
-  const totalMonthlyCost = instances.reduce((sum, i) => sum + (i.monthly_price || 0), 0);
-  const activeInstanceCount = instances.filter(i => i.monthly_price).length;
-  const averageCost = activeInstanceCount > 0 ? totalMonthlyCost / activeInstanceCount : 0;
+  // Aggregates are computed server-side; totals come sorted by amount
+  const mainTotal = data?.totals[0];
+  const currency = mainTotal?.currency ?? 'USD';
+  const totalMonthlyCost = Number(mainTotal?.total ?? 0);
+  const averageCost = Number(mainTotal?.average ?? 0);
+  const activeInstanceCount = (data?.totals ?? []).reduce((sum, group) => sum + group.count, 0);
+
+  const providerCosts = Object.fromEntries(
+    (data?.by_provider ?? [])
+      .filter((group) => group.currency === currency)
+      .map((group) => [
+        group.provider_type,
+        { total: Number(group.total), count: group.count, currency: group.currency },
+      ])
+  );
 
   // Provider colors
   const providerColors: Record<string, string> = {
@@ -138,7 +137,7 @@ export function BillingPage() {
                 <div className="flex items-center justify-between">
                   <div>
                     <p className="stat-label">Total Monthly Cost</p>
-                    <p className="stat-value text-green-600">{formatCurrency(totalMonthlyCost)}</p>
+                    <p className="stat-value text-green-600">{formatCurrency(totalMonthlyCost, currency)}</p>
                   </div>
                   <div className="w-12 h-12 bg-green-100 rounded-lg flex items-center justify-center group-hover:bg-green-200 transition-colors">
                     <DollarSign size={24} className="text-green-600" />
@@ -162,7 +161,7 @@ export function BillingPage() {
                 <div className="flex items-center justify-between">
                   <div>
                     <p className="stat-label">Average Cost per Instance</p>
-                    <p className="stat-value text-purple-600">{formatCurrency(averageCost)}</p>
+                    <p className="stat-value text-purple-600">{formatCurrency(averageCost, currency)}</p>
                   </div>
                   <div className="w-12 h-12 bg-purple-100 rounded-lg flex items-center justify-center group-hover:bg-purple-200 transition-colors">
                     <TrendingUp size={24} className="text-purple-600" />
@@ -14,6 +14,15 @@ import { CreateProviderRequest, Provider } from '../types/provider';
 import { formatDate } from '../lib/utils';
 import { toast } from '../lib/utils/toast';
 
+// Circuit breaker states, shown instead of the last sync status while not closed
+const SYNC_STATUS_LABELS: Record<string, string> = {
+  open: 'Failing, retrying later',
+  half_open: 'Retrying',
+};
+
+const getSyncStatus = (provider: Provider): string | null =>
+  provider.circuit_state !== 'closed' ? provider.circuit_state : provider.last_sync_status;
+
 export function ProvidersPage() {
   usePageTitle('Providers');
   const [showModal, setShowModal] = useState(false);
@@ -220,35 +229,35 @@ export function ProvidersPage() {
 
                     {/* Sync Status Badge */}
                     <div className={`rounded-lg p-2.5 border flex items-center gap-2 ${
-                      provider.last_sync_status?.toLowerCase() === 'success'
+                      getSyncStatus(provider)?.toLowerCase() === 'success'
                         ? 'bg-green-50 border-green-200'
-                        : provider.last_sync_status?.toLowerCase() === 'failed'
+                        : ['failed', 'open'].includes(getSyncStatus(provider)?.toLowerCase() ?? '')
                           ? 'bg-red-50 border-red-200'
-                          : provider.last_sync_status?.toLowerCase() === 'pending'
+                          : ['pending', 'half_open'].includes(getSyncStatus(provider)?.toLowerCase() ?? '')
                             ? 'bg-blue-50 border-blue-200'
                             : 'bg-slate-50 border-slate-200'
                     }`}>
                       <span className="text-lg">
-                        {provider.last_sync_status?.toLowerCase() === 'success'
+                        {getSyncStatus(provider)?.toLowerCase() === 'success'
                           ? '✓'
-                          : provider.last_sync_status?.toLowerCase() === 'failed'
+                          : ['failed', 'open'].includes(getSyncStatus(provider)?.toLowerCase() ?? '')
                             ? '✕'
-                            : provider.last_sync_status?.toLowerCase() === 'pending'
+                            : ['pending', 'half_open'].includes(getSyncStatus(provider)?.toLowerCase() ?? '')
                               ? '⟳'
                               : '—'}
                       </span>
                       <div className="flex-1">
                         <p className="text-xs text-slate-500 font-medium">Sync Status</p>
                         <p className={`text-xs font-semibold mt-0.5 ${
-                          provider.last_sync_status?.toLowerCase() === 'success'
+                          getSyncStatus(provider)?.toLowerCase() === 'success'
                             ? 'text-green-700'
-                            : provider.last_sync_status?.toLowerCase() === 'failed'
+                            : ['failed', 'open'].includes(getSyncStatus(provider)?.toLowerCase() ?? '')
                               ? 'text-red-700'
-                              : provider.last_sync_status?.toLowerCase() === 'pending'
+                              : ['pending', 'half_open'].includes(getSyncStatus(provider)?.toLowerCase() ?? '')
                                 ? 'text-blue-700'
                                 : 'text-slate-900'
                         }`}>
-                          {provider.last_sync_status || 'Never synced'}
+                          {SYNC_STATUS_LABELS[getSyncStatus(provider) ?? ''] ?? (getSyncStatus(provider) || 'Never synced')}
                         </p>
                       </div>
                     </div>
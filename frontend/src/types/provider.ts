@@ -7,8 +7,11 @@ export interface Provider {
   is_active: boolean;
   created_at: string;
   updated_at: string;
+  sync_interval: number | null;
   last_sync_at: string | null;
   last_sync_status: string | null;
+  last_snapshot_at: string | null;
+  circuit_state: 'closed' | 'open' | 'half_open';
 }
 
 export interface CreateProviderRequest {
@@ -16,8 +16,53 @@ export interface VPSInstance {
   currency: string;
 }
 
+export interface VPSProviderError {
+  provider_id: number;
+  provider_name: string;
+  provider_type: string;
+  error: string;
+  // Set when the provider's last known good instances are served instead
+  stale?: boolean;
+  fetched_at?: string;
+}
+
+// Amounts are decimal strings, exact as computed by the server
+export interface BillingGroup {
+  currency: string;
+  total: string;
+  count: number;
+  average: string;
+}
+
+export interface BillingSummary {
+  instance_count: number;
+  totals: BillingGroup[];
+  by_provider: (BillingGroup & { provider_type: string })[];
+  by_provider_account: (BillingGroup & { provider_account_id: number; provider_name: string | null })[];
+  by_region: (BillingGroup & { region: string | null })[];
+  by_plan: (BillingGroup & { plan: string | null })[];
+  errors: VPSProviderError[];
+  fetched_at: string;
+}
+
+// Pushed by /vps/events when a snapshot adds, removes or changes an instance
+export interface VPSInstanceEvent {
+  change: 'added' | 'modified' | 'removed';
+  provider_account_id: number;
+  id: string;
+  name?: string;
+  status?: VPSInstance['status'];
+  monthly_price?: number | null;
+  currency?: string;
+}
+
 export interface VPSFilters {
   provider_type?: string;
   status?: string;
   region?: string;
+  search?: string;
+  ordering?: string;
+  cpu_cores__gte?: number;
+  ram_mb__gte?: number;
+  disk_gb__gte?: number;
 }